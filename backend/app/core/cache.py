@@ -0,0 +1,614 @@
+"""
+Response Cache
+Two-tier cache for read paths: a small in-process LRU in front of a shared
+Redis-compatible store (or an in-memory stand-in for tests and single-process
+deployments).
+
+- Per-key TTLs; the local tier additionally caps staleness across processes
+  at CACHE_LOCAL_TTL_SECONDS, since another process's invalidation only
+  reaches the shared tier.
+- Tags: every entry is filed under tags such as "job:<id>"; invalidating a
+  tag drops every entry filed under it, in both tiers.
+- Single-flight: concurrent misses on one key in a process share one load.
+
+Values must be JSON-serialisable; `cached(schema=...)` dumps ORM results
+through a pydantic schema first. Local hits hand out the cached object
+itself, so callers must treat values as read-only.
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# How long a tag's invalidation time is remembered to reject loads that
+# started before it; longer than any sane loader runs
+RECENT_INVALIDATION_WINDOW = 60.0
+
+
+class CacheBackendError(Exception):
+    """Raised by a backend when the shared store is unreachable."""
+
+
+# ===============================
+#       SHARED STORE BACKENDS
+# ===============================
+class CacheBackend:
+    """
+    The handful of Redis commands the cache needs. Keys and tag names
+    arrive fully namespaced.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Sequence[str]) -> None:
+        """Stores the value and adds `key` to each tag's member set."""
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Sequence[str]) -> int:
+        """Deletes every key filed under the tags, and the tag sets."""
+        raise NotImplementedError
+
+    def clear(self, prefix: str) -> None:
+        """Deletes every key starting with `prefix`."""
+        raise NotImplementedError
+
+
+class InMemoryBackend(CacheBackend):
+    """
+    Process-local stand-in with Redis semantics, for tests and for running
+    without a Redis server.
+    """
+
+    SWEEP_EVERY = 1024
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[bytes, float, Tuple[str, ...]]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _drop(self, key):
+        _, _, tags = self._values.pop(key)
+        for tag in tags:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+
+    def _sweep(self):
+        now = time.monotonic()
+        for key in [k for k, (_, expires, _) in self._values.items() if expires <= now]:
+            self._drop(key)
+
+    def get(self, key):
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.monotonic():
+                self._drop(key)
+                return None
+            return item[0]
+
+    def set(self, key, value, ttl, tags):
+        with self._lock:
+            if key in self._values:
+                self._drop(key)
+            self._values[key] = (value, time.monotonic() + ttl, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self._sweep()
+
+    def invalidate_tags(self, tags):
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    removed += 1
+        return removed
+
+    def clear(self, prefix):
+        with self._lock:
+            for key in [k for k in self._values if k.startswith(prefix)]:
+                self._drop(key)
+            for tag in [t for t in self._tags if t.startswith(prefix)]:
+                del self._tags[tag]
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis (or any RESP-compatible server) through redis-py. A write is one
+    pipelined round trip: SET with EX, then SADD + EXPIRE per tag. Tag sets
+    always get the maximum entry TTL, so they outlive every member and an
+    invalidation can never miss a live key.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        try:
+            from redis.exceptions import RedisError
+        except ImportError:  # a duck-typed client in tests
+            RedisError = ConnectionError
+        self._errors = (RedisError, OSError)
+
+    @classmethod
+    def from_settings(cls) -> "RedisBackend":
+        import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+
+        return cls(
+            redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD,
+                socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            )
+        )
+
+    def get(self, key):
+        try:
+            return self.client.get(key)
+        except self._errors as exc:
+            raise CacheBackendError(exc)
+
+    def set(self, key, value, ttl, tags):
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(key, value, ex=max(1, int(round(ttl))))
+            for tag in tags:
+                pipe.sadd(tag, key)
+                pipe.expire(tag, int(settings.CACHE_MAX_TTL_SECONDS))
+            pipe.execute()
+        except self._errors as exc:
+            raise CacheBackendError(exc)
+
+    def invalidate_tags(self, tags):
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(tag)
+            members = set()
+            for keys in pipe.execute():
+                members.update(keys)
+            removed = self.client.delete(*members) if members else 0
+            self.client.delete(*tags)
+            return removed
+        except self._errors as exc:
+            raise CacheBackendError(exc)
+
+    def clear(self, prefix):
+        # Only our namespace, never FLUSHDB on a shared server
+        try:
+            for key in self.client.scan_iter(match=f"{prefix}*", count=1000):
+                self.client.delete(key)
+        except self._errors as exc:
+            raise CacheBackendError(exc)
+
+
+# ===============================
+#       LOCAL TIER
+# ===============================
+class _LocalLRU:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float, Tuple[str, ...]]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        item = self._entries.get(key)
+        if item is None:
+            return _MISSING
+        if item[1] <= time.monotonic():
+            self._drop(key)
+            return _MISSING
+        self._entries.move_to_end(key)
+        return item[0]
+
+    def put(self, key: str, value: Any, ttl: float, tags: Tuple[str, ...]) -> None:
+        if self.max_entries <= 0:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (value, time.monotonic() + ttl, tags)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            for key in list(self._by_tag.get(tag, ())):
+                self._drop(key)
+                removed += 1
+        return removed
+
+    def _drop(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_tag.clear()
+
+
+# ===============================
+#       CACHE
+# ===============================
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class Cache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str = "swipehire",
+        default_ttl: float = 60.0,
+        local_max_entries: int = 10000,
+        local_ttl: float = 5.0,
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.local_ttl = local_ttl
+        self._local = _LocalLRU(local_max_entries)
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._recent_invalidations: "OrderedDict[str, float]" = OrderedDict()
+        self._counts = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced": 0,
+            "backend_errors": 0,
+            "invalidations": 0,
+        }
+
+    def _ns(self, name: str) -> str:
+        return f"{self.namespace}:{name}"
+
+    def _count(self, name: str, n: int = 1) -> None:
+        self._counts[name] += n
+
+    # --- Basic operations ---
+    def get(self, key: str, default=None):
+        with self._lock:
+            value = self._local.get(key)
+            if value is not _MISSING:
+                self._count("local_hits")
+                return value
+        try:
+            raw = self.backend.get(self._ns(key))
+        except CacheBackendError:
+            logger.warning("Cache backend unavailable on get(%s)", key, exc_info=True)
+            with self._lock:
+                self._count("backend_errors")
+            raw = None
+        with self._lock:
+            if raw is None:
+                self._count("misses")
+                return default
+            self._count("shared_hits")
+            value, tags = json.loads(raw)
+            self._local.put(key, value, self.local_ttl, tuple(tags))
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ttl = min(ttl or self.default_ttl, settings.CACHE_MAX_TTL_SECONDS)
+        tags = tuple(sorted(set(tags)))
+        raw = json.dumps([value, tags], separators=(",", ":")).encode()
+        with self._lock:
+            self._local.put(key, value, min(ttl, self.local_ttl), tags)
+        try:
+            self.backend.set(self._ns(key), raw, ttl, [self._ns(f"tag:{t}") for t in tags])
+        except CacheBackendError:
+            logger.warning("Cache backend unavailable on set(%s)", key, exc_info=True)
+            with self._lock:
+                self._count("backend_errors")
+
+    def invalidate_tags(self, *tags: str) -> None:
+        tags = tuple(set(tags))
+        if not tags:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._local.invalidate_tags(tags)
+            self._count("invalidations", len(tags))
+            for tag in tags:
+                self._recent_invalidations.pop(tag, None)
+                self._recent_invalidations[tag] = now
+            while self._recent_invalidations:
+                oldest_tag, at = next(iter(self._recent_invalidations.items()))
+                if now - at < RECENT_INVALIDATION_WINDOW:
+                    break
+                del self._recent_invalidations[oldest_tag]
+        try:
+            self.backend.invalidate_tags([self._ns(f"tag:{t}") for t in tags])
+        except CacheBackendError:
+            # Entries in the shared tier live out their TTL
+            logger.warning("Cache backend unavailable on invalidate(%s)", tags, exc_info=True)
+            with self._lock:
+                self._count("backend_errors")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+        self.backend.clear(self._ns(""))
+
+    def _store_loaded(self, key, value, ttl, tags, started: float) -> None:
+        """
+        Caches a freshly loaded value unless one of its tags was invalidated
+        after the load began: the loader may have read the pre-commit rows.
+        """
+        if value is None:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if any(self._recent_invalidations.get(tag, 0.0) >= started for tag in tags):
+                return
+        self.set(key, value, ttl, tags)
+
+    # --- Read-through with single-flight ---
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Callable[[Any], Iterable[str]] = lambda value: (),
+    ):
+        """
+        Returns the cached value, or runs `loader` once for all threads
+        missing on `key` at the same time. None results are not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                # A flight may have landed since the lookup above
+                value = self._local.get(key)
+                if value is not _MISSING:
+                    return value
+                flight = self._flights[key] = _Flight()
+            else:
+                self._count("coalesced")
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            with self._lock:
+                self._count("loads")
+            started = time.monotonic()
+            flight.value = loader()
+            if flight.value is not None:
+                self._store_loaded(key, flight.value, ttl, tags(flight.value), started)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def get_or_load_async(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Callable[[Any], Iterable[str]] = lambda value: (),
+    ):
+        """
+        Async twin of get_or_load(); coalesces per event loop. The shared
+        tier is a blocking client, so it is consulted off the loop only on
+        a local miss.
+        """
+        with self._lock:
+            value = self._local.get(key)
+            if value is not _MISSING:
+                self._count("local_hits")
+                return value
+
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        future = self._async_flights.get(flight_key)
+        if future is not None:
+            with self._lock:
+                self._count("coalesced")
+            return await asyncio.shield(future)
+
+        future = self._async_flights[flight_key] = loop.create_future()
+        try:
+            value = await loop.run_in_executor(None, self.get, key, _MISSING)
+            if value is _MISSING:
+                with self._lock:
+                    self._count("loads")
+                started = time.monotonic()
+                value = await loader()
+                if value is not None:
+                    await loop.run_in_executor(
+                        None, self._store_loaded, key, value, ttl, tags(value), started
+                    )
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # retrieved here, so followers-less failures don't warn
+            raise
+        finally:
+            del self._async_flights[flight_key]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._counts)
+            stats["local_entries"] = len(self._local)
+            stats["local_evictions"] = self._local.evictions
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["local_hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+@lru_cache()
+def get_cache() -> Cache:
+    if settings.CACHE_BACKEND == "redis":
+        backend = RedisBackend.from_settings()
+    elif settings.CACHE_BACKEND == "memory":
+        backend = InMemoryBackend()
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND {settings.CACHE_BACKEND!r}")
+    return Cache(
+        backend,
+        namespace=settings.CACHE_NAMESPACE,
+        default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS,
+        local_max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+        local_ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+    )
+
+
+# ===============================
+#       DECORATOR
+# ===============================
+def cached(
+    key: Callable[..., str],
+    ttl: Optional[float] = None,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    schema=None,
+):
+    """
+    Read-through caching for a sync or async getter.
+
+        @cached(key=lambda db, job_id: f"job:{job_id}",
+                tags=lambda value, db, job_id: [f"job:{job_id}"],
+                schema=schemas.JobDetail)
+        def get_job_detail(db, job_id): ...
+
+    `key` and `tags` receive the getter's arguments (`tags` gets the loaded
+    value first). With `schema`, the getter's result is dumped to JSON-safe
+    data, so callers get a dict whether it was a hit or a miss. Bypassed
+    entirely when CACHE_ENABLED is off.
+    """
+
+    def to_value(result):
+        if schema is None or result is None:
+            return result
+        return schema.model_validate(result).model_dump(mode="json")
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not settings.CACHE_ENABLED:
+                    return to_value(await fn(*args, **kwargs))
+
+                async def load():
+                    return to_value(await fn(*args, **kwargs))
+
+                return await get_cache().get_or_load_async(
+                    key(*args, **kwargs),
+                    load,
+                    ttl,
+                    lambda value: tags(value, *args, **kwargs) if tags else (),
+                )
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not settings.CACHE_ENABLED:
+                return to_value(fn(*args, **kwargs))
+            return get_cache().get_or_load(
+                key(*args, **kwargs),
+                lambda: to_value(fn(*args, **kwargs)),
+                ttl,
+                lambda value: tags(value, *args, **kwargs) if tags else (),
+            )
+
+        return wrapper
+
+    return decorate
+
+
+# ===============================
+#       INVALIDATION ON COMMIT
+# ===============================
+_PENDING_KEY = "cache_tags"
+
+
+def invalidate_on_commit(session, *tags: str) -> None:
+    """
+    Queues tags to invalidate when `session` commits, for writes the ORM
+    flush hooks cannot see (Core INSERT/UPDATE statements).
+    """
+    session = getattr(session, "sync_session", session)
+    session.info.setdefault(_PENDING_KEY, set()).update(tags)
+
+
+def install_cache_invalidation(session_factory, tags_for: Callable[[Any], Iterable[str]]) -> None:
+    """
+    Invalidates the tags of every object inserted, updated or deleted in a
+    committed transaction; `tags_for(obj)` maps an ORM object to its tags.
+    Collected on flush, applied after commit, discarded on rollback.
+    """
+
+    def collect(session, flush_context):
+        pending = session.info.setdefault(_PENDING_KEY, set())
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            pending.update(tags_for(obj))
+
+    def apply(session):
+        tags = session.info.pop(_PENDING_KEY, None)
+        if tags and settings.CACHE_ENABLED:
+            get_cache().invalidate_tags(*tags)
+
+    def discard(session):
+        session.info.pop(_PENDING_KEY, None)
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(session_factory, "after_soft_rollback", lambda session, previous: discard(session))
@@ -0,0 +1,202 @@
+"""
+Conditional GET
+ETag / Last-Modified validators built from a cheap version probe, so a
+client polling an unchanged resource gets a 304 without the server loading
+or serialising the object graph.
+
+Handlers probe first, then hand the validators and a loader to respond():
+
+    version = catalog.get_job_version(db, job_id)        # one indexed query
+    return respond(request, make_etag("job", job_id, *version), last_modified, load)
+
+Each 304 is credited with the average body size and build time of that
+route's full responses, reported as bandwidth and CPU saved in /metrics.
+"""
+
+import hashlib
+import inspect
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.instrumentation import route_label
+from app.core.metrics import registry
+
+CONDITIONAL_REQUESTS = registry.counter(
+    "swipehire_conditional_requests_total",
+    "Validator-carrying GETs by route template and outcome (not_modified or full).",
+    ("route", "result"),
+)
+BYTES_SAVED = registry.counter(
+    "swipehire_conditional_bytes_saved_total",
+    "Response body bytes not sent thanks to 304s (estimated from the route's full responses).",
+    ("route",),
+)
+SECONDS_SAVED = registry.counter(
+    "swipehire_conditional_seconds_saved_total",
+    "Load and serialisation time skipped thanks to 304s, net of the version probe.",
+    ("route",),
+)
+
+# Responses are private to the caller and must be revalidated before reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag over the version parts, e.g. ("job", id, updated_at, count).
+    Weak because equal versions mean equivalent, not byte-identical, bodies.
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    present = [_as_utc(ts) for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Drivers hand back naive datetimes for UTC columns
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    RFC 9110 evaluation for GET/HEAD: If-None-Match (weak comparison) wins;
+    If-Modified-Since is only consulted when it is absent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        wanted = _strip_weak(etag)
+        return any(_strip_weak(candidate) == wanted for candidate in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: Optional[str], last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"Cache-Control": CACHE_CONTROL}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+class _FullResponseCost:
+    """Running averages of a route's full response size and build time."""
+
+    __slots__ = ("count", "bytes", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0.0
+        self.seconds = 0.0
+
+    def observe(self, body_bytes: int, seconds: float) -> None:
+        # Cumulative mean for the first 100 responses, then an EWMA
+        self.count += 1
+        alpha = max(1.0 / self.count, 0.01)
+        self.bytes += alpha * (body_bytes - self.bytes)
+        self.seconds += alpha * (seconds - self.seconds)
+
+
+_costs: Dict[str, _FullResponseCost] = {}
+_costs_lock = threading.Lock()
+
+
+def _cost(route: str) -> _FullResponseCost:
+    with _costs_lock:
+        cost = _costs.get(route)
+        if cost is None:
+            cost = _costs[route] = _FullResponseCost()
+        return cost
+
+
+def _not_modified(request: Request, etag, last_modified, started: float) -> Response:
+    route = route_label(request.scope)
+    CONDITIONAL_REQUESTS.inc((route, "not_modified"))
+    cost = _cost(route)
+    if cost.count:
+        BYTES_SAVED.inc((route,), cost.bytes)
+        SECONDS_SAVED.inc((route,), max(cost.seconds - (time.perf_counter() - started), 0.0))
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def _full(request: Request, payload: Any, etag, last_modified, started: float) -> Response:
+    response = JSONResponse(jsonable_encoder(payload), headers=validator_headers(etag, last_modified))
+    route = route_label(request.scope)
+    CONDITIONAL_REQUESTS.inc((route, "full"))
+    cost = _cost(route)
+    with _costs_lock:
+        cost.observe(len(response.body), time.perf_counter() - started)
+    return response
+
+
+def respond(
+    request: Request,
+    etag: Optional[str],
+    last_modified: Optional[datetime],
+    load: Callable[[], Any],
+    started: Optional[float] = None,
+    not_found: str = "Not found",
+) -> Response:
+    """
+    304 when the request's validators match, otherwise the JSON body from
+    `load()` with ETag / Last-Modified set. `started` is when the handler
+    began (before the probe), for the CPU-saved estimate. A None from
+    `load()` (the row went away after the probe) is a 404 with `not_found`.
+    """
+    started = started if started is not None else time.perf_counter()
+    if is_not_modified(request, etag, last_modified):
+        return _not_modified(request, etag, last_modified, started)
+    payload = load()
+    if payload is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return _full(request, payload, etag, last_modified, started)
+
+
+async def respond_async(
+    request: Request,
+    etag: Optional[str],
+    last_modified: Optional[datetime],
+    load: Callable[[], Any],
+    started: Optional[float] = None,
+    not_found: str = "Not found",
+) -> Response:
+    started = started if started is not None else time.perf_counter()
+    if is_not_modified(request, etag, last_modified):
+        return _not_modified(request, etag, last_modified, started)
+    payload = load()
+    if inspect.isawaitable(payload):
+        payload = await payload
+    if payload is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return _full(request, payload, etag, last_modified, started)
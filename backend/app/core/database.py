@@ -1,7 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from functools import lru_cache
+from typing import AsyncGenerator, Generator
 from app.core.config import settings
 
 # Create SQLAlchemy engine
@@ -32,6 +35,57 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# Async drivers for each sync dialect we run on
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Swaps the driver of a sync database URL for its async counterpart,
+    e.g. mysql+pymysql:// -> mysql+aiomysql://, sqlite:// -> sqlite+aiosqlite://.
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.drivername}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """
+    Created on first use, so the async driver is only needed when
+    DATABASE_ASYNC is enabled.
+    """
+    return create_async_engine(
+        settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL),
+        echo=settings.DATABASE_ECHO,
+        pool_pre_ping=True,
+    )
+
+
+@lru_cache()
+def get_async_sessionmaker() -> async_sessionmaker:
+    # expire_on_commit=False: attributes stay readable after commit without
+    # an implicit (and, in async, illegal) lazy refresh
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False, autoflush=False)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database dependency for FastAPI endpoints.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database - create all tables.
@@ -0,0 +1,112 @@
+"""
+Password Hashing Pool
+Runs argon2/bcrypt hashing and verification in a dedicated process pool so
+a login burst burns its own cores instead of the request threadpool.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+
+
+class HashingPoolSaturated(RuntimeError):
+    """Raised when the pool already has `max_pending` jobs in flight."""
+
+
+# --- Worker-side functions (run inside the pool processes) ---
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+class HashingPool:
+    """
+    Process pool with an admission limit.
+
+    At most `max_pending` hash/verify jobs may be running or queued at once;
+    beyond that submissions fail fast with HashingPoolSaturated, which the
+    auth routes turn into a 503 instead of letting requests pile up. A job
+    counts as pending until its worker finishes it, even if the caller has
+    stopped waiting.
+
+    Workers are spawned, not forked: the pool starts lazily, when the app's
+    background threads may be holding locks a forked child would inherit.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 64):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.total_completed = 0
+        self.total_failed = 0
+        self.total_rejected = 0
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.total_rejected += 1
+                raise HashingPoolSaturated(
+                    f"{self._pending} password hashing jobs already pending"
+                )
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+                self.total_failed += 1
+            raise
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.total_failed += 1
+            else:
+                self.total_completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "total_completed": self.total_completed,
+            "total_failed": self.total_failed,
+            "total_rejected": self.total_rejected,
+        }
+
+
+@lru_cache()
+def get_hashing_pool() -> HashingPool:
+    return HashingPool(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    )
@@ -0,0 +1,243 @@
+"""
+Request and SQL Instrumentation
+ASGI middleware plus SQLAlchemy engine hooks that attribute statement
+counts, DB time and rows to the route template that issued them, and track
+connection-pool checkout waits and saturation.
+
+Nothing here is installed when METRICS_ENABLED is off, so a disabled
+deployment pays no per-request or per-statement cost at all.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import registry
+
+# Label values are route templates ("/api/jobs/{job_id}"), never raw paths,
+# and these fixed fallbacks, so cardinality is bounded by the route table.
+UNMATCHED_ROUTE = "unmatched"
+BACKGROUND_ROUTE = "background"
+KNOWN_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+
+HTTP_REQUESTS = registry.counter(
+    "swipehire_http_requests_total",
+    "HTTP requests by route template and status class.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = registry.histogram(
+    "swipehire_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+)
+STATEMENTS_PER_REQUEST = registry.histogram(
+    "swipehire_db_statements_per_request",
+    "SQL statements issued per HTTP request.",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_STATEMENTS = registry.counter(
+    "swipehire_db_statements_total",
+    "SQL statements executed, by engine and route template.",
+    ("engine", "route"),
+)
+DB_TIME = registry.counter(
+    "swipehire_db_time_seconds_total",
+    "Time spent executing SQL, by engine and route template.",
+    ("engine", "route"),
+)
+DB_ROWS = registry.counter(
+    "swipehire_db_rows_total",
+    "Rows returned or affected as reported by the driver (SQLite reports none for SELECT).",
+    ("engine", "route"),
+)
+POOL_WAIT = registry.histogram(
+    "swipehire_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ("engine",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+_engines: Dict[str, Engine] = {}
+
+
+class _RequestStats:
+    __slots__ = ("by_engine",)
+
+    def __init__(self):
+        self.by_engine: Dict[str, list] = {}  # engine -> [statements, seconds, rows]
+
+
+_current: ContextVar[Optional[_RequestStats]] = ContextVar("request_db_stats", default=None)
+
+
+# ===============================
+#       ENGINE HOOKS
+# ===============================
+def _pool_gauge():
+    for label, engine in _engines.items():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        yield (label, "checked_out"), checked_out
+        yield (label, "size"), pool.size()
+        yield (label, "overflow"), max(pool.overflow(), 0)
+        yield (label, "saturation"), checked_out / capacity if capacity else 0.0
+
+
+registry.gauge(
+    "swipehire_db_pool",
+    "Connection pool state; saturation is checked-out / (size + max_overflow).",
+    ("engine", "stat"),
+    callback=_pool_gauge,
+)
+
+
+def instrument_engine(engine: Engine, label: str) -> None:
+    """
+    Attaches statement and pool hooks to an engine. Idempotent per label.
+    """
+    if label in _engines:
+        return
+    _engines[label] = engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record(conn.info["metrics_started"].pop(), max(cursor.rowcount, 0))
+
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            record(started.pop(), 0)
+
+    def record(started, rows):
+        elapsed = time.perf_counter() - started
+        stats = _current.get()
+        if stats is None:
+            DB_STATEMENTS.inc((label, BACKGROUND_ROUTE))
+            DB_TIME.inc((label, BACKGROUND_ROUTE), elapsed)
+            DB_ROWS.inc((label, BACKGROUND_ROUTE), rows)
+            return
+        totals = stats.by_engine.get(label)
+        if totals is None:
+            totals = stats.by_engine[label] = [0, 0.0, 0]
+        totals[0] += 1
+        totals[1] += elapsed
+        totals[2] += rows
+
+    def time_checkouts(engine):
+        # Pools have no event before a checkout starts waiting, so the wait
+        # is timed around connect(); dispose() swaps in a new, unwrapped pool
+        pool = engine.pool
+        checkout = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                return checkout()
+            finally:
+                POOL_WAIT.observe(time.perf_counter() - started, (label,))
+
+        pool.connect = timed_connect
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+    event.listen(engine, "engine_disposed", time_checkouts)
+    time_checkouts(engine)
+
+
+# ===============================
+#       ASGI MIDDLEWARE
+# ===============================
+def route_label(scope) -> str:
+    # Newer FastAPI keeps included routes un-prefixed on scope["route"] and
+    # records the full template on the effective route context instead
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path if path else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task hop) that times each
+    request and flushes its per-request SQL totals under the matched route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = _RequestStats()
+        token = _current.set(stats)
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+            route = route_label(scope)
+            HTTP_REQUESTS.inc((method, route, f"{status_holder[0] // 100}xx"))
+            HTTP_LATENCY.observe(elapsed, (method, route))
+            total_statements = 0
+            for label, (statements, seconds, rows) in stats.by_engine.items():
+                total_statements += statements
+                DB_STATEMENTS.inc((label, route), statements)
+                DB_TIME.inc((label, route), seconds)
+                DB_ROWS.inc((label, route), rows)
+            STATEMENTS_PER_REQUEST.observe(total_statements, (method, route))
+
+
+# ===============================
+#       COMPONENT STATS
+# ===============================
+_components: Dict[str, Callable[[], Dict]] = {}
+
+
+def _component_gauge():
+    for component, stats in list(_components.items()):
+        for stat, value in stats().items():
+            if isinstance(value, (int, float)):
+                yield (component, stat), float(value)
+
+
+registry.gauge(
+    "swipehire_component",
+    "Numeric stats reported by in-process components (caches, buffers, pools).",
+    ("component", "stat"),
+    callback=_component_gauge,
+)
+
+
+def register_component(name: str, stats: Callable[[], Dict]) -> None:
+    """
+    Exposes a component's stats() dict; only numeric values are exported.
+    """
+    _components[name] = stats
+
+
+def install_instrumentation(app, engines: Dict[str, Engine]) -> None:
+    for label, engine in engines.items():
+        instrument_engine(engine, label)
+    app.add_middleware(MetricsMiddleware)
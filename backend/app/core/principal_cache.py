@@ -0,0 +1,111 @@
+"""
+Principal Cache
+Remembers who a bearer token belongs to, so authenticated requests skip the
+JWT decode and the user lookup until the token expires.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Detached snapshot of an authenticated user. Safe to share between
+    requests because it holds no session or lazy-loading state.
+    """
+
+    id: int
+    email: str
+    is_active: bool
+    profile_id: Optional[int] = None
+
+
+def token_key(token: str) -> str:
+    # Raw tokens never sit in memory longer than the request that sent them
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """
+    LRU map of token hash -> Principal.
+
+    Each entry lives until the token's `exp` or `max_ttl` seconds, whichever
+    comes first; the TTL cap bounds how long a change made by another process
+    can go unnoticed. invalidate_user() drops every token of a user at once.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (principal, expires_at)
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        key = token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, token: str, principal: Principal, token_exp: float) -> None:
+        expires_at = min(float(token_exp), time.time() + self.max_ttl)
+        key = token_key(token)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (principal, expires_at)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> int:
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys_by_user.get(entry[0].id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[entry[0].id]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
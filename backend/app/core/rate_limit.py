@@ -0,0 +1,518 @@
+"""
+Rate Limiting
+Sliding-window request limits and calendar-day quotas, kept in memory or
+in a shared Redis-compatible store. A check is a handful of dictionary
+operations (or one script call) and never touches SQL.
+
+- Sliding window: the classic two-bucket approximation. The count for the
+  current fixed window is added to the previous window's count, weighted by
+  how much of that window is still inside the sliding one. That is O(1)
+  state per key rather than a timestamp per request.
+- Daily quotas: one counter per key and local calendar day. The date is
+  part of the key, so midnight in the caller's timezone starts a fresh
+  counter and yesterday's expires on its own.
+- Fail open: an unreachable store lets requests through (and counts the
+  error) rather than taking the API down with it.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta, tzinfo
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = registry.counter(
+    "swipehire_rate_limited_total",
+    "Requests rejected by a rate limit or quota.",
+    ("limit",),
+)
+
+
+class RateLimitBackendError(Exception):
+    """Raised by a backend when the shared store is unreachable."""
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the caller may retry (denied) or the count resets
+
+    @property
+    def reset_seconds(self) -> int:
+        """reset_after rounded up to whole seconds, as the headers carry it."""
+        return max(1, int(self.reset_after + 0.999))
+
+    def raw_headers(self) -> List[Tuple[bytes, bytes]]:
+        """X-RateLimit-* (and Retry-After once denied) as ASGI header pairs."""
+        reset = str(self.reset_seconds).encode()
+        headers = [
+            (b"x-ratelimit-limit", str(self.limit).encode()),
+            (b"x-ratelimit-remaining", str(self.remaining).encode()),
+            (b"x-ratelimit-reset", reset),
+        ]
+        if not self.allowed:
+            headers.append((b"retry-after", reset))
+        return headers
+
+
+def window_estimate(previous: int, current: int, elapsed: float) -> float:
+    """Requests inside the sliding window; `elapsed` is the fraction of the current window gone."""
+    return previous * (1.0 - elapsed) + current
+
+
+def retry_after(previous: int, current: int, limit: int, window: float, elapsed: float) -> float:
+    """Seconds until one more request fits under `limit`."""
+    if current + 1 > limit:
+        # Only the next window helps; by then this one is the weighted one
+        return window * (1.0 - elapsed)
+    # Wait until the previous window's weight has decayed enough
+    needed = 1.0 - (limit - current - 1) / previous if previous else elapsed
+    return max(0.0, window * (needed - elapsed))
+
+
+# ===============================
+#       STORAGE BACKENDS
+# ===============================
+class RateLimitBackend:
+    """Counter storage. Keys arrive fully namespaced."""
+
+    # Whether calls block on I/O; async callers move them off the event loop
+    blocking = False
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Tuple[bool, int, int]:
+        """
+        Counts a request against the sliding window unless that would exceed
+        `limit`. Returns (allowed, previous window count, current window count).
+        """
+        raise NotImplementedError
+
+    def consume(self, key: str, limit: int, expires_at: float) -> Tuple[bool, int]:
+        """Takes one unit of a quota unless it is used up. Returns (allowed, used)."""
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        """Gives back one unit taken by consume()."""
+        raise NotImplementedError
+
+    def size(self) -> int:
+        """Live keys, where the store can tell cheaply; -1 otherwise."""
+        return -1
+
+
+class _Shard:
+    __slots__ = ("lock", "windows", "quotas", "ops")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows: Dict[str, List] = {}  # key -> [window index, previous, current, expires_at]
+        self.quotas: Dict[str, List] = {}  # key -> [used, expires_at]
+        self.ops = 0
+
+
+class ShardedMemoryBackend(RateLimitBackend):
+    """
+    Process-local counters split over `shards` lock-protected dicts, so
+    concurrent requests for different keys rarely wait on each other.
+    For a single process, or when each process may enforce its own limits.
+    """
+
+    SWEEP_EVERY = 4096  # operations per shard between sweeps of expired keys
+
+    def __init__(self, shards: int = 64):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    @staticmethod
+    def _sweep(shard: _Shard, now: float) -> None:
+        for key in [k for k, entry in shard.windows.items() if entry[3] <= now]:
+            del shard.windows[key]
+        for key in [k for k, (_, expires_at) in shard.quotas.items() if expires_at <= now]:
+            del shard.quotas[key]
+
+    def _tick(self, shard: _Shard, now: float) -> None:
+        shard.ops += 1
+        if shard.ops % self.SWEEP_EVERY == 0:
+            self._sweep(shard, now)
+
+    def hit(self, key, limit, window, now):
+        index = int(now // window)
+        elapsed = (now - index * window) / window
+        shard = self._shard(key)
+        with shard.lock:
+            self._tick(shard, now)
+            entry = shard.windows.get(key)
+            if entry is None:
+                entry = shard.windows[key] = [index, 0, 0, 0.0]
+            elif entry[0] != index:
+                entry[1] = entry[2] if entry[0] == index - 1 else 0
+                entry[2] = 0
+                entry[0] = index
+            previous, current = entry[1], entry[2]
+            if window_estimate(previous, current, elapsed) + 1 > limit:
+                return False, previous, current
+            entry[2] = current + 1
+            # Useless once it cannot be the previous window any more
+            entry[3] = (index + 2) * window
+            return True, previous, current + 1
+
+    def consume(self, key, limit, expires_at):
+        shard = self._shard(key)
+        now = time.time()
+        with shard.lock:
+            self._tick(shard, now)
+            entry = shard.quotas.get(key)
+            if entry is None:
+                entry = shard.quotas[key] = [0, expires_at]
+            if entry[0] >= limit:
+                return False, entry[0]
+            entry[0] += 1
+            return True, entry[0]
+
+    def release(self, key):
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.quotas.get(key)
+            if entry is not None and entry[0] > 0:
+                entry[0] -= 1
+
+    def size(self):
+        return sum(len(shard.windows) + len(shard.quotas) for shard in self._shards)
+
+
+# The scripts run atomically on the server, so concurrent processes cannot
+# both take the last unit
+_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * (1 - tonumber(ARGV[2])) + current + 1 > tonumber(ARGV[1]) then
+    return {0, previous, current}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then redis.call('EXPIRE', KEYS[1], ARGV[3]) end
+return {1, previous, current}
+"""
+
+_CONSUME_SCRIPT = """
+local used = redis.call('INCR', KEYS[1])
+if used == 1 then redis.call('EXPIREAT', KEYS[1], ARGV[2]) end
+if used > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return {0, used - 1}
+end
+return {1, used}
+"""
+
+_RELEASE_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') > 0 then redis.call('DECR', KEYS[1]) end
+return 0
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Counters shared by every process, on Redis or any RESP-compatible server
+    with scripting, through redis-py. Each check is one EVALSHA round trip.
+    """
+
+    blocking = True
+
+    def __init__(self, client):
+        self.client = client
+        try:
+            from redis.exceptions import RedisError
+        except ImportError:  # a duck-typed client in tests
+            RedisError = ConnectionError
+        self._errors = (RedisError, OSError)
+        self._hit = client.register_script(_HIT_SCRIPT)
+        self._consume = client.register_script(_CONSUME_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    @classmethod
+    def from_settings(cls) -> "RedisRateLimitBackend":
+        import redis  # optional dependency, only needed for RATE_LIMIT_BACKEND=redis
+
+        return cls(
+            redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD,
+                socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+            )
+        )
+
+    def hit(self, key, limit, window, now):
+        index = int(now // window)
+        elapsed = (now - index * window) / window
+        try:
+            allowed, previous, current = self._hit(
+                # The braces keep both windows of a key in one cluster slot
+                keys=[f"{{{key}}}:{index}", f"{{{key}}}:{index - 1}"],
+                args=[limit, elapsed, int(window * 2) + 1],
+            )
+        except self._errors as exc:
+            raise RateLimitBackendError(exc)
+        return bool(allowed), int(previous), int(current)
+
+    def consume(self, key, limit, expires_at):
+        try:
+            allowed, used = self._consume(keys=[key], args=[limit, int(expires_at) + 1])
+        except self._errors as exc:
+            raise RateLimitBackendError(exc)
+        return bool(allowed), int(used)
+
+    def release(self, key):
+        try:
+            self._release(keys=[key])
+        except self._errors as exc:
+            raise RateLimitBackendError(exc)
+
+
+# ===============================
+#       LIMITERS
+# ===============================
+class SlidingWindowLimiter:
+    """At most `limit` requests per key in any `window` seconds."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        limit: int,
+        window: float = 60.0,
+        namespace: str = "swipehire",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.limit = limit
+        self.window = window
+        self.namespace = namespace
+        self._clock = clock
+        self.allowed = 0
+        self.denied = 0
+        self.errors = 0
+
+    def check(self, key: str) -> Decision:
+        now = self._clock()
+        elapsed = (now % self.window) / self.window
+        try:
+            allowed, previous, current = self.backend.hit(
+                f"{self.namespace}:rl:{key}", self.limit, self.window, now
+            )
+        except RateLimitBackendError as exc:
+            self.errors += 1
+            logger.warning("Rate limit store unavailable, allowing request: %s", exc)
+            return Decision(True, self.limit, self.limit, self.window)
+        estimate = window_estimate(previous, current, elapsed)
+        if allowed:
+            self.allowed += 1
+            return Decision(
+                True,
+                self.limit,
+                max(0, int(self.limit - estimate)),
+                self.window * (1.0 - elapsed),
+            )
+        self.denied += 1
+        RATE_LIMITED.inc(("requests",))
+        return Decision(
+            False,
+            self.limit,
+            0,
+            retry_after(previous, current, self.limit, self.window, elapsed),
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "window_seconds": self.window,
+            "keys": self.backend.size(),
+            "allowed": self.allowed,
+            "denied": self.denied,
+            "errors": self.errors,
+        }
+
+
+def next_midnight(now: datetime) -> datetime:
+    """The start of the day after `now`, in now's timezone."""
+    return datetime.combine(now.date() + timedelta(days=1), dt_time(), tzinfo=now.tzinfo)
+
+
+class DailyQuota:
+    """
+    At most `limit` units per key and calendar day in the given timezone.
+    The quota is taken up front; release() returns a unit when the work it
+    paid for did not happen.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        name: str,
+        namespace: str = "swipehire",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.name = name
+        self.namespace = namespace
+        self._clock = clock
+        self._days: Dict[tzinfo, Tuple[str, float, float]] = {}
+        self.allowed = 0
+        self.denied = 0
+        self.errors = 0
+
+    def _day(self, tz: tzinfo) -> Tuple[str, float, float]:
+        """(local date, now, next local midnight) for `tz`, from a per-timezone memo."""
+        now = self._clock()
+        day = self._days.get(tz)
+        if day is None or not day[1] <= now < day[2]:
+            local = datetime.fromtimestamp(now, tz)
+            start = datetime.combine(local.date(), dt_time(), tzinfo=tz).timestamp()
+            day = self._days[tz] = (local.date().isoformat(), start, next_midnight(local).timestamp())
+        return day[0], now, day[2]
+
+    def consume(self, key: str, limit: int, tz: tzinfo) -> Decision:
+        date, now, resets_at = self._day(tz)
+        try:
+            allowed, used = self.backend.consume(
+                f"{self.namespace}:quota:{self.name}:{key}:{date}", limit, resets_at
+            )
+        except RateLimitBackendError as exc:
+            self.errors += 1
+            logger.warning("Quota store unavailable, allowing %s: %s", self.name, exc)
+            return Decision(True, limit, limit, resets_at - now)
+        if allowed:
+            self.allowed += 1
+        else:
+            self.denied += 1
+            RATE_LIMITED.inc((self.name,))
+        return Decision(allowed, limit, max(0, limit - used), resets_at - now)
+
+    def release(self, key: str, tz: tzinfo) -> None:
+        date, _, _ = self._day(tz)
+        try:
+            self.backend.release(f"{self.namespace}:quota:{self.name}:{key}:{date}")
+        except RateLimitBackendError as exc:
+            self.errors += 1
+            logger.warning("Quota store unavailable, not releasing %s: %s", self.name, exc)
+
+    def stats(self) -> Dict:
+        return {"allowed": self.allowed, "denied": self.denied, "errors": self.errors}
+
+
+@lru_cache()
+def get_rate_limit_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend.from_settings()
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return ShardedMemoryBackend(settings.RATE_LIMIT_SHARDS)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {settings.RATE_LIMIT_BACKEND!r}")
+
+
+@lru_cache()
+def get_rate_limiter() -> SlidingWindowLimiter:
+    return SlidingWindowLimiter(
+        get_rate_limit_backend(),
+        limit=settings.RATE_LIMIT_PER_MINUTE,
+        window=60.0,
+        namespace=settings.CACHE_NAMESPACE,
+    )
+
+
+# ===============================
+#       MIDDLEWARE
+# ===============================
+def client_key(scope) -> str:
+    """Who an anonymous request counts against: the client address."""
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def bearer_key(verify: Callable[[str], Optional[str]]) -> Callable:
+    """
+    A key function counting a request against the subject of its bearer
+    token, as returned by `verify`. A missing token, or one `verify`
+    rejects, counts against the client address, so sending a different
+    junk token each time does not buy a fresh limit.
+    """
+
+    def key(scope) -> str:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    subject = verify(token.strip())
+                    if subject is not None:
+                        return "u:" + subject
+                break
+        return client_key(scope)
+
+    return key
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware enforcing the sliding-window limit per client, with
+    X-RateLimit-* headers on every limited response and 429 + Retry-After
+    once the limit is hit.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter_getter: Callable[[], SlidingWindowLimiter] = get_rate_limiter,
+        exempt_paths: Sequence[str] = (),
+        key: Callable = client_key,
+    ):
+        self.app = app
+        self._limiter_getter = limiter_getter
+        self._exempt = frozenset(exempt_paths)
+        self._key = key
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self._exempt or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._limiter_getter()
+        key = self._key(scope)
+        if limiter.backend.blocking:
+            decision = await asyncio.get_running_loop().run_in_executor(None, limiter.check, key)
+        else:
+            decision = limiter.check(key)
+        headers = decision.raw_headers()
+
+        if not decision.allowed:
+            body = json.dumps({"detail": "Rate limit exceeded, retry later"}).encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                    ]
+                    + headers,
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
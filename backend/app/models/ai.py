@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Enum as SQLEnum, DateTime, Integer, DECIMAL, JSON
+from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Enum as SQLEnum, DateTime, Integer, DECIMAL, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base import BaseModel, SoftDeleteMixin
@@ -156,6 +156,9 @@ class AIRecommendation(BaseModel):
 
 class MatchScore(BaseModel):
     __tablename__ = "match_scores"
+    __table_args__ = (
+        UniqueConstraint("user_id", "job_id", name="uq_match_scores_user_job"),
+    )
     
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     job_id = Column(String(36), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -197,6 +200,8 @@ class MatchScore(BaseModel):
     calculation_version = Column(String(50), default="1.0")
     last_calculated_at = Column(DateTime(timezone=True), server_default=None)
     is_stale = Column(Boolean, default=False, index=True)
+    stale_claimed_at = Column(DateTime(timezone=True), nullable=True)  # rescore lease start
+    stale_claim_id = Column(String(36), nullable=True)  # the claiming round
     
     # Relationships
     user = relationship("User", back_populates="match_scores")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Enum as SQLEnum, DateTime, Integer, DECIMAL, JSON
+from sqlalchemy import Column, Index, UniqueConstraint, String, Boolean, ForeignKey, Text, Enum as SQLEnum, DateTime, Integer, DECIMAL, JSON
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base import BaseModel, SoftDeleteMixin
@@ -18,6 +18,10 @@ class DeviceType(str, enum.Enum):
 
 class Swipe(BaseModel):
     __tablename__ = "swipes"
+    __table_args__ = (
+        # Keyset pagination (app.utils.pagination)
+        Index("ix_swipes_user_created_at_id", "user_id", "created_at", "id"),
+    )
     
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     job_id = Column(String(36), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -71,6 +75,12 @@ class InterviewType(str, enum.Enum):
 
 class Application(BaseModel, SoftDeleteMixin):
     __tablename__ = "applications"
+    __table_args__ = (
+        # Keyset pagination (app.utils.pagination)
+        Index("ix_applications_user_created_at_id", "user_id", "created_at", "id"),
+        # One application per job; auto-apply relies on it to stay idempotent
+        UniqueConstraint("user_id", "job_id", name="uq_applications_user_job"),
+    )
     
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     job_id = Column(String(36), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -133,6 +143,10 @@ class Application(BaseModel, SoftDeleteMixin):
 
 class SavedJob(BaseModel):
     __tablename__ = "saved_jobs"
+    __table_args__ = (
+        # Keyset pagination (app.utils.pagination)
+        Index("ix_saved_jobs_user_created_at_id", "user_id", "created_at", "id"),
+    )
     
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     job_id = Column(String(36), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -60,6 +60,7 @@ class UserPreferences(BaseModel):
     # Application Settings
     auto_apply = Column(Boolean, default=False)
     daily_swipe_limit = Column(String(20), default="50")
+    timezone = Column(String(64), nullable=True)  # IANA name; the daily limit resets at local midnight
     search_radius = Column(String(20), default="50")  # in miles/km
     
     # Notifications
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Enum as SQLEnum, Date, DECIMAL, Integer, DateTime, BIGINT, JSON
+from sqlalchemy import Column, Index, UniqueConstraint, String, Boolean, ForeignKey, Text, Enum as SQLEnum, Date, DECIMAL, Integer, DateTime, BIGINT, JSON
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base import BaseModel, SoftDeleteMixin
@@ -145,6 +145,12 @@ class JobSource(str, enum.Enum):
 
 class Job(BaseModel, SoftDeleteMixin):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination (app.utils.pagination)
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        # Feed imports upsert on this (app.services.job_import)
+        UniqueConstraint("source", "external_job_id", name="uq_jobs_source_external_id"),
+    )
     
     company_id = Column(String(36), ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True)
     
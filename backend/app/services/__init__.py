@@ -0,0 +1 @@
+# SwipeHire business logic services
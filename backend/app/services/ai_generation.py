@@ -0,0 +1,409 @@
+"""
+AI Generation Cache
+Cover letters and resumes are written by a slow, paid model call. The same
+inputs produce text that is just as good, so results are cached on disk
+under a content hash of everything the prompt is built from:
+
+    sha256(canonical JSON of kind, profile snapshot, job snapshot, tone,
+           template, model, max_tokens, PROMPT_VERSION)
+
+- Snapshots hold only prompt content (no ids, timestamps or counters), so
+  a profile re-applying to a re-posted or near-identical job hits.
+- Canonical JSON collapses whitespace, NFC-normalises text, drops empty
+  fields, sorts keys, and treats lists of plain strings (skills,
+  requirements) as sets. Cosmetic edits therefore do not miss.
+- Concurrent identical requests share one model call (single-flight).
+- The store is a size-bounded LRU directory (GENERATION_CACHE_DIR), shared
+  by the workers of a host.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from functools import cached_property, lru_cache
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.ai import CoverLetter, CoverLetterTone, FileFormat, Resume
+from app.services.llm import Completion, TextModel, get_text_model
+from app.utils.disk_lru import DiskLRU
+
+logger = logging.getLogger(__name__)
+
+# Part of every key: bump it whenever the templates below change meaning
+PROMPT_VERSION = "1"
+
+KIND_COVER_LETTER = "cover_letter"
+KIND_RESUME = "resume"
+
+GENERATIONS = registry.counter(
+    "swipehire_generation_cache_total",
+    "AI generation requests by kind and result (hits, misses, coalesced).",
+    ("kind", "result"),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+PROMPT_TEMPLATES: Dict[str, Dict[str, str]] = {
+    KIND_COVER_LETTER: {
+        "default": (
+            "Write a {tone} cover letter for {name} applying to the {job_title} role at {company}.\n"
+            "Keep it under 350 words, in first person, with no placeholders.\n\n"
+            "CANDIDATE\n{profile}\n\nJOB\n{job}\n"
+        ),
+        "concise": (
+            "Write a {tone} cover letter of at most 150 words for {name}, applying to "
+            "{job_title} at {company}. Lead with the strongest overlap.\n\n"
+            "CANDIDATE\n{profile}\n\nJOB\n{job}\n"
+        ),
+    },
+    KIND_RESUME: {
+        "default": (
+            "Rewrite the resume of {name} as clean Markdown sections (Summary, Experience, "
+            "Education, Skills){target}. Do not invent facts.\n\nCANDIDATE\n{profile}\n{job}"
+        ),
+    },
+}
+
+
+# ===============================
+#       CANONICAL HASHING
+# ===============================
+def normalize(value: Any) -> Any:
+    """
+    The canonical form of a snapshot: what the model would see, minus
+    differences that cannot change its output.
+    """
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", value)).strip()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        value = float(value)
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else round(value, 6)
+    if isinstance(value, dict):
+        items = ((str(k), normalize(v)) for k, v in value.items())
+        return {k: v for k, v in sorted(items) if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [normalize(v) for v in value]
+        items = [v for v in items if v not in (None, "", [], {})]
+        if all(isinstance(v, str) for v in items):
+            # Skills and requirements: order and repeats carry no meaning
+            return sorted(set(items), key=lambda v: (v.casefold(), v))
+        return items
+    return value
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(normalize(value), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(value: Any) -> str:
+    return hashlib.sha256(canonical_json(value).encode()).hexdigest()
+
+
+def profile_snapshot(profile) -> Dict[str, Any]:
+    """What a prompt may say about a candidate (a models.Profile with its collections loaded)."""
+    return {
+        "name": f"{profile.first_name} {profile.last_name}",
+        "headline": profile.headline,
+        "bio": profile.bio,
+        "skills": [skill.name for skill in profile.skills],
+        "experience": [
+            {
+                "title": experience.title,
+                "company": experience.company,
+                "start": experience.start_date,
+                "end": experience.end_date,
+                "description": experience.description,
+            }
+            for experience in sorted(
+                profile.experiences, key=lambda e: e.start_date or date.min, reverse=True
+            )
+        ],
+        "education": [
+            {
+                "school": education.school,
+                "degree": education.degree,
+                "field": education.field_of_study,
+                "end": education.end_date,
+            }
+            for education in sorted(
+                profile.educations, key=lambda e: e.end_date or date.min, reverse=True
+            )
+        ],
+    }
+
+
+def job_snapshot(job) -> Dict[str, Any]:
+    """What a prompt may say about a job (an app.models.job.Job with company and skills loaded)."""
+    return {
+        "title": job.job_title,
+        "company": job.company.company_name if job.company is not None else None,
+        "industry": job.industry,
+        "description": job.job_description,
+        "responsibilities": job.job_responsibilities,
+        "requirements": job.job_requirements,
+        "nice_to_have": job.nice_to_have,
+        "skills": [skill.skill_name for skill in job.required_skills],
+        "experience_level": job.experience_level,
+        "employment_type": job.employment_type,
+        "work_mode": job.work_mode,
+        "location": ", ".join(
+            part for part in (job.location_city, job.location_state, job.location_country) if part
+        ),
+    }
+
+
+# ===============================
+#       REQUESTS
+# ===============================
+def _render(snapshot: Dict[str, Any]) -> str:
+    lines = []
+    for key, value in normalize(snapshot).items():
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            lines.append(f"{key}:")
+            lines.extend("  - " + "; ".join(f"{k}: {v}" for k, v in item.items()) for item in value)
+        elif isinstance(value, list):
+            lines.append(f"{key}: {', '.join(map(str, value))}")
+        else:
+            lines.append(f"{key}: {value}")
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class GenerationRequest:
+    kind: str
+    profile: Dict[str, Any]
+    job: Optional[Dict[str, Any]] = None
+    tone: Optional[str] = None
+    template_id: Optional[str] = None
+    model: str = ""
+    max_tokens: int = 2000
+
+    def __post_init__(self):
+        templates = PROMPT_TEMPLATES.get(self.kind)
+        if templates is None:
+            raise ValueError(f"Unknown generation kind {self.kind!r}")
+        if (self.template_id or "default") not in templates:
+            raise ValueError(f"Unknown {self.kind} template {self.template_id!r}")
+
+    @cached_property
+    def key(self) -> str:
+        return content_hash(
+            {
+                "kind": self.kind,
+                "profile": self.profile,
+                "job": self.job,
+                "tone": self.tone,
+                "template": self.template_id or "default",
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "prompt_version": PROMPT_VERSION,
+            }
+        )
+
+    def prompt(self) -> str:
+        template = PROMPT_TEMPLATES[self.kind][self.template_id or "default"]
+        job = self.job or {}
+        return template.format(
+            tone=normalize(self.tone) or "professional",
+            name=normalize(self.profile.get("name")) or "the candidate",
+            job_title=normalize(job.get("title")) or "open",
+            company=normalize(job.get("company")) or "the company",
+            target=f", tailored to {normalize(job.get('title'))}" if job.get("title") else "",
+            profile=_render(self.profile),
+            job=_render(job) if job else "",
+        )
+
+
+@dataclass(frozen=True)
+class Generation:
+    key: str
+    text: str
+    model: str  # the version that wrote it, for ai_model_version
+    prompt: str  # for generation_prompt
+    cached: bool
+
+
+# ===============================
+#       CACHE
+# ===============================
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[Generation] = None
+        self.error: Optional[BaseException] = None
+
+
+class GenerationCache:
+    """
+    Completions by request hash. `store` may be None to run uncached (the
+    single-flight still applies).
+    """
+
+    def __init__(self, model: TextModel, store: Optional[DiskLRU] = None):
+        self.model = model
+        self.store = store
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._counts = {"hits": 0, "misses": 0, "coalesced": 0}
+        self.model_seconds = 0.0
+
+    def request(self, kind: str, profile, job=None, tone=None, template_id=None, max_tokens=None):
+        """A GenerationRequest for this cache's model."""
+        return GenerationRequest(
+            kind=kind,
+            profile=profile,
+            job=job,
+            tone=tone,
+            template_id=template_id,
+            model=self.model.name,
+            max_tokens=max_tokens or settings.OPENAI_MAX_TOKENS,
+        )
+
+    def lookup(self, request: GenerationRequest) -> Optional[Generation]:
+        if self.store is None:
+            return None
+        try:
+            raw = self.store.get(request.key)
+        except OSError:
+            logger.exception("Generation cache read failed")
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return Generation(request.key, entry["text"], entry["model"], entry["prompt"], cached=True)
+
+    def save(self, generation: Generation) -> None:
+        if self.store is None:
+            return
+        entry = {"text": generation.text, "model": generation.model, "prompt": generation.prompt}
+        try:
+            self.store.put(generation.key, json.dumps(entry, ensure_ascii=False).encode())
+        except OSError:
+            logger.exception("Generation cache write failed")
+
+    def record(self, kind: str, result: str) -> None:
+        """Counts a lookup outcome: hits, misses or coalesced."""
+        with self._lock:
+            self._counts[result] += 1
+        GENERATIONS.inc((kind, result))
+
+    def generate(self, request: GenerationRequest) -> Generation:
+        """The cached completion for `request`, or one fresh model call shared by all waiting callers."""
+        cached = self.lookup(request)
+        if cached is not None:
+            self.record(request.kind, "hits")
+            return cached
+
+        key = request.key
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            self.record(request.kind, "coalesced")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            # Another process, or a flight that just landed, may have written it
+            cached = self.lookup(request)
+            if cached is not None:
+                self.record(request.kind, "hits")
+                flight.value = cached
+                return cached
+            self.record(request.kind, "misses")
+            prompt = request.prompt()
+            started = time.perf_counter()
+            completion: Completion = self.model.complete(prompt, request.max_tokens)
+            with self._lock:
+                self.model_seconds += time.perf_counter() - started
+            flight.value = Generation(key, completion.text, completion.model, prompt, cached=False)
+            self.save(flight.value)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counts)
+            lookups = sum(self._counts.values())
+            served = stats["hits"] + stats["coalesced"]
+            stats["hit_ratio"] = round(served / lookups, 4) if lookups else 0.0
+            stats["model_seconds"] = round(self.model_seconds, 3)
+        if self.store is not None:
+            stats.update(self.store.stats())
+        return stats
+
+
+# ===============================
+#       DOCUMENTS
+# ===============================
+def save_document(db: Session, user_id: str, request: GenerationRequest, generation: Generation, job_id=None):
+    """
+    Stores a finished generation as the user's CoverLetter or Resume and
+    returns it (not yet committed).
+    """
+    job = request.job or {}
+    target = " at ".join(part for part in (job.get("title"), job.get("company")) if part)
+    common = {
+        "user_id": user_id,
+        "template_id": request.template_id,
+        "is_ai_generated": True,
+        "generation_prompt": generation.prompt,
+        "ai_model_version": generation.model[:50],
+        "word_count": len(generation.text.split()),
+    }
+    if request.kind == KIND_COVER_LETTER:
+        document = CoverLetter(
+            job_id=job_id,
+            title=(f"Cover letter: {target}" if target else "Cover letter")[:255],
+            content=generation.text,
+            tone=CoverLetterTone(request.tone) if request.tone else CoverLetterTone.PROFESSIONAL,
+            **common,
+        )
+    else:
+        document = Resume(
+            resume_name=(f"Resume: {target}" if target else "Resume")[:255],
+            target_job_title=job.get("title"),
+            target_industry=job.get("industry"),
+            content_sections={"markdown": generation.text},
+            file_format=FileFormat.TXT,
+            **common,
+        )
+    db.add(document)
+    return document
+
+
+@lru_cache()
+def get_generation_cache() -> GenerationCache:
+    store = None
+    if settings.GENERATION_CACHE_ENABLED:
+        store = DiskLRU(settings.GENERATION_CACHE_DIR, int(settings.GENERATION_CACHE_MAX_MB * 1024 * 1024))
+    return GenerationCache(get_text_model(), store)
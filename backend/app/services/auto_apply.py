@@ -0,0 +1,789 @@
+"""
+Auto-Apply Pipeline
+Turns right swipes of users who enabled auto-apply into applications, off
+the request path: the swipe flusher hands over committed swipes and a
+background worker creates the applications in batches.
+
+- Batches are written with a few set-based statements. A
+  (user_id, job_id) unique constraint makes re-queued swipes harmless,
+  and applying twice to the same job is a no-op.
+- Each application gets the user's cover letter for that job, or else their
+  default one, plus their default resume. Jobs applied to in-app are
+  submitted right away.
+- Resumes going out to other sites are rendered to files once per batch,
+  across the resume renderer's process pool (app.services.resume_render).
+- Jobs applied to elsewhere (ATS links, e-mail) are handed to a submitter
+  registered for their apply_type, on a lane with its own concurrency
+  limit so a slow partner only backs up its own lane.
+- Every queue is bounded. Overflow is not lost: the swipe stays
+  `auto_applied = false`, or the application stays PENDING, and a sweep of
+  the database queues it again once there is room.
+- A batch that fails is split in halves until the failing requests are
+  isolated. Those are dropped, so they cannot stall the queue; their
+  swipes stay unapplied and a later sweep gives them another chance.
+"""
+
+import logging
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, bindparam, func, or_, select, true, update
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import registry
+from app.models.ai import CoverLetter, Resume
+from app.models.application import (
+    Application,
+    ApplicationMethod,
+    ApplicationStatus,
+    Swipe,
+    SwipeDirection,
+)
+from app.models.auth import UserPreferences
+from app.models.job import ApplyType, Job, JobStatus
+from app.services.resume_render import RenderedResume, RenderSpec, ResumeRenderer, get_resume_renderer
+from app.utils.sql import upsert_many
+
+logger = logging.getLogger(__name__)
+
+APPLYING_DIRECTIONS = (SwipeDirection.RIGHT, SwipeDirection.SUPER)
+
+AUTO_APPLY_OUTCOMES = registry.counter(
+    "swipehire_auto_apply_total",
+    "Auto-apply requests by outcome (created, duplicate, disabled, job_closed, "
+    "submitted, submit_failed, dropped, deferred, failed).",
+    ("outcome",),
+)
+
+
+@dataclass
+class AutoApplyRequest:
+    swipe_id: str
+    user_id: str
+    job_id: str
+    match_score: Optional[float] = None
+
+
+@dataclass
+class Submission:
+    application_id: str
+    user_id: str
+    job_id: str
+    apply_type: ApplyType
+    external_url: Optional[str]
+    apply_email: Optional[str]
+    resume_id: Optional[str]
+    cover_letter_id: Optional[str]
+    # The resume rendered in its file_format; None without a resume or if rendering failed
+    resume_file: Optional[RenderedResume] = None
+
+
+# Sends an application to where the job is applied to; returns the
+# partner's application id, if any. Raising leaves the application PENDING.
+Submitter = Callable[[Submission], Optional[str]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ===============================
+#       SUBMISSION LANES
+# ===============================
+class _Lane:
+    """
+    A bounded queue plus `concurrency` workers for one apply_type.
+    """
+
+    def __init__(
+        self,
+        apply_type: ApplyType,
+        submitter: Submitter,
+        concurrency: int,
+        max_queued: int,
+        complete: Callable[[Submission, Optional[str], Optional[Exception]], None],
+    ):
+        self.apply_type = apply_type
+        self.concurrency = concurrency
+        self.capacity = concurrency + max_queued
+        self._submitter = submitter
+        self._complete = complete
+        self._pool = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix=f"auto-apply-{apply_type.value}"
+        )
+        self._lock = threading.Lock()
+        self._waiting: Set[str] = set()
+        self._running: Set[str] = set()
+
+    def offer(self, submission: Submission) -> bool:
+        """Queues a submission unless the lane is full or already has it."""
+        with self._lock:
+            application_id = submission.application_id
+            if application_id in self._waiting or application_id in self._running:
+                return True
+            if len(self._waiting) + len(self._running) >= self.capacity:
+                return False
+            self._waiting.add(application_id)
+        self._pool.submit(self._run, submission)
+        return True
+
+    def _run(self, submission: Submission) -> None:
+        with self._lock:
+            self._waiting.discard(submission.application_id)
+            self._running.add(submission.application_id)
+        try:
+            try:
+                external_id = self._submitter(submission)
+            except Exception as exc:
+                self._complete(submission, None, exc)
+            else:
+                self._complete(submission, external_id, None)
+        except Exception:
+            logger.exception("Recording auto-apply submission %s failed", submission.application_id)
+        finally:
+            with self._lock:
+                self._running.discard(submission.application_id)
+
+    def depth(self) -> Tuple[int, int]:
+        """(waiting, running) submissions."""
+        with self._lock:
+            return len(self._waiting), len(self._running)
+
+    def holds(self, application_id: str) -> bool:
+        with self._lock:
+            return application_id in self._waiting or application_id in self._running
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+# ===============================
+#       PIPELINE
+# ===============================
+class AutoApplyPipeline:
+    """
+    Creates applications for queued right swipes in batches of `batch_size`,
+    every `flush_interval` seconds or as soon as a batch is waiting.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        submit_queue: int = 100,
+        concurrency: Optional[Dict[ApplyType, int]] = None,
+        sweep_window: timedelta = timedelta(hours=24),
+        renderer: Optional[ResumeRenderer] = None,
+    ):
+        self._session_factory = session_factory
+        self._renderer = renderer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.submit_queue = submit_queue
+        self.concurrency = concurrency or {ApplyType.EXTERNAL: 4, ApplyType.EMAIL: 2}
+        self.sweep_window = sweep_window
+        self._lanes: Dict[ApplyType, _Lane] = {}
+        self._pending: Deque[AutoApplyRequest] = deque()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        # Set when anything overflowed into the database
+        self._needs_sweep = True
+        self._retried_failed = False
+        self.total_batches = 0
+        self.total_errors = 0
+
+    # --- Lifecycle ---
+    def register_submitter(self, apply_type: ApplyType, submitter: Submitter) -> None:
+        """
+        Routes jobs of `apply_type` to `submitter`. Applications to jobs
+        without one stay PENDING for the candidate to finish.
+        """
+        if apply_type is ApplyType.INTERNAL:
+            raise ValueError("Internal applications need no submitter")
+        self._lanes[apply_type] = _Lane(
+            apply_type,
+            submitter,
+            self.concurrency.get(apply_type, 1),
+            self.submit_queue,
+            self._record_submission,
+        )
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="auto-apply", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            while self.process_batch():
+                pass
+        except Exception:
+            logger.exception("Auto-apply final drain failed; the next sweep retries it")
+        for lane in self._lanes.values():
+            lane.shutdown()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                if len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+            try:
+                if self.process_batch() == 0 and self._needs_sweep:
+                    self.sweep()
+            except Exception:
+                logger.exception("Auto-apply batch failed")
+                self.total_errors += 1
+                self._stop.wait(self.flush_interval)
+
+    # --- Intake ---
+    def enqueue(self, requests: Iterable[AutoApplyRequest]) -> int:
+        """
+        Queues requests without ever blocking; what does not fit is picked
+        up by the next sweep. Returns the number queued.
+        """
+        accepted = dropped = 0
+        with self._cond:
+            for request in requests:
+                if len(self._pending) >= self.max_pending:
+                    dropped += 1
+                    continue
+                self._pending.append(request)
+                accepted += 1
+            if dropped:
+                self._needs_sweep = True
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        if dropped:
+            AUTO_APPLY_OUTCOMES.inc(("dropped",), dropped)
+        return accepted
+
+    # --- Batches ---
+    def process_batch(self) -> int:
+        """
+        Creates applications for one batch. If the database is unreachable
+        the batch goes back to the front of the queue; any other failure is
+        narrowed down by _write_bisected(). Returns the number of requests taken.
+        """
+        with self._cond:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        if not batch:
+            return 0
+        try:
+            try:
+                submissions = self._write_batch(batch)
+            except (OperationalError, InterfaceError):
+                raise
+            except Exception:
+                logger.exception("Auto-apply batch of %d failed; retrying it in halves", len(batch))
+                submissions = self._write_bisected(batch)
+        except (OperationalError, InterfaceError):
+            # Halves already written are no-ops the second time round
+            with self._cond:
+                self._pending.extendleft(reversed(batch))
+            raise
+        self.total_batches += 1
+        self._attach_resume_files(submissions)
+        self._dispatch(submissions)
+        return len(batch)
+
+    def _write_bisected(self, batch: List[AutoApplyRequest]) -> List[Submission]:
+        """
+        Writes a failed batch as two halves, splitting again whichever half
+        fails, and drops the single requests that still fail.
+        """
+        middle = len(batch) // 2
+        submissions = []
+        for half in (batch[:middle], batch[middle:]):
+            if not half:
+                continue
+            try:
+                submissions.extend(self._write_batch(half))
+            except (OperationalError, InterfaceError):
+                raise
+            except Exception:
+                if len(half) > 1:
+                    submissions.extend(self._write_bisected(half))
+                    continue
+                logger.exception(
+                    "Dropping auto-apply for swipe %s (user %s, job %s)",
+                    half[0].swipe_id, half[0].user_id, half[0].job_id,
+                )
+                AUTO_APPLY_OUTCOMES.inc(("failed",))
+        return submissions
+
+    def _write_batch(self, batch: List[AutoApplyRequest]) -> List[Submission]:
+        # The first swipe on a job wins
+        requests: Dict[Tuple[str, str], AutoApplyRequest] = {}
+        for request in batch:
+            requests.setdefault((request.user_id, request.job_id), request)
+        user_ids = list({user_id for user_id, _ in requests})
+        job_ids = list({job_id for _, job_id in requests})
+
+        db = self._session_factory()
+        try:
+            enabled = {
+                user_id
+                for (user_id,) in db.execute(
+                    select(UserPreferences.user_id).where(
+                        UserPreferences.user_id.in_(user_ids), UserPreferences.auto_apply.is_(True)
+                    )
+                )
+            }
+            jobs = {
+                row.id: row
+                for row in db.execute(
+                    select(Job.id, Job.apply_type, Job.external_url, Job.apply_email).where(
+                        Job.id.in_(job_ids),
+                        Job.job_status == JobStatus.ACTIVE,
+                        Job.deleted_at.is_(None),
+                    )
+                )
+            }
+            existing = set(
+                db.execute(
+                    select(Application.user_id, Application.job_id).where(
+                        Application.user_id.in_(user_ids), Application.job_id.in_(job_ids)
+                    )
+                ).all()
+            )
+
+            outcomes = {"disabled": 0, "job_closed": 0, "duplicate": 0}
+            wanted = []
+            for key, request in requests.items():
+                if request.user_id not in enabled:
+                    outcomes["disabled"] += 1
+                elif request.job_id not in jobs:
+                    outcomes["job_closed"] += 1
+                elif key in existing:
+                    outcomes["duplicate"] += 1
+                else:
+                    wanted.append(request)
+            outcomes["duplicate"] += len(batch) - len(requests)
+            if not wanted:
+                db.commit()
+                self._count(outcomes)
+                return []
+
+            resumes, letters = self._documents(db, wanted)
+            now = _utcnow()
+            rows = []
+            for request in wanted:
+                internal = jobs[request.job_id].apply_type in (None, ApplyType.INTERNAL)
+                rows.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "user_id": request.user_id,
+                        "job_id": request.job_id,
+                        "swipe_id": request.swipe_id,
+                        "resume_id": resumes.get(request.user_id),
+                        "cover_letter_id": letters.get((request.user_id, request.job_id)),
+                        "application_status": (
+                            ApplicationStatus.SUBMITTED if internal else ApplicationStatus.PENDING
+                        ),
+                        "application_method": ApplicationMethod.AUTO_SWIPE,
+                        "is_auto_applied": True,
+                        "submitted_at": now if internal else None,
+                        "last_status_update_at": now,
+                        "match_score": request.match_score,
+                    }
+                )
+            # A manual application racing this batch makes its row a no-op
+            upsert_many(db, Application.__table__, rows, ["user_id", "job_id"], [])
+            created = db.execute(
+                select(
+                    Application.id,
+                    Application.user_id,
+                    Application.job_id,
+                    Application.swipe_id,
+                    Application.resume_id,
+                    Application.cover_letter_id,
+                ).where(Application.id.in_([row["id"] for row in rows]))
+            ).all()
+            outcomes["duplicate"] += len(wanted) - len(created)
+            outcomes["created"] = len(created)
+            self._bump_counters(db, created, now)
+            db.commit()
+        finally:
+            db.close()
+        self._count(outcomes)
+
+        submissions = []
+        for row in created:
+            job = jobs[row.job_id]
+            if job.apply_type in (None, ApplyType.INTERNAL):
+                continue
+            submissions.append(
+                Submission(
+                    application_id=row.id,
+                    user_id=row.user_id,
+                    job_id=row.job_id,
+                    apply_type=job.apply_type,
+                    external_url=job.external_url,
+                    apply_email=job.apply_email,
+                    resume_id=row.resume_id,
+                    cover_letter_id=row.cover_letter_id,
+                )
+            )
+        return submissions
+
+    @staticmethod
+    def _documents(
+        db: Session, requests: List[AutoApplyRequest]
+    ) -> Tuple[Dict[str, str], Dict[Tuple[str, str], str]]:
+        """
+        Default resume per user, and the cover letter per (user, job): the
+        one written for the job, else the user's default.
+        """
+        user_ids = list({request.user_id for request in requests})
+        job_ids = list({request.job_id for request in requests})
+        resumes: Dict[str, str] = {}
+        for user_id, resume_id in db.execute(
+            select(Resume.user_id, Resume.id)
+            .where(Resume.user_id.in_(user_ids), Resume.is_default.is_(True), Resume.deleted_at.is_(None))
+            .order_by(Resume.updated_at)
+        ):
+            resumes[user_id] = resume_id  # the most recently updated default wins
+
+        for_job: Dict[Tuple[str, str], str] = {}
+        defaults: Dict[str, str] = {}
+        for user_id, job_id, letter_id, is_default in db.execute(
+            select(CoverLetter.user_id, CoverLetter.job_id, CoverLetter.id, CoverLetter.is_default)
+            .where(
+                CoverLetter.user_id.in_(user_ids),
+                CoverLetter.deleted_at.is_(None),
+                or_(CoverLetter.job_id.in_(job_ids), CoverLetter.is_default.is_(True)),
+            )
+            .order_by(CoverLetter.updated_at)
+        ):
+            if job_id in job_ids:
+                for_job[(user_id, job_id)] = letter_id
+            if is_default:
+                defaults[user_id] = letter_id
+        letters = {}
+        for request in requests:
+            key = (request.user_id, request.job_id)
+            letter = for_job.get(key) or defaults.get(request.user_id)
+            if letter is not None:
+                letters[key] = letter
+        return resumes, letters
+
+    @staticmethod
+    def _bump_counters(db: Session, created, now: datetime) -> None:
+        if not created:
+            return
+        db.execute(
+            update(Swipe.__table__)
+            .where(Swipe.id.in_([row.swipe_id for row in created]))
+            .values(auto_applied=True)
+        )
+        jobs = Job.__table__
+        per_job: Dict[str, int] = {}
+        for row in created:
+            per_job[row.job_id] = per_job.get(row.job_id, 0) + 1
+        db.execute(
+            update(jobs)
+            .where(jobs.c.id == bindparam("b_id"))
+            .values(
+                application_count=func.coalesce(jobs.c.application_count, 0) + bindparam("b_count"),
+                # A counter, not job content: keep the job's ETag stable
+                updated_at=jobs.c.updated_at,
+            ),
+            [{"b_id": job_id, "b_count": count} for job_id, count in sorted(per_job.items())],
+        )
+        for table, column in ((Resume.__table__, "resume_id"), (CoverLetter.__table__, "cover_letter_id")):
+            uses: Dict[str, int] = {}
+            for row in created:
+                document_id = getattr(row, column)
+                if document_id is not None:
+                    uses[document_id] = uses.get(document_id, 0) + 1
+            if uses:
+                db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(
+                        application_count=func.coalesce(table.c.application_count, 0)
+                        + bindparam("b_count"),
+                        last_used_at=now,
+                    ),
+                    [{"b_id": doc_id, "b_count": count} for doc_id, count in sorted(uses.items())],
+                )
+
+    # --- Submission ---
+    def _attach_resume_files(self, submissions: List[Submission]) -> None:
+        """
+        Renders the batch's resumes together, each distinct one once, for
+        the submissions a lane will send. Uploaded resumes (no
+        content_sections) are sent as stored and not rendered.
+        """
+        resume_ids = list(
+            {
+                submission.resume_id
+                for submission in submissions
+                if submission.resume_id and submission.apply_type in self._lanes
+            }
+        )
+        if self._renderer is None or not resume_ids:
+            return
+        try:
+            db = self._session_factory()
+            try:
+                resumes = [
+                    resume
+                    for resume in db.execute(select(Resume).where(Resume.id.in_(resume_ids))).scalars()
+                    if resume.content_sections
+                ]
+                specs = [RenderSpec.for_resume(resume) for resume in resumes]
+            finally:
+                db.close()
+            files = {
+                resume.id: result
+                for resume, result in zip(resumes, self._renderer.render_many(specs))
+                if not isinstance(result, Exception)
+            }
+        except Exception:
+            logger.exception("Rendering auto-apply resumes failed")
+            return
+        for submission in submissions:
+            submission.resume_file = files.get(submission.resume_id)
+
+    def _dispatch(self, submissions: List[Submission]) -> None:
+        deferred = 0
+        for submission in submissions:
+            lane = self._lanes.get(submission.apply_type)
+            if lane is not None and not lane.offer(submission):
+                deferred += 1
+        if deferred:
+            self._needs_sweep = True
+            AUTO_APPLY_OUTCOMES.inc(("deferred",), deferred)
+
+    def _record_submission(
+        self, submission: Submission, external_id: Optional[str], error: Optional[Exception]
+    ) -> None:
+        db = self._session_factory()
+        try:
+            applications = Application.__table__
+            now = _utcnow()
+            if error is None:
+                values = {
+                    "application_status": ApplicationStatus.SUBMITTED,
+                    "submitted_at": now,
+                    "external_application_id": external_id,
+                    "external_status": None,
+                    "last_status_update_at": now,
+                }
+            else:
+                logger.warning(
+                    "Auto-apply submission %s failed: %s", submission.application_id, error
+                )
+                # Stays PENDING; the first sweep after a restart retries it
+                values = {"external_status": f"submit_failed: {error}"[:100]}
+            db.execute(
+                update(applications)
+                .where(
+                    applications.c.id == submission.application_id,
+                    applications.c.application_status == ApplicationStatus.PENDING,
+                )
+                .values(**values)
+            )
+            db.commit()
+        finally:
+            db.close()
+        AUTO_APPLY_OUTCOMES.inc(("submitted" if error is None else "submit_failed",))
+
+    # --- Recovery ---
+    def sweep(self) -> int:
+        """
+        Re-queues work that overflowed into the database (or was in memory
+        when the process stopped): recent applying swipes of auto-apply users
+        that never became applications, then auto-applications still waiting
+        for a submitter. Returns the number of items queued.
+        """
+        with self._cond:
+            room = self.max_pending - len(self._pending)
+            self._needs_sweep = False
+            retry_failed, self._retried_failed = not self._retried_failed, True
+        if room <= 0:
+            self._needs_sweep = True
+            return 0
+
+        db = self._session_factory()
+        try:
+            since = _utcnow() - self.sweep_window
+            swipes = db.execute(
+                select(Swipe.id, Swipe.user_id, Swipe.job_id, Swipe.match_score)
+                .join(UserPreferences, UserPreferences.user_id == Swipe.user_id)
+                .join(Job, Job.id == Swipe.job_id)
+                .outerjoin(
+                    Application,
+                    and_(Application.user_id == Swipe.user_id, Application.job_id == Swipe.job_id),
+                )
+                .where(
+                    Swipe.swipe_direction.in_(APPLYING_DIRECTIONS),
+                    Swipe.auto_applied.is_(False),
+                    Swipe.swipe_timestamp >= since,
+                    UserPreferences.auto_apply.is_(True),
+                    Job.job_status == JobStatus.ACTIVE,
+                    Job.deleted_at.is_(None),
+                    Application.id.is_(None),
+                )
+                .order_by(Swipe.swipe_timestamp)
+                .limit(room)
+            ).all()
+
+            stranded = []
+            if self._lanes:
+                stranded = db.execute(
+                    select(
+                        Application.id,
+                        Application.user_id,
+                        Application.job_id,
+                        Application.resume_id,
+                        Application.cover_letter_id,
+                        Job.apply_type,
+                        Job.external_url,
+                        Job.apply_email,
+                    )
+                    .join(Job, Job.id == Application.job_id)
+                    .where(
+                        Application.application_status == ApplicationStatus.PENDING,
+                        Application.is_auto_applied.is_(True),
+                        Application.deleted_at.is_(None),
+                        Job.apply_type.in_(list(self._lanes)),
+                        # Failed submissions are retried once per process start
+                        true() if retry_failed else Application.external_status.is_(None),
+                    )
+                    .limit(sum(lane.capacity for lane in self._lanes.values()))
+                ).all()
+        finally:
+            db.close()
+
+        if len(swipes) == room:
+            self._needs_sweep = True
+        stranded = [row for row in stranded if not self._lanes[row.apply_type].holds(row.id)]
+        queued = self.enqueue(
+            AutoApplyRequest(
+                swipe_id=row.id,
+                user_id=row.user_id,
+                job_id=row.job_id,
+                match_score=float(row.match_score) if row.match_score is not None else None,
+            )
+            for row in swipes
+        )
+        submissions = [
+            Submission(
+                application_id=row.id,
+                user_id=row.user_id,
+                job_id=row.job_id,
+                apply_type=row.apply_type,
+                external_url=row.external_url,
+                apply_email=row.apply_email,
+                resume_id=row.resume_id,
+                cover_letter_id=row.cover_letter_id,
+            )
+            for row in stranded
+        ]
+        self._attach_resume_files(submissions)
+        self._dispatch(submissions)
+        if queued or stranded:
+            logger.info(
+                "Auto-apply sweep queued %d swipes and %d submissions", queued, len(stranded)
+            )
+        return queued + len(stranded)
+
+    # --- Metrics ---
+    @staticmethod
+    def _count(outcomes: Dict[str, int]) -> None:
+        for outcome, count in outcomes.items():
+            if count:
+                AUTO_APPLY_OUTCOMES.inc((outcome,), count)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Items waiting or running per stage: intake, then one per lane."""
+        with self._cond:
+            depths = {"intake": len(self._pending)}
+        for apply_type, lane in self._lanes.items():
+            waiting, running = lane.depth()
+            depths[f"submit_{apply_type.value}"] = waiting + running
+        return depths
+
+    def stats(self) -> Dict:
+        depths = self.queue_depths()
+        lanes = {}
+        for apply_type, lane in self._lanes.items():
+            waiting, running = lane.depth()
+            lanes[apply_type.value] = {
+                "waiting": waiting,
+                "running": running,
+                "concurrency": lane.concurrency,
+            }
+        return {
+            "pending": depths["intake"],
+            "lanes": lanes,
+            "total_batches": self.total_batches,
+            "total_errors": self.total_errors,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+def _queue_depth_samples():
+    if get_auto_apply_pipeline.cache_info().currsize:
+        for stage, depth in get_auto_apply_pipeline().queue_depths().items():
+            yield (stage,), float(depth)
+
+
+registry.gauge(
+    "swipehire_auto_apply_queue_depth",
+    "Auto-apply work waiting or running, per stage (intake, submit_<apply_type>).",
+    ("stage",),
+    callback=_queue_depth_samples,
+)
+
+
+def requests_from_swipes(events) -> List[AutoApplyRequest]:
+    """Auto-apply requests for the applying swipes among flushed swipe events."""
+    applying = {direction.value for direction in APPLYING_DIRECTIONS}
+    return [
+        AutoApplyRequest(
+            swipe_id=event.id,
+            user_id=event.user_id,
+            job_id=event.job_id,
+            match_score=event.match_score,
+        )
+        for event in events
+        if event.swipe_direction in applying
+    ]
+
+
+@lru_cache()
+def get_auto_apply_pipeline() -> AutoApplyPipeline:
+    return AutoApplyPipeline(
+        batch_size=settings.AUTO_APPLY_BATCH_SIZE,
+        flush_interval=settings.AUTO_APPLY_FLUSH_INTERVAL_MS / 1000.0,
+        max_pending=settings.AUTO_APPLY_MAX_PENDING,
+        submit_queue=settings.AUTO_APPLY_SUBMIT_QUEUE,
+        concurrency={
+            ApplyType.EXTERNAL: settings.AUTO_APPLY_EXTERNAL_CONCURRENCY,
+            ApplyType.EMAIL: settings.AUTO_APPLY_EMAIL_CONCURRENCY,
+        },
+        sweep_window=timedelta(hours=settings.AUTO_APPLY_SWEEP_HOURS),
+        renderer=get_resume_renderer(),
+    )
@@ -0,0 +1,158 @@
+"""
+Job and Company Catalog Reads
+Cached read models for the job detail and company pages, plus the mapping
+from changed rows to the cache tags those pages are filed under.
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+import schemas
+from app.core.cache import cached
+from app.core.conditional import latest, make_etag
+from app.models.job import Company, Job, JobSkill, JobStatus
+
+COMPANY_PAGE_OPEN_JOBS = 50
+
+
+def job_tag(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def company_tag(company_id: str) -> str:
+    return f"company:{company_id}"
+
+
+@cached(
+    key=lambda db, job_id, etag: f"job-detail:{job_id}:{etag}",
+    tags=lambda value, db, job_id, etag: [job_tag(job_id), company_tag(value["company"]["id"])],
+    schema=schemas.JobDetail,
+)
+def get_job_detail(db: Session, job_id: str, etag: str) -> Optional[dict]:
+    """
+    A live job with its company and skills, as a schemas.JobDetail dict.
+    Cached per ETag (from get_job_validators), so a stale cached body can
+    never be served under a newer ETag.
+    """
+    return (
+        db.query(Job)
+        .options(joinedload(Job.company), selectinload(Job.required_skills))
+        .filter(Job.id == job_id, Job.deleted_at.is_(None))
+        .first()
+    )
+
+
+@cached(
+    key=lambda db, company_slug, etag: f"company-page:{company_slug}:{etag}",
+    tags=lambda value, db, company_slug, etag: [company_tag(value["id"])],
+    schema=schemas.CompanyPage,
+)
+def get_company_page(db: Session, company_slug: str, etag: str) -> Optional[dict]:
+    """
+    A company with its most recently published active jobs, as a
+    schemas.CompanyPage dict. Cached per ETag, like get_job_detail().
+    """
+    company = (
+        db.query(Company)
+        .filter(Company.company_slug == company_slug, Company.deleted_at.is_(None))
+        .first()
+    )
+    if company is None:
+        return None
+    company.open_jobs = (
+        db.query(Job)
+        .filter(
+            Job.company_id == company.id,
+            Job.job_status == JobStatus.ACTIVE,
+            Job.deleted_at.is_(None),
+        )
+        .order_by(Job.published_at.desc(), Job.id)
+        .limit(COMPANY_PAGE_OPEN_JOBS)
+        .all()
+    )
+    return company
+
+
+# ===============================
+#       VERSION PROBES
+# ===============================
+# One aggregate query per page, used for ETag / Last-Modified before the
+# page itself is loaded. Counts catch deleted child rows, which leave no
+# updated_at behind.
+Validators = Tuple[str, Optional[datetime]]
+
+
+def get_job_validators(db: Session, job_id: str) -> Optional[Validators]:
+    """
+    (ETag, Last-Modified) for the job detail page, None if the job is gone.
+    """
+    row = (
+        db.query(
+            Job.updated_at,
+            Company.updated_at,
+            func.max(JobSkill.updated_at),
+            func.count(JobSkill.id),
+        )
+        .join(Company, Company.id == Job.company_id)
+        .outerjoin(JobSkill, JobSkill.job_id == Job.id)
+        .filter(Job.id == job_id, Job.deleted_at.is_(None))
+        .group_by(Job.id, Job.updated_at, Company.updated_at)
+        .first()
+    )
+    if row is None:
+        return None
+    job_updated, company_updated, skills_updated, skill_count = row
+    return (
+        make_etag("job", job_id, job_updated, company_updated, skills_updated, skill_count),
+        latest(job_updated, company_updated, skills_updated),
+    )
+
+
+def get_company_validators(db: Session, company_slug: str) -> Optional[Validators]:
+    """
+    (ETag, Last-Modified) for the company page, None if the company is gone.
+    Covers every open job, not only the ones that make the page.
+    """
+    row = (
+        db.query(
+            Company.id,
+            Company.updated_at,
+            func.max(Job.updated_at),
+            func.count(Job.id),
+        )
+        .outerjoin(
+            Job,
+            and_(
+                Job.company_id == Company.id,
+                Job.job_status == JobStatus.ACTIVE,
+                Job.deleted_at.is_(None),
+            ),
+        )
+        .filter(Company.company_slug == company_slug, Company.deleted_at.is_(None))
+        .group_by(Company.id, Company.updated_at)
+        .first()
+    )
+    if row is None:
+        return None
+    company_id, company_updated, jobs_updated, open_jobs = row
+    return (
+        make_etag("company", company_id, company_updated, jobs_updated, open_jobs),
+        latest(company_updated, jobs_updated),
+    )
+
+
+def cache_tags(obj) -> Iterable[str]:
+    """
+    Tags to invalidate when `obj` changes. A job also appears on its
+    company's page, so job edits invalidate the company too.
+    """
+    if isinstance(obj, Job):
+        return [job_tag(obj.id), company_tag(obj.company_id)]
+    if isinstance(obj, JobSkill):
+        return [job_tag(obj.job_id)]
+    if isinstance(obj, Company):
+        return [company_tag(obj.id)]
+    return []
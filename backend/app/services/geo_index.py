@@ -0,0 +1,396 @@
+"""
+Geospatial Radius Index
+Grid-bucketed index of job coordinates answering "active jobs within R km"
+and bounding-box queries without scanning the jobs table.
+"""
+
+import logging
+import math
+import threading
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.auth import UserPreferences
+from app.models.job import Job, JobStatus, WorkMode
+from app.models.profile import Profile
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in km. Accepts scalars or NumPy arrays (degrees).
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+@dataclass
+class GeoHit:
+    id: str
+    distance_km: Optional[float]  # None for remote jobs
+    work_mode: Optional[str] = None
+
+
+class _Bucket:
+    __slots__ = ("ordinals", "lats", "lons")
+
+    def __init__(self):
+        self.ordinals = array("I")
+        self.lats = array("d")
+        self.lons = array("d")
+
+
+class GeoIndex:
+    """
+    Points bucketed into a fixed lat/lon grid of `cell_degrees` cells.
+
+    A radius query visits only the cells overlapping the circle's bounding
+    box and then runs one vectorised haversine over those candidates.
+    Items marked remote live outside the grid and bypass the geo filter.
+    """
+
+    def __init__(self, cell_degrees: float = 0.25):
+        self.cell_degrees = cell_degrees
+        self._lon_cells = int(round(360.0 / cell_degrees))
+        self._buckets: Dict[Cell, _Bucket] = {}
+        self._ids: List[Optional[str]] = []
+        self._ordinals: Dict[str, int] = {}
+        self._cell_of: Dict[int, Cell] = {}
+        self._work_mode: Dict[int, Optional[str]] = {}
+        self._remote: Dict[int, None] = {}  # insertion-ordered set
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._cell_of) + len(self._remote)
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        row = int(math.floor((lat + 90.0) / self.cell_degrees))
+        col = int(math.floor((lon + 180.0) / self.cell_degrees)) % self._lon_cells
+        return row, col
+
+    # --- Updates ---
+    def upsert(
+        self,
+        item_id: str,
+        lat: Optional[float],
+        lon: Optional[float],
+        work_mode: Optional[str] = None,
+    ) -> None:
+        """
+        Adds or moves an item. Remote items (or items without coordinates
+        that are remote) are kept out of the grid; non-remote items without
+        coordinates are not indexed at all.
+        """
+        work_mode = getattr(work_mode, "value", work_mode)
+        with self._lock:
+            self.remove(item_id)
+            ordinal = self._ordinals.get(item_id)
+            if ordinal is None:
+                ordinal = self._ordinals[item_id] = len(self._ids)
+                self._ids.append(item_id)
+            if work_mode == WorkMode.REMOTE.value:
+                self._remote[ordinal] = None
+                self._work_mode[ordinal] = work_mode
+                return
+            if lat is None or lon is None:
+                return
+            lat, lon = float(lat), float(lon)
+            cell = self._cell(lat, lon)
+            bucket = self._buckets.get(cell)
+            if bucket is None:
+                bucket = self._buckets[cell] = _Bucket()
+            bucket.ordinals.append(ordinal)
+            bucket.lats.append(lat)
+            bucket.lons.append(lon)
+            self._cell_of[ordinal] = cell
+            self._work_mode[ordinal] = work_mode
+
+    def remove(self, item_id: str) -> None:
+        with self._lock:
+            ordinal = self._ordinals.get(item_id)
+            if ordinal is None:
+                return
+            self._work_mode.pop(ordinal, None)
+            if ordinal in self._remote:
+                del self._remote[ordinal]
+                return
+            cell = self._cell_of.pop(ordinal, None)
+            if cell is None:
+                return
+            bucket = self._buckets[cell]
+            i = bucket.ordinals.index(ordinal)
+            # Swap-remove keeps deletion O(1) after the lookup
+            last = len(bucket.ordinals) - 1
+            for column in (bucket.ordinals, bucket.lats, bucket.lons):
+                column[i] = column[last]
+                del column[last]
+            if not bucket.ordinals:
+                del self._buckets[cell]
+
+    # --- Queries ---
+    def _cells_in_box(self, min_lat, min_lon, max_lat, max_lon) -> Iterable[Cell]:
+        min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+        row0, col0 = self._cell(min_lat, min_lon)
+        row1, _ = self._cell(max_lat, max_lon)
+        span = int(math.floor((max_lon - min_lon) / self.cell_degrees)) + 1
+        span = min(span + 1, self._lon_cells)
+        for row in range(row0, row1 + 1):
+            for step in range(span):
+                yield row, (col0 + step) % self._lon_cells
+
+    def _gather(self, cells: Iterable[Cell]):
+        ordinals, lats, lons = array("I"), array("d"), array("d")
+        for cell in cells:
+            bucket = self._buckets.get(cell)
+            if bucket is not None:
+                ordinals.extend(bucket.ordinals)
+                lats.extend(bucket.lats)
+                lons.extend(bucket.lons)
+        return (
+            np.frombuffer(ordinals, dtype=np.uint32),
+            np.frombuffer(lats, dtype=np.float64),
+            np.frombuffer(lons, dtype=np.float64),
+        )
+
+    def _allowed(self, ordinal: int, work_modes: Optional[Sequence[str]]) -> bool:
+        return work_modes is None or self._work_mode.get(ordinal) in work_modes
+
+    def within_radius(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        work_modes: Optional[Sequence[str]] = None,
+        include_remote: bool = True,
+        limit: Optional[int] = None,
+    ) -> List[GeoHit]:
+        """
+        Items within `radius_km` of (lat, lon), nearest first, followed by
+        remote items when `include_remote` (and remote is in `work_modes`).
+        """
+        work_modes = [getattr(m, "value", m) for m in work_modes] if work_modes else None
+        lat, lon = float(lat), float(lon)
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        # Widest longitude span is at the circle's most poleward latitude
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + dlat, 90.0))), 1e-6)
+        dlon = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+
+        with self._lock:
+            ordinals, lats, lons = self._gather(
+                self._cells_in_box(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+            )
+            distances = haversine_km(lat, lon, lats, lons)
+            inside = distances <= radius_km
+            ordinals, distances = ordinals[inside], distances[inside]
+            order = np.argsort(distances, kind="stable")
+
+            hits = []
+            for i in order:
+                ordinal = int(ordinals[i])
+                if self._allowed(ordinal, work_modes):
+                    hits.append(
+                        GeoHit(self._ids[ordinal], round(float(distances[i]), 3), self._work_mode.get(ordinal))
+                    )
+                    if limit is not None and len(hits) >= limit:
+                        return hits
+
+            if include_remote and (work_modes is None or WorkMode.REMOTE.value in work_modes):
+                remaining = None if limit is None else limit - len(hits)
+                hits.extend(self.remote_items(remaining))
+            return hits
+
+    def remote_items(self, limit: Optional[int] = None) -> List[GeoHit]:
+        with self._lock:
+            ordinals = list(self._remote)
+        if limit is not None:
+            ordinals = ordinals[:limit]
+        return [GeoHit(self._ids[o], None, WorkMode.REMOTE.value) for o in ordinals]
+
+    def within_box(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        work_modes: Optional[Sequence[str]] = None,
+        center: Optional[Tuple[float, float]] = None,
+        limit: Optional[int] = None,
+    ) -> List[GeoHit]:
+        """
+        Items inside a bounding box (min_lon > max_lon crosses the
+        antimeridian). Sorted by distance from `center`, which defaults to
+        the box centre; only the nearest `limit` are ranked.
+        """
+        work_modes = [getattr(m, "value", m) for m in work_modes] if work_modes else None
+        crosses = min_lon > max_lon
+        span_max_lon = max_lon + 360.0 if crosses else max_lon
+        if center is None:
+            mid_lon = (min_lon + span_max_lon) / 2.0
+            center = ((min_lat + max_lat) / 2.0, (mid_lon + 180.0) % 360.0 - 180.0)
+
+        with self._lock:
+            ordinals, lats, lons = self._gather(
+                self._cells_in_box(min_lat, min_lon, max_lat, span_max_lon)
+            )
+            in_lat = (lats >= min_lat) & (lats <= max_lat)
+            if crosses:
+                in_lon = (lons >= min_lon) | (lons <= max_lon)
+            else:
+                in_lon = (lons >= min_lon) & (lons <= max_lon)
+            keep = in_lat & in_lon
+            if work_modes is not None:
+                keep &= np.fromiter(
+                    (self._allowed(int(o), work_modes) for o in ordinals), dtype=bool, count=len(ordinals)
+                )
+            ordinals, lats, lons = ordinals[keep], lats[keep], lons[keep]
+            distances = haversine_km(center[0], center[1], lats, lons)
+            if limit is not None and limit < len(distances):
+                nearest = np.argpartition(distances, limit)[:limit]
+                order = nearest[np.argsort(distances[nearest], kind="stable")]
+            else:
+                order = np.argsort(distances, kind="stable")
+            return [
+                GeoHit(self._ids[int(ordinals[i])], round(float(distances[i]), 3), self._work_mode.get(int(ordinals[i])))
+                for i in order
+            ]
+
+
+# ===============================
+#       JOBS INDEX
+# ===============================
+_TRACKED_COLUMNS = ("latitude", "longitude", "work_mode", "job_status", "deleted_at")
+_PENDING_KEY = "geo_index_jobs"
+
+
+def _active_jobs_query(db: Session):
+    return db.query(Job.id, Job.latitude, Job.longitude, Job.work_mode).filter(
+        Job.job_status == JobStatus.ACTIVE, Job.deleted_at.is_(None)
+    )
+
+
+def build_job_geo_index(db: Session) -> GeoIndex:
+    index = GeoIndex(cell_degrees=settings.GEO_INDEX_CELL_DEGREES)
+    for job_id, lat, lon, work_mode in _active_jobs_query(db).yield_per(10000):
+        index.upsert(job_id, lat, lon, work_mode)
+    return index
+
+
+def refresh_jobs(index: GeoIndex, db: Session, job_ids: Iterable[str]) -> None:
+    job_ids = list(set(job_ids))
+    if not job_ids:
+        return
+    found = set()
+    for job_id, lat, lon, work_mode in _active_jobs_query(db).filter(Job.id.in_(job_ids)):
+        index.upsert(job_id, lat, lon, work_mode)
+        found.add(job_id)
+    for job_id in set(job_ids) - found:
+        index.remove(job_id)
+
+
+def install_geo_sync(session_factory, index_getter) -> None:
+    """
+    Keeps the jobs geo index in step with committed job changes.
+    """
+
+    def collect(session, flush_context):
+        touched = session.info.setdefault(_PENDING_KEY, set())
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, Job):
+                touched.add(obj.id)
+        for obj in session.dirty:
+            if isinstance(obj, Job):
+                state = inspect(obj)
+                if any(state.attrs[c].history.has_changes() for c in _TRACKED_COLUMNS):
+                    touched.add(obj.id)
+
+    def apply(session):
+        touched = session.info.pop(_PENDING_KEY, None)
+        if not touched:
+            return
+        db = SessionLocal()
+        try:
+            refresh_jobs(index_getter(), db, touched)
+        except Exception:
+            logger.exception("Geo index sync failed")
+        finally:
+            db.close()
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(
+        session_factory,
+        "after_soft_rollback",
+        lambda session, previous: session.info.pop(_PENDING_KEY, None),
+    )
+
+
+@lru_cache()
+def get_job_geo_index() -> GeoIndex:
+    db = SessionLocal()
+    try:
+        return build_job_geo_index(db)
+    finally:
+        db.close()
+
+
+def jobs_near_user(
+    db: Session,
+    user_id: str,
+    radius_km: Optional[float] = None,
+    work_modes: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+) -> List[GeoHit]:
+    """
+    Active jobs near a candidate's profile location. The radius defaults to
+    UserPreferences.search_radius and the work modes to the user's
+    preferred ones. Without a profile location only remote jobs match.
+    """
+    location = (
+        db.query(Profile.latitude, Profile.longitude)
+        .filter(Profile.user_id == user_id)
+        .first()
+    )
+    preferences = (
+        db.query(UserPreferences.search_radius, UserPreferences.work_mode)
+        .filter(UserPreferences.user_id == user_id)
+        .first()
+    )
+    if radius_km is None:
+        try:
+            radius_km = float(preferences.search_radius) if preferences else None
+        except (TypeError, ValueError):
+            radius_km = None
+        radius_km = radius_km or settings.GEO_DEFAULT_RADIUS_KM
+    if work_modes is None and preferences and preferences.work_mode:
+        work_modes = preferences.work_mode
+
+    index = get_job_geo_index()
+    if location is None or location.latitude is None or location.longitude is None:
+        if work_modes is not None and WorkMode.REMOTE.value not in work_modes:
+            return []
+        return index.remote_items(limit)
+    return index.within_radius(
+        float(location.latitude),
+        float(location.longitude),
+        radius_km,
+        work_modes=work_modes,
+        limit=limit,
+    )
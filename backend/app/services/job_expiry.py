@@ -0,0 +1,393 @@
+"""
+Job Expiry Scheduler
+Moves active jobs to EXPIRED when their application deadline passes, so
+feed, search and matching queries can rely on `job_status = ACTIVE` alone.
+
+- A min-heap holds the deadlines of active jobs falling within the next
+  JOB_EXPIRY_HORIZON_HOURS, loaded by range scans on the deadline index as
+  the window slides forward; later deadlines are never held in memory.
+- The worker sleeps until the earliest deadline (or until an earlier one is
+  scheduled) and expires everything due in batched UPDATEs.
+- Expired jobs are evicted from the in-memory indexes and swipe decks of
+  this process and their cached pages invalidated.
+- On start, one range scan expires whatever fell due while nothing was
+  running.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import invalidate_on_commit
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job, JobStatus
+from app.services.catalog import company_tag, job_tag
+
+logger = logging.getLogger(__name__)
+
+# Longest the worker sleeps without re-checking its window
+_MAX_SLEEP_SECONDS = 300.0
+_TRACKED_COLUMNS = ("application_deadline", "job_status", "deleted_at")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite hands back naive datetimes; they were written as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _as_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def _scheduled_jobs(db: Session):
+    return db.query(Job.id, Job.application_deadline).filter(
+        Job.job_status == JobStatus.ACTIVE,
+        Job.deleted_at.is_(None),
+        Job.application_deadline.isnot(None),
+    )
+
+
+def evict_jobs(job_ids: List[str]) -> None:
+    """
+    Drops jobs from the in-memory structures loaded in this process; ones
+    not loaded read the database when first used anyway.
+    """
+    from app.services.geo_index import get_job_geo_index
+    from app.services.job_search import get_job_search_index
+    from app.services.skill_index import get_skill_index
+    from app.services.swipe_deck import get_deck_engine
+
+    if get_skill_index.cache_info().currsize:
+        for job_id in job_ids:
+            get_skill_index().remove_job(job_id)
+    if get_job_geo_index.cache_info().currsize:
+        for job_id in job_ids:
+            get_job_geo_index().remove(job_id)
+    if get_job_search_index.cache_info().currsize:
+        for job_id in job_ids:
+            get_job_search_index().delete(job_id)
+    if get_deck_engine.cache_info().currsize:
+        get_deck_engine().evict_jobs(job_ids)
+
+
+class ExpiryScheduler:
+    """
+    Expires jobs at their application deadline.
+
+    The heap may hold outdated entries for jobs whose deadline moved; the
+    job -> deadline map is authoritative and stale entries are skipped when
+    popped. The UPDATE re-checks status and deadline, so a job re-opened
+    or extended at the last moment is left alone.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        horizon_seconds: float = 24 * 3600.0,
+        batch_size: int = 500,
+        on_expired: Callable[[List[str]], None] = evict_jobs,
+    ):
+        self._session_factory = session_factory
+        self.horizon_seconds = horizon_seconds
+        self.batch_size = batch_size
+        self._on_expired = on_expired
+        self._heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        # Every active deadline up to here is in the heap; while a scan
+        # runs, schedule() already accepts deadlines up to its target
+        self._loaded_until: Optional[float] = None
+        self._scanning_until: Optional[float] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.total_expired = 0
+        self.total_batches = 0
+        self.total_errors = 0
+
+    # --- Lifecycle ---
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="job-expiry", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            self.catch_up()
+        except Exception:
+            logger.exception("Job expiry catch-up failed")
+            self.total_errors += 1
+        while not self._stop.is_set():
+            self._wake.clear()
+            expired = 0
+            try:
+                self.extend_window()
+                expired = self.expire_due()
+            except Exception:
+                logger.exception("Job expiry round failed")
+                self.total_errors += 1
+            if expired < self.batch_size:
+                self._wake.wait(self._sleep_seconds())
+
+    def _sleep_seconds(self) -> float:
+        now = time.time()
+        with self._lock:
+            wake_at = now + _MAX_SLEEP_SECONDS
+            if self._heap:
+                wake_at = min(wake_at, self._heap[0][0])
+            if self._loaded_until is not None:
+                # Slide the window forward once half of it has elapsed
+                wake_at = min(wake_at, self._loaded_until - self.horizon_seconds / 2)
+        return max(wake_at - now, 0.0)
+
+    # --- Scheduling ---
+    def schedule(self, job_id: str, deadline: Optional[datetime]) -> None:
+        """
+        (Re)schedules an active job's deadline; None unschedules it.
+        Deadlines beyond the loaded window are picked up when it slides.
+        """
+        with self._lock:
+            if deadline is None:
+                self._deadlines.pop(job_id, None)
+                return
+            at = _timestamp(deadline)
+            limit = max(self._loaded_until or 0.0, self._scanning_until or 0.0)
+            if at > limit:
+                self._deadlines.pop(job_id, None)
+                return
+            self._deadlines[job_id] = at
+            heapq.heappush(self._heap, (at, job_id))
+            earliest = self._heap[0][1] == job_id
+            self._compact()
+        if earliest:
+            self._wake.set()
+
+    def unschedule(self, job_id: str) -> None:
+        self.schedule(job_id, None)
+
+    def _compact(self) -> None:
+        # Rebuilds the heap once outdated entries outnumber live ones
+        if len(self._heap) > 2 * len(self._deadlines) + 1024:
+            self._heap = [(at, job_id) for job_id, at in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def extend_window(self) -> int:
+        """
+        Loads the deadlines entering the horizon with one range scan.
+        Returns the number of jobs loaded.
+        """
+        now = time.time()
+        until = now + self.horizon_seconds
+        with self._lock:
+            loaded_until = self._loaded_until
+            if loaded_until is not None and loaded_until >= now + self.horizon_seconds / 2:
+                return 0
+            self._scanning_until = until
+
+        db = self._session_factory()
+        try:
+            query = _scheduled_jobs(db).filter(Job.application_deadline <= _as_datetime(until))
+            if loaded_until is not None:
+                query = query.filter(Job.application_deadline > _as_datetime(loaded_until))
+            rows = query.all()
+        except Exception:
+            with self._lock:
+                self._scanning_until = None
+            raise
+        finally:
+            db.close()
+        with self._lock:
+            for job_id, deadline in rows:
+                # A commit racing the scan may already have scheduled the job
+                at = self._deadlines.setdefault(job_id, _timestamp(deadline))
+                heapq.heappush(self._heap, (at, job_id))
+            self._loaded_until = until
+            self._scanning_until = None
+        return len(rows)
+
+    # --- Expiring ---
+    def expire_due(self) -> int:
+        """
+        Expires one batch of jobs whose deadline has passed.
+        Returns the number of jobs taken off the heap.
+        """
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                at, job_id = heapq.heappop(self._heap)
+                if self._deadlines.get(job_id) == at:
+                    del self._deadlines[job_id]
+                    due.append((at, job_id))
+        if due:
+            try:
+                self._expire([job_id for _, job_id in due])
+            except Exception:
+                # Back on the heap, retried next round
+                with self._lock:
+                    for at, job_id in due:
+                        self._deadlines.setdefault(job_id, at)
+                        heapq.heappush(self._heap, (at, job_id))
+                raise
+        return len(due)
+
+    def catch_up(self) -> int:
+        """
+        Expires every active job already past its deadline, found with one
+        range scan on the deadline index. Returns the number expired.
+        """
+        db = self._session_factory()
+        try:
+            job_ids = [
+                job_id
+                for (job_id,) in db.query(Job.id)
+                .filter(
+                    Job.job_status == JobStatus.ACTIVE,
+                    Job.deleted_at.is_(None),
+                    Job.application_deadline <= _utcnow(),
+                )
+                .order_by(Job.application_deadline)
+            ]
+        finally:
+            db.close()
+        expired = 0
+        for start in range(0, len(job_ids), self.batch_size):
+            expired += self._expire(job_ids[start : start + self.batch_size])
+        if expired:
+            logger.info("Expired %d jobs whose deadline passed while stopped", expired)
+        return expired
+
+    def _expire(self, job_ids: List[str]) -> int:
+        db = self._session_factory()
+        try:
+            now = _utcnow()
+            due = (
+                Job.id.in_(job_ids),
+                Job.job_status == JobStatus.ACTIVE,
+                Job.application_deadline <= now,
+            )
+            rows = db.execute(select(Job.id, Job.company_id).where(*due)).all()
+            if rows:
+                db.execute(
+                    update(Job.__table__)
+                    .where(Job.id.in_([job_id for job_id, _ in rows]), *due[1:])
+                    .values(job_status=JobStatus.EXPIRED, updated_at=now)
+                )
+                invalidate_on_commit(
+                    db,
+                    *(job_tag(job_id) for job_id, _ in rows),
+                    *(company_tag(company_id) for company_id in {c for _, c in rows}),
+                )
+            db.commit()
+        finally:
+            db.close()
+
+        expired = [job_id for job_id, _ in rows]
+        self.total_batches += 1
+        self.total_expired += len(expired)
+        if expired:
+            try:
+                self._on_expired(expired)
+            except Exception:
+                logger.exception("Evicting expired jobs failed")
+        return len(expired)
+
+    # --- Metrics ---
+    def stats(self) -> Dict:
+        with self._lock:
+            scheduled = len(self._deadlines)
+            live = [at for at, job_id in self._heap[:1] if self._deadlines.get(job_id) == at]
+        return {
+            "scheduled": scheduled,
+            "next_deadline_in_seconds": round(live[0] - time.time(), 1) if live else None,
+            "total_expired": self.total_expired,
+            "total_batches": self.total_batches,
+            "total_errors": self.total_errors,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+# ===============================
+#       SYNC
+# ===============================
+def refresh_jobs(scheduler: ExpiryScheduler, db: Session, job_ids: Iterable[str]) -> None:
+    """
+    Re-reads the deadlines of specific jobs; ones no longer active (or
+    without a deadline) are unscheduled.
+    """
+    job_ids = list(set(job_ids))
+    if not job_ids:
+        return
+    found = dict(_scheduled_jobs(db).filter(Job.id.in_(job_ids)).all())
+    for job_id in job_ids:
+        scheduler.schedule(job_id, found.get(job_id))
+
+
+_PENDING_KEY = "job_expiry_jobs"
+
+
+def install_expiry_sync(session_factory, scheduler_getter) -> None:
+    """
+    Reschedules jobs whose deadline, status or deletion changed in a
+    committed transaction.
+    """
+
+    def collect(session, flush_context):
+        touched = session.info.setdefault(_PENDING_KEY, set())
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, Job):
+                touched.add(obj.id)
+        for obj in session.dirty:
+            if isinstance(obj, Job):
+                state = inspect(obj)
+                if any(state.attrs[c].history.has_changes() for c in _TRACKED_COLUMNS):
+                    touched.add(obj.id)
+
+    def apply(session):
+        touched = session.info.pop(_PENDING_KEY, None)
+        if not touched:
+            return
+        db = SessionLocal()
+        try:
+            refresh_jobs(scheduler_getter(), db, touched)
+        except Exception:
+            logger.exception("Job expiry sync failed")
+        finally:
+            db.close()
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(
+        session_factory,
+        "after_soft_rollback",
+        lambda session, previous: session.info.pop(_PENDING_KEY, None),
+    )
+
+
+@lru_cache()
+def get_expiry_scheduler() -> ExpiryScheduler:
+    return ExpiryScheduler(
+        horizon_seconds=timedelta(hours=settings.JOB_EXPIRY_HORIZON_HOURS).total_seconds(),
+        batch_size=settings.JOB_EXPIRY_BATCH_SIZE,
+    )
@@ -0,0 +1,359 @@
+"""
+Bulk Job Import
+Streams partner and scraped job feeds (JSONL or CSV) into the catalog in
+fixed-size batches. Each batch is validated in one pass, written with a few
+set-based statements (companies upserted by slug, jobs by
+(source, external_job_id), their skills replaced) and committed, so memory
+stays bounded by the batch size however long the feed is.
+"""
+
+import csv
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import schemas
+from app.core.cache import invalidate_on_commit
+from app.models.job import Company, Job, JobSkill, JobSource
+from app.services.catalog import company_tag, job_tag
+from app.services.match_invalidation import mark_stale
+from app.utils.sql import upsert_many
+from app.utils.text import normalize_skill_name, slugify
+
+logger = logging.getLogger(__name__)
+
+FEED_FORMATS = ("jsonl", "csv")
+MAX_REPORTED_ERRORS = 100
+# Job columns a feed owns: re-importing a job overwrites exactly these.
+# published_at is kept from the first import.
+_JOB_FEED_COLUMNS = (
+    "company_id",
+    "job_title",
+    "job_description",
+    "job_responsibilities",
+    "job_requirements",
+    "nice_to_have",
+    "employment_type",
+    "work_mode",
+    "experience_level",
+    "job_status",
+    "location_city",
+    "location_state",
+    "location_country",
+    "latitude",
+    "longitude",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "salary_period",
+    "external_url",
+    "apply_type",
+    "application_deadline",
+    "updated_at",
+)
+
+_ROWS_ADAPTER = TypeAdapter(List[schemas.JobImportRow])
+
+
+@dataclass
+class RowError:
+    line: int
+    error: str
+
+
+@dataclass
+class BatchProgress:
+    batch: int
+    rows: int
+    imported: int
+    invalid: int
+    seconds: float
+    total_rows: int
+    rows_per_second: float  # overall, so far
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    imported: int = 0
+    invalid: int = 0
+    companies: int = 0
+    skills: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+    errors: List[RowError] = field(default_factory=list)
+
+    def add_error(self, line: int, error: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, error))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ===============================
+#       READING
+# ===============================
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """
+    Feed format implied by a file name: .jsonl/.ndjson or .csv.
+    """
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    return None
+
+
+def _present(record: Dict) -> Dict:
+    # Empty cells are missing values, so schema defaults apply
+    return {key: value for key, value in record.items() if value not in ("", None)}
+
+
+def read_feed(stream: TextIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """
+    Lazily yields (line number, record) pairs. A record is a dict, or the
+    error message of a line that could not be parsed.
+    """
+    if fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_no, f"invalid JSON: {exc}"
+                continue
+            if isinstance(record, dict):
+                yield line_no, _present(record)
+            else:
+                yield line_no, "expected a JSON object"
+    elif fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, _present(record)
+    else:
+        raise ValueError(f"Unsupported feed format {fmt!r}; expected one of {FEED_FORMATS}")
+
+
+def _format_error(error: dict) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+def validate_batch(
+    records: List[Tuple[int, object]], report: ImportReport
+) -> List[Tuple[int, schemas.JobImportRow]]:
+    """
+    Validates a batch in one pydantic call, returning (line number, row)
+    pairs. Invalid rows are reported and dropped; only a batch with
+    failures is validated a second time.
+    """
+    numbered = []
+    for line_no, record in records:
+        if isinstance(record, dict):
+            numbered.append((line_no, record))
+        else:
+            report.add_error(line_no, record)
+    try:
+        rows = _ROWS_ADAPTER.validate_python([record for _, record in numbered])
+        return [(line_no, row) for (line_no, _), row in zip(numbered, rows)]
+    except ValidationError as exc:
+        failed: Dict[int, List[str]] = {}
+        for error in exc.errors():
+            index, *loc = error["loc"]
+            failed.setdefault(index, []).append(_format_error({**error, "loc": loc}))
+    for index in sorted(failed):
+        report.add_error(numbered[index][0], "; ".join(failed[index]))
+    numbered = [pair for index, pair in enumerate(numbered) if index not in failed]
+    rows = _ROWS_ADAPTER.validate_python([record for _, record in numbered])
+    return [(line_no, row) for (line_no, _), row in zip(numbered, rows)]
+
+
+# ===============================
+#       WRITING
+# ===============================
+def _company_slug(row: schemas.JobImportRow) -> str:
+    return row.company_slug or slugify(row.company_name) or row.company_name.lower()
+
+
+def import_batch(
+    db: Session, rows: List[schemas.JobImportRow], source: JobSource
+) -> Tuple[List[str], List[str], int]:
+    """
+    Upserts a validated batch: its companies, its jobs, then replaces those
+    jobs' skills. Does not commit.
+    Returns (job ids, company ids, skill rows written).
+    """
+    now = _utcnow()
+    # A feed repeating a job within one batch: the last row wins
+    rows = list({row.external_job_id: row for row in rows}.values())
+
+    companies: Dict[str, str] = {}
+    for row in rows:
+        companies.setdefault(_company_slug(row), row.company_name)
+    # Existing companies only get their name refreshed; the rest of the
+    # profile is curated in-app
+    upsert_many(
+        db,
+        Company.__table__,
+        [
+            {"id": str(uuid.uuid4()), "company_name": name, "company_slug": slug, "updated_at": now}
+            for slug, name in companies.items()
+        ],
+        ["company_slug"],
+        ["company_name", "updated_at"],
+    )
+    company_ids = dict(
+        db.execute(
+            select(Company.company_slug, Company.id).where(Company.company_slug.in_(list(companies)))
+        ).all()
+    )
+
+    job_rows = []
+    for row in rows:
+        values = row.model_dump(exclude={"company_name", "company_slug", "skills"})
+        values.update(
+            id=str(uuid.uuid4()),
+            source=source,
+            company_id=company_ids[_company_slug(row)],
+            published_at=row.published_at or now,
+            updated_at=now,
+        )
+        job_rows.append(values)
+    upsert_many(db, Job.__table__, job_rows, ["source", "external_job_id"], _JOB_FEED_COLUMNS)
+    job_ids = dict(
+        db.execute(
+            select(Job.external_job_id, Job.id).where(
+                Job.source == source,
+                Job.external_job_id.in_([row.external_job_id for row in rows]),
+            )
+        ).all()
+    )
+
+    skill_rows = []
+    for row in rows:
+        seen = set()
+        for name in row.skills:
+            key = normalize_skill_name(name)
+            if key and key not in seen:
+                seen.add(key)
+                skill_rows.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "job_id": job_ids[row.external_job_id],
+                        "skill_name": name.strip(),
+                        "updated_at": now,
+                    }
+                )
+    db.execute(delete(JobSkill.__table__).where(JobSkill.job_id.in_(list(job_ids.values()))))
+    if skill_rows:
+        db.execute(insert(JobSkill.__table__), skill_rows)
+
+    return list(job_ids.values()), list(company_ids.values()), len(skill_rows)
+
+
+def _refresh_loaded_indexes(db: Session, job_ids: List[str]) -> None:
+    # Core writes bypass the ORM sync hooks; indexes not loaded in this
+    # process build from the database when first used anyway
+    from app.services import geo_index, job_expiry, job_search, skill_index, swipe_deck
+
+    for getter, refresh in (
+        (skill_index.get_skill_index, skill_index.refresh_jobs),
+        (geo_index.get_job_geo_index, geo_index.refresh_jobs),
+        (job_search.get_job_search_index, job_search.refresh_jobs),
+        (job_expiry.get_expiry_scheduler, job_expiry.refresh_jobs),
+    ):
+        if getter.cache_info().currsize:
+            try:
+                refresh(getter(), db, job_ids)
+            except Exception:
+                logger.exception("Index refresh after job import failed")
+    swipe_deck.expire_deck_heads()
+
+
+def _batches(records: Iterator, size: int) -> Iterator[List]:
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_feed(
+    db: Session,
+    stream: TextIO,
+    fmt: str,
+    source: JobSource = JobSource.IMPORTED,
+    batch_size: int = 1000,
+    on_batch: Optional[Callable[[BatchProgress], None]] = None,
+) -> ImportReport:
+    """
+    Imports a whole feed, committing once per batch. A batch the database
+    rejects is rolled back and reported; the import carries on with the
+    next one. `on_batch` receives progress after every batch.
+    """
+    report = ImportReport()
+    company_ids_seen = set()  # a company can appear in many batches
+    started = time.perf_counter()
+    for records in _batches(read_feed(stream, fmt), batch_size):
+        batch_started = time.perf_counter()
+        invalid_before = report.invalid
+        report.rows_read += len(records)
+        report.batches += 1
+        valid = validate_batch(records, report)
+        imported = 0
+        if valid:
+            try:
+                job_ids, company_ids, skills = import_batch(db, [row for _, row in valid], source)
+                mark_stale(db, job_ids=job_ids)
+                invalidate_on_commit(
+                    db,
+                    *(job_tag(job_id) for job_id in job_ids),
+                    *(company_tag(company_id) for company_id in company_ids),
+                )
+                db.commit()
+            except SQLAlchemyError as exc:
+                db.rollback()
+                logger.exception("Job import batch %d failed", report.batches)
+                for line_no, _ in valid:
+                    report.add_error(line_no, f"batch rejected by the database: {exc.__class__.__name__}")
+            else:
+                imported = len(valid)
+                report.imported += imported
+                company_ids_seen.update(company_ids)
+                report.companies = len(company_ids_seen)
+                report.skills += skills
+                _refresh_loaded_indexes(db, job_ids)
+
+        elapsed = time.perf_counter() - started
+        if on_batch is not None:
+            on_batch(
+                BatchProgress(
+                    batch=report.batches,
+                    rows=len(records),
+                    imported=imported,
+                    invalid=report.invalid - invalid_before,
+                    seconds=time.perf_counter() - batch_started,
+                    total_rows=report.rows_read,
+                    rows_per_second=report.rows_read / elapsed if elapsed else 0.0,
+                )
+            )
+
+    report.seconds = time.perf_counter() - started
+    report.rows_per_second = report.rows_read / report.seconds if report.seconds else 0.0
+    return report
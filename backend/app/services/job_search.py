@@ -0,0 +1,862 @@
+"""
+Job Search Index
+In-process full-text search over active jobs: BM25 ranking across the
+title, skills, requirements and description fields with per-field boosts
+(BM25F), phrase queries over token positions, and incremental updates.
+
+Writes land in an in-memory buffer that is flushed into immutable segment
+files once it fills up. Segments are memory-mapped, so a restart reopens
+the index instead of rebuilding it; edits and deletions tombstone the old
+copy, and small segments are merged as they accumulate.
+"""
+
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, reduce
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job, JobSkill, JobStatus
+from app.utils.text import analyze, analyze_positions
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("title", "skills", "requirements", "description")
+FIELD_BOOSTS = np.array([3.0, 2.0, 1.5, 1.0])
+K1 = 1.2
+B = 0.75
+MAX_QUERY_TERMS = 32
+
+# Positions are packed as field << 24 | offset within the field
+_FIELD_SHIFT = 24
+_OFFSET_MASK = (1 << _FIELD_SHIFT) - 1
+# Offset gap between list items, so a phrase never spans two requirements
+_ITEM_GAP = 8
+
+SEGMENT_MAGIC = b"SHJSEG01"
+SEGMENT_SUFFIX = ".seg"
+MANIFEST = "manifest.json"
+# Buffer size while building from scratch: fewer, larger segments
+BUILD_BUFFER_DOCS = 20_000
+
+
+@dataclass
+class SearchHit:
+    job_id: str
+    score: float
+
+
+# ===============================
+#       DOCUMENTS
+# ===============================
+class _Document:
+    """
+    One job after analysis: field lengths plus, per term, its frequency in
+    each field and its packed positions.
+    """
+
+    __slots__ = ("job_id", "lengths", "terms")
+
+    def __init__(self, job_id: str, fields: Dict[str, object]):
+        self.job_id = job_id
+        self.lengths = [0] * len(FIELDS)
+        self.terms: Dict[str, Tuple[List[int], List[int]]] = {}
+        for f, name in enumerate(FIELDS):
+            value = fields.get(name)
+            items = [value] if isinstance(value, str) else list(value or [])
+            offset = 0
+            for item in items:
+                analyzed = analyze_positions(item if isinstance(item, str) else str(item))
+                for position, term in analyzed:
+                    entry = self.terms.get(term)
+                    if entry is None:
+                        entry = self.terms[term] = ([0] * len(FIELDS), [])
+                    entry[0][f] += 1
+                    entry[1].append(f << _FIELD_SHIFT | min(offset + position, _OFFSET_MASK))
+                self.lengths[f] += len(analyzed)
+                if analyzed:
+                    offset += analyzed[-1][0] + 1 + _ITEM_GAP
+
+
+def _ranges(begins: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenated arange(begin, begin + count) for each pair, vectorised."""
+    total = int(counts.sum())
+    if not total:
+        return np.empty(0, dtype=np.int64)
+    starts = begins.astype(np.int64) - (np.cumsum(counts) - counts)
+    return np.repeat(starts, counts) + np.arange(total, dtype=np.int64)
+
+
+# ===============================
+#       SEGMENTS
+# ===============================
+class _Segment:
+    """
+    Immutable postings for a batch of jobs. The arrays are numpy views over
+    a memory-mapped segment file, or plain arrays for the write buffer; only
+    the `deleted` tombstone mask changes after construction.
+
+    Postings of a term are the slice [start, start + count) of `docs`
+    (ascending ordinals) and `tfs` (per-field frequencies); posting i owns
+    positions[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, doc_ids, terms, lengths, docs, tfs, offsets, positions, path=None, mapped=None):
+        self.doc_ids: List[str] = doc_ids
+        self.ordinals = {job_id: i for i, job_id in enumerate(doc_ids)}
+        self.terms: Dict[str, Tuple[int, int]] = terms
+        self.lengths = lengths
+        self.docs = docs
+        self.tfs = tfs
+        self.offsets = offsets
+        self.positions = positions
+        self.deleted = np.zeros(len(doc_ids), dtype=bool)
+        self.path = path
+        self._mapped = mapped
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def live(self) -> int:
+        return len(self.doc_ids) - int(self.deleted.sum())
+
+    def doc_frequency(self, term: str) -> int:
+        entry = self.terms.get(term)
+        return entry[1] if entry else 0
+
+    # --- Queries ---
+    def top(self, idf: Dict[str, float], phrases, avg_lengths: np.ndarray, k: int) -> List[Tuple[float, str]]:
+        """
+        Best `k` (score, job_id) pairs of this segment. Every phrase must
+        match; the query terms (phrase terms included) add BM25F scores.
+        """
+        allowed = None
+        for phrase in phrases:
+            matched = self._phrase_docs(phrase)
+            allowed = matched if allowed is None else np.intersect1d(allowed, matched, assume_unique=True)
+            if not len(allowed):
+                return []
+
+        scores = np.zeros(len(self), dtype=np.float64)
+        for term, weight in idf.items():
+            entry = self.terms.get(term)
+            if entry is None:
+                continue
+            start, count = entry
+            docs = self.docs[start : start + count]
+            norm = (1.0 - B) + B * (self.lengths[docs] / avg_lengths)
+            tf = (self.tfs[start : start + count] / norm) @ FIELD_BOOSTS
+            scores[docs] += weight * tf * (K1 + 1.0) / (tf + K1)
+
+        if allowed is not None:
+            candidates = allowed[scores[allowed] > 0]
+        else:
+            candidates = np.flatnonzero(scores > 0)
+        candidates = candidates[~self.deleted[candidates]]
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        return [(float(scores[i]), self.doc_ids[i]) for i in candidates]
+
+    def _phrase_docs(self, phrase: Sequence[Tuple[int, str]]) -> np.ndarray:
+        """
+        Ordinals whose fields contain the phrase: each term at its offset
+        from the first, within a single field.
+        """
+        entries = []
+        for offset, term in phrase:
+            entry = self.terms.get(term)
+            if entry is None:
+                return np.empty(0, dtype=np.int64)
+            entries.append((offset, entry))
+        # Rarest term first keeps the candidate set small
+        entries.sort(key=lambda item: item[1][1])
+        candidates = reduce(
+            lambda acc, docs: np.intersect1d(acc, docs, assume_unique=True),
+            (self.docs[start : start + count] for _, (start, count) in entries),
+        )
+
+        if not len(candidates):
+            return candidates.astype(np.int64)
+
+        # Key every occurrence as (doc, position - offset in phrase); a doc
+        # matches when some key is shared by all terms. Vectorised over all
+        # candidates at once.
+        common = None
+        for offset, (start, count) in entries:
+            index = start + np.searchsorted(self.docs[start : start + count], candidates)
+            begins = self.offsets[index]
+            sizes = self.offsets[index + 1] - begins
+            shifted = self.positions[_ranges(begins, sizes)].astype(np.int64) - offset
+            keys = (np.repeat(candidates.astype(np.int64), sizes) << 32) + shifted
+            keys = keys[shifted >= 0]
+            common = keys if common is None else np.intersect1d(common, keys, assume_unique=True)
+            if not len(common):
+                return np.empty(0, dtype=np.int64)
+        return np.unique(common >> 32)
+
+    # --- Construction ---
+    @classmethod
+    def build(cls, documents: Sequence[_Document]) -> "_Segment":
+        by_term = defaultdict(list)
+        for ordinal, document in enumerate(documents):
+            for term, entry in document.terms.items():
+                by_term[term].append((ordinal, entry))
+
+        terms, docs, tfs, offsets, positions = {}, [], [], [0], []
+        for term in sorted(by_term):
+            postings = by_term[term]
+            terms[term] = (len(docs), len(postings))
+            for ordinal, (tf, packed) in postings:
+                docs.append(ordinal)
+                tfs.append(tf)
+                positions.extend(packed)
+                offsets.append(len(positions))
+
+        width = len(FIELDS)
+        return cls(
+            [document.job_id for document in documents],
+            terms,
+            np.array([d.lengths for d in documents], dtype=np.uint32).reshape(-1, width),
+            np.array(docs, dtype=np.uint32),
+            np.minimum(np.array(tfs, dtype=np.uint32), 0xFFFF).astype(np.uint16).reshape(-1, width),
+            np.array(offsets, dtype=np.int64),
+            np.array(positions, dtype=np.uint32),
+        )
+
+    @classmethod
+    def merge(cls, segments: Sequence["_Segment"], deleted: Sequence[np.ndarray]) -> "_Segment":
+        """
+        One segment holding the documents of `segments` not marked in the
+        matching `deleted` masks. Works term by term on the arrays, without
+        re-analysing any text.
+        """
+        doc_ids, lengths, remaps = [], [], []
+        for segment, mask in zip(segments, deleted):
+            live = np.flatnonzero(~mask)
+            remap = np.full(len(segment), -1, dtype=np.int64)
+            remap[live] = np.arange(len(doc_ids), len(doc_ids) + len(live))
+            doc_ids.extend(segment.doc_ids[i] for i in live)
+            lengths.append(np.asarray(segment.lengths)[live])
+            remaps.append(remap)
+
+        terms, docs, tfs, counts, positions = {}, [], [], [], []
+        total = 0
+        for term in sorted(set().union(*(segment.terms for segment in segments))):
+            first = total
+            for segment, remap in zip(segments, remaps):
+                entry = segment.terms.get(term)
+                if entry is None:
+                    continue
+                start, count = entry
+                index = np.arange(start, start + count)
+                renumbered = remap[segment.docs[index]]
+                keep = renumbered >= 0
+                if not keep.any():
+                    continue
+                index = index[keep]
+                begins = segment.offsets[index]
+                sizes = segment.offsets[index + 1] - begins
+                docs.append(renumbered[keep])
+                tfs.append(segment.tfs[index])
+                counts.append(sizes)
+                positions.append(segment.positions[_ranges(begins, sizes)])
+                total += len(index)
+            if total > first:
+                terms[term] = (first, total - first)
+
+        width = len(FIELDS)
+        sizes = np.concatenate(counts) if counts else np.empty(0, dtype=np.int64)
+        return cls(
+            doc_ids,
+            terms,
+            np.concatenate(lengths).astype(np.uint32) if lengths else np.empty((0, width), np.uint32),
+            np.concatenate(docs).astype(np.uint32) if docs else np.empty(0, np.uint32),
+            np.concatenate(tfs) if tfs else np.empty((0, width), np.uint16),
+            np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+            np.concatenate(positions).astype(np.uint32) if positions else np.empty(0, np.uint32),
+        )
+
+    # --- Files ---
+    def _arrays(self):
+        return (self.lengths, self.docs, self.tfs, self.offsets, self.positions)
+
+    def write(self, path: str) -> None:
+        """
+        Layout: magic, header length, JSON header (doc ids, term dictionary,
+        array sizes) padded to 8 bytes, then the arrays, each 8-byte aligned
+        so they can be mapped in place.
+        """
+        header = json.dumps(
+            {
+                "doc_ids": self.doc_ids,
+                "terms": [[term, start, count] for term, (start, count) in self.terms.items()],
+                "postings": len(self.docs),
+                "positions": len(self.positions),
+            }
+        ).encode()
+        header += b" " * (-len(header) % 8)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(SEGMENT_MAGIC)
+            fh.write(struct.pack("<Q", len(header)))
+            fh.write(header)
+            for array in self._arrays():
+                data = np.ascontiguousarray(array).tobytes()
+                fh.write(data)
+                fh.write(b"\0" * (-len(data) % 8))
+        os.replace(tmp_path, path)
+        self.path = path
+
+    @classmethod
+    def open(cls, path: str) -> "_Segment":
+        with open(path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[: len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+            raise ValueError(f"{path} is not a job search segment")
+        (header_len,) = struct.unpack_from("<Q", mapped, len(SEGMENT_MAGIC))
+        cursor = len(SEGMENT_MAGIC) + 8
+        header = json.loads(mapped[cursor : cursor + header_len])
+        cursor += header_len
+
+        width = len(FIELDS)
+        n_docs, n_postings = len(header["doc_ids"]), header["postings"]
+        shapes = (
+            (np.uint32, (n_docs, width)),
+            (np.uint32, (n_postings,)),
+            (np.uint16, (n_postings, width)),
+            (np.int64, (n_postings + 1,)),
+            (np.uint32, (header["positions"],)),
+        )
+        arrays = []
+        for dtype, shape in shapes:
+            count = int(np.prod(shape))
+            arrays.append(np.frombuffer(mapped, dtype=dtype, count=count, offset=cursor).reshape(shape))
+            size = count * np.dtype(dtype).itemsize
+            cursor += size + (-size % 8)
+        terms = {term: (start, count) for term, start, count in header["terms"]}
+        return cls(header["doc_ids"], terms, *arrays, path=path, mapped=mapped)
+
+    def unlink(self) -> None:
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+# ===============================
+#       QUERIES
+# ===============================
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[Tuple[int, str]]]]:
+    """
+    Terms and quoted phrases of a query. Each phrase is a list of
+    (offset from its first term, term); one-word phrases become terms.
+    """
+    terms, phrases = [], []
+    for text in _PHRASE.findall(query or ""):
+        analyzed = analyze_positions(text)
+        if len(analyzed) > 1:
+            first = analyzed[0][0]
+            phrases.append([(position - first, term) for position, term in analyzed])
+        else:
+            terms.extend(term for _, term in analyzed)
+    terms.extend(analyze(_PHRASE.sub(" ", query or "")))
+    return list(dict.fromkeys(terms))[:MAX_QUERY_TERMS], phrases[:MAX_QUERY_TERMS]
+
+
+# ===============================
+#       INDEX
+# ===============================
+class JobSearchIndex:
+    """
+    Segmented BM25F index of jobs. With a `directory`, flushed segments are
+    written there and memory-mapped, and a manifest records the segment
+    list and tombstones; without one the index lives in memory only.
+    """
+
+    def __init__(self, directory: Optional[str] = None, buffer_docs: int = 1000, max_segments: int = 8):
+        self.directory = directory
+        self.buffer_docs = buffer_docs
+        self.max_segments = max(max_segments, 2)
+        self._segments: List[_Segment] = []
+        self._buffer: Dict[str, _Document] = {}
+        self._buffer_segment: Optional[_Segment] = None
+        # Flushed segment holding the live copy of each job
+        self._located: Dict[str, _Segment] = {}
+        self._length_sums = np.zeros(len(FIELDS))
+        self._live = 0
+        self._next_segment = 0
+        self._merging = False
+        self._lock = threading.RLock()
+        self.watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return self._live
+
+    def job_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._located) + list(self._buffer)
+
+    # --- Updates ---
+    def upsert(self, job_id: str, fields: Dict[str, object]) -> None:
+        """
+        Indexes (or re-indexes) a job. `fields` maps FIELDS names to a
+        string or a list of strings.
+        """
+        document = _Document(job_id, fields)
+        with self._lock:
+            self._remove(job_id)
+            self._buffer[job_id] = document
+            self._buffer_segment = None
+            self._account(document.lengths, 1)
+            full = len(self._buffer) >= self.buffer_docs
+        if full:
+            self.flush()
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._remove(job_id)
+
+    def _remove(self, job_id: str) -> None:
+        document = self._buffer.pop(job_id, None)
+        if document is not None:
+            self._buffer_segment = None
+            self._account(document.lengths, -1)
+            return
+        segment = self._located.pop(job_id, None)
+        if segment is not None:
+            ordinal = segment.ordinals[job_id]
+            segment.deleted[ordinal] = True
+            self._account(segment.lengths[ordinal], -1)
+
+    def _account(self, lengths, sign: int) -> None:
+        self._length_sums += sign * np.asarray(lengths, dtype=np.float64)
+        self._live += sign
+
+    # --- Queries ---
+    def search(self, query: str, k: int = 20) -> List[SearchHit]:
+        """
+        Top-k jobs for a query such as `python "data engineer" remote`:
+        quoted phrases must match, other terms rank by BM25F.
+        """
+        terms, phrases = parse_query(query)
+        if not terms and not phrases:
+            return []
+        with self._lock:
+            if not self._live:
+                return []
+            segments = list(self._segments)
+            if self._buffer:
+                if self._buffer_segment is None:
+                    self._buffer_segment = _Segment.build(list(self._buffer.values()))
+                segments.append(self._buffer_segment)
+
+            scoring = set(terms).union(*({term for _, term in phrase} for phrase in phrases))
+            idf = {}
+            for term in sorted(scoring):
+                # Tombstoned copies still count, as in most engines; they
+                # only skew idf until the next merge
+                df = sum(segment.doc_frequency(term) for segment in segments)
+                if df:
+                    idf[term] = max(math.log(1.0 + (self._live - df + 0.5) / (df + 0.5)), 1e-6)
+            if not idf:
+                return []
+            avg_lengths = np.maximum(self._length_sums / self._live, 1.0)
+            hits = []
+            for segment in segments:
+                hits.extend(segment.top(idf, phrases, avg_lengths, k))
+
+        best = heapq.nlargest(k, hits)
+        return [SearchHit(job_id=job_id, score=round(score, 4)) for score, job_id in best]
+
+    # --- Segments ---
+    def flush(self) -> None:
+        """
+        Turns the write buffer into a segment, then merges the smallest
+        segments once more than `max_segments` have accumulated.
+        """
+        with self._lock:
+            if self._buffer:
+                segment = self._persist(_Segment.build(list(self._buffer.values())))
+                self._buffer.clear()
+                self._buffer_segment = None
+                # Already counted in the totals when they were buffered
+                self._add_segment(segment, account=False)
+            self._drop_empty_segments()
+            self._write_manifest()
+            victims = None
+            if len(self._segments) > self.max_segments and not self._merging:
+                by_size = sorted(self._segments, key=lambda s: s.live)
+                victims = by_size[: len(self._segments) - self.max_segments // 2]
+                self._merging = True
+        if victims:
+            self._merge(victims)
+
+    def optimize(self) -> None:
+        """Flushes and merges everything into a single segment."""
+        self.flush()
+        with self._lock:
+            if len(self._segments) < 2 or self._merging:
+                return
+            victims = list(self._segments)
+            self._merging = True
+        self._merge(victims)
+
+    def _merge(self, victims: List[_Segment]) -> None:
+        """
+        Merges outside the lock so searches and updates carry on; deletions
+        that land meanwhile are replayed onto the merged segment.
+        """
+        try:
+            with self._lock:
+                snapshots = [segment.deleted.copy() for segment in victims]
+            merged = self._persist(_Segment.merge(victims, snapshots))
+            with self._lock:
+                for segment, snapshot in zip(victims, snapshots):
+                    for ordinal in np.flatnonzero(segment.deleted & ~snapshot):
+                        merged.deleted[merged.ordinals[segment.doc_ids[ordinal]]] = True
+                self._segments = [s for s in self._segments if not any(s is v for v in victims)]
+                self._segments.append(merged)
+                for ordinal in np.flatnonzero(~merged.deleted):
+                    self._located[merged.doc_ids[ordinal]] = merged
+                self._write_manifest()
+        finally:
+            with self._lock:
+                self._merging = False
+        for segment in victims:
+            segment.unlink()
+
+    def _add_segment(self, segment: _Segment, account: bool = True) -> None:
+        self._segments.append(segment)
+        live = ~segment.deleted
+        for ordinal in np.flatnonzero(live):
+            self._located[segment.doc_ids[ordinal]] = segment
+        if account:
+            self._length_sums += np.asarray(segment.lengths)[live].sum(axis=0)
+            self._live += int(live.sum())
+
+    def _drop_empty_segments(self) -> None:
+        empty = [segment for segment in self._segments if not segment.live]
+        if empty:
+            self._segments = [segment for segment in self._segments if segment.live]
+            for segment in empty:
+                segment.unlink()
+
+    def _persist(self, segment: _Segment) -> _Segment:
+        if not self.directory:
+            return segment
+        with self._lock:
+            name = f"segment-{self._next_segment:06d}{SEGMENT_SUFFIX}"
+            self._next_segment += 1
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        segment.write(path)
+        return _Segment.open(path)
+
+    # --- Persistence ---
+    def _write_manifest(self) -> None:
+        if not self.directory:
+            return
+        manifest = {
+            "segments": [
+                {
+                    "file": os.path.basename(segment.path),
+                    "deleted": np.flatnonzero(segment.deleted).tolist(),
+                }
+                for segment in self._segments
+            ],
+            "next_segment": self._next_segment,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, MANIFEST)
+        with open(f"{path}.tmp", "w") as fh:
+            json.dump(manifest, fh)
+        os.replace(f"{path}.tmp", path)
+
+    def save(self) -> None:
+        """Flushes the buffer so every indexed job is on disk."""
+        self.flush()
+
+    @classmethod
+    def open(cls, directory: str, **kwargs) -> "JobSearchIndex":
+        """
+        Maps the segments listed in the manifest and applies their
+        tombstones; segment files the manifest doesn't list are left over
+        from an interrupted merge and are removed.
+        """
+        with open(os.path.join(directory, MANIFEST)) as fh:
+            manifest = json.load(fh)
+        index = cls(directory, **kwargs)
+        listed = set()
+        for entry in manifest["segments"]:
+            segment = _Segment.open(os.path.join(directory, entry["file"]))
+            segment.deleted[np.asarray(entry["deleted"], dtype=np.int64)] = True
+            index._add_segment(segment)
+            listed.add(entry["file"])
+        index._next_segment = manifest["next_segment"]
+        if manifest.get("watermark"):
+            index.watermark = datetime.fromisoformat(manifest["watermark"])
+        for name in os.listdir(directory):
+            if name.endswith(SEGMENT_SUFFIX) and name not in listed:
+                os.remove(os.path.join(directory, name))
+        return index
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "documents": self._live,
+                "segments": len(self._segments),
+                "buffered": len(self._buffer),
+                "postings": sum(len(segment.docs) for segment in self._segments),
+                "tombstones": sum(len(segment) - segment.live for segment in self._segments),
+            }
+
+
+# ===============================
+#       DATABASE SYNC
+# ===============================
+# Columns that feed the index; edits to anything else are ignored
+SEARCH_COLUMNS = (
+    "job_title",
+    "job_description",
+    "job_responsibilities",
+    "job_requirements",
+    "nice_to_have",
+    "ai_match_keywords",
+    "job_status",
+    "deleted_at",
+)
+_BATCH = 1000
+# Re-read a little before the watermark: second-resolution timestamps and
+# app/database clock skew would otherwise hide edits made right around it
+_WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, matching what the database hands back for updated_at
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _searchable_jobs(db: Session):
+    return db.query(
+        Job.id,
+        Job.job_title,
+        Job.job_description,
+        Job.job_responsibilities,
+        Job.job_requirements,
+        Job.nice_to_have,
+        Job.ai_match_keywords,
+    ).filter(Job.job_status == JobStatus.ACTIVE, Job.deleted_at.is_(None))
+
+
+def _with_skills(db: Session, rows) -> Iterator[Tuple[str, Dict[str, object]]]:
+    skills = defaultdict(list)
+    for job_id, name in db.query(JobSkill.job_id, JobSkill.skill_name).filter(
+        JobSkill.job_id.in_([row.id for row in rows])
+    ):
+        skills[job_id].append(name)
+    for row in rows:
+        yield row.id, {
+            "title": row.job_title,
+            "skills": skills[row.id] + list(row.ai_match_keywords or []),
+            "requirements": list(row.job_requirements or []) + list(row.nice_to_have or []),
+            "description": [row.job_description] + list(row.job_responsibilities or []),
+        }
+
+
+def job_documents(db: Session) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """
+    (job_id, fields) for every active job, read in id-ordered batches of
+    _BATCH together with their skills.
+    """
+    rows = _searchable_jobs(db).order_by(Job.id).limit(_BATCH).all()
+    while rows:
+        yield from _with_skills(db, rows)
+        if len(rows) < _BATCH:
+            return
+        rows = _searchable_jobs(db).filter(Job.id > rows[-1].id).order_by(Job.id).limit(_BATCH).all()
+
+
+def build_job_search_index(db: Session, directory: Optional[str] = None) -> JobSearchIndex:
+    """
+    Indexes every active job from scratch into a single segment, replacing
+    whatever segment files `directory` held.
+    """
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.endswith(SEGMENT_SUFFIX) or name == MANIFEST:
+                os.remove(os.path.join(directory, name))
+    index = JobSearchIndex(
+        directory, buffer_docs=BUILD_BUFFER_DOCS, max_segments=settings.JOB_SEARCH_MAX_SEGMENTS
+    )
+    index.watermark = _utcnow()
+    for job_id, fields in job_documents(db):
+        index.upsert(job_id, fields)
+    index.optimize()
+    index.buffer_docs = settings.JOB_SEARCH_BUFFER_DOCS
+    return index
+
+
+def refresh_jobs(index: JobSearchIndex, db: Session, job_ids: Iterable[str]) -> None:
+    """
+    Re-indexes specific jobs; ones that are no longer active drop out.
+    """
+    job_ids = sorted(set(job_ids))
+    for i in range(0, len(job_ids), _BATCH):
+        chunk = job_ids[i : i + _BATCH]
+        found = dict(_with_skills(db, _searchable_jobs(db).filter(Job.id.in_(chunk)).all()))
+        for job_id in chunk:
+            if job_id in found:
+                index.upsert(job_id, found[job_id])
+            else:
+                index.delete(job_id)
+
+
+def catch_up(index: JobSearchIndex, db: Session) -> None:
+    """
+    Applies changes made since the manifest watermark: jobs or job skills
+    touched after it are re-indexed, and jobs no longer active are dropped.
+    """
+    started = _utcnow()
+    if index.watermark is not None:
+        since = index.watermark - _WATERMARK_OVERLAP
+        changed = {job_id for (job_id,) in db.query(Job.id).filter(Job.updated_at > since)}
+        changed.update(
+            job_id for (job_id,) in db.query(JobSkill.job_id).filter(JobSkill.updated_at > since)
+        )
+        refresh_jobs(index, db, changed)
+
+    active = {
+        job_id
+        for (job_id,) in db.query(Job.id).filter(
+            Job.job_status == JobStatus.ACTIVE, Job.deleted_at.is_(None)
+        )
+    }
+    for job_id in index.job_ids():
+        if job_id not in active:
+            index.delete(job_id)
+    index.watermark = started
+
+
+_PENDING_KEY = "job_search_jobs"
+
+
+def install_search_sync(session_factory, index_getter) -> None:
+    """
+    Re-indexes jobs whose searchable text, status or skills changed in a
+    committed transaction: publishing, editing and closing a job. Job ids
+    are collected on flush and re-read after commit.
+    """
+
+    def collect(session, flush_context):
+        touched = session.info.setdefault(_PENDING_KEY, set())
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, JobSkill):
+                touched.add(obj.job_id)
+            elif isinstance(obj, Job):
+                touched.add(obj.id)
+        for obj in session.dirty:
+            if isinstance(obj, JobSkill):
+                touched.add(obj.job_id)
+            elif isinstance(obj, Job):
+                state = inspect(obj)
+                if any(state.attrs[c].history.has_changes() for c in SEARCH_COLUMNS):
+                    touched.add(obj.id)
+
+    def apply(session):
+        touched = session.info.pop(_PENDING_KEY, None)
+        if not touched:
+            return
+        db = SessionLocal()
+        try:
+            refresh_jobs(index_getter(), db, touched)
+        except Exception:
+            logger.exception("Job search sync failed")
+        finally:
+            db.close()
+
+    def discard(session):
+        session.info.pop(_PENDING_KEY, None)
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(session_factory, "after_soft_rollback", lambda session, previous: discard(session))
+
+
+_load_lock = threading.Lock()
+_loaded: Optional[JobSearchIndex] = None
+
+
+@lru_cache()
+def get_job_search_index() -> JobSearchIndex:
+    """
+    Reopens the on-disk index when there is one (then catches up with the
+    database), otherwise builds it from scratch. Concurrent first callers
+    (the warm-up thread and a search) wait for a single load.
+    """
+    global _loaded
+    with _load_lock:
+        if _loaded is None:
+            _loaded = _load_job_search_index()
+        return _loaded
+
+
+def _load_job_search_index() -> JobSearchIndex:
+    directory = settings.JOB_SEARCH_INDEX_DIR or None
+    db = SessionLocal()
+    try:
+        if directory and os.path.exists(os.path.join(directory, MANIFEST)):
+            try:
+                index = JobSearchIndex.open(
+                    directory,
+                    buffer_docs=settings.JOB_SEARCH_BUFFER_DOCS,
+                    max_segments=settings.JOB_SEARCH_MAX_SEGMENTS,
+                )
+                catch_up(index, db)
+                return index
+            except (OSError, ValueError, KeyError):
+                logger.exception("Ignoring unreadable job search index in %s", directory)
+        return build_job_search_index(db, directory)
+    finally:
+        db.close()
+
+
+def warm_job_search_index() -> None:
+    """
+    Loads the index on a background thread, so startup never waits for a
+    full build. A failure (say, no jobs table yet) is logged, and the first
+    search tries again.
+    """
+
+    def load():
+        try:
+            get_job_search_index()
+        except Exception:
+            logger.exception("Job search index warm-up failed; it loads on first use")
+
+    threading.Thread(target=load, name="job-search-warmup", daemon=True).start()
+
+
+def save_job_search_index() -> None:
+    if get_job_search_index.cache_info().currsize:
+        get_job_search_index().save()
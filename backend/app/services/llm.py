@@ -0,0 +1,174 @@
+"""
+Text Models
+The seam between SwipeHire and whatever writes its cover letters and
+resumes. Generation code asks a TextModel for a completion, whole or as a
+token stream, and never talks to a vendor API itself.
+
+- OpenAIModel: any OpenAI-compatible chat completions endpoint
+  (OPENAI_BASE_URL), spoken to directly over httpx. Streams are read as
+  server-sent events on the event loop, so no thread waits on the model.
+- StubModel: deterministic local stand-in for offline development, tests
+  and benchmarks. The same prompt always gives the same text, with
+  optional artificial latency.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    model: str  # the model version that wrote it, for ai_model_version
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class TextModel:
+    name = "base"
+
+    def complete(self, prompt: str, max_tokens: int) -> Completion:
+        raise NotImplementedError
+
+    async def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """
+        Text deltas as the model produces them. The default waits for the
+        whole completion on a worker thread; streaming models override it.
+        """
+        completion = await asyncio.get_running_loop().run_in_executor(
+            None, self.complete, prompt, max_tokens
+        )
+        yield completion.text
+
+    async def aclose(self) -> None:
+        pass
+
+
+class StubModel(TextModel):
+    """
+    Echoes a digest of the prompt back as a short letter. `latency` seconds
+    pass before the first token and `token_interval` between tokens, as
+    they would with a remote model; `calls` counts generations.
+    """
+
+    def __init__(self, name: str = "stub-1", latency: float = 0.0, token_interval: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.token_interval = token_interval
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _tokens(self, prompt: str, max_tokens: int) -> List[str]:
+        with self._lock:
+            self.calls += 1
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        first_line = prompt.strip().splitlines()[0] if prompt.strip() else ""
+        words = (
+            f"Dear Hiring Manager,\n\n[{self.name} {digest[:12]}] {first_line}\n\n"
+            "I would welcome the chance to discuss how my experience fits the role.\n\n"
+            "Kind regards"
+        ).split(" ")[:max_tokens]
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    def complete(self, prompt: str, max_tokens: int) -> Completion:
+        tokens = self._tokens(prompt, max_tokens)
+        time.sleep(self.latency + self.token_interval * len(tokens))
+        return Completion("".join(tokens), self.name, len(prompt.split()), len(tokens))
+
+    async def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        tokens = self._tokens(prompt, max_tokens)
+        await asyncio.sleep(self.latency)
+        for i, token in enumerate(tokens):
+            if i and self.token_interval:
+                await asyncio.sleep(self.token_interval)
+            yield token
+
+
+class OpenAIModel(TextModel):
+    """Chat completions against OPENAI_BASE_URL, blocking or streamed."""
+
+    def __init__(self, model: str, api_key: Optional[str], base_url: str, timeout: float = 120.0):
+        self.name = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _body(self, prompt: str, max_tokens: int, stream: bool) -> dict:
+        return {
+            "model": self.name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+
+    def complete(self, prompt: str, max_tokens: int) -> Completion:
+        response = httpx.post(
+            f"{self.base_url}/chat/completions",
+            json=self._body(prompt, max_tokens, stream=False),
+            headers=self._headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        usage = payload.get("usage") or {}
+        return Completion(
+            text=payload["choices"][0]["message"].get("content") or "",
+            model=payload.get("model", self.name),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+
+    async def stream(self, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        if self._client is None:
+            # One pooled client per process; keeps connections to the model warm
+            self._client = httpx.AsyncClient(timeout=self.timeout, headers=self._headers)
+        async with self._client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            json=self._body(prompt, max_tokens, stream=True),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                choices = json.loads(data).get("choices") or ()
+                for choice in choices:
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+@lru_cache()
+def get_text_model() -> TextModel:
+    backend = settings.AI_MODEL_BACKEND
+    if backend == "auto":
+        backend = "openai" if settings.OPENAI_API_KEY else "stub"
+    if backend == "openai":
+        return OpenAIModel(
+            settings.OPENAI_MODEL,
+            settings.OPENAI_API_KEY,
+            settings.OPENAI_BASE_URL,
+            timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+        )
+    if backend == "stub":
+        return StubModel()
+    raise ValueError(f"Unknown AI_MODEL_BACKEND {settings.AI_MODEL_BACKEND!r}")
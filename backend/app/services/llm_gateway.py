@@ -0,0 +1,367 @@
+"""
+LLM Gateway
+Async front door for document generation. Model tokens are relayed to the
+client as they arrive, so the first words show up after the model's
+first-token latency instead of after the whole completion, and no request
+thread waits on the model.
+
+- Concurrency: a global limit (LLM_MAX_CONCURRENCY) keeps the process
+  within the model's rate limits; a per-user limit stops one user from
+  filling it. Requests wait for a slot up to LLM_QUEUE_TIMEOUT_SECONDS;
+  beyond LLM_MAX_QUEUE waiters, or LLM_MAX_QUEUE_PER_USER for one user,
+  new ones are refused at once.
+- Cached results (app.services.ai_generation) are replayed without taking
+  a slot. Identical requests in flight follow one model stream, token by
+  token; it is cancelled once every follower has disconnected.
+- Cache reads and writes and the final CoverLetter/Resume insert run on
+  the gateway's own small thread pool, never the request threadpool.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.ai_generation import Generation, GenerationCache, GenerationRequest, get_generation_cache
+
+logger = logging.getLogger(__name__)
+
+LLM_REQUESTS = registry.counter(
+    "swipehire_llm_requests_total",
+    "Streamed generation requests by kind and outcome "
+    "(generated, cached, coalesced, busy, timeout, error, cancelled).",
+    ("kind", "outcome"),
+)
+LLM_FIRST_TOKEN = registry.histogram(
+    "swipehire_llm_first_token_seconds",
+    "Time from request to its first streamed token, queueing included.",
+    ("kind",),
+)
+
+
+class GatewayBusy(Exception):
+    """No model slot: too many requests queued, or the wait timed out."""
+
+    def __init__(self, detail: str, timed_out: bool = False):
+        super().__init__(detail)
+        self.timed_out = timed_out
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    event: str  # start | token | done | error
+    data: Dict
+
+
+def format_sse(event: StreamEvent) -> bytes:
+    """One server-sent event frame."""
+    return f"event: {event.event}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n".encode()
+
+
+# ===============================
+#       FLIGHTS
+# ===============================
+class _Flight:
+    """One model stream and everyone following it."""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.queued = False  # counted as a waiter, not yet holding slots
+        self.holds_user = False  # counted in the user's holders
+        self.tokens: List[str] = []
+        self.generation: Optional[Generation] = None
+        self.error: Optional[BaseException] = None
+        self.finished = False
+        self.followers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def push(self, token: str) -> None:
+        self.tokens.append(token)
+        self._wake()
+
+    def finish(self, generation: Optional[Generation] = None, error: Optional[BaseException] = None) -> None:
+        self.generation, self.error, self.finished = generation, error, True
+        self._wake()
+
+    def _wake(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Every token so far, then each new one until the stream ends."""
+        seen = 0
+        while True:
+            while seen < len(self.tokens):
+                seen += 1
+                yield self.tokens[seen - 1]
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class _UserSlots:
+    __slots__ = ("semaphore", "holders", "waiting")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.holders = 0  # flights waiting for or holding one of the user's slots
+        self.waiting = 0  # of those, flights still waiting
+
+
+# ===============================
+#       GATEWAY
+# ===============================
+class LLMGateway:
+    def __init__(
+        self,
+        cache: GenerationCache,
+        max_concurrency: int = 8,
+        per_user: int = 2,
+        queue_timeout: float = 15.0,
+        max_queue: int = 200,
+        max_queue_per_user: int = 4,
+        db_threads: int = 4,
+    ):
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.per_user = per_user
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.max_queue_per_user = max_queue_per_user
+        self._global: Optional[asyncio.Semaphore] = None  # created on the serving loop
+        self._users: Dict[str, _UserSlots] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self._pool = ThreadPoolExecutor(max_workers=db_threads, thread_name_prefix="llm-gateway")
+        self.waiting = 0
+        self.in_flight = 0
+        self.model_seconds = 0.0
+        self.total_requests = 0
+        self.total_generated = 0
+        self.total_busy = 0
+        self.total_timeouts = 0
+        self.total_cancelled = 0
+        self.total_errors = 0
+
+    async def run_sync(self, fn: Callable, *args):
+        """Runs a short blocking call (cache file, database) on the gateway's pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def aclose(self) -> None:
+        for flight in list(self._flights.values()):
+            flight.task.cancel()
+        await self.cache.model.aclose()
+        self._pool.shutdown(wait=True)
+
+    # --- Slots ---
+    def _enqueue(self, flight: _Flight) -> None:
+        """Counts a new flight as a waiter before its task starts, or refuses it."""
+        slots = self._users.get(flight.user_id)
+        if self.waiting >= self.max_queue:
+            raise GatewayBusy("Too many generations queued")
+        if slots is not None and slots.waiting >= self.max_queue_per_user:
+            raise GatewayBusy("Too many of your generations queued")
+        if slots is None:
+            slots = self._users[flight.user_id] = _UserSlots(self.per_user)
+        slots.holders += 1
+        slots.waiting += 1
+        self.waiting += 1
+        flight.queued = flight.holds_user = True
+
+    def _dequeue(self, flight: _Flight) -> None:
+        if flight.queued:
+            flight.queued = False
+            self.waiting -= 1
+            self._users[flight.user_id].waiting -= 1
+
+    def _forget(self, flight: _Flight) -> None:
+        self._dequeue(flight)
+        if flight.holds_user:
+            flight.holds_user = False
+            slots = self._users[flight.user_id]
+            slots.holders -= 1
+            if slots.holders == 0:
+                del self._users[flight.user_id]
+
+    async def _acquire(self, flight: _Flight) -> None:
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrency)
+        slots = self._users[flight.user_id]
+        deadline = time.monotonic() + self.queue_timeout
+        has_user_slot = False
+        try:
+            # The user's slot first, so one user's backlog never holds global slots
+            await asyncio.wait_for(slots.semaphore.acquire(), self.queue_timeout)
+            has_user_slot = True
+            await asyncio.wait_for(self._global.acquire(), max(0.0, deadline - time.monotonic()))
+        except BaseException as exc:
+            if has_user_slot:
+                slots.semaphore.release()
+            self._forget(flight)
+            if isinstance(exc, asyncio.TimeoutError):
+                self.total_timeouts += 1
+                raise GatewayBusy("Timed out waiting for a generation slot", timed_out=True) from None
+            raise
+        self._dequeue(flight)
+        self.in_flight += 1
+
+    def _release(self, flight: _Flight) -> None:
+        self.in_flight -= 1
+        self._global.release()
+        self._users[flight.user_id].semaphore.release()
+        self._forget(flight)
+
+    # --- Generation ---
+    async def _run(self, flight: _Flight, request: GenerationRequest) -> None:
+        """Flight task: waits for slots, streams the model into the flight, caches the result."""
+        try:
+            await self._acquire(flight)
+            try:
+                # Another process may have written it while this one queued
+                cached = await self.run_sync(self.cache.lookup, request)
+                if cached is not None:
+                    self.cache.record(request.kind, "hits")
+                    flight.push(cached.text)
+                    flight.finish(cached)
+                    return
+                self.cache.record(request.kind, "misses")
+                prompt = request.prompt()
+                started = time.perf_counter()
+                async for token in self.cache.model.stream(prompt, request.max_tokens):
+                    flight.push(token)
+                self.model_seconds += time.perf_counter() - started
+            finally:
+                self._release(flight)
+            generation = Generation(request.key, "".join(flight.tokens), self.cache.model.name, prompt, cached=False)
+            self.total_generated += 1
+            await self.run_sync(self.cache.save, generation)
+            flight.finish(generation)
+        except BaseException as exc:
+            flight.finish(error=exc)
+            if not isinstance(exc, Exception):
+                raise
+
+    def _landed(self, flight: _Flight, key: str) -> None:
+        """Flight task done callback; also runs for a task cancelled before it started."""
+        self._forget(flight)
+        if not flight.finished:
+            flight.finish(error=asyncio.CancelledError())
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def stream(
+        self,
+        user_id: str,
+        request: GenerationRequest,
+        on_complete: Optional[Callable[[Generation], Dict]] = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        A "start" event as soon as the request has a cached result, a
+        place in a flight or a queue slot, then token events and one "done"
+        event; or one "error" event if the generation could not run. `on_complete(generation)` runs on the
+        gateway's pool once the text is final; what it returns is merged
+        into the "done" data. Closing the iterator early (a disconnected
+        client) skips `on_complete`.
+        """
+        started = time.monotonic()
+        kind = request.kind
+        outcome = "error"
+        self.total_requests += 1
+        flight = None
+        try:
+            cached = await self.run_sync(self.cache.lookup, request)
+            if cached is not None:
+                self.cache.record(kind, "hits")
+                outcome = "cached"
+                yield StreamEvent("start", {"cached": True})
+                LLM_FIRST_TOKEN.observe(time.monotonic() - started, (kind,))
+                yield StreamEvent("token", {"text": cached.text})
+                generation = cached
+            else:
+                flight = self._flights.get(request.key)
+                # A flight nobody follows has been cancelled, or is about to be
+                if flight is not None and flight.followers > 0 and not flight.task.cancelled():
+                    self.cache.record(kind, "coalesced")
+                    outcome = "coalesced"
+                else:
+                    flight = _Flight(user_id)
+                    try:
+                        self._enqueue(flight)
+                    except GatewayBusy:
+                        flight = None
+                        self.total_busy += 1
+                        raise
+                    self._flights[request.key] = flight
+                    flight.task = asyncio.get_running_loop().create_task(self._run(flight, request))
+                    flight.task.add_done_callback(lambda _, flight=flight, key=request.key: self._landed(flight, key))
+                    outcome = "generated"
+                flight.followers += 1
+                yield StreamEvent("start", {"cached": False, "queued": not flight.tokens})
+                first = True
+                async for token in flight.follow():
+                    if first:
+                        LLM_FIRST_TOKEN.observe(time.monotonic() - started, (kind,))
+                        first = False
+                    yield StreamEvent("token", {"text": token})
+                generation = flight.generation
+
+            done = {"cached": generation.cached, "model": generation.model}
+            if on_complete is not None:
+                done.update(await self.run_sync(on_complete, generation))
+            yield StreamEvent("done", done)
+        except GatewayBusy as exc:
+            outcome = "timeout" if exc.timed_out else "busy"
+            yield StreamEvent("error", {"detail": str(exc), "retryable": True})
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            self.total_cancelled += 1
+            raise
+        except Exception as exc:
+            logger.exception("Streamed %s generation failed", kind)
+            self.total_errors += 1
+            yield StreamEvent("error", {"detail": "Generation failed", "retryable": False})
+        finally:
+            if flight is not None:
+                flight.followers -= 1
+                if flight.followers == 0 and not flight.finished:
+                    flight.task.cancel()  # nobody is listening any more
+            LLM_REQUESTS.inc((kind, outcome))
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_concurrency_per_user": self.per_user,
+            "max_queue_per_user": self.max_queue_per_user,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "flights": len(self._flights),
+            "users_active": len(self._users),
+            "model_seconds": round(self.model_seconds, 3),
+            "total_requests": self.total_requests,
+            "total_generated": self.total_generated,
+            "total_busy": self.total_busy,
+            "total_timeouts": self.total_timeouts,
+            "total_cancelled": self.total_cancelled,
+            "total_errors": self.total_errors,
+        }
+
+
+@lru_cache()
+def get_llm_gateway() -> LLMGateway:
+    return LLMGateway(
+        get_generation_cache(),
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        per_user=settings.LLM_MAX_CONCURRENCY_PER_USER,
+        queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+        max_queue=settings.LLM_MAX_QUEUE,
+        max_queue_per_user=settings.LLM_MAX_QUEUE_PER_USER,
+        db_threads=settings.LLM_GATEWAY_DB_THREADS,
+    )
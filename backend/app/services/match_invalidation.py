@@ -0,0 +1,350 @@
+"""
+Incremental Match Score Invalidation
+Captures changes to the rows a match score is computed from, marks only the
+affected match_scores rows stale, and drains the stale backlog in batches.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, inspect, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.ai import MatchScore
+from app.models.auth import UserPreferences
+from app.models.job import Job, JobSkill
+from app.models.profile import Education, Experience, Profile, Skill
+from app.services.match_scoring import rescore_pairs
+from app.services.swipe_deck import invalidate_decks
+
+logger = logging.getLogger(__name__)
+
+# Columns that feed the scorer, per source model. Edits to anything else
+# (a headline, a description) leave match scores untouched.
+USER_SOURCES = {
+    Profile: ("total_experience_years", "latitude", "longitude", "deleted_at"),
+    Skill: ("skill_name", "deleted_at"),
+    Experience: ("industry", "deleted_at"),
+    Education: ("degree_type", "deleted_at"),
+    UserPreferences: ("min_salary", "work_mode", "job_types", "preferred_industries"),
+}
+JOB_SOURCES = {
+    Job: (
+        "experience_level",
+        "min_experience_years",
+        "max_experience_years",
+        "education_level",
+        "latitude",
+        "longitude",
+        "work_mode",
+        "employment_type",
+        "salary_max",
+        "industry",
+        "company_id",
+    ),
+    JobSkill: ("skill_name", "importance", "weight"),
+}
+
+_PENDING_KEY = "match_invalidation"
+
+
+# ===============================
+#       CHANGE CAPTURE
+# ===============================
+def _changed(obj, columns) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in columns)
+
+
+def _collect(session: Session, flush_context, instances) -> None:
+    """
+    before_flush hook: records the user and job ids whose scores change.
+    """
+    pending = session.info.setdefault(_PENDING_KEY, (set(), set()))
+    user_ids, job_ids = pending
+
+    def visit(obj, is_update: bool):
+        for model, columns in USER_SOURCES.items():
+            if isinstance(obj, model):
+                if not is_update or _changed(obj, columns):
+                    user_ids.add(obj.user_id)
+                return
+        for model, columns in JOB_SOURCES.items():
+            if isinstance(obj, model):
+                if not is_update or _changed(obj, columns):
+                    job_ids.add(obj.id if model is Job else obj.job_id)
+                return
+
+    for obj in session.new:
+        visit(obj, is_update=False)
+    for obj in session.deleted:
+        visit(obj, is_update=False)
+    for obj in session.dirty:
+        visit(obj, is_update=True)
+
+
+def _mark_stale(session: Session, flush_context) -> None:
+    """
+    after_flush hook: flags the affected rows inside the same transaction,
+    so a rolled-back edit never leaves stale flags behind.
+    """
+    user_ids, job_ids = session.info.pop(_PENDING_KEY, (set(), set()))
+    user_ids.discard(None)
+    job_ids.discard(None)
+    if user_ids or job_ids:
+        mark_stale(session, user_ids=user_ids, job_ids=job_ids)
+
+
+def mark_stale(session: Session, user_ids=(), job_ids=()) -> int:
+    """
+    Flags every match score of the given users and jobs as stale, and
+    voids any rescore claim on them so an in-flight recompute, which may
+    have read the old inputs, cannot clear the flag.
+    Use this directly after bulk/Core writes, which bypass the ORM hooks.
+    """
+    conditions = []
+    if user_ids:
+        conditions.append(MatchScore.user_id.in_(list(user_ids)))
+    if job_ids:
+        conditions.append(MatchScore.job_id.in_(list(job_ids)))
+    if not conditions:
+        return 0
+    result = session.connection().execute(
+        update(MatchScore.__table__)
+        .where(
+            or_(*conditions),
+            or_(MatchScore.is_stale.is_(False), MatchScore.stale_claim_id.isnot(None)),
+        )
+        .values(is_stale=True, stale_claimed_at=None, stale_claim_id=None)
+    )
+    return result.rowcount
+
+
+def install_change_capture(session_factory) -> None:
+    """
+    Registers the capture hooks on a sessionmaker (or Session class).
+    """
+    if not event.contains(session_factory, "before_flush", _collect):
+        event.listen(session_factory, "before_flush", _collect)
+        event.listen(session_factory, "after_flush", _mark_stale)
+
+
+# ===============================
+#       RECOMPUTE WORKER
+# ===============================
+class StaleScoreWorker:
+    """
+    Background loop that drains stale match scores.
+
+    Each round claims a batch of stale rows by stamping them with a round
+    id (`stale_claim_id`) and the claim time, then re-scores the batch per user group on a bounded thread pool. A
+    group's new scores and the cleared flags commit together, and only rows
+    still carrying this round's claim are cleared: an edit that lands
+    mid-recompute voids the claim and the row stays stale. A claim older
+    than `claim_ttl` (its worker crashed) is taken over by the next round.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        rescore: Callable[[Session, List[Tuple[str, str]]], int],
+        batch_size: int = 500,
+        max_workers: int = 4,
+        poll_interval: float = 2.0,
+        rate_window: float = 60.0,
+        claim_ttl: float = 300.0,
+    ):
+        self._session_factory = session_factory
+        self._rescore = rescore
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.claim_ttl = claim_ttl
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="match-rescore"
+        )
+        self._stop = threading.Event()
+        self._thread = None
+        self._rate_window = rate_window
+        self._drained = deque()  # (timestamp, rows)
+        self._drained_lock = threading.Lock()
+        self.total_drained = 0
+        self.total_errors = 0
+
+    # --- Lifecycle ---
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="match-stale-drain", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                drained = self.drain_once()
+            except Exception:
+                logger.exception("Stale match score drain failed")
+                self.total_errors += 1
+                drained = 0
+            if drained < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    # --- Draining ---
+    def drain_once(self) -> int:
+        """
+        Claims and re-scores one batch. Returns the number of rows handled.
+        """
+        claim, pairs = self._claim_batch()
+        if not pairs:
+            return 0
+
+        by_user: Dict[str, List[Tuple[str, str]]] = {}
+        for user_id, job_id in pairs:
+            by_user.setdefault(user_id, []).append((user_id, job_id))
+
+        # One task per slice of users keeps each scoring block small
+        groups: List[List[Tuple[str, str]]] = [[]]
+        for user_pairs in by_user.values():
+            if len(groups[-1]) >= 100:
+                groups.append([])
+            groups[-1].extend(user_pairs)
+
+        futures = [self._pool.submit(self._rescore_group, claim, group) for group in groups]
+        handled = 0
+        error: Optional[BaseException] = None
+        for future in futures:
+            try:
+                handled += future.result()
+            except Exception as exc:
+                error = error or exc
+        # Groups that succeeded count even when another one failed
+        self._record(handled)
+        if error is not None:
+            raise error
+        return handled
+
+    def _claim_batch(self) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        """(claim, pairs): stale rows stamped with this round's claim id."""
+        # Compared by id, not time: MySQL DATETIME drops the microseconds
+        claim = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        db = self._session_factory()
+        try:
+            rows = (
+                db.query(MatchScore.id, MatchScore.user_id, MatchScore.job_id)
+                .filter(
+                    MatchScore.is_stale.is_(True),
+                    or_(
+                        MatchScore.stale_claimed_at.is_(None),
+                        MatchScore.stale_claimed_at < now - timedelta(seconds=self.claim_ttl),
+                    ),
+                )
+                .limit(self.batch_size)
+                .all()
+            )
+            if not rows:
+                return None, []
+            db.execute(
+                update(MatchScore.__table__)
+                .where(MatchScore.id.in_([row.id for row in rows]))
+                .values(stale_claimed_at=now, stale_claim_id=claim)
+            )
+            db.commit()
+            return claim, [(row.user_id, row.job_id) for row in rows]
+        finally:
+            db.close()
+
+    def _rescore_group(self, claim: str, pairs: List[Tuple[str, str]]) -> int:
+        db = self._session_factory()
+        try:
+            self._rescore(db, pairs)
+            _settle_pairs(db, claim, pairs, is_stale=False)
+            db.commit()
+            invalidate_decks({user_id for user_id, _ in pairs})
+            return len(pairs)
+        except Exception:
+            db.rollback()
+            # Release the claim so the pairs are retried next round
+            _settle_pairs(db, claim, pairs, is_stale=True)
+            db.commit()
+            raise
+        finally:
+            db.close()
+
+    # --- Metrics ---
+    def _record(self, rows: int) -> None:
+        now = time.monotonic()
+        with self._drained_lock:
+            self._drained.append((now, rows))
+            self.total_drained += rows
+            while self._drained and self._drained[0][0] < now - self._rate_window:
+                self._drained.popleft()
+
+    def drain_rate(self) -> float:
+        """Rows re-scored per second over the rate window."""
+        now = time.monotonic()
+        with self._drained_lock:
+            recent = sum(rows for ts, rows in self._drained if ts >= now - self._rate_window)
+        return recent / self._rate_window
+
+    def backlog(self) -> int:
+        """Number of match scores currently flagged stale."""
+        db = self._session_factory()
+        try:
+            return (
+                db.query(func.count(MatchScore.id))
+                .filter(MatchScore.is_stale.is_(True))
+                .scalar()
+            )
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        return {
+            "stale_backlog": self.backlog(),
+            "drain_rate_per_second": round(self.drain_rate(), 2),
+            "total_drained": self.total_drained,
+            "total_errors": self.total_errors,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+def _settle_pairs(db: Session, claim: str, pairs: List[Tuple[str, str]], is_stale: bool) -> None:
+    """Sets `is_stale` and drops the claim on the pairs this claim still holds."""
+    table = MatchScore.__table__
+    stmt = (
+        update(table)
+        .where(table.c.user_id == bindparam("b_user_id"))
+        .where(table.c.job_id == bindparam("b_job_id"))
+        .where(table.c.stale_claim_id == claim)
+        .values(is_stale=is_stale, stale_claimed_at=None, stale_claim_id=None)
+    )
+    db.execute(stmt, [{"b_user_id": u, "b_job_id": j} for u, j in pairs])
+
+
+@lru_cache()
+def get_stale_score_worker() -> StaleScoreWorker:
+    return StaleScoreWorker(
+        session_factory=SessionLocal,
+        rescore=rescore_pairs,
+        batch_size=settings.MATCH_RESCORE_BATCH_SIZE,
+        max_workers=settings.MATCH_RESCORE_WORKERS,
+        poll_interval=settings.MATCH_RESCORE_POLL_SECONDS,
+        claim_ttl=settings.MATCH_RESCORE_CLAIM_TTL_SECONDS,
+    )
@@ -0,0 +1,890 @@
+"""
+Batch Match Scoring Engine
+Scores whole user x job blocks at once with NumPy and bulk-upserts the
+results into the match_scores table.
+"""
+
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.ai import MatchScore
+from app.models.auth import UserPreferences
+from app.models.job import Company, Job, JobSkill, JobStatus, SkillImportance
+from app.models.profile import Education, Experience, Profile, Skill
+from app.services.swipe_deck import invalidate_decks
+from app.utils.sql import bulk_upsert
+from app.utils.text import normalize_skill_name
+
+CALCULATION_VERSION = "2.0"
+
+# Order matches MatchScore's component columns and the `weights` JSON keys
+COMPONENTS = (
+    "skills",
+    "experience",
+    "education",
+    "location",
+    "salary",
+    "job_type",
+    "industry",
+    "company_culture",
+    "career_growth",
+)
+
+DEFAULT_WEIGHTS = {
+    "skills": 0.30,
+    "experience": 0.25,
+    "education": 0.10,
+    "location": 0.10,
+    "salary": 0.10,
+    "job_type": 0.05,
+    "industry": 0.05,
+    "company_culture": 0.03,
+    "career_growth": 0.02,
+}
+
+IMPORTANCE_MULTIPLIER = {
+    SkillImportance.REQUIRED: 1.0,
+    SkillImportance.PREFERRED: 0.6,
+    SkillImportance.NICE_TO_HAVE: 0.3,
+}
+
+LEVEL_RANK = {"entry": 0, "mid": 1, "senior": 2, "lead": 3, "executive": 4}
+# Typical years-of-experience band for each experience level
+LEVEL_YEARS = np.array(
+    [[0, 2], [2, 5], [5, 8], [8, 12], [12, 40]], dtype=np.float32
+)
+EDUCATION_RANK = {
+    "high_school": 0,
+    "diploma": 0,
+    "certification": 0,
+    "associate": 1,
+    "bootcamp": 1,
+    "bachelor": 2,
+    "master": 3,
+    "doctorate": 4,
+}
+WORK_MODE_BIT = {"remote": 1, "hybrid": 2, "onsite": 4}
+EMPLOYMENT_BIT = {
+    "full_time": 1,
+    "part_time": 2,
+    "contract": 4,
+    "internship": 8,
+    "freelance": 16,
+    "temporary": 32,
+}
+# Career growth by (job level - user level), indexed from -4 to +4
+GROWTH_BY_LEVEL_GAP = np.array(
+    [40, 40, 40, 40, 75, 100, 60, 30, 30], dtype=np.float32
+)
+# (user level, job level) lookup table derived from the gap scores
+GROWTH_BY_LEVEL = GROWTH_BY_LEVEL_GAP[
+    np.arange(5)[None, :] - np.arange(5)[:, None] + 4
+]
+
+LOCATION_FALLOFF_KM = 150.0
+EARTH_RADIUS_KM = 6371.0
+
+
+def _enum_value(value) -> Optional[str]:
+    return getattr(value, "value", value)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class Vocabulary:
+    """Assigns dense ids to normalised strings (skill names, industries)."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def id_for(self, name: Optional[str]) -> int:
+        if not name:
+            return -1
+        return self.ids.setdefault(normalize_skill_name(name), len(self.ids))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+# ===============================
+#       FEATURE ARRAYS
+# ===============================
+@dataclass
+class JobFeatures:
+    job_ids: List[str]
+    skill_ids: np.ndarray  # (n, K) int32, padded with -1
+    skill_weights: np.ndarray  # (n, K) float32, zero-padded
+    skill_names: List[List[str]]
+    required_skill_names: List[List[str]]
+    min_years: np.ndarray
+    max_years: np.ndarray
+    level_rank: np.ndarray
+    education_rank: np.ndarray  # -1 means any
+    lat: np.ndarray  # radians, NaN when unknown
+    lon: np.ndarray
+    is_remote: np.ndarray
+    work_mode_bit: np.ndarray
+    employment_bit: np.ndarray
+    salary_max: np.ndarray
+    industry_id: np.ndarray  # -1 when unknown
+    company_rating: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+
+@dataclass
+class UserFeatures:
+    user_ids: List[str]
+    # Skills and industries are stored CSR-style: ids[offsets[i]:offsets[i+1]]
+    skill_offsets: np.ndarray
+    skill_flat: np.ndarray
+    industry_offsets: np.ndarray
+    industry_flat: np.ndarray
+    years: np.ndarray
+    degree_rank: np.ndarray  # -1 when no education on file
+    lat: np.ndarray
+    lon: np.ndarray
+    work_mode_mask: np.ndarray  # 0 means no preference
+    employment_mask: np.ndarray
+    min_salary: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def slice(self, start: int, stop: int) -> "UserFeatures":
+        s0, s1 = self.skill_offsets[start], self.skill_offsets[stop]
+        i0, i1 = self.industry_offsets[start], self.industry_offsets[stop]
+        return UserFeatures(
+            user_ids=self.user_ids[start:stop],
+            skill_offsets=self.skill_offsets[start : stop + 1] - s0,
+            skill_flat=self.skill_flat[s0:s1],
+            industry_offsets=self.industry_offsets[start : stop + 1] - i0,
+            industry_flat=self.industry_flat[i0:i1],
+            years=self.years[start:stop],
+            degree_rank=self.degree_rank[start:stop],
+            lat=self.lat[start:stop],
+            lon=self.lon[start:stop],
+            work_mode_mask=self.work_mode_mask[start:stop],
+            employment_mask=self.employment_mask[start:stop],
+            min_salary=self.min_salary[start:stop],
+        )
+
+    def skill_ids_of(self, index: int) -> np.ndarray:
+        return self.skill_flat[self.skill_offsets[index] : self.skill_offsets[index + 1]]
+
+
+def _csr(lists: Sequence[Iterable[int]]):
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    flat: List[int] = []
+    for i, ids in enumerate(lists):
+        flat.extend(sorted(set(ids)))
+        offsets[i + 1] = len(flat)
+    return offsets, np.asarray(flat, dtype=np.int32)
+
+
+def build_job_features(jobs: Sequence[Dict], vocab: Vocabulary, industries: Vocabulary) -> JobFeatures:
+    """
+    Builds JobFeatures from plain job dicts (see load_job_features for keys).
+    """
+    n = len(jobs)
+    width = max([len(job["skills"]) for job in jobs] + [1])
+    skill_ids = np.full((n, width), -1, dtype=np.int32)
+    skill_weights = np.zeros((n, width), dtype=np.float32)
+    min_years = np.empty(n, dtype=np.float32)
+    max_years = np.empty(n, dtype=np.float32)
+    level_rank = np.empty(n, dtype=np.int8)
+    education_rank = np.empty(n, dtype=np.int8)
+    lat = np.empty(n, dtype=np.float32)
+    lon = np.empty(n, dtype=np.float32)
+    is_remote = np.empty(n, dtype=bool)
+    work_mode_bit = np.empty(n, dtype=np.uint8)
+    employment_bit = np.empty(n, dtype=np.uint8)
+    salary_max = np.empty(n, dtype=np.float32)
+    industry_id = np.empty(n, dtype=np.int32)
+    company_rating = np.empty(n, dtype=np.float32)
+    skill_names, required_skill_names = [], []
+
+    for i, job in enumerate(jobs):
+        names, required = [], []
+        for k, (name, importance, weight) in enumerate(job["skills"]):
+            importance = _enum_value(importance) or "required"
+            skill_ids[i, k] = vocab.id_for(name)
+            skill_weights[i, k] = IMPORTANCE_MULTIPLIER[SkillImportance(importance)] * (weight or 1)
+            names.append(name)
+            if importance == SkillImportance.REQUIRED.value:
+                required.append(name)
+        skill_names.append(names)
+        required_skill_names.append(required)
+
+        rank = LEVEL_RANK.get(_enum_value(job["experience_level"]), 1)
+        level_rank[i] = rank
+        low = job.get("min_experience_years")
+        high = job.get("max_experience_years")
+        min_years[i] = LEVEL_YEARS[rank, 0] if low is None else low
+        max_years[i] = LEVEL_YEARS[rank, 1] if high is None else high
+        education_rank[i] = EDUCATION_RANK.get(_enum_value(job.get("education_level")), -1)
+
+        lat[i] = np.radians(_to_float(job.get("latitude")))
+        lon[i] = np.radians(_to_float(job.get("longitude")))
+        work_mode = _enum_value(job.get("work_mode")) or "remote"
+        is_remote[i] = work_mode == "remote"
+        work_mode_bit[i] = WORK_MODE_BIT.get(work_mode, 0)
+        employment_bit[i] = EMPLOYMENT_BIT.get(_enum_value(job.get("employment_type")), 0)
+        salary_max[i] = _to_float(job.get("salary_max"))
+        industry_id[i] = industries.id_for(job.get("industry"))
+        company_rating[i] = _to_float(job.get("company_rating"))
+
+    return JobFeatures(
+        job_ids=[job["id"] for job in jobs],
+        skill_ids=skill_ids,
+        skill_weights=skill_weights,
+        skill_names=skill_names,
+        required_skill_names=required_skill_names,
+        min_years=min_years,
+        max_years=max_years,
+        level_rank=level_rank,
+        education_rank=education_rank,
+        lat=lat,
+        lon=lon,
+        is_remote=is_remote,
+        work_mode_bit=work_mode_bit,
+        employment_bit=employment_bit,
+        salary_max=salary_max,
+        industry_id=industry_id,
+        company_rating=company_rating,
+    )
+
+
+def build_user_features(users: Sequence[Dict], vocab: Vocabulary, industries: Vocabulary) -> UserFeatures:
+    """
+    Builds UserFeatures from plain user dicts (see load_user_features for keys).
+    """
+    n = len(users)
+    skill_offsets, skill_flat = _csr(
+        [[vocab.id_for(name) for name in user["skills"]] for user in users]
+    )
+    industry_offsets, industry_flat = _csr(
+        [
+            [i for i in (industries.id_for(name) for name in user["industries"]) if i >= 0]
+            for user in users
+        ]
+    )
+
+    def mask(values, bits):
+        result = 0
+        for value in values or []:
+            result |= bits.get(_enum_value(value), 0)
+        return result
+
+    return UserFeatures(
+        user_ids=[user["id"] for user in users],
+        skill_offsets=skill_offsets,
+        skill_flat=skill_flat,
+        industry_offsets=industry_offsets,
+        industry_flat=industry_flat,
+        years=np.array([_to_float(u.get("years")) for u in users], dtype=np.float32),
+        degree_rank=np.array(
+            [max([EDUCATION_RANK.get(_enum_value(d), 0) for d in u.get("degrees", [])] + [-1]) for u in users],
+            dtype=np.int8,
+        ),
+        lat=np.radians(np.array([_to_float(u.get("latitude")) for u in users], dtype=np.float32)),
+        lon=np.radians(np.array([_to_float(u.get("longitude")) for u in users], dtype=np.float32)),
+        work_mode_mask=np.array([mask(u.get("work_modes"), WORK_MODE_BIT) for u in users], dtype=np.uint8),
+        employment_mask=np.array([mask(u.get("job_types"), EMPLOYMENT_BIT) for u in users], dtype=np.uint8),
+        min_salary=np.array([_to_float(u.get("min_salary")) for u in users], dtype=np.float32),
+    )
+
+
+# ===============================
+#       VECTORISED SCORER
+# ===============================
+def normalize_weights(weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    vector = np.array([weights[name] for name in COMPONENTS], dtype=np.float32)
+    return vector / vector.sum()
+
+
+def score_block(
+    users: UserFeatures, jobs: JobFeatures, vocab_size: int, industry_count: int
+) -> np.ndarray:
+    """
+    Scores every user in `users` against every job in `jobs`.
+    Returns a (len(COMPONENTS), n_users, n_jobs) float32 array of 0-100 scores.
+    """
+    nu, nj = len(users), len(jobs)
+    out = np.empty((len(COMPONENTS), nu, nj), dtype=np.float32)
+
+    # --- Skills: weighted share of the job's skills the user has ---
+    # Built skill-major so each gather copies whole contiguous rows;
+    # row `vocab_size` is padding and always 0.
+    has_skill = np.zeros((vocab_size + 1, nu), dtype=np.float32)
+    columns = np.repeat(np.arange(nu), np.diff(users.skill_offsets))
+    has_skill[users.skill_flat, columns] = 1.0
+    skill_ids = np.where(jobs.skill_ids < 0, vocab_size, jobs.skill_ids)
+    matched = np.zeros((nj, nu), dtype=np.float32)
+    for k in range(skill_ids.shape[1]):
+        matched += has_skill[skill_ids[:, k]] * jobs.skill_weights[:, k, None]
+    total = jobs.skill_weights.sum(axis=1)
+    matched /= np.where(total > 0, total, 1.0)[:, None]
+    matched *= 100.0
+    matched[total == 0] = 100.0
+    out[0] = matched.T
+
+    # --- Experience: inside the job's band scores 100 ---
+    years = np.nan_to_num(users.years, nan=0.0)[:, None]
+    low, high = jobs.min_years[None, :], jobs.max_years[None, :]
+    out[1] = np.where(
+        years < low,
+        np.clip(100.0 - 20.0 * (low - years), 0.0, 100.0),
+        np.where(years > high, np.clip(100.0 - 5.0 * (years - high), 60.0, 100.0), 100.0),
+    )
+
+    # --- Education: meeting the required level scores 100 ---
+    degree = users.degree_rank.astype(np.float32)[:, None]
+    required = jobs.education_rank.astype(np.float32)[None, :]
+    out[2] = np.where(
+        required < 0,
+        100.0,
+        np.where(
+            degree < 0,
+            40.0,
+            np.clip(100.0 - 25.0 * np.maximum(required - degree, 0.0), 0.0, 100.0),
+        ),
+    )
+
+    # --- Location: haversine falloff; remote jobs always score 100 ---
+    ulat, ulon = users.lat[:, None], users.lon[:, None]
+    jlat, jlon = jobs.lat[None, :], jobs.lon[None, :]
+    a = (
+        np.sin((jlat - ulat) / 2.0) ** 2
+        + np.cos(ulat) * np.cos(jlat) * np.sin((jlon - ulon) / 2.0) ** 2
+    )
+    distance = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    location = np.clip(100.0 * (1.0 - distance / LOCATION_FALLOFF_KM), 0.0, 100.0)
+    location[np.isnan(distance)] = 50.0
+    location[:, jobs.is_remote] = 100.0
+    out[3] = location
+
+    # --- Salary: job's ceiling against the user's floor ---
+    floor, ceiling = users.min_salary[:, None], jobs.salary_max[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        salary = np.where(ceiling >= floor, 100.0, 100.0 * ceiling / floor)
+    salary[np.isnan(floor) | np.isnan(ceiling)] = 50.0
+    out[4] = salary
+
+    # --- Job type: work mode and employment type preferences ---
+    mode_ok = (users.work_mode_mask[:, None] & jobs.work_mode_bit[None, :]) > 0
+    mode_ok |= users.work_mode_mask[:, None] == 0
+    employment_ok = (users.employment_mask[:, None] & jobs.employment_bit[None, :]) > 0
+    employment_ok |= users.employment_mask[:, None] == 0
+    np.add(mode_ok, employment_ok, out=out[5], dtype=np.float32)
+    out[5] *= 50.0
+
+    # --- Industry: job industry in the user's history or preferences ---
+    in_industry = np.zeros((nu, industry_count + 1), dtype=np.float32)
+    rows = np.repeat(np.arange(nu), np.diff(users.industry_offsets))
+    in_industry[rows, users.industry_flat] = 1.0
+    industry_ids = np.where(jobs.industry_id < 0, industry_count, jobs.industry_id)
+    industry = 20.0 + 80.0 * in_industry[:, industry_ids]
+    industry[:, jobs.industry_id < 0] = 50.0
+    industry[np.diff(users.industry_offsets) == 0, :] = 50.0
+    out[6] = industry
+
+    # --- Company culture: company rating out of 5 ---
+    out[7] = np.nan_to_num(jobs.company_rating / 5.0 * 100.0, nan=50.0)[None, :]
+
+    # --- Career growth: one level up is ideal ---
+    user_level = np.searchsorted(LEVEL_YEARS[:, 0], years[:, 0], side="right") - 1
+    np.take(GROWTH_BY_LEVEL[user_level], jobs.level_rank, axis=1, out=out[8])
+
+    return out
+
+
+@dataclass
+class ScoredPairs:
+    user_index: np.ndarray
+    job_index: np.ndarray
+    overall: np.ndarray
+    components: np.ndarray  # (n_pairs, len(COMPONENTS))
+
+    def __len__(self) -> int:
+        return len(self.overall)
+
+
+class MatchScorer:
+    """
+    Scores users against jobs in (user_block x job_block) tiles and keeps the
+    best `top_k` jobs per user, so memory stays bounded by the tile size.
+    """
+
+    def __init__(
+        self,
+        vocab_size: int,
+        industry_count: int,
+        weights: Optional[Dict[str, float]] = None,
+        user_block: int = 256,
+        job_block: int = 4096,
+    ):
+        self.vocab_size = vocab_size
+        self.industry_count = industry_count
+        self.weights = normalize_weights(weights)
+        self.user_block = user_block
+        self.job_block = job_block
+
+    def top_matches(
+        self, users: UserFeatures, jobs: JobFeatures, top_k: Optional[int] = None
+    ) -> ScoredPairs:
+        """
+        Returns the `top_k` best-scoring jobs for each user, or every pair
+        when `top_k` is None.
+        """
+        results = []
+        for u0 in range(0, len(users), self.user_block):
+            u1 = min(u0 + self.user_block, len(users))
+            user_slice = users.slice(u0, u1)
+            best_overall = best_jobs = best_components = None
+
+            for j0 in range(0, len(jobs), self.job_block):
+                j1 = min(j0 + self.job_block, len(jobs))
+                components = score_block(
+                    user_slice, _slice_jobs(jobs, j0, j1), self.vocab_size, self.industry_count
+                )
+                overall = np.tensordot(self.weights, components, axes=1)
+                job_index = np.broadcast_to(np.arange(j0, j1), overall.shape)
+                components = np.moveaxis(components, 0, -1)
+
+                if best_overall is not None:
+                    overall = np.concatenate([best_overall, overall], axis=1)
+                    job_index = np.concatenate([best_jobs, job_index], axis=1)
+                    components = np.concatenate([best_components, components], axis=1)
+                if top_k is not None and overall.shape[1] > top_k:
+                    keep = np.argpartition(-overall, top_k - 1, axis=1)[:, :top_k]
+                    overall = np.take_along_axis(overall, keep, axis=1)
+                    job_index = np.take_along_axis(job_index, keep, axis=1)
+                    components = np.take_along_axis(components, keep[:, :, None], axis=1)
+                best_overall, best_jobs, best_components = overall, job_index, components
+
+            if best_overall is None:
+                continue
+            user_index = np.broadcast_to(
+                np.arange(u0, u1)[:, None], best_overall.shape
+            )
+            results.append(
+                ScoredPairs(
+                    user_index=user_index.ravel(),
+                    job_index=np.ascontiguousarray(best_jobs).ravel(),
+                    overall=best_overall.ravel(),
+                    components=best_components.reshape(-1, len(COMPONENTS)),
+                )
+            )
+        return _concat_pairs(results)
+
+
+def _slice_jobs(jobs: JobFeatures, start: int, stop: int) -> JobFeatures:
+    return JobFeatures(
+        **{
+            name: value[start:stop]
+            for name, value in vars(jobs).items()
+        }
+    )
+
+
+def _concat_pairs(parts: List[ScoredPairs]) -> ScoredPairs:
+    if not parts:
+        return ScoredPairs(
+            user_index=np.empty(0, dtype=np.int64),
+            job_index=np.empty(0, dtype=np.int64),
+            overall=np.empty(0, dtype=np.float32),
+            components=np.empty((0, len(COMPONENTS)), dtype=np.float32),
+        )
+    return ScoredPairs(
+        user_index=np.concatenate([p.user_index for p in parts]),
+        job_index=np.concatenate([p.job_index for p in parts]),
+        overall=np.concatenate([p.overall for p in parts]),
+        components=np.concatenate([p.components for p in parts]),
+    )
+
+
+# --- Multi-core mode ---
+_worker_state: Dict = {}
+
+
+def _init_worker(scorer: MatchScorer, jobs: JobFeatures) -> None:
+    _worker_state["scorer"] = scorer
+    _worker_state["jobs"] = jobs
+
+
+def _score_chunk(users: UserFeatures, offset: int, top_k: Optional[int]) -> ScoredPairs:
+    pairs = _worker_state["scorer"].top_matches(users, _worker_state["jobs"], top_k)
+    pairs.user_index = pairs.user_index + offset
+    return pairs
+
+
+def top_matches_parallel(
+    scorer: MatchScorer,
+    users: UserFeatures,
+    jobs: JobFeatures,
+    top_k: Optional[int] = None,
+    processes: int = 2,
+) -> ScoredPairs:
+    """
+    Splits users across a process pool. Job features are shipped to each
+    worker once, through the pool initializer.
+    """
+    chunk = max(scorer.user_block, -(-len(users) // (processes * 4)))
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(scorer, jobs)
+    ) as pool:
+        futures = [
+            pool.submit(_score_chunk, users.slice(start, min(start + chunk, len(users))), start, top_k)
+            for start in range(0, len(users), chunk)
+        ]
+        return _concat_pairs([future.result() for future in futures])
+
+
+# ===============================
+#       DATABASE LOADING
+# ===============================
+def load_job_features_rows(db: Session, job_ids: Optional[Sequence[str]] = None) -> List[Dict]:
+    """
+    Loads active jobs, their JobSkill rows and company rating as plain dicts.
+    """
+    query = (
+        db.query(
+            Job.id,
+            Job.experience_level,
+            Job.min_experience_years,
+            Job.max_experience_years,
+            Job.education_level,
+            Job.latitude,
+            Job.longitude,
+            Job.work_mode,
+            Job.employment_type,
+            Job.salary_max,
+            Job.industry,
+            Company.rating,
+        )
+        .join(Company, Company.id == Job.company_id)
+        .filter(Job.job_status == JobStatus.ACTIVE, Job.deleted_at.is_(None))
+    )
+    if job_ids is not None:
+        query = query.filter(Job.id.in_(job_ids))
+
+    jobs = {}
+    for row in query:
+        jobs[row.id] = {
+            "id": row.id,
+            "experience_level": row.experience_level,
+            "min_experience_years": row.min_experience_years,
+            "max_experience_years": row.max_experience_years,
+            "education_level": row.education_level,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "work_mode": row.work_mode,
+            "employment_type": row.employment_type,
+            "salary_max": row.salary_max,
+            "industry": row.industry,
+            "company_rating": row.rating,
+            "skills": [],
+        }
+
+    skills = db.query(JobSkill.job_id, JobSkill.skill_name, JobSkill.importance, JobSkill.weight)
+    if job_ids is not None:
+        skills = skills.filter(JobSkill.job_id.in_(job_ids))
+    for job_id, name, importance, weight in skills:
+        if job_id in jobs:
+            jobs[job_id]["skills"].append((name, importance, weight))
+    return list(jobs.values())
+
+
+def load_user_features_rows(db: Session, user_ids: Optional[Sequence[str]] = None) -> List[Dict]:
+    """
+    Loads profile, skills, education, experience and preferences as plain
+    dicts, one query per table.
+    """
+
+    def scoped(query, column):
+        return query.filter(column.in_(user_ids)) if user_ids is not None else query
+
+    users = {}
+    profiles = db.query(
+        Profile.user_id, Profile.total_experience_years, Profile.latitude, Profile.longitude
+    ).filter(Profile.deleted_at.is_(None))
+    for row in scoped(profiles, Profile.user_id):
+        users[row.user_id] = {
+            "id": row.user_id,
+            "years": row.total_experience_years,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "skills": [],
+            "industries": [],
+            "degrees": [],
+        }
+
+    skills = db.query(Skill.user_id, Skill.skill_name).filter(Skill.deleted_at.is_(None))
+    for user_id, name in scoped(skills, Skill.user_id):
+        if user_id in users:
+            users[user_id]["skills"].append(name)
+
+    educations = db.query(Education.user_id, Education.degree_type).filter(Education.deleted_at.is_(None))
+    for user_id, degree in scoped(educations, Education.user_id):
+        if user_id in users:
+            users[user_id]["degrees"].append(degree)
+
+    experiences = db.query(Experience.user_id, Experience.industry).filter(
+        Experience.deleted_at.is_(None), Experience.industry.isnot(None)
+    )
+    for user_id, industry in scoped(experiences, Experience.user_id):
+        if user_id in users:
+            users[user_id]["industries"].append(industry)
+
+    preferences = db.query(
+        UserPreferences.user_id,
+        UserPreferences.min_salary,
+        UserPreferences.work_mode,
+        UserPreferences.job_types,
+        UserPreferences.preferred_industries,
+    )
+    for row in scoped(preferences, UserPreferences.user_id):
+        if row.user_id in users:
+            user = users[row.user_id]
+            user["min_salary"] = row.min_salary
+            user["work_modes"] = row.work_mode
+            user["job_types"] = row.job_types
+            user["industries"].extend(row.preferred_industries or [])
+    return list(users.values())
+
+
+# ===============================
+#       PERSISTENCE
+# ===============================
+def build_score_rows(
+    users: UserFeatures,
+    jobs: JobFeatures,
+    pairs: ScoredPairs,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Dict]:
+    """
+    Turns scored pairs into match_scores column dicts, including the
+    matched/missing skill breakdown.
+    """
+    now = datetime.now(timezone.utc)
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    rows = []
+    for u, j, overall, components in zip(
+        pairs.user_index, pairs.job_index, pairs.overall, pairs.components
+    ):
+        user_skills = set(users.skill_ids_of(u).tolist())
+        # Names and ids filtered together: an empty name has id -1
+        job_skills = [
+            (name, skill_id)
+            for name, skill_id in zip(jobs.skill_names[j], jobs.skill_ids[j].tolist())
+            if skill_id >= 0
+        ]
+        job_skill_ids = [skill_id for _, skill_id in job_skills]
+        matched = [s for s in job_skill_ids if s in user_skills]
+        missing = [
+            name
+            for name, skill_id in job_skills
+            if skill_id not in user_skills and name in jobs.required_skill_names[j]
+        ]
+        row = {
+            "user_id": users.user_ids[u],
+            "job_id": jobs.job_ids[j],
+            "overall_score": round(float(overall), 2),
+            "weights": weights,
+            "matched_skills_count": len(matched),
+            "total_required_skills": len(job_skill_ids),
+            "missing_critical_skills": missing,
+            "calculation_version": CALCULATION_VERSION,
+            "last_calculated_at": now,
+            "updated_at": now,
+        }
+        for name, value in zip(COMPONENTS, components.tolist()):
+            row[f"{name}_score"] = round(value, 2)
+        rows.append(row)
+    return rows
+
+
+def upsert_match_scores(
+    db: Session,
+    users: UserFeatures,
+    jobs: JobFeatures,
+    pairs: ScoredPairs,
+    weights: Optional[Dict[str, float]] = None,
+) -> int:
+    """
+    Bulk-upserts scored pairs into match_scores, clearing `is_stale`.
+    Does not commit.
+    """
+    rows = build_score_rows(users, jobs, pairs, weights)
+    for row in rows:
+        row["id"] = str(uuid.uuid4())
+        row["is_stale"] = False
+        row["stale_claimed_at"] = None
+        row["stale_claim_id"] = None
+
+    update_columns = [key for key in rows[0] if key not in ("id", "user_id", "job_id")] if rows else []
+    return bulk_upsert(
+        db, MatchScore.__table__, rows, ("user_id", "job_id"), update_columns
+    )
+
+
+def delete_unranked_scores(
+    db: Session,
+    user_ids: Sequence[str],
+    job_ids: Optional[Sequence[str]],
+    kept: Set[Tuple[str, str]],
+    chunk_size: int = 500,
+) -> int:
+    """
+    Deletes the users' match scores (for `job_ids`, or any job when None)
+    whose (user_id, job_id) is not in `kept`: pairs that dropped out of a
+    recompute's top-k must not keep ranking on their old score.
+    Does not commit; returns the number of rows deleted.
+    """
+    deleted = 0
+    for start in range(0, len(user_ids), chunk_size):
+        query = select(MatchScore.id, MatchScore.user_id, MatchScore.job_id).where(
+            MatchScore.user_id.in_(list(user_ids[start : start + chunk_size]))
+        )
+        if job_ids is not None:
+            query = query.where(MatchScore.job_id.in_(list(job_ids)))
+        dropped = [row.id for row in db.execute(query) if (row.user_id, row.job_id) not in kept]
+        for offset in range(0, len(dropped), chunk_size):
+            deleted += db.execute(
+                delete(MatchScore).where(MatchScore.id.in_(dropped[offset : offset + chunk_size]))
+            ).rowcount
+    return deleted
+
+
+def dedupe_match_scores(db: Session) -> int:
+    """
+    Deletes all but the most recently calculated match_scores row of each
+    (user_id, job_id), so uq_match_scores_user_job can be added to a table
+    scored before it existed. Commits; returns the number of rows deleted.
+    """
+    duplicated = db.execute(
+        select(MatchScore.user_id, MatchScore.job_id)
+        .group_by(MatchScore.user_id, MatchScore.job_id)
+        .having(func.count() > 1)
+    ).all()
+    deleted = 0
+    for user_id, job_id in duplicated:
+        ids = db.execute(
+            select(MatchScore.id)
+            .where(MatchScore.user_id == user_id, MatchScore.job_id == job_id)
+            .order_by(
+                MatchScore.last_calculated_at.is_(None),
+                MatchScore.last_calculated_at.desc(),
+                MatchScore.updated_at.desc(),
+            )
+        ).scalars().all()
+        deleted += db.execute(delete(MatchScore).where(MatchScore.id.in_(ids[1:]))).rowcount
+    db.commit()
+    return deleted
+
+
+def rescore_pairs(
+    db: Session,
+    pairs: Sequence[Tuple[str, str]],
+    weights: Optional[Dict[str, float]] = None,
+) -> int:
+    """
+    Re-scores specific existing (user_id, job_id) rows in one block and
+    updates them in place. Leaves `is_stale` untouched so the caller decides
+    how the flag is cleared. Pairs whose job is no longer active are skipped.
+    Does not commit.
+    """
+    user_ids = sorted({user_id for user_id, _ in pairs})
+    job_ids = sorted({job_id for _, job_id in pairs})
+    vocab, industries = Vocabulary(), Vocabulary()
+    jobs = build_job_features(load_job_features_rows(db, job_ids), vocab, industries)
+    users = build_user_features(load_user_features_rows(db, user_ids), vocab, industries)
+    if not len(jobs) or not len(users):
+        return 0
+
+    user_index = {user_id: i for i, user_id in enumerate(users.user_ids)}
+    job_index = {job_id: j for j, job_id in enumerate(jobs.job_ids)}
+    wanted = [
+        (user_index[u], job_index[j])
+        for u, j in pairs
+        if u in user_index and j in job_index
+    ]
+    if not wanted:
+        return 0
+
+    scorer = MatchScorer(len(vocab), len(industries), weights=weights)
+    components = score_block(users, jobs, scorer.vocab_size, scorer.industry_count)
+    u_idx = np.array([u for u, _ in wanted])
+    j_idx = np.array([j for _, j in wanted])
+    picked = components[:, u_idx, j_idx].T
+    scored = ScoredPairs(
+        user_index=u_idx,
+        job_index=j_idx,
+        overall=picked @ scorer.weights,
+        components=picked,
+    )
+
+    rows = build_score_rows(users, jobs, scored, weights)
+    for row in rows:
+        row["b_user_id"] = row.pop("user_id")
+        row["b_job_id"] = row.pop("job_id")
+    table = MatchScore.__table__
+    stmt = (
+        update(table)
+        .where(table.c.user_id == bindparam("b_user_id"))
+        .where(table.c.job_id == bindparam("b_job_id"))
+    )
+    db.execute(stmt, rows)
+    return len(rows)
+
+
+def recompute_match_scores(
+    db: Session,
+    user_ids: Optional[Sequence[str]] = None,
+    job_ids: Optional[Sequence[str]] = None,
+    top_k: Optional[int] = 500,
+    weights: Optional[Dict[str, float]] = None,
+    processes: int = 1,
+) -> int:
+    """
+    Scores the given users against the given jobs (all of either when None)
+    and upserts the best `top_k` matches per user; the users' scores for
+    those jobs that did not make it are deleted in the same transaction.
+    Commits on success.
+    """
+    vocab, industries = Vocabulary(), Vocabulary()
+    jobs = build_job_features(load_job_features_rows(db, job_ids), vocab, industries)
+    users = build_user_features(load_user_features_rows(db, user_ids), vocab, industries)
+    if not len(jobs) or not len(users):
+        return 0
+
+    scorer = MatchScorer(len(vocab), len(industries), weights=weights)
+    if processes > 1:
+        pairs = top_matches_parallel(scorer, users, jobs, top_k, processes)
+    else:
+        pairs = scorer.top_matches(users, jobs, top_k)
+
+    written = upsert_match_scores(db, users, jobs, pairs, weights)
+    kept = {
+        (users.user_ids[u], jobs.job_ids[j])
+        for u, j in zip(pairs.user_index.tolist(), pairs.job_index.tolist())
+    }
+    delete_unranked_scores(db, users.user_ids, job_ids, kept)
+    db.commit()
+    invalidate_decks(users.user_ids)
+    return written
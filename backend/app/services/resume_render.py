@@ -0,0 +1,507 @@
+"""
+Resume Rendering
+Turns a Resume's content_sections and formatting_options into a file in
+its FileFormat (PDF, DOCX, TXT or HTML), with its word and page counts.
+
+- Every format starts from a Jinja2 HTML template (app/templates/resumes/
+  <template_id>.html.j2), compiled once per process and template_id. PDF,
+  DOCX and TXT are converted from that HTML (app.utils.documents).
+- Rendering is CPU-bound, so it runs in a process pool
+  (RESUME_RENDER_WORKERS, 0 renders in the calling thread). Pool workers
+  compile every template when they start.
+- Output is cached on disk under a hash of the sections, formatting,
+  template source and format. An unchanged resume is never rendered twice.
+- render_many() renders a batch (auto-apply, exports) across all workers
+  at once, rendering each distinct resume once.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.ai import FileFormat
+from app.utils.disk_lru import DiskLRU
+from app.utils.documents import PAGE_SIZES, PageSetup, layout, parse_html, to_docx, to_pdf, to_text, word_count
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key: bump it when the converters change their output
+RENDER_VERSION = "1"
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "resumes")
+TEMPLATE_SUFFIX = ".html.j2"
+DEFAULT_TEMPLATE = "default"
+
+MEDIA_TYPES = {
+    FileFormat.PDF: "application/pdf",
+    FileFormat.DOCX: "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    FileFormat.TXT: "text/plain; charset=utf-8",
+    FileFormat.HTML: "text/html; charset=utf-8",
+}
+
+RENDERS = registry.counter(
+    "swipehire_resume_renders_total",
+    "Resume renders by format and result (rendered, cached, failed).",
+    ("format", "result"),
+)
+
+_TEMPLATE_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,99}$")
+_COLOR = re.compile(r"^#[0-9a-fA-F]{6}$")
+
+FORMATTING_DEFAULTS = {
+    "page_size": "letter",
+    "font_size": 10.5,
+    "margin_in": 0.75,
+    "accent_color": "#1f4e79",
+    "font_family": "Helvetica, Arial, sans-serif",
+}
+
+# Sections laid out first, in this order; the rest follow alphabetically
+SECTION_ORDER = ("summary", "experience", "education", "skills", "projects", "certifications", "languages")
+_HEADER_KEYS = ("name", "full_name", "headline", "email", "phone", "location", "website", "links", "contact")
+
+
+class UnknownTemplate(ValueError):
+    pass
+
+
+# ===============================
+#       CONTENT
+# ===============================
+def normalize_formatting(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """formatting_options with defaults filled in and out-of-range values replaced."""
+    options = options or {}
+    formatting = dict(FORMATTING_DEFAULTS)
+    if str(options.get("page_size", "")).lower() in PAGE_SIZES:
+        formatting["page_size"] = str(options["page_size"]).lower()
+    for name, low, high in (("font_size", 7.0, 16.0), ("margin_in", 0.3, 1.5)):
+        try:
+            formatting[name] = min(high, max(low, float(options[name])))
+        except (KeyError, TypeError, ValueError):
+            pass
+    if _COLOR.match(str(options.get("accent_color", ""))):
+        formatting["accent_color"] = options["accent_color"].lower()
+    if isinstance(options.get("font_family"), str) and options["font_family"].strip():
+        formatting["font_family"] = options["font_family"].strip()[:100]
+    return formatting
+
+
+def _title(key: str) -> str:
+    return key.replace("_", " ").strip().title()
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _entry(item: Dict[str, Any]) -> Dict[str, Any]:
+    heading = item.get("title") or item.get("degree") or item.get("name") or item.get("role")
+    subheading = item.get("company") or item.get("school") or item.get("organization") or item.get("issuer")
+    start, end = _text(item.get("start") or item.get("start_date")), _text(item.get("end") or item.get("end_date"))
+    dates = _text(item.get("dates")) or (f"{start} – {end or 'Present'}" if start else end)
+    bullets = item.get("bullets") or item.get("highlights") or []
+    return {
+        "kind": "entry",
+        "heading": _text(heading),
+        "subheading": _text(subheading),
+        "dates": dates,
+        "text": _text(item.get("description") or item.get("summary")),
+        "bullets": [_text(bullet) for bullet in bullets if _text(bullet)],
+    }
+
+
+def _items(value: Any) -> List[Dict[str, Any]]:
+    if isinstance(value, str):
+        return [{"kind": "text", "text": part.strip()} for part in value.split("\n\n") if part.strip()]
+    if isinstance(value, dict):
+        return [_entry(value)]
+    if isinstance(value, (list, tuple)):
+        if all(not isinstance(item, dict) for item in value):
+            bullets = [_text(item) for item in value if _text(item)]
+            return [{"kind": "bullets", "items": bullets}] if bullets else []
+        return [_entry(item) if isinstance(item, dict) else {"kind": "text", "text": _text(item)} for item in value]
+    return [{"kind": "text", "text": _text(value)}] if _text(value) else []
+
+
+def _from_markdown(markdown: str) -> Dict[str, Any]:
+    """Sections of the Markdown resumes the generator writes (# name, ## section, ### entry, - bullet)."""
+    resume: Dict[str, Any] = {"name": "", "headline": "", "contact": [], "sections": []}
+    section = entry = None
+    for raw in markdown.splitlines():
+        line = raw.strip().replace("**", "").replace("__", "")
+        if not line:
+            continue
+        if line.startswith("# ") and not resume["name"] and not resume["sections"]:
+            resume["name"] = line[2:].strip()
+        elif line.startswith("## ") or line.startswith("# "):
+            section = {"title": line.lstrip("#").strip(), "items": []}
+            resume["sections"].append(section)
+            entry = None
+        else:
+            if section is None:
+                if not resume["headline"] and not line.startswith(("- ", "* ")):
+                    resume["headline"] = line
+                    continue
+                section = {"title": "Summary", "items": []}
+                resume["sections"].append(section)
+            if line.startswith("### "):
+                entry = {"kind": "entry", "heading": line[4:].strip(), "subheading": "", "dates": "", "text": "", "bullets": []}
+                section["items"].append(entry)
+            elif line.startswith(("- ", "* ")):
+                if entry is not None:
+                    entry["bullets"].append(line[2:].strip())
+                elif section["items"] and section["items"][-1]["kind"] == "bullets":
+                    section["items"][-1]["items"].append(line[2:].strip())
+                else:
+                    section["items"].append({"kind": "bullets", "items": [line[2:].strip()]})
+            elif entry is not None and not entry["bullets"]:
+                entry["text"] = f"{entry['text']} {line}".strip()
+            else:
+                entry = None
+                section["items"].append({"kind": "text", "text": line})
+    return resume
+
+
+def resume_context(content_sections: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """What a template sees as `resume`: name, headline, contact lines and ordered sections."""
+    content = content_sections or {}
+    if isinstance(content.get("markdown"), str):
+        return _from_markdown(content["markdown"])
+    contact = content.get("contact") if isinstance(content.get("contact"), dict) else {}
+    merged = {**contact, **{key: content[key] for key in _HEADER_KEYS if key in content and key != "contact"}}
+    links = merged.get("links") or []
+    contact_lines = [
+        _text(merged.get(key)) for key in ("email", "phone", "location", "website") if _text(merged.get(key))
+    ] + [_text(link) for link in (links if isinstance(links, list) else [links]) if _text(link)]
+    keys = [key for key in content if key not in _HEADER_KEYS]
+    keys.sort(key=lambda key: (SECTION_ORDER.index(key) if key in SECTION_ORDER else len(SECTION_ORDER), key))
+    sections = [{"title": _title(key), "items": _items(content[key])} for key in keys]
+    return {
+        "name": _text(merged.get("name") or merged.get("full_name")),
+        "headline": _text(merged.get("headline")),
+        "contact": contact_lines,
+        "sections": [section for section in sections if section["items"]],
+    }
+
+
+# ===============================
+#       TEMPLATES
+# ===============================
+def _template_path(template_id: str) -> str:
+    if not _TEMPLATE_ID.match(template_id):
+        raise UnknownTemplate(f"Unknown resume template {template_id!r}")
+    path = os.path.join(TEMPLATE_DIR, template_id + TEMPLATE_SUFFIX)
+    if not os.path.isfile(path):
+        raise UnknownTemplate(f"Unknown resume template {template_id!r}")
+    return path
+
+
+@lru_cache()
+def template_digest(template_id: str) -> str:
+    """Hash of the template's source; editing a template retires its cached output."""
+    with open(_template_path(template_id), "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def available_templates() -> List[str]:
+    return sorted(
+        name[: -len(TEMPLATE_SUFFIX)] for name in os.listdir(TEMPLATE_DIR) if name.endswith(TEMPLATE_SUFFIX)
+    )
+
+
+@lru_cache(maxsize=1)
+def _environment() -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=False,  # templates change with a deploy, which restarts the pool
+        undefined=StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+@lru_cache(maxsize=None)
+def compiled_template(template_id: str):
+    """The compiled template; compiled once per process and template_id."""
+    _template_path(template_id)
+    return _environment().get_template(template_id + TEMPLATE_SUFFIX)
+
+
+def _warm_templates() -> None:
+    """Pool worker initializer: compiles every template up front."""
+    for template_id in available_templates():
+        try:
+            compiled_template(template_id)
+        except Exception:
+            logger.exception("Resume template %s does not compile", template_id)
+
+
+# ===============================
+#       RENDERING
+# ===============================
+@dataclass(frozen=True)
+class RenderSpec:
+    """Everything a render depends on; picklable, for the process pool."""
+
+    sections: Dict[str, Any]
+    formatting: Dict[str, Any]
+    file_format: FileFormat = FileFormat.PDF
+    template_id: str = DEFAULT_TEMPLATE
+    title: str = ""
+
+    @classmethod
+    def for_resume(cls, resume, file_format: Optional[FileFormat] = None) -> "RenderSpec":
+        return cls(
+            sections=resume.content_sections or {},
+            formatting=normalize_formatting(resume.formatting_options),
+            file_format=FileFormat(file_format or resume.file_format or FileFormat.PDF),
+            template_id=resume.template_id or DEFAULT_TEMPLATE,
+            title=resume.resume_name or "",
+        )
+
+    def key(self) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                {
+                    "version": RENDER_VERSION,
+                    "template": self.template_id,
+                    "template_digest": template_digest(self.template_id),
+                    "format": self.file_format.value,
+                    "sections": self.sections,
+                    "formatting": self.formatting,
+                    "title": self.title,
+                },
+                sort_keys=True,
+                separators=(",", ":"),
+                ensure_ascii=False,
+                default=str,
+            ).encode()
+        ).hexdigest()
+
+
+@dataclass(frozen=True)
+class RenderedResume:
+    key: str
+    file_format: FileFormat
+    content: bytes
+    word_count: int
+    page_count: int
+    cached: bool = False
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.file_format]
+
+    def filename(self, stem: str) -> str:
+        return safe_filename(stem, self.file_format.value)
+
+
+def safe_filename(stem: str, extension: str) -> str:
+    """A download filename that is safe to quote in a Content-Disposition header."""
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", stem).strip("._") or "resume"
+    return f"{stem[:80]}.{extension}"
+
+
+def render_document(spec: RenderSpec) -> RenderedResume:
+    """Renders one spec (runs in a pool worker)."""
+    html = compiled_template(spec.template_id).render(
+        resume=resume_context(spec.sections), fmt=spec.formatting, title=spec.title
+    )
+    blocks = parse_html(html)
+    formatting = spec.formatting
+    accent = formatting["accent_color"]
+    page = PageSetup(
+        size=formatting["page_size"],
+        margin=formatting["margin_in"] * 72,
+        font_size=formatting["font_size"],
+        accent=tuple(int(accent[i : i + 2], 16) / 255 for i in (1, 3, 5)),
+    )
+    pages = layout(blocks, page)
+    words = word_count(blocks)
+    if spec.file_format is FileFormat.PDF:
+        content = to_pdf(pages, page, title=spec.title)
+    elif spec.file_format is FileFormat.DOCX:
+        content = to_docx(blocks, page, len(pages), words)
+    elif spec.file_format is FileFormat.TXT:
+        content = to_text(blocks).encode()
+    else:
+        content = html.encode()
+    return RenderedResume("", spec.file_format, content, words, len(pages))
+
+
+def _render_chunk(specs: List[RenderSpec]) -> List[Union[RenderedResume, Exception]]:
+    outcomes: List[Union[RenderedResume, Exception]] = []
+    for spec in specs:
+        try:
+            outcomes.append(render_document(spec))
+        except Exception as exc:
+            outcomes.append(exc)
+    return outcomes
+
+
+class ResumeRenderer:
+    def __init__(self, workers: int = 2, store: Optional[DiskLRU] = None):
+        self.workers = workers
+        self.store = store
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._counts = {"rendered": 0, "cached": 0, "failed": 0}
+        self.render_seconds = 0.0
+
+    # --- Pool ---
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # Not fork: the server process runs threads that hold locks
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_templates,
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # --- Cache ---
+    def _lookup(self, key: str, file_format: FileFormat) -> Optional[RenderedResume]:
+        if self.store is None:
+            return None
+        try:
+            raw = self.store.get(key)
+        except OSError:
+            logger.exception("Resume render cache read failed")
+            return None
+        if raw is None:
+            return None
+        header, content = raw.split(b"\n", 1)
+        meta = json.loads(header)
+        return RenderedResume(key, file_format, content, meta["words"], meta["pages"], cached=True)
+
+    def _save(self, rendered: RenderedResume) -> None:
+        if self.store is None:
+            return
+        header = json.dumps({"words": rendered.word_count, "pages": rendered.page_count}).encode()
+        try:
+            self.store.put(rendered.key, header + b"\n" + rendered.content)
+        except OSError:
+            logger.exception("Resume render cache write failed")
+
+    def _count(self, file_format: FileFormat, result: str, amount: int = 1) -> None:
+        if amount:
+            with self._lock:
+                self._counts[result] += amount
+            RENDERS.inc((file_format.value, result), amount)
+
+    # --- Rendering ---
+    def render(self, spec: RenderSpec) -> RenderedResume:
+        result = self.render_many([spec])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def render_many(self, specs: Sequence[RenderSpec]) -> List[Union[RenderedResume, Exception]]:
+        """
+        Renders a batch, in order; a spec that fails gets its exception in
+        its place instead of failing the batch.
+        """
+        results: List[Union[RenderedResume, Exception, None]] = [None] * len(specs)
+        misses: Dict[str, List[int]] = {}
+        for index, spec in enumerate(specs):
+            try:
+                key = spec.key()
+            except UnknownTemplate as exc:
+                results[index] = exc
+                self._count(spec.file_format, "failed")
+                continue
+            if key in misses:
+                misses[key].append(index)
+                continue
+            cached = self._lookup(key, spec.file_format)
+            if cached is not None:
+                results[index] = cached
+                self._count(spec.file_format, "cached")
+            else:
+                misses[key] = [index]
+
+        started = time.perf_counter()
+        keys = list(misses)
+        todo = [specs[misses[key][0]] for key in keys]
+        if self.workers > 0 and len(todo) > 1:
+            # A few chunks per worker: cheap IPC, yet the load still evens out
+            size = max(1, min(32, -(-len(todo) // (self.workers * 4))))
+            try:
+                pool = self._executor()
+                chunks = [pool.submit(_render_chunk, todo[i : i + size]) for i in range(0, len(todo), size)]
+                rendered = [outcome for chunk in chunks for outcome in chunk.result()]
+            except BrokenProcessPool:
+                logger.exception("Resume render pool broke; it restarts on the next render")
+                with self._lock:
+                    self._pool = None
+                rendered = [RuntimeError("Resume renderer unavailable")] * len(todo)
+        else:
+            # A single render is not worth the trip to another process
+            rendered = _render_chunk(todo)
+        outcomes = dict(zip(keys, rendered))
+        if misses:
+            with self._lock:
+                self.render_seconds += time.perf_counter() - started
+
+        for key, indexes in misses.items():
+            outcome = outcomes[key]
+            file_format = specs[indexes[0]].file_format
+            if isinstance(outcome, Exception):
+                logger.warning("Rendering resume %s failed: %s", key[:12], outcome)
+                self._count(file_format, "failed", len(indexes))
+            else:
+                outcome = RenderedResume(key, file_format, outcome.content, outcome.word_count, outcome.page_count)
+                self._save(outcome)
+                self._count(file_format, "rendered")
+                self._count(file_format, "cached", len(indexes) - 1)
+            for index in indexes:
+                results[index] = outcome
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counts)
+            stats["workers"] = self.workers
+            stats["render_seconds"] = round(self.render_seconds, 3)
+        stats["templates_compiled"] = compiled_template.cache_info().currsize
+        if self.store is not None:
+            stats.update(self.store.stats())
+        return stats
+
+
+def apply_render_stats(resume, rendered: RenderedResume) -> None:
+    """Records what a render measured on the Resume row (not committed)."""
+    resume.word_count = rendered.word_count
+    resume.page_count = rendered.page_count
+    if rendered.file_format == resume.file_format:
+        resume.file_size_bytes = len(rendered.content)
+
+
+@lru_cache()
+def get_resume_renderer() -> ResumeRenderer:
+    store = None
+    if settings.RESUME_RENDER_CACHE_ENABLED:
+        store = DiskLRU(settings.RESUME_RENDER_CACHE_DIR, int(settings.RESUME_RENDER_CACHE_MAX_MB * 1024 * 1024))
+    return ResumeRenderer(settings.RESUME_RENDER_WORKERS, store)
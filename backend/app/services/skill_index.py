@@ -0,0 +1,449 @@
+"""
+Inverted Skill Index
+In-process index from normalised skill name to a sorted postings list of
+active job ids, used to retrieve candidate jobs for a set of skills without
+scanning job_skills.
+"""
+
+import heapq
+import json
+import logging
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job, JobSkill, JobStatus, SkillImportance
+from app.services.match_scoring import IMPORTANCE_MULTIPLIER
+from app.utils.text import normalize_skill_name
+
+logger = logging.getLogger(__name__)
+
+IMPORTANCE_CODES = list(SkillImportance)
+SNAPSHOT_MAGIC = b"SHSKIDX1"
+
+
+class _Postings:
+    """
+    Job ordinals in ascending order with parallel payload arrays.
+    """
+
+    __slots__ = ("ordinals", "importance", "weights")
+
+    def __init__(self):
+        self.ordinals = array("I")
+        self.importance = array("B")
+        self.weights = array("f")
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def upsert(self, ordinal: int, importance: int, weight: float) -> None:
+        i = bisect_left(self.ordinals, ordinal)
+        if i < len(self.ordinals) and self.ordinals[i] == ordinal:
+            self.importance[i] = importance
+            self.weights[i] = weight
+            return
+        self.ordinals.insert(i, ordinal)
+        self.importance.insert(i, importance)
+        self.weights.insert(i, weight)
+
+    def remove(self, ordinal: int) -> None:
+        i = bisect_left(self.ordinals, ordinal)
+        if i < len(self.ordinals) and self.ordinals[i] == ordinal:
+            del self.ordinals[i]
+            del self.importance[i]
+            del self.weights[i]
+
+    def contains(self, ordinal: int) -> bool:
+        i = bisect_left(self.ordinals, ordinal)
+        return i < len(self.ordinals) and self.ordinals[i] == ordinal
+
+
+@dataclass
+class SkillMatch:
+    job_id: str
+    score: float
+    coverage: float
+    matched_skills: List[str]
+
+
+class SkillIndex:
+    """
+    Skill -> postings index with SkillImportance and effective weight payload.
+
+    The effective weight of a posting is JobSkill.weight scaled by the same
+    importance multipliers the match scorer uses.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, _Postings] = {}
+        self._job_ids: List[Optional[str]] = []
+        self._ordinals: Dict[str, int] = {}
+        # Forward index, so a job can be removed without scanning postings
+        self._job_skills: Dict[int, Set[str]] = {}
+        self._job_total_weight: Dict[int, float] = {}
+        self._lock = threading.RLock()
+        self.watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._job_skills)
+
+    @property
+    def skill_count(self) -> int:
+        return len(self._postings)
+
+    # --- Updates ---
+    def _ordinal(self, job_id: str) -> int:
+        ordinal = self._ordinals.get(job_id)
+        if ordinal is None:
+            ordinal = len(self._job_ids)
+            self._ordinals[job_id] = ordinal
+            self._job_ids.append(job_id)
+        return ordinal
+
+    def add(self, job_id: str, skill_name: str, importance=SkillImportance.REQUIRED, weight: Optional[int] = 1) -> None:
+        skill = normalize_skill_name(skill_name)
+        if not skill:
+            return
+        importance = SkillImportance(importance or SkillImportance.REQUIRED)
+        effective = IMPORTANCE_MULTIPLIER[importance] * (weight or 1)
+        with self._lock:
+            ordinal = self._ordinal(job_id)
+            postings = self._postings.get(skill)
+            if postings is None:
+                postings = self._postings[skill] = _Postings()
+            elif postings.contains(ordinal):
+                i = bisect_left(postings.ordinals, ordinal)
+                self._job_total_weight[ordinal] -= postings.weights[i]
+            postings.upsert(ordinal, IMPORTANCE_CODES.index(importance), effective)
+            self._job_skills.setdefault(ordinal, set()).add(skill)
+            self._job_total_weight[ordinal] = self._job_total_weight.get(ordinal, 0.0) + effective
+
+    def remove(self, job_id: str, skill_name: str) -> None:
+        skill = normalize_skill_name(skill_name)
+        with self._lock:
+            ordinal = self._ordinals.get(job_id)
+            postings = self._postings.get(skill)
+            if ordinal is None or postings is None or not postings.contains(ordinal):
+                return
+            i = bisect_left(postings.ordinals, ordinal)
+            self._job_total_weight[ordinal] -= postings.weights[i]
+            postings.remove(ordinal)
+            if not len(postings):
+                del self._postings[skill]
+            skills = self._job_skills.get(ordinal, set())
+            skills.discard(skill)
+            if not skills:
+                self._forget(ordinal)
+
+    def remove_job(self, job_id: str) -> None:
+        with self._lock:
+            ordinal = self._ordinals.get(job_id)
+            if ordinal is None:
+                return
+            for skill in self._job_skills.get(ordinal, ()):
+                postings = self._postings.get(skill)
+                if postings is not None:
+                    postings.remove(ordinal)
+                    if not len(postings):
+                        del self._postings[skill]
+            self._forget(ordinal)
+
+    def replace_job(self, job_id: str, skills: Iterable[Tuple[str, object, Optional[int]]]) -> None:
+        """
+        Replaces every posting of a job with (skill_name, importance, weight).
+        """
+        with self._lock:
+            self.remove_job(job_id)
+            for skill_name, importance, weight in skills:
+                self.add(job_id, skill_name, importance, weight)
+
+    def _forget(self, ordinal: int) -> None:
+        self._job_skills.pop(ordinal, None)
+        self._job_total_weight.pop(ordinal, None)
+
+    # --- Queries ---
+    def jobs_with_all(self, skills: Iterable[str]) -> List[str]:
+        """
+        Ids of jobs that list every one of `skills` (postings intersection).
+        """
+        with self._lock:
+            lists = self._postings_for(skills, require_all=True)
+            if not lists:
+                return []
+            lists.sort(key=len)
+            result = []
+            for ordinal in lists[0].ordinals:
+                if all(other.contains(ordinal) for other in lists[1:]):
+                    result.append(self._job_ids[ordinal])
+            return result
+
+    def top_jobs(self, skills: Iterable[str], k: int = 20, require_all: bool = False) -> List[SkillMatch]:
+        """
+        Top-k jobs by weighted skill overlap (postings union, or intersection
+        when `require_all`). Ties break on coverage of the job's own skills.
+        """
+        names = sorted({normalize_skill_name(s) for s in skills if s and s.strip()})
+        with self._lock:
+            if require_all:
+                candidates = {self._ordinals[job_id] for job_id in self.jobs_with_all(names)}
+            else:
+                candidates = None
+
+            scores: Dict[int, float] = {}
+            matched: Dict[int, List[str]] = {}
+            for name in names:
+                postings = self._postings.get(name)
+                if postings is None:
+                    continue
+                for ordinal, weight in zip(postings.ordinals, postings.weights):
+                    if candidates is not None and ordinal not in candidates:
+                        continue
+                    scores[ordinal] = scores.get(ordinal, 0.0) + weight
+                    matched.setdefault(ordinal, []).append(name)
+
+            def coverage(ordinal: int) -> float:
+                total = self._job_total_weight.get(ordinal) or 1.0
+                return min(scores[ordinal] / total, 1.0)
+
+            best = heapq.nlargest(k, scores, key=lambda o: (scores[o], coverage(o)))
+            return [
+                SkillMatch(
+                    job_id=self._job_ids[o],
+                    score=round(scores[o], 4),
+                    coverage=round(coverage(o), 4),
+                    matched_skills=matched[o],
+                )
+                for o in best
+            ]
+
+    def _postings_for(self, skills: Iterable[str], require_all: bool) -> List[_Postings]:
+        lists = []
+        for skill in {normalize_skill_name(s) for s in skills if s and s.strip()}:
+            postings = self._postings.get(skill)
+            if postings is None:
+                if require_all:
+                    return []
+                continue
+            lists.append(postings)
+        return lists
+
+    # --- Snapshot / restore ---
+    def save(self, path: str) -> None:
+        """
+        Writes the index to `path` atomically. Layout: magic, header length,
+        JSON header (job ids, skills and their postings offsets), then the
+        concatenated ordinal, importance and weight arrays.
+        """
+        with self._lock:
+            live = sorted(self._job_skills)
+            remap = {old: new for new, old in enumerate(live)}
+            ordinals, importance, weights = array("I"), array("B"), array("f")
+            skills = []
+            for name, postings in self._postings.items():
+                skills.append([name, len(ordinals), len(postings)])
+                ordinals.extend(remap[o] for o in postings.ordinals)
+                importance.extend(postings.importance)
+                weights.extend(postings.weights)
+            header = json.dumps(
+                {
+                    "job_ids": [self._job_ids[o] for o in live],
+                    "skills": skills,
+                    "watermark": self.watermark.isoformat() if self.watermark else None,
+                }
+            ).encode()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(SNAPSHOT_MAGIC)
+            fh.write(struct.pack("<Q", len(header)))
+            fh.write(header)
+            ordinals.tofile(fh)
+            importance.tofile(fh)
+            weights.tofile(fh)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SkillIndex":
+        index = cls()
+        with open(path, "rb") as fh:
+            if fh.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a skill index snapshot")
+            (header_len,) = struct.unpack("<Q", fh.read(8))
+            header = json.loads(fh.read(header_len))
+            total = sum(count for _, _, count in header["skills"])
+            ordinals, importance, weights = array("I"), array("B"), array("f")
+            ordinals.fromfile(fh, total)
+            importance.fromfile(fh, total)
+            weights.fromfile(fh, total)
+
+        index._job_ids = list(header["job_ids"])
+        index._ordinals = {job_id: i for i, job_id in enumerate(index._job_ids)}
+        for name, start, count in header["skills"]:
+            postings = _Postings()
+            postings.ordinals = ordinals[start : start + count]
+            postings.importance = importance[start : start + count]
+            postings.weights = weights[start : start + count]
+            index._postings[name] = postings
+            for ordinal, weight in zip(postings.ordinals, postings.weights):
+                index._job_skills.setdefault(ordinal, set()).add(name)
+                index._job_total_weight[ordinal] = index._job_total_weight.get(ordinal, 0.0) + weight
+        if header.get("watermark"):
+            index.watermark = datetime.fromisoformat(header["watermark"])
+        return index
+
+
+# ===============================
+#       DATABASE SYNC
+# ===============================
+def _utcnow() -> datetime:
+    # Naive UTC, matching what the database hands back for updated_at
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _active_skills_query(db: Session):
+    return (
+        db.query(JobSkill.job_id, JobSkill.skill_name, JobSkill.importance, JobSkill.weight)
+        .join(Job, Job.id == JobSkill.job_id)
+        .filter(Job.job_status == JobStatus.ACTIVE, Job.deleted_at.is_(None))
+    )
+
+
+def build_skill_index(db: Session) -> SkillIndex:
+    """
+    Builds the index from every JobSkill row of an active job.
+    """
+    index = SkillIndex()
+    index.watermark = _utcnow()
+    for job_id, name, importance, weight in _active_skills_query(db).yield_per(10000):
+        index.add(job_id, name, importance, weight)
+    return index
+
+
+def refresh_jobs(index: SkillIndex, db: Session, job_ids: Iterable[str]) -> None:
+    """
+    Re-reads the postings of specific jobs; inactive jobs drop out.
+    """
+    job_ids = list(set(job_ids))
+    if not job_ids:
+        return
+    rows: Dict[str, List] = {job_id: [] for job_id in job_ids}
+    for job_id, name, importance, weight in _active_skills_query(db).filter(JobSkill.job_id.in_(job_ids)):
+        rows[job_id].append((name, importance, weight))
+    for job_id, skills in rows.items():
+        index.replace_job(job_id, skills)
+
+
+def catch_up(index: SkillIndex, db: Session) -> None:
+    """
+    Applies changes made since the snapshot watermark: jobs or job skills
+    touched after it are re-read, and jobs that no longer exist are dropped.
+    """
+    started = _utcnow()
+    if index.watermark is not None:
+        changed = {
+            job_id
+            for (job_id,) in db.query(Job.id).filter(Job.updated_at > index.watermark)
+        }
+        changed.update(
+            job_id
+            for (job_id,) in db.query(JobSkill.job_id).filter(JobSkill.updated_at > index.watermark)
+        )
+        refresh_jobs(index, db, changed)
+
+    active = {
+        job_id
+        for (job_id,) in db.query(Job.id).filter(
+            Job.job_status == JobStatus.ACTIVE, Job.deleted_at.is_(None)
+        )
+    }
+    with index._lock:
+        gone = [index._job_ids[o] for o in index._job_skills if index._job_ids[o] not in active]
+    for job_id in gone:
+        index.remove_job(job_id)
+    index.watermark = started
+
+
+_PENDING_KEY = "skill_index_jobs"
+
+
+def install_index_sync(session_factory, index_getter) -> None:
+    """
+    Keeps the index in step with committed Job/JobSkill changes. Touched
+    job ids are collected on flush and re-read after commit, so rolled
+    back edits never reach the index.
+    """
+
+    def collect(session, flush_context):
+        touched = session.info.setdefault(_PENDING_KEY, set())
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, JobSkill):
+                touched.add(obj.job_id)
+            elif isinstance(obj, Job):
+                touched.add(obj.id)
+        for obj in session.dirty:
+            if isinstance(obj, JobSkill):
+                touched.add(obj.job_id)
+            elif isinstance(obj, Job):
+                state = inspect(obj)
+                if any(state.attrs[c].history.has_changes() for c in ("job_status", "deleted_at")):
+                    touched.add(obj.id)
+
+    def apply(session):
+        touched = session.info.pop(_PENDING_KEY, None)
+        if not touched:
+            return
+        db = SessionLocal()
+        try:
+            refresh_jobs(index_getter(), db, touched)
+        except Exception:
+            logger.exception("Skill index sync failed")
+        finally:
+            db.close()
+
+    def discard(session):
+        session.info.pop(_PENDING_KEY, None)
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(session_factory, "after_soft_rollback", lambda session, previous: discard(session))
+
+
+@lru_cache()
+def get_skill_index() -> SkillIndex:
+    """
+    Restores the index from its snapshot when one exists (then catches up
+    with the database), otherwise builds it from scratch.
+    """
+    path = settings.SKILL_INDEX_SNAPSHOT_PATH
+    db = SessionLocal()
+    try:
+        if path and os.path.exists(path):
+            try:
+                index = SkillIndex.load(path)
+                catch_up(index, db)
+                return index
+            except (OSError, ValueError):
+                logger.exception("Ignoring unreadable skill index snapshot %s", path)
+        return build_skill_index(db)
+    finally:
+        db.close()
+
+
+def save_skill_index() -> None:
+    if settings.SKILL_INDEX_SNAPSHOT_PATH and get_skill_index.cache_info().currsize:
+        get_skill_index().save(settings.SKILL_INDEX_SNAPSHOT_PATH)
@@ -0,0 +1,338 @@
+"""
+Skill Typeahead
+In-memory prefix index over skill names that answers "top-K skills starting
+with this prefix, most popular first" without touching the database.
+Popularity is the number of profiles plus active job postings that list the
+skill.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+import models
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job, JobSkill, JobStatus
+from app.utils.text import normalize_skill_name
+from database import SessionLocal as LegacySessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every character a normalised name can contain, so
+# [prefix, prefix + _PREFIX_END) is the range of keys starting with prefix
+_PREFIX_END = "\U0010ffff"
+
+
+@dataclass(frozen=True)
+class SkillSuggestion:
+    id: int
+    name: str
+    popularity: int
+
+
+class _Segment:
+    """
+    Immutable sorted run of skills plus a sparse table answering "which
+    index in [lo, hi) is the most popular" in O(1). Ties go to the lower
+    index, i.e. alphabetical order.
+    """
+
+    __slots__ = ("keys", "entries", "scores", "table")
+
+    def __init__(self, items: List[Tuple[str, SkillSuggestion]]):
+        items.sort(key=lambda item: item[0])
+        self.keys = [key for key, _ in items]
+        self.entries = [entry for _, entry in items]
+        self.scores = [entry.popularity for entry in self.entries]
+        self.table = self._build_table(np.asarray(self.scores, dtype=np.int64))
+
+    @staticmethod
+    def _build_table(scores: np.ndarray) -> List[np.ndarray]:
+        n = len(scores)
+        if not n:
+            return []
+        table = [np.arange(n, dtype=np.int32)]
+        span = 1
+        while span * 2 <= n:
+            previous = table[-1]
+            left = previous[: n - span * 2 + 1]
+            right = previous[span : n - span + 1]
+            table.append(np.where(scores[left] >= scores[right], left, right))
+            span *= 2
+        return table
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def argmax(self, lo: int, hi: int) -> int:
+        level = (hi - lo).bit_length() - 1
+        row = self.table[level]
+        left, right = int(row[lo]), int(row[hi - (1 << level)])
+        return left if self.scores[left] >= self.scores[right] else right
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + _PREFIX_END)
+
+    def ranked(self, lo: int, hi: int) -> Iterable[Tuple[str, SkillSuggestion]]:
+        """
+        Yields keys in [lo, hi) most popular first, splitting the range
+        around each winner, so K results cost O(K log K) whatever the range size.
+        """
+        if lo >= hi:
+            return
+        heap = []
+
+        def push(a, b):
+            if a < b:
+                best = self.argmax(a, b)
+                heapq.heappush(heap, (-self.scores[best], best, a, b))
+
+        push(lo, hi)
+        while heap:
+            _, best, a, b = heapq.heappop(heap)
+            yield self.keys[best], self.entries[best]
+            push(a, best)
+            push(best + 1, b)
+
+
+class SkillTypeahead:
+    """
+    A large read-optimised segment plus a small overlay of skills created
+    or re-scored since it was built. Overlay entries shadow the segment and
+    are folded into a fresh segment once there are `merge_threshold` of them.
+    """
+
+    def __init__(self, merge_threshold: int = 1024):
+        self.merge_threshold = merge_threshold
+        self._segment = _Segment([])
+        self._overlay: Dict[str, SkillSuggestion] = {}
+        self._overlay_keys: List[str] = []
+        self._lock = threading.RLock()
+        self.max_skill_id = 0
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            shadowed = sum(1 for key in self._overlay if self._segment_entry(key) is not None)
+            return len(self._segment) + len(self._overlay) - shadowed
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[SkillSuggestion], **kwargs) -> "SkillTypeahead":
+        index = cls(**kwargs)
+        items = [(normalize_skill_name(entry.name), entry) for entry in entries]
+        index._segment = _Segment(items)
+        index.max_skill_id = max((entry.id for _, entry in items), default=0)
+        return index
+
+    # --- Updates ---
+    def _segment_entry(self, key: str) -> Optional[SkillSuggestion]:
+        i = bisect_left(self._segment.keys, key)
+        if i < len(self._segment) and self._segment.keys[i] == key:
+            return self._segment.entries[i]
+        return None
+
+    def upsert(self, skill_id: int, name: str, popularity: int = 0) -> None:
+        """
+        Adds a new skill or replaces the popularity of a known one.
+        """
+        key = normalize_skill_name(name)
+        if not key:
+            return
+        with self._lock:
+            if key not in self._overlay:
+                self._overlay_keys.insert(bisect_left(self._overlay_keys, key), key)
+            self._overlay[key] = SkillSuggestion(skill_id, name, popularity)
+            self.max_skill_id = max(self.max_skill_id, skill_id)
+            merge = len(self._overlay) >= self.merge_threshold
+        if merge:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Folds the overlay into a new segment. The rebuild runs outside the
+        lock; overlay entries written meanwhile survive the swap.
+        """
+        with self._lock:
+            segment, overlay = self._segment, dict(self._overlay)
+        merged = dict(zip(segment.keys, segment.entries))
+        merged.update(overlay)
+        rebuilt = _Segment(list(merged.items()))
+        with self._lock:
+            self._segment = rebuilt
+            for key, entry in overlay.items():
+                if self._overlay.get(key) is entry:
+                    del self._overlay[key]
+            self._overlay_keys = sorted(self._overlay)
+
+    # --- Queries ---
+    def suggest(self, prefix: str, k: int = 10) -> List[SkillSuggestion]:
+        """
+        Top-k skills whose normalised name starts with `prefix`, by
+        popularity then name. An empty prefix ranks every skill.
+        """
+        normalized = normalize_skill_name(prefix)
+        if normalized and prefix[-1:].isspace():
+            normalized += " "  # "go " should not match "golang"
+        prefix = normalized
+        with self._lock:
+            segment, overlay = self._segment, self._overlay
+            lo = bisect_left(self._overlay_keys, prefix)
+            hi = bisect_left(self._overlay_keys, prefix + _PREFIX_END)
+            candidates = [(key, overlay[key]) for key in self._overlay_keys[lo:hi]]
+            taken = 0
+            for key, entry in segment.ranked(*segment.prefix_range(prefix)):
+                if key in overlay:
+                    continue
+                candidates.append((key, entry))
+                taken += 1
+                if taken == k:
+                    break
+        best = heapq.nsmallest(k, candidates, key=lambda item: (-item[1].popularity, item[0]))
+        return [entry for _, entry in best]
+
+
+# ===============================
+#       DATABASE SYNC
+# ===============================
+def _profile_counts_query(min_skill_id: int = 0):
+    link = models.profile_skills_association
+    return (
+        select(models.Skill.id, models.Skill.name, func.count(link.c.profile_id))
+        .outerjoin(link, link.c.skill_id == models.Skill.id)
+        .where(models.Skill.id > min_skill_id)
+        .group_by(models.Skill.id, models.Skill.name)
+    )
+
+
+def _job_counts(db: Session) -> Dict[str, int]:
+    rows = (
+        db.query(JobSkill.skill_name, func.count(JobSkill.id))
+        .join(Job, Job.id == JobSkill.job_id)
+        .filter(Job.job_status == JobStatus.ACTIVE, Job.deleted_at.is_(None))
+        .group_by(JobSkill.skill_name)
+    )
+    counts: Dict[str, int] = {}
+    for name, count in rows:
+        key = normalize_skill_name(name)
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def build_skill_typeahead(legacy_db: Session, app_db: Session) -> SkillTypeahead:
+    """
+    Builds the index from the skills table, with profile links counted in
+    the same aggregate query and job postings counted by normalised name.
+    """
+    job_counts = _job_counts(app_db)
+    entries = [
+        SkillSuggestion(skill_id, name, profiles + job_counts.get(normalize_skill_name(name), 0))
+        for skill_id, name, profiles in legacy_db.execute(_profile_counts_query())
+    ]
+    return SkillTypeahead.from_entries(entries)
+
+
+def catch_up(index: SkillTypeahead, legacy_db: Session) -> int:
+    """
+    Adds skills created since the index last saw one, detected by id.
+    Job postings only feed popularity at the next rebuild.
+    Returns the number of skills added.
+    """
+    added = 0
+    for skill_id, name, profiles in legacy_db.execute(_profile_counts_query(index.max_skill_id)):
+        index.upsert(skill_id, name, profiles)
+        added += 1
+    return added
+
+
+_PENDING_KEY = "skill_typeahead_new_skills"
+
+
+def install_typeahead_sync(session_factory, index_getter) -> None:
+    """
+    Picks up new skills after every commit that inserted any, whether via
+    the ORM or a Core INSERT (the bulk attach path), so they are suggested
+    immediately. Rolled-back inserts never reach the index.
+    """
+
+    def collect_orm(session, flush_context):
+        if any(isinstance(obj, models.Skill) for obj in session.new):
+            session.info[_PENDING_KEY] = True
+
+    def collect_core(orm_execute_state):
+        statement = orm_execute_state.statement
+        if orm_execute_state.is_insert and getattr(statement, "table", None) is models.Skill.__table__:
+            orm_execute_state.session.info[_PENDING_KEY] = True
+
+    def apply(session):
+        if not session.info.pop(_PENDING_KEY, False):
+            return
+        db = LegacySessionLocal()
+        try:
+            catch_up(index_getter(), db)
+        except Exception:
+            logger.exception("Skill typeahead sync failed")
+        finally:
+            db.close()
+
+    def discard(session):
+        session.info.pop(_PENDING_KEY, None)
+
+    event.listen(session_factory, "after_flush", collect_orm)
+    event.listen(session_factory, "do_orm_execute", collect_core)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(session_factory, "after_soft_rollback", lambda session, previous: discard(session))
+
+
+_rebuilding = threading.Lock()
+
+
+def _rebuild() -> None:
+    legacy_db, app_db = LegacySessionLocal(), SessionLocal()
+    try:
+        fresh = build_skill_typeahead(legacy_db, app_db)
+        current = get_skill_typeahead()
+        # Swap the contents rather than the object, so references held by
+        # the sync hooks and routers stay valid
+        with current._lock:
+            current._segment = fresh._segment
+            current._overlay, current._overlay_keys = {}, []
+            current.max_skill_id = max(current.max_skill_id, fresh.max_skill_id)
+            current.built_at = fresh.built_at
+        catch_up(current, legacy_db)  # skills created while the build ran
+    except Exception:
+        logger.exception("Skill typeahead rebuild failed")
+    finally:
+        legacy_db.close()
+        app_db.close()
+        _rebuilding.release()
+
+
+def refresh_if_stale(index: SkillTypeahead) -> None:
+    """
+    Starts a background rebuild once the popularity counts are older than
+    SKILL_TYPEAHEAD_REFRESH_SECONDS; queries keep using the current index.
+    """
+    age = time.monotonic() - index.built_at
+    if age < settings.SKILL_TYPEAHEAD_REFRESH_SECONDS or not _rebuilding.acquire(blocking=False):
+        return
+    threading.Thread(target=_rebuild, name="skill-typeahead-rebuild", daemon=True).start()
+
+
+@lru_cache()
+def get_skill_typeahead() -> SkillTypeahead:
+    legacy_db, app_db = LegacySessionLocal(), SessionLocal()
+    try:
+        return build_skill_typeahead(legacy_db, app_db)
+    finally:
+        legacy_db.close()
+        app_db.close()
@@ -0,0 +1,476 @@
+"""
+Swipe Deck Engine
+Keeps a precomputed, ranked queue of candidate job ids per user so serving
+cards never has to anti-join the jobs table against the user's swipes.
+"""
+
+import base64
+import json
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, event, inspect, or_
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.application import Swipe
+from app.models.job import Job, JobStatus
+from app.utils.pagination import InvalidCursor
+
+# A deck is ordered by score descending, then job id ascending.
+RankKey = Tuple[float, str]
+CandidateSource = Callable[[str, Optional[RankKey], int], List[RankKey]]
+SeenLoader = Callable[[str], Iterable[str]]
+
+
+def encode_cursor(key: RankKey) -> str:
+    raw = json.dumps([key[0], key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> RankKey:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), str(job_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def _order(key: RankKey) -> Tuple[float, str]:
+    return -key[0], key[1]
+
+
+# ===============================
+#       COMPACT JOB ID SETS
+# ===============================
+class JobIdInterner:
+    """
+    Maps 36-character job UUIDs to dense integer ordinals.
+    Shared by every deck, so each user only stores 4 bytes per seen job.
+    """
+
+    def __init__(self):
+        self._ordinals: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, job_id: str) -> int:
+        ordinal = self._ordinals.get(job_id)
+        if ordinal is None:
+            with self._lock:
+                ordinal = self._ordinals.setdefault(job_id, len(self._ordinals))
+        return ordinal
+
+    def get(self, job_id: str) -> Optional[int]:
+        return self._ordinals.get(job_id)
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+
+class SeenSet:
+    """
+    Per-user set of swiped job ordinals.
+    A sorted uint32 array answers membership by bisection; new swipes land in
+    a small buffer that is merged into the array once it fills up.
+    """
+
+    MERGE_THRESHOLD = 256
+
+    __slots__ = ("_sorted", "_pending")
+
+    def __init__(self, ordinals: Iterable[int] = ()):
+        self._sorted = array("I", sorted(set(ordinals)))
+        self._pending = set()
+
+    def __contains__(self, ordinal: int) -> bool:
+        if ordinal in self._pending:
+            return True
+        index = bisect_left(self._sorted, ordinal)
+        return index < len(self._sorted) and self._sorted[index] == ordinal
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def add(self, ordinal: int) -> None:
+        if ordinal in self:
+            return
+        self._pending.add(ordinal)
+        if len(self._pending) >= self.MERGE_THRESHOLD:
+            merged = sorted(self._pending.union(self._sorted))
+            self._sorted = array("I", merged)
+            self._pending.clear()
+
+
+# ===============================
+#       DECK ENGINE
+# ===============================
+@dataclass
+class Card:
+    job_id: str
+    score: float
+
+    @property
+    def cursor(self) -> str:
+        return encode_cursor((self.score, self.job_id))
+
+
+class _Deck:
+    __slots__ = (
+        "queue",
+        "queued",
+        "seen",
+        "source_cursor",
+        "head",
+        "checked_at",
+        "exhausted",
+        "refilling",
+        "lock",
+    )
+
+    def __init__(self, seen: SeenSet):
+        # Entries are (score, job_id, ordinal) in deck order
+        self.queue: Deque[Tuple[float, str, int]] = deque()
+        self.queued = set()
+        self.seen = seen
+        self.source_cursor: Optional[RankKey] = None
+        self.head: Optional[RankKey] = None  # best-ranked key the source has returned
+        self.checked_at = time.monotonic()  # when the head was last re-checked
+        self.exhausted = False
+        self.refilling = False
+        self.lock = threading.Lock()
+
+
+class DeckEngine:
+    """
+    Serves swipe cards from per-user ranked queues.
+
+    - Already-swiped jobs are excluded through a compact SeenSet that is
+      loaded once per deck and updated by record_swipe().
+    - next_cards() is keyset-paginated: the cursor is the rank key of the
+      last card the client received, so a page costs O(limit) no matter how
+      long the user's swipe history is.
+    - When a deck drops below the low-water mark it is topped up from the
+      candidate source on a background executor.
+    - A deck only pages towards lower ranks, so a first page (no cursor)
+      re-checks the head once it is `head_ttl` old: candidates ranked above
+      everything seen so far (newly published jobs) go to the front, and an
+      exhausted deck gets another look at the source. expire_heads() forces
+      that check after a publish or import.
+    """
+
+    def __init__(
+        self,
+        source: CandidateSource,
+        seen_loader: SeenLoader,
+        deck_size: int = 200,
+        low_water: int = 50,
+        max_decks: int = 10000,
+        head_ttl: float = 60.0,
+        executor: Optional[Executor] = None,
+    ):
+        self._source = source
+        self._seen_loader = seen_loader
+        self.deck_size = deck_size
+        self.low_water = low_water
+        self.max_decks = max_decks
+        self.head_ttl = head_ttl
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="deck-refill"
+        )
+        self._interner = JobIdInterner()
+        self._decks: "OrderedDict[str, _Deck]" = OrderedDict()
+        self._decks_lock = threading.Lock()
+
+    # --- Public API ---
+    def next_cards(
+        self, user_id: str, limit: int, after: Optional[str] = None
+    ) -> List[Card]:
+        """
+        Returns up to `limit` unseen cards ranked after the `after` cursor.
+        """
+        after_key = _order(decode_cursor(after)) if after else None
+        deck = self._get_deck(user_id)
+        if after_key is None:
+            # Only a first page may gain cards ranked above the queue: a
+            # cursor page would drop them as already delivered
+            with deck.lock:
+                check_head = (
+                    not deck.refilling and time.monotonic() - deck.checked_at >= self.head_ttl
+                )
+                if check_head:
+                    deck.refilling = True
+            if check_head:
+                self._check_head(user_id, deck)
+
+        cards: List[Card] = []
+        with deck.lock:
+            queue = deck.queue
+            # Everything up to the cursor has been delivered; drop it
+            while queue and (
+                queue[0][2] in deck.seen
+                or (after_key is not None and _order(queue[0][:2]) <= after_key)
+            ):
+                deck.queued.discard(queue.popleft()[2])
+
+            for score, job_id, ordinal in queue:
+                if len(cards) == limit:
+                    break
+                if ordinal not in deck.seen:
+                    cards.append(Card(job_id=job_id, score=score))
+
+            needs_refill = (
+                len(queue) < self.low_water
+                and not deck.exhausted
+                and not deck.refilling
+            )
+            if needs_refill:
+                deck.refilling = True
+
+        if needs_refill:
+            self._executor.submit(self._refill, user_id, deck)
+        return cards
+
+    def record_swipe(self, user_id: str, job_id: str) -> None:
+        """
+        Marks a job as seen so it is never served to this user again.
+        """
+        with self._decks_lock:
+            deck = self._decks.get(user_id)
+        if deck is None:
+            # The seen set is rebuilt from the swipes table when the deck loads
+            return
+        ordinal = self._interner.intern(job_id)
+        with deck.lock:
+            deck.seen.add(ordinal)
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drops a user's deck, e.g. after their match scores were recomputed.
+        """
+        with self._decks_lock:
+            self._decks.pop(user_id, None)
+
+    def expire_heads(self) -> None:
+        """
+        Makes every deck re-check its head on its next first page, e.g.
+        after jobs were published.
+        """
+        with self._decks_lock:
+            decks = list(self._decks.values())
+        for deck in decks:
+            with deck.lock:
+                deck.checked_at = float("-inf")
+
+    def evict_jobs(self, job_ids: Iterable[str]) -> int:
+        """
+        Drops jobs from every deck's queue, e.g. once they expire; the
+        candidate source stops returning them by itself.
+        Returns the number of decks that held any of them.
+        """
+        ordinals = {self._interner.get(job_id) for job_id in job_ids} - {None}
+        if not ordinals:
+            return 0
+        with self._decks_lock:
+            decks = list(self._decks.values())
+        touched = 0
+        for deck in decks:
+            with deck.lock:
+                if deck.queued.isdisjoint(ordinals):
+                    continue
+                deck.queue = deque(entry for entry in deck.queue if entry[2] not in ordinals)
+                deck.queued -= ordinals
+                touched += 1
+        return touched
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # --- Internals ---
+    def _get_deck(self, user_id: str) -> _Deck:
+        with self._decks_lock:
+            deck = self._decks.get(user_id)
+            if deck is not None:
+                self._decks.move_to_end(user_id)
+                return deck
+
+        seen = SeenSet(self._interner.intern(j) for j in self._seen_loader(user_id))
+        deck = _Deck(seen)
+        # Cold start: the first page has to be filled synchronously
+        deck.refilling = True
+        self._refill(user_id, deck)
+
+        with self._decks_lock:
+            existing = self._decks.get(user_id)
+            if existing is not None:
+                return existing
+            self._decks[user_id] = deck
+            while len(self._decks) > self.max_decks:
+                self._decks.popitem(last=False)
+        return deck
+
+    def _refill(self, user_id: str, deck: _Deck) -> None:
+        try:
+            while True:
+                with deck.lock:
+                    if len(deck.queue) >= self.deck_size or deck.exhausted:
+                        return
+                    cursor = deck.source_cursor
+
+                batch = self._source(user_id, cursor, self.deck_size)
+
+                with deck.lock:
+                    for score, job_id in batch:
+                        ordinal = self._interner.intern(job_id)
+                        if ordinal in deck.seen or ordinal in deck.queued:
+                            continue
+                        deck.queue.append((score, job_id, ordinal))
+                        deck.queued.add(ordinal)
+                    if batch:
+                        deck.source_cursor = batch[-1]
+                        if deck.head is None:
+                            deck.head = batch[0]
+                    deck.exhausted = len(batch) < self.deck_size
+        finally:
+            with deck.lock:
+                deck.refilling = False
+
+    def _check_head(self, user_id: str, deck: _Deck) -> None:
+        try:
+            batch = self._source(user_id, None, self.deck_size)
+            with deck.lock:
+                head = deck.head
+                fresh = [key for key in batch if head is None or _order(key) < _order(head)]
+                if len(fresh) == self.deck_size:
+                    # There may be more between these and the old head: start over
+                    deck.queue.clear()
+                    deck.queued.clear()
+                    deck.source_cursor = fresh[-1]
+                entries = []
+                for score, job_id in fresh:
+                    ordinal = self._interner.intern(job_id)
+                    if ordinal in deck.seen or ordinal in deck.queued:
+                        continue
+                    entries.append((score, job_id, ordinal))
+                    deck.queued.add(ordinal)
+                deck.queue.extendleft(reversed(entries))
+                if fresh:
+                    deck.head = fresh[0]
+                deck.exhausted = False
+        finally:
+            with deck.lock:
+                deck.refilling = False
+                deck.checked_at = time.monotonic()
+
+
+# ===============================
+#       DATABASE-BACKED SOURCES
+# ===============================
+def _timestamp(value: datetime) -> float:
+    # Naive datetimes from the DB are UTC, not the host's local time
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def recent_jobs_source(
+    user_id: str, after: Optional[RankKey], limit: int
+) -> List[RankKey]:
+    """
+    Active, published jobs ranked by recency, keyset-paginated on
+    (published_at DESC, id ASC).
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Job.published_at, Job.id).filter(
+            Job.job_status == JobStatus.ACTIVE,
+            Job.deleted_at.is_(None),
+            Job.published_at.isnot(None),
+        )
+        if after is not None:
+            published_at = datetime.fromtimestamp(after[0], tz=timezone.utc)
+            query = query.filter(
+                or_(
+                    Job.published_at < published_at,
+                    and_(Job.published_at == published_at, Job.id > after[1]),
+                )
+            )
+        rows = query.order_by(Job.published_at.desc(), Job.id.asc()).limit(limit)
+        return [(_timestamp(published), job_id) for published, job_id in rows]
+    finally:
+        db.close()
+
+
+def swiped_job_ids(user_id: str) -> Iterable[str]:
+    """
+    Streams the ids of every job the user has already swiped on.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Swipe.job_id).filter(Swipe.user_id == user_id)
+        for (job_id,) in query.yield_per(5000):
+            yield job_id
+    finally:
+        db.close()
+
+
+def invalidate_decks(user_ids: Iterable[str]) -> None:
+    """Drops the given users' decks if the engine is loaded in this process."""
+    if get_deck_engine.cache_info().currsize:
+        engine = get_deck_engine()
+        for user_id in user_ids:
+            engine.invalidate(user_id)
+
+
+def expire_deck_heads() -> None:
+    """Has loaded decks look for newly published jobs on their next first page."""
+    if get_deck_engine.cache_info().currsize:
+        get_deck_engine().expire_heads()
+
+
+def install_deck_sync(session_factory) -> None:
+    """
+    Expires deck heads once a commit publishes or re-activates a job.
+    """
+    pending_key = "swipe_deck_publish"
+
+    def collect(session, flush_context):
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, Job) and obj.job_status == JobStatus.ACTIVE and obj.published_at is not None:
+                if obj in session.new or any(
+                    inspect(obj).attrs[c].history.has_changes() for c in ("job_status", "published_at")
+                ):
+                    session.info[pending_key] = True
+                    return
+
+    def apply(session):
+        if session.info.pop(pending_key, None):
+            expire_deck_heads()
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(
+        session_factory,
+        "after_soft_rollback",
+        lambda session, previous: session.info.pop(pending_key, None),
+    )
+
+
+@lru_cache()
+def get_deck_engine() -> DeckEngine:
+    return DeckEngine(
+        source=recent_jobs_source,
+        seen_loader=swiped_job_ids,
+        deck_size=settings.SWIPE_DECK_SIZE,
+        low_water=settings.SWIPE_DECK_LOW_WATER,
+        max_decks=settings.SWIPE_DECK_MAX_USERS,
+        head_ttl=settings.SWIPE_DECK_HEAD_TTL_SECONDS,
+    )
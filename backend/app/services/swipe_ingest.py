@@ -0,0 +1,499 @@
+"""
+Swipe Ingestion
+Write-behind buffer for swipes: requests are acknowledged as soon as the
+swipe is buffered (and spilled to disk), and a background flusher writes
+batches with multi-row INSERTs plus one counter UPDATE per job.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.application import Swipe, SwipeDirection
+from app.models.job import Job
+from app.services.auto_apply import get_auto_apply_pipeline, requests_from_swipes
+from app.services.swipe_deck import get_deck_engine
+
+logger = logging.getLogger(__name__)
+
+# Durability modes for the spill file
+DURABILITY_MEMORY = "memory"  # no spill file; a crash loses the buffer
+DURABILITY_SPILL = "spill"  # appended and flushed to the OS on every swipe
+DURABILITY_FSYNC = "fsync"  # appended and fsynced on every swipe
+DURABILITY_MODES = (DURABILITY_MEMORY, DURABILITY_SPILL, DURABILITY_FSYNC)
+
+# The database is unreachable, not refusing the row: retry, never dead-letter
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+class BufferFull(RuntimeError):
+    """Raised when the flusher cannot keep up and the buffer stays full."""
+
+
+@dataclass
+class SwipeEvent:
+    user_id: str
+    job_id: str
+    swipe_direction: str
+    swipe_timestamp: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    time_spent_viewing: Optional[int] = None
+    device_type: Optional[str] = None
+    session_id: Optional[str] = None
+    swipe_context: Dict = field(default_factory=dict)
+    match_score: Optional[float] = None
+
+    def to_row(self) -> Dict:
+        row = asdict(self)
+        row["swipe_timestamp"] = datetime.fromisoformat(self.swipe_timestamp)
+        row["swipe_direction"] = SwipeDirection(self.swipe_direction)
+        return row
+
+
+# ===============================
+#       SPILL FILE
+# ===============================
+class SpillLog:
+    """
+    Append-only JSON-lines segments holding swipes not yet committed.
+
+    The active segment is rotated at the start of every flush; a rotated
+    segment is deleted once its swipes are committed. Whatever segments are
+    left on disk at startup are replayed. Swipes the database refuses are
+    appended to dead-letter.jsonl for inspection and are never replayed.
+    """
+
+    def __init__(self, directory: str, fsync: bool = False):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        existing = self.segments()
+        self._sequence = self._sequence_of(existing[-1]) + 1 if existing else 0
+        self._file = self._open()
+
+    def segments(self) -> List[str]:
+        return sorted(
+            glob.glob(os.path.join(self.directory, "swipes-*.jsonl")),
+            key=self._sequence_of,
+        )
+
+    @staticmethod
+    def _sequence_of(path: str) -> int:
+        return int(os.path.basename(path)[len("swipes-") : -len(".jsonl")])
+
+    def _open(self):
+        path = os.path.join(self.directory, f"swipes-{self._sequence:012d}.jsonl")
+        return open(path, "a", encoding="utf-8")
+
+    @property
+    def active_path(self) -> str:
+        return self._file.name
+
+    def append(self, event: SwipeEvent) -> None:
+        self._file.write(json.dumps(asdict(event), separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def rotate(self) -> str:
+        """Closes the active segment and returns its path."""
+        closed = self._file.name
+        self._file.close()
+        self._sequence += 1
+        self._file = self._open()
+        return closed
+
+    @staticmethod
+    def read(path: str) -> List[SwipeEvent]:
+        events = []
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    events.append(SwipeEvent(**json.loads(line)))
+                except (ValueError, TypeError):
+                    # A torn final line from a crash mid-write
+                    logger.warning("Skipping unreadable spill line in %s", path)
+        return events
+
+    def dead_letter(self, events: List[SwipeEvent], reason: str) -> None:
+        path = os.path.join(self.directory, "dead-letter.jsonl")
+        with open(path, "a", encoding="utf-8") as handle:
+            for event in events:
+                record = {"reason": reason, "swipe": asdict(event)}
+                handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+        if os.path.getsize(self._file.name) == 0:
+            os.remove(self._file.name)
+
+
+# ===============================
+#       BATCH WRITER
+# ===============================
+def _counter_deltas(events: List[SwipeEvent]) -> List[Dict]:
+    deltas: Dict[str, List[int]] = {}
+    for event in events:
+        counts = deltas.setdefault(event.job_id, [0, 0])
+        counts[1 if event.swipe_direction == SwipeDirection.LEFT.value else 0] += 1
+    # Sorted so concurrent flushers always lock job rows in the same order
+    return [
+        {"b_job_id": job_id, "b_right": right, "b_left": left}
+        for job_id, (right, left) in sorted(deltas.items())
+    ]
+
+
+def write_swipes(
+    db: Session, events: List[SwipeEvent], skip_existing: bool = False
+) -> int:
+    """
+    Inserts a batch of swipes and applies the coalesced per-job counter
+    deltas. With `skip_existing`, swipes whose id is already stored are
+    dropped first, so replaying a spill segment never double-counts.
+    Does not commit.
+    """
+    if skip_existing and events:
+        stored = {
+            swipe_id
+            for (swipe_id,) in db.query(Swipe.id).filter(
+                Swipe.id.in_([event.id for event in events])
+            )
+        }
+        events = [event for event in events if event.id not in stored]
+    if not events:
+        return 0
+
+    db.execute(insert(Swipe.__table__), [event.to_row() for event in events])
+
+    jobs = Job.__table__
+    db.execute(
+        update(jobs)
+        .where(jobs.c.id == bindparam("b_job_id"))
+        .values(
+            swipe_right_count=func.coalesce(jobs.c.swipe_right_count, 0)
+            + bindparam("b_right"),
+            swipe_left_count=func.coalesce(jobs.c.swipe_left_count, 0)
+            + bindparam("b_left"),
+            # Counters are not job content: keep updated_at (and the job's
+            # ETag) stable instead of letting onupdate bump it every flush
+            updated_at=jobs.c.updated_at,
+        ),
+        _counter_deltas(events),
+    )
+    return len(events)
+
+
+def drop_orphans(db: Session, events: List[SwipeEvent]) -> List[SwipeEvent]:
+    """
+    Filters out swipes on jobs that no longer exist.
+    """
+    job_ids = {event.job_id for event in events}
+    existing = {
+        job_id for (job_id,) in db.query(Job.id).filter(Job.id.in_(list(job_ids)))
+    }
+    dropped = len(job_ids - existing)
+    if dropped:
+        logger.warning("Dropping swipes on %d unknown jobs", dropped)
+    return [event for event in events if event.job_id in existing]
+
+
+def write_each(
+    db: Session,
+    events: List[SwipeEvent],
+    written: List[SwipeEvent],
+    rejected: List[SwipeEvent],
+) -> None:
+    """
+    Writes swipes one per transaction, after their batch failed. Each lands
+    in `written` or, if the database refuses it, in `rejected`. A transient
+    error propagates; the swipes in neither list are still unwritten.
+    """
+    for event in events:
+        try:
+            write_swipes(db, [event], skip_existing=True)
+            db.commit()
+        except TRANSIENT_ERRORS:
+            db.rollback()
+            raise
+        except Exception:
+            db.rollback()
+            logger.warning("Swipe %s rejected by the database", event.id, exc_info=True)
+            rejected.append(event)
+        else:
+            written.append(event)
+
+
+def write_batch(
+    db: Session,
+    batch: List[SwipeEvent],
+    written: List[SwipeEvent],
+    rejected: List[SwipeEvent],
+    skip_existing: bool = False,
+) -> None:
+    """
+    Writes a batch in one transaction if the database accepts it, falling
+    back to write_each() if it does not. Commits.
+    """
+    for retry in (False, True):
+        if retry:
+            batch = drop_orphans(db, batch)
+        try:
+            write_swipes(db, batch, skip_existing=skip_existing)
+            db.commit()
+        except TRANSIENT_ERRORS:
+            db.rollback()
+            raise
+        except IntegrityError:
+            # Swipes on deleted jobs are the usual culprit: drop them and retry
+            db.rollback()
+            continue
+        except Exception:
+            db.rollback()
+            break
+        written.extend(batch)
+        return
+    write_each(db, batch, written, rejected)
+
+
+class SwipeBuffer:
+    """
+    Buffers swipes in memory and flushes them every `flush_interval` seconds
+    or as soon as `max_batch` swipes are waiting, whichever comes first.
+
+    With a spill log, every swipe is on disk before submit() returns, so a
+    crash between acknowledgement and flush loses nothing.
+
+    A batch the database refuses is retried one swipe at a time, and the
+    swipes that still fail are dead-lettered, so one bad row never holds up
+    the rest. Only transient errors put a batch back in the buffer.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = 0.2,
+        max_batch: int = 1000,
+        max_pending: int = 50000,
+        spill: Optional[SpillLog] = None,
+        on_swipe: Optional[Callable[[SwipeEvent], None]] = None,
+        on_flushed: Optional[Callable[[List[SwipeEvent]], None]] = None,
+    ):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._spill = spill
+        self._on_swipe = on_swipe
+        self._on_flushed = on_flushed
+        self._pending: List[SwipeEvent] = []
+        self._segments: List[str] = []  # rotated spill segments awaiting commit
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.total_flushed = 0
+        self.total_batches = 0
+        self.total_errors = 0
+        self.total_dead_lettered = 0
+
+    # --- Lifecycle ---
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self.recover()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="swipe-flush", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        if self._spill is not None:
+            self._spill.close()
+
+    def recover(self) -> int:
+        """
+        Replays spill segments left behind by a previous process. A segment
+        the database refuses is replayed swipe by swipe; if the database is
+        unreachable, the remaining segments stay on disk for the next start.
+        """
+        if self._spill is None:
+            return 0
+        recovered = 0
+        for path in self._spill.segments():
+            if path == self._spill.active_path:
+                continue
+            events = SpillLog.read(path)
+            written: List[SwipeEvent] = []
+            rejected: List[SwipeEvent] = []
+            db = self._session_factory()
+            try:
+                write_batch(db, events, written, rejected, skip_existing=True)
+            except TRANSIENT_ERRORS:
+                logger.exception("Spill replay stopped; %s and later segments are kept", path)
+                self.total_errors += 1
+                break
+            finally:
+                db.close()
+            recovered += len(written)
+            self._dead_letter(rejected, f"replay of {os.path.basename(path)}")
+            os.remove(path)
+        if recovered:
+            logger.info("Recovered %d swipes from the spill log", recovered)
+        return recovered
+
+    def _dead_letter(self, events: List[SwipeEvent], reason: str) -> None:
+        if not events:
+            return
+        self.total_dead_lettered += len(events)
+        if self._spill is not None:
+            self._spill.dead_letter(events, reason)
+        for event in events:
+            logger.error("Dead-lettered swipe (%s): %s", reason, json.dumps(asdict(event)))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                if len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Swipe flush failed")
+                self.total_errors += 1
+                self._stop.wait(self.flush_interval)
+
+    # --- Ingestion ---
+    def submit(self, event: SwipeEvent, timeout: float = 5.0) -> SwipeEvent:
+        """
+        Buffers a swipe. Blocks while the buffer is over `max_pending` and
+        raises BufferFull if it does not drain within `timeout` seconds.
+        """
+        with self._cond:
+            deadline = time.monotonic() + timeout
+            while len(self._pending) >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise BufferFull("Swipe buffer is full")
+                self._cond.notify_all()
+                self._cond.wait(remaining)
+            if self._spill is not None:
+                self._spill.append(event)
+            self._pending.append(event)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+        if self._on_swipe is not None:
+            self._on_swipe(event)
+        return event
+
+    def flush(self) -> int:
+        """
+        Writes everything buffered so far in one transaction, or swipe by
+        swipe if the database refuses the batch. On a transient error the
+        unwritten swipes go back to the front of the buffer.
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+                if batch and self._spill is not None:
+                    self._segments.append(self._spill.rotate())
+                self._cond.notify_all()
+            if not batch:
+                return 0
+
+            db = self._session_factory()
+            written: List[SwipeEvent] = []
+            rejected: List[SwipeEvent] = []
+            try:
+                write_batch(db, batch, written, rejected)
+            except TRANSIENT_ERRORS:
+                done = {event.id for event in written + rejected}
+                with self._cond:
+                    self._pending[:0] = [event for event in batch if event.id not in done]
+                self._finish(written, rejected, clear_segments=False)
+                raise
+            finally:
+                db.close()
+            return self._finish(written, rejected, clear_segments=True)
+
+    def _finish(self, written: List[SwipeEvent], rejected: List[SwipeEvent], clear_segments: bool) -> int:
+        self._dead_letter(rejected, "flush")
+        if clear_segments:
+            for path in self._segments:
+                os.remove(path)
+            self._segments.clear()
+        self.total_flushed += len(written)
+        self.total_batches += 1
+        if self._on_flushed is not None and written:
+            try:
+                self._on_flushed(written)
+            except Exception:
+                # Follow-up work must never fail a committed flush
+                logger.exception("Post-flush hook failed")
+        return len(written)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "total_flushed": self.total_flushed,
+            "total_batches": self.total_batches,
+            "total_errors": self.total_errors,
+            "total_dead_lettered": self.total_dead_lettered,
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+def _record_in_deck(event: SwipeEvent) -> None:
+    # The deck must stop serving the job before the swipe reaches the DB
+    get_deck_engine().record_swipe(event.user_id, event.job_id)
+
+
+def _queue_auto_apply(events: List[SwipeEvent]) -> None:
+    # Runs on the flush thread, after commit: the swipe request never waits
+    get_auto_apply_pipeline().enqueue(requests_from_swipes(events))
+
+
+@lru_cache()
+def get_swipe_buffer() -> SwipeBuffer:
+    if settings.SWIPE_DURABILITY not in DURABILITY_MODES:
+        raise ValueError(f"Unknown SWIPE_DURABILITY: {settings.SWIPE_DURABILITY}")
+    spill = None
+    if settings.SWIPE_DURABILITY != DURABILITY_MEMORY:
+        spill = SpillLog(
+            settings.SWIPE_SPILL_DIR,
+            fsync=settings.SWIPE_DURABILITY == DURABILITY_FSYNC,
+        )
+    return SwipeBuffer(
+        session_factory=SessionLocal,
+        flush_interval=settings.SWIPE_FLUSH_INTERVAL_MS / 1000.0,
+        max_batch=settings.SWIPE_FLUSH_MAX_ROWS,
+        max_pending=settings.SWIPE_BUFFER_MAX_ROWS,
+        spill=spill,
+        on_swipe=_record_in_deck,
+        on_flushed=_queue_auto_apply if settings.ENABLE_AUTO_APPLY else None,
+    )
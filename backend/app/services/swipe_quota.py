@@ -0,0 +1,182 @@
+"""
+Daily Swipe Quota
+Enforces UserPreferences.daily_swipe_limit without counting swipes in SQL:
+each swipe takes one unit from a per-user counter for the user's local day
+(app.core.rate_limit.DailyQuota), which rolls over at midnight in
+UserPreferences.timezone.
+
+A user's limit and timezone are read once and kept in a small TTL'd LRU.
+Committed preference changes drop the entry in this process; other
+processes pick the change up within SWIPE_QUOTA_POLICY_TTL_SECONDS.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timezone, tzinfo
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.rate_limit import DailyQuota, Decision, get_rate_limit_backend
+from app.models.auth import UserPreferences
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "swipe_quota_users"
+_TRACKED_COLUMNS = ("daily_swipe_limit", "timezone")
+
+
+@dataclass(frozen=True)
+class QuotaPolicy:
+    limit: Optional[int]  # None: unlimited
+    timezone: tzinfo
+
+
+def parse_limit(value, default: Optional[int]) -> Optional[int]:
+    """daily_swipe_limit is free text; anything but a positive integer means no limit."""
+    if value is None:
+        return default
+    try:
+        limit = int(str(value).strip())
+    except ValueError:
+        return None
+    return limit if limit > 0 else None
+
+
+def parse_timezone(name: Optional[str], default: tzinfo) -> tzinfo:
+    if not name:
+        return default
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("Unknown timezone %r, using the default", name)
+        return default
+
+
+class SwipeQuota:
+    """Per-user daily swipe counters plus the cached policy behind them."""
+
+    def __init__(
+        self,
+        quota: DailyQuota,
+        session_factory: Callable[[], Session] = SessionLocal,
+        default_limit: Optional[int] = 50,
+        default_timezone: tzinfo = timezone.utc,
+        policy_ttl: float = 300.0,
+        max_policies: int = 100000,
+    ):
+        self.quota = quota
+        self._session_factory = session_factory
+        self.default_limit = default_limit
+        self.default_timezone = default_timezone
+        self.policy_ttl = policy_ttl
+        self.max_policies = max_policies
+        self._policies: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (policy, expires_at)
+        self._lock = threading.Lock()
+        self.policy_loads = 0
+
+    def policy(self, user_id: str) -> QuotaPolicy:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._policies.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._policies.move_to_end(user_id)
+                return entry[0]
+        policy = self._load(user_id)
+        with self._lock:
+            self._policies[user_id] = (policy, now + self.policy_ttl)
+            self._policies.move_to_end(user_id)
+            while len(self._policies) > self.max_policies:
+                self._policies.popitem(last=False)
+        return policy
+
+    def _load(self, user_id: str) -> QuotaPolicy:
+        self.policy_loads += 1
+        db = self._session_factory()
+        try:
+            row = db.execute(
+                select(UserPreferences.daily_swipe_limit, UserPreferences.timezone).where(
+                    UserPreferences.user_id == user_id
+                )
+            ).first()
+        finally:
+            db.close()
+        if row is None:
+            return QuotaPolicy(self.default_limit, self.default_timezone)
+        return QuotaPolicy(
+            parse_limit(row.daily_swipe_limit, self.default_limit),
+            parse_timezone(row.timezone, self.default_timezone),
+        )
+
+    def consume(self, user_id: str) -> Optional[Decision]:
+        """Takes one swipe from today's quota; None when the user has no limit."""
+        policy = self.policy(user_id)
+        if policy.limit is None:
+            return None
+        return self.quota.consume(user_id, policy.limit, policy.timezone)
+
+    def release(self, user_id: str) -> None:
+        """Returns a swipe taken by consume() that was never recorded."""
+        policy = self.policy(user_id)
+        if policy.limit is not None:
+            self.quota.release(user_id, policy.timezone)
+
+    def invalidate(self, user_ids: Iterable[str]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._policies.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            cached = len(self._policies)
+        return {"policies": cached, "policy_loads": self.policy_loads, **self.quota.stats()}
+
+
+def install_quota_sync(session_factory, quota_getter) -> None:
+    """
+    Drops the cached policy of users whose swipe limit or timezone changed
+    in a committed transaction.
+    """
+
+    def collect(session, flush_context):
+        touched = session.info.setdefault(_PENDING_KEY, set())
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, UserPreferences):
+                touched.add(obj.user_id)
+        for obj in session.dirty:
+            if isinstance(obj, UserPreferences):
+                state = inspect(obj)
+                if any(state.attrs[c].history.has_changes() for c in _TRACKED_COLUMNS):
+                    touched.add(obj.user_id)
+
+    def apply(session):
+        touched = session.info.pop(_PENDING_KEY, None)
+        if touched:
+            quota_getter().invalidate(touched)
+
+    event.listen(session_factory, "after_flush", collect)
+    event.listen(session_factory, "after_commit", apply)
+    event.listen(
+        session_factory,
+        "after_soft_rollback",
+        lambda session, previous: session.info.pop(_PENDING_KEY, None),
+    )
+
+
+@lru_cache()
+def get_swipe_quota() -> SwipeQuota:
+    return SwipeQuota(
+        DailyQuota(get_rate_limit_backend(), "daily_swipes", namespace=settings.CACHE_NAMESPACE),
+        default_limit=settings.SWIPE_DAILY_LIMIT_DEFAULT or None,
+        default_timezone=parse_timezone(settings.DEFAULT_TIMEZONE, timezone.utc),
+        policy_ttl=settings.SWIPE_QUOTA_POLICY_TTL_SECONDS,
+        max_policies=settings.SWIPE_QUOTA_POLICY_MAX_ENTRIES,
+    )
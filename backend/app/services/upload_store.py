@@ -0,0 +1,350 @@
+"""
+Upload Store
+Resume uploads, streamed to disk and stored by content. A request body is
+never held in memory: it passes through in chunks, and each chunk is hashed
+and appended to a temporary file before the next is read.
+
+- MAX_UPLOAD_SIZE is enforced as the bytes arrive, so an oversized upload is
+  cut off at the limit rather than after it has been received.
+- The file type is sniffed from its first bytes (PDF, DOCX, DOC or UTF-8
+  text) and checked against ALLOWED_EXTENSIONS. The filename the client
+  sent is not trusted. A disallowed type is refused as soon as the first
+  few kilobytes are in.
+- Finished files are renamed to objects/<sha256[:2]>/<sha256>.<ext> under
+  UPLOAD_DIR. The same file uploaded again, by anyone, is discarded in
+  favour of the stored copy, so duplicates cost no disk. Stored files are
+  immutable and shared: rows point at them and nothing deletes them.
+- Hashing and disk writes run on the store's own small thread pool, off the
+  event loop and out of the request threadpool.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 8192
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "doc": "application/msword",
+    "txt": "text/plain; charset=utf-8",
+}
+
+UPLOADS = registry.counter(
+    "swipehire_uploads_total",
+    "Uploads by result (stored, deduplicated, too_large, unsupported, invalid, aborted).",
+    ("result",),
+)
+
+_KEY = re.compile(r"^objects/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z]{2,5}$")
+_OLE2 = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+
+class UploadRejected(Exception):
+    status_code = 400
+    result = "invalid"
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class UploadTooLarge(UploadRejected):
+    status_code = 413
+    result = "too_large"
+
+
+class UnsupportedFileType(UploadRejected):
+    status_code = 415
+    result = "unsupported"
+
+
+def sniff(head: bytes, complete: bool) -> Optional[str]:
+    """
+    The extension the leading bytes belong to: pdf, docx (a ZIP, confirmed
+    once the file is complete), doc or txt. None while undecided, or when
+    `complete` and nothing matches.
+    """
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    if head.startswith(_OLE2):
+        return "doc"
+    if len(head) < SNIFF_BYTES and not complete:
+        return None
+    if b"\x00" in head:
+        return None
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        # A multi-byte character cut off at the end of the sample is fine
+        if exc.start < len(head) - 3 or exc.reason != "unexpected end of data":
+            return None
+    return "txt"
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    key: str  # objects/ab/<sha256>.<ext>, relative to the store root
+    sha256: str
+    size: int
+    extension: str
+    deduplicated: bool
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.extension]
+
+
+class _Ingest:
+    """One upload on its way to disk. Not thread-safe; the store calls it one chunk at a time."""
+
+    def __init__(self, store: "UploadStore"):
+        self.store = store
+        self.fd, self.tmp_path = tempfile.mkstemp(dir=store.tmp_dir, prefix="upload-")
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.head = b""
+        self.extension: Optional[str] = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.store.max_bytes:
+            raise UploadTooLarge(f"File is larger than {self.store.max_bytes} bytes")
+        self.digest.update(chunk)
+        view = memoryview(chunk)
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+        if self.extension is None and len(self.head) < SNIFF_BYTES:
+            self.head += chunk[: SNIFF_BYTES - len(self.head)]
+            self._check_type(complete=False)
+
+    def _check_type(self, complete: bool) -> None:
+        extension = sniff(self.head, complete)
+        if extension is None:
+            if complete or len(self.head) >= SNIFF_BYTES:
+                raise UnsupportedFileType("Unrecognised file type")
+            return
+        if extension not in self.store.allowed:
+            raise UnsupportedFileType(f"{extension} files are not accepted")
+        self.extension = extension
+
+    def finish(self) -> StoredFile:
+        if self.size == 0:
+            raise UploadRejected("Empty upload")
+        if self.extension is None:
+            self._check_type(complete=True)
+        os.fsync(self.fd)
+        os.close(self.fd)
+        self.fd = None
+        if self.extension == "docx" and not _is_docx(self.tmp_path):
+            raise UnsupportedFileType("ZIP archives other than .docx are not accepted")
+        sha256 = self.digest.hexdigest()
+        key = f"objects/{sha256[:2]}/{sha256}.{self.extension}"
+        path = self.store.path(key)
+        deduplicated = os.path.exists(path)
+        if deduplicated:
+            os.remove(self.tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.tmp_path, path)
+        return StoredFile(key, sha256, self.size, self.extension, deduplicated)
+
+    def abort(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _is_docx(path: str) -> bool:
+    # Reads only the archive's central directory, not the whole file
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+    except zipfile.BadZipFile:
+        return False
+    return "word/document.xml" in names and "[Content_Types].xml" in names
+
+
+class UploadStore:
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int,
+        allowed: Iterable[str],
+        io_threads: int = 4,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.allowed = {extension.lower().lstrip(".") for extension in allowed}
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="upload-io")
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {
+            "stored": 0, "deduplicated": 0, "too_large": 0, "unsupported": 0, "invalid": 0, "aborted": 0,
+        }
+        self.bytes_received = 0
+        self.bytes_stored = 0
+
+    def path(self, key: str) -> str:
+        if not _KEY.match(key):
+            raise ValueError(f"Not an upload key: {key!r}")
+        return os.path.join(self.root, key)
+
+    @staticmethod
+    def owns(file_url: Optional[str]) -> bool:
+        """Whether a stored file_url / resume_url is a key of this store."""
+        return bool(file_url) and bool(_KEY.match(file_url))
+
+    async def _run(self, fn: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def save(self, chunks: AsyncIterator[bytes]) -> StoredFile:
+        """
+        Streams `chunks` into the store. Raises an UploadRejected subclass
+        (nothing is kept) when the upload is too large, of the wrong type or
+        empty.
+        """
+        ingest = await self._run(_Ingest, self)
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    await self._run(ingest.write, chunk)
+            stored = await self._run(ingest.finish)
+        except UploadRejected as exc:
+            ingest.abort()
+            self._count(exc.result, ingest.size)
+            raise
+        except BaseException:
+            ingest.abort()  # client went away, or the request was cancelled
+            self._count("aborted", ingest.size)
+            raise
+        self._count("deduplicated" if stored.deduplicated else "stored", stored.size)
+        if not stored.deduplicated:
+            with self._lock:
+                self.bytes_stored += stored.size
+        return stored
+
+    def _count(self, result: str, received: int) -> None:
+        with self._lock:
+            self._counts[result] += 1
+            self.bytes_received += received
+        UPLOADS.inc((result,))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counts)
+            stats["bytes_received"] = self.bytes_received
+            stats["bytes_stored"] = self.bytes_stored
+        return stats
+
+
+# ===============================
+#       MULTIPART
+# ===============================
+class MultipartFile:
+    """
+    The first file field of a multipart/form-data body, parsed as the body
+    streams in. Other fields are skipped. `filename` is known once the
+    file's part headers have been read.
+    """
+
+    def __init__(self, body: AsyncIterator[bytes], content_type: str):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise UploadRejected("Missing multipart boundary")
+        self.filename: Optional[str] = None
+        self._body = body
+        self._pieces: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._in_file = False
+        self._seen_file = False
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"filename" in params and not self._seen_file:
+            self._in_file = self._seen_file = True
+            self.filename = params[b"filename"].decode("utf-8", "replace")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._pieces.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file = False
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        async for chunk in self._body:
+            self._parser.write(chunk)
+            # Only slices of the chunk just written are ever held
+            for piece in self._pieces:
+                yield piece
+            self._pieces.clear()
+        self._parser.finalize()
+        if not self._seen_file:
+            raise UploadRejected("No file in the form")
+
+
+@lru_cache()
+def get_upload_store() -> UploadStore:
+    return UploadStore(
+        settings.UPLOAD_DIR,
+        settings.MAX_UPLOAD_SIZE,
+        settings.ALLOWED_EXTENSIONS,
+        io_threads=settings.UPLOAD_IO_THREADS,
+    )
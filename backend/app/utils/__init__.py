@@ -0,0 +1 @@
+# SwipeHire shared utilities
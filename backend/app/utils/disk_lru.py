@@ -0,0 +1,133 @@
+"""
+Disk LRU
+Byte values stored one file per key under a directory, with the least
+recently used files evicted once their total size passes a budget.
+
+Writes go to a temporary file first and are renamed into place, so readers
+never see a partial value. Several processes may share a directory. Each
+keeps its own recency index and picks up the others' files on demand, so
+the budget is enforced per process and a file another process removed is
+simply a miss.
+"""
+
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+_VALID_KEY = re.compile(r"^[A-Za-z0-9_-]{3,128}$")
+
+
+class DiskLRU:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        if not _VALID_KEY.match(key):
+            raise ValueError(f"Invalid cache key {key!r}")
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load_index(self) -> None:
+        """Rebuilds the recency order from modification times (bumped on every hit)."""
+        found = []
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.startswith("."):
+                    continue  # an interrupted write
+                try:
+                    stat = os.stat(os.path.join(shard_dir, name))
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, name, stat.st_size))
+        for _, key, size in sorted(found):
+            self._sizes[key] = size
+            self.total_bytes += size
+        with self._lock:
+            self._evict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                value = handle.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                size = self._sizes.pop(key, None)
+                if size is not None:
+                    self.total_bytes -= size
+            return None
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+            else:  # written by another process
+                self._sizes[key] = len(value)
+                self.total_bytes += len(value)
+                self._evict()
+        return value
+
+    def put(self, key: str, value: bytes) -> bool:
+        """Stores the value; False when it alone is over the budget."""
+        if len(value) > self.max_bytes:
+            return False
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(value)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self.total_bytes += len(value) - self._sizes.pop(key, 0)
+            self._sizes[key] = len(value)
+            self._evict()
+        return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            size = self._sizes.pop(key, None)
+            if size is not None:
+                self.total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        # Called with the lock held
+        while self.total_bytes > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._sizes),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,430 @@
+"""
+Documents
+Turns the small HTML subset resume templates are written in into plain
+text, PDF and DOCX without a browser or office suite:
+
+    <h1> title   <h2> section heading   <h3> entry heading
+    <p> paragraph   <li> bullet   class="meta" on any of them: small, grey
+    <b>/<strong>, <i>/<em>, <br>;  <head>, <style> and <script> are skipped
+
+Text is laid out once with the metrics of the PDF standard fonts
+(Helvetica), which gives the PDF its pages and every format its
+page count. Output is deterministic: the same HTML and page setup always
+produce the same bytes.
+"""
+
+import re
+import textwrap
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from io import BytesIO
+from typing import List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+# Helvetica advance widths (1/1000 em) for ASCII 32..126
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_BOLD_FACTOR = 1.07  # Helvetica-Bold runs about this much wider
+
+PAGE_SIZES = {"letter": (612.0, 792.0), "a4": (595.28, 841.89)}  # points
+
+_SPACES = re.compile(r"\s+")
+
+
+# ===============================
+#       PARSING
+# ===============================
+@dataclass
+class Run:
+    text: str
+    bold: bool = False
+    italic: bool = False
+
+
+@dataclass
+class Block:
+    style: str  # title | heading | subheading | paragraph | bullet
+    runs: List[Run] = field(default_factory=list)
+    meta: bool = False
+
+    @property
+    def text(self) -> str:
+        return "".join(run.text for run in self.runs).strip()
+
+
+_BLOCK_STYLES = {"h1": "title", "h2": "heading", "h3": "subheading", "p": "paragraph", "li": "bullet"}
+_SKIPPED = {"head", "style", "script", "title"}
+
+
+class _Parser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Block] = []
+        self._block: Optional[Block] = None
+        self._bold = 0
+        self._italic = 0
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED:
+            self._skip += 1
+        elif tag in _BLOCK_STYLES:
+            self._close()
+            classes = (dict(attrs).get("class") or "").split()
+            self._block = Block(_BLOCK_STYLES[tag], meta="meta" in classes)
+        elif tag in ("b", "strong"):
+            self._bold += 1
+        elif tag in ("i", "em"):
+            self._italic += 1
+        elif tag == "br" and self._block is not None:
+            self._block.runs.append(Run("\n"))
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED:
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_STYLES:
+            self._close()
+        elif tag in ("b", "strong"):
+            self._bold = max(0, self._bold - 1)
+        elif tag in ("i", "em"):
+            self._italic = max(0, self._italic - 1)
+
+    def handle_data(self, data):
+        if self._skip or self._block is None:
+            return
+        text = _SPACES.sub(" ", data)
+        if text.strip() or (self._block.runs and text == " "):
+            self._block.runs.append(Run(text, bool(self._bold), bool(self._italic)))
+
+    def _close(self):
+        if self._block is not None and self._block.text:
+            runs = self._block.runs
+            runs[0].text = runs[0].text.lstrip()
+            runs[-1].text = runs[-1].text.rstrip()
+            self.blocks.append(self._block)
+        self._block = None
+
+
+def parse_html(html: str) -> List[Block]:
+    parser = _Parser()
+    parser.feed(html)
+    parser.close()
+    parser._close()
+    return parser.blocks
+
+
+def word_count(blocks: List[Block]) -> int:
+    return sum(len(block.text.split()) for block in blocks)
+
+
+# ===============================
+#       LAYOUT
+# ===============================
+@dataclass(frozen=True)
+class PageSetup:
+    size: str = "letter"
+    margin: float = 54.0  # points
+    font_size: float = 10.5
+    accent: Tuple[float, float, float] = (0.12, 0.31, 0.47)
+
+    @property
+    def width(self) -> float:
+        return PAGE_SIZES[self.size][0]
+
+    @property
+    def height(self) -> float:
+        return PAGE_SIZES[self.size][1]
+
+
+# style: (size factor, bold, space before in lines, indent in points)
+_STYLES = {
+    "title": (2.0, True, 0.0, 0.0),
+    "heading": (1.25, True, 1.0, 0.0),
+    "subheading": (1.05, True, 0.6, 0.0),
+    "paragraph": (1.0, False, 0.3, 0.0),
+    "bullet": (1.0, False, 0.15, 14.0),
+}
+_LEADING = 1.3
+_BULLET = "•"
+
+
+@dataclass
+class Line:
+    x: float
+    y: float  # baseline, from the bottom of the page
+    size: float
+    segments: List[Tuple[str, bool, bool]]  # (text, bold, italic)
+    grey: bool = False
+    accent: bool = False
+    rule: bool = False  # a line under it, across the text width
+
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    units = 0
+    for char in text:
+        code = ord(char)
+        units += _HELVETICA[code - 32] if 32 <= code < 127 else 556
+    return units * size / 1000 * (_BOLD_FACTOR if bold else 1.0)
+
+
+def _wrap(runs: List[Run], size: float, bold: bool, width: float) -> List[List[Tuple[str, bool, bool]]]:
+    """Greedy word wrap of styled runs into lines of (text, bold, italic) segments."""
+    words: List[Tuple[str, bool, bool, bool]] = []  # (word, bold, italic, space before)
+    space_pending = False
+    for run in runs:
+        if run.text == "\n":
+            words.append(("\n", False, False, False))
+            space_pending = False
+            continue
+        pieces = run.text.split(" ")
+        for i, piece in enumerate(pieces):
+            if i:
+                space_pending = True
+            if piece:
+                words.append((piece, bold or run.bold, run.italic, space_pending))
+                space_pending = False
+
+    lines: List[List[Tuple[str, bool, bool]]] = [[]]
+    used = 0.0
+    for word, word_bold, italic, space in words:
+        if word == "\n":
+            lines.append([])
+            used = 0.0
+            continue
+        gap = text_width(" ", size) if space and lines[-1] else 0.0
+        advance = text_width(word, size, word_bold)
+        if lines[-1] and used + gap + advance > width:
+            lines.append([])
+            used, gap = 0.0, 0.0
+        segment = (" " if gap else "") + word
+        current = lines[-1]
+        if current and current[-1][1:] == (word_bold, italic):
+            current[-1] = (current[-1][0] + segment, word_bold, italic)
+        else:
+            current.append((segment, word_bold, italic))
+        used += gap + advance
+    return [line for line in lines if line]
+
+
+def layout(blocks: List[Block], page: PageSetup) -> List[List[Line]]:
+    """The blocks set on pages: one list of lines per page."""
+    pages: List[List[Line]] = [[]]
+    top = page.height - page.margin
+    y = top
+    text_width_max = page.width - 2 * page.margin
+    for index, block in enumerate(blocks):
+        factor, bold, before, indent = _STYLES[block.style]
+        size = page.font_size * (0.9 if block.meta else factor)
+        leading = size * _LEADING
+        wrapped = _wrap(block.runs, size, bold, text_width_max - indent)
+        if index and pages[-1]:
+            y -= before * page.font_size * _LEADING
+        # Keep headings with at least the first line of what follows them
+        needed = leading * (2 if block.style in ("heading", "subheading") else 1)
+        for number, segments in enumerate(wrapped):
+            if y - (needed if number == 0 else leading) < page.margin:
+                pages.append([])
+                y = top
+            y -= leading
+            line = Line(
+                x=page.margin + indent,
+                y=y + (leading - size),
+                size=size,
+                segments=segments,
+                grey=block.meta,
+                accent=block.style in ("title", "heading") and not block.meta,
+                rule=block.style == "heading" and number == len(wrapped) - 1,
+            )
+            if block.style == "bullet" and number == 0:
+                line.segments = [(_BULLET + " ", False, False)] + segments
+                line.x -= text_width(_BULLET + " ", size)
+            pages[-1].append(line)
+        if block.style == "heading":
+            y -= size * 0.35
+    return pages
+
+
+# ===============================
+#       WRITERS
+# ===============================
+def to_text(blocks: List[Block], width: int = 78) -> str:
+    out: List[str] = []
+    for block in blocks:
+        text = "\n".join(_SPACES.sub(" ", part).strip() for part in block.text.split("\n"))
+        if block.style == "title":
+            out.append(text)
+        elif block.style == "heading":
+            out.extend(("", text.upper(), "-" * min(width, len(text))))
+        elif block.style == "subheading":
+            out.extend(("", text))
+        elif block.style == "bullet":
+            out.append(textwrap.fill(text, width, initial_indent="  - ", subsequent_indent="    "))
+        else:
+            out.append("\n".join(textwrap.fill(part, width) for part in text.split("\n")))
+    return "\n".join(out).strip() + "\n"
+
+
+def _pdf_text(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+_FONTS = {(False, False): b"F1", (True, False): b"F2", (False, True): b"F3", (True, True): b"F4"}
+_FONT_NAMES = (b"Helvetica", b"Helvetica-Bold", b"Helvetica-Oblique", b"Helvetica-BoldOblique")
+
+
+def to_pdf(pages: List[List[Line]], page: PageSetup, title: str = "") -> bytes:
+    """A PDF 1.4 file using the standard fonts (nothing embedded)."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in below
+    pages_id = add(b"")
+    font_ids = [
+        add(b"<< /Type /Font /Subtype /Type1 /BaseFont /" + name + b" /Encoding /WinAnsiEncoding >>")
+        for name in _FONT_NAMES
+    ]
+    fonts = b" ".join(b"/F%d %d 0 R" % (i + 1, font_id) for i, font_id in enumerate(font_ids))
+    accent = b"%.3f %.3f %.3f" % page.accent
+    kids = []
+    for lines in pages:
+        ops = []
+        for line in lines:
+            color = b"0.4 0.4 0.4" if line.grey else accent if line.accent else b"0 0 0"
+            ops.append(color + b" rg BT 1 0 0 1 %.2f %.2f Tm" % (line.x, line.y))
+            for text, bold, italic in line.segments:
+                ops.append(b"/%s %.2f Tf (%s) Tj" % (_FONTS[(bold, italic)], line.size, _pdf_text(text)))
+            ops.append(b"ET")
+            if line.rule:
+                rule_y = line.y - line.size * 0.3
+                ops.append(
+                    accent + b" RG 0.6 w %.2f %.2f m %.2f %.2f l S"
+                    % (page.margin, rule_y, page.width - page.margin, rule_y)
+                )
+        stream = zlib.compress(b"\n".join(ops), 6)
+        content = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+        kids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R "
+                b"/Resources << /Font << %s >> >> >>" % (pages_id, page.width, page.height, content, fonts)
+            )
+        )
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids),
+        len(kids),
+    )
+    info = add(b"<< /Title (%s) /Producer (SwipeHire) >>" % _pdf_text(title))
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(
+        b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, catalog, info, xref)
+    )
+    return out.getvalue()
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/docProps/app.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships/officeDocument" Target="word/document.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships/extended-properties" Target="docProps/app.xml"/>'
+    "</Relationships>"
+)
+_TWIPS = 20  # per point
+
+
+def _docx_paragraph(block: Block, page: PageSetup, accent: str) -> str:
+    factor, bold, before, indent = _STYLES[block.style]
+    size = page.font_size * (0.9 if block.meta else factor)
+    props = f'<w:spacing w:before="{int(before * page.font_size * _LEADING * _TWIPS)}" w:after="0"/>'
+    if indent:
+        props += f'<w:ind w:left="{int(indent * _TWIPS)}" w:hanging="{int(10 * _TWIPS)}"/>'
+    if block.style == "heading":
+        props += f'<w:pBdr><w:bottom w:val="single" w:sz="4" w:space="1" w:color="{accent}"/></w:pBdr>'
+    color = "666666" if block.meta else accent if block.style in ("title", "heading") else None
+    runs = []
+    if block.style == "bullet":
+        runs.append(Run(_BULLET + "\t"))
+    runs.extend(block.runs)
+    parts = []
+    for run in runs:
+        run_props = f'<w:sz w:val="{round(size * 2)}"/>'
+        if bold or run.bold:
+            run_props = "<w:b/>" + run_props
+        if run.italic:
+            run_props = "<w:i/>" + run_props
+        if color:
+            run_props = f'<w:color w:val="{color}"/>' + run_props
+        if run.text == "\n":
+            parts.append(f"<w:r><w:rPr>{run_props}</w:rPr><w:br/></w:r>")
+        elif run.text.endswith("\t"):
+            parts.append(f'<w:r><w:rPr>{run_props}</w:rPr><w:t>{escape(run.text[:-1])}</w:t><w:tab/></w:r>')
+        else:
+            parts.append(f'<w:r><w:rPr>{run_props}</w:rPr><w:t xml:space="preserve">{escape(run.text)}</w:t></w:r>')
+    return f"<w:p><w:pPr>{props}</w:pPr>{''.join(parts)}</w:p>"
+
+
+def to_docx(blocks: List[Block], page: PageSetup, pages: int, words: int) -> bytes:
+    """A Word document with direct formatting only (no styles part)."""
+    accent = "%02X%02X%02X" % tuple(round(channel * 255) for channel in page.accent)
+    width, height = (round(dimension * _TWIPS) for dimension in PAGE_SIZES[page.size])
+    margin = round(page.margin * _TWIPS)
+    body = "".join(_docx_paragraph(block, page, accent) for block in blocks)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        f"{body}"
+        f'<w:sectPr><w:pgSz w:w="{width}" w:h="{height}"/>'
+        f'<w:pgMar w:top="{margin}" w:right="{margin}" w:bottom="{margin}" w:left="{margin}" '
+        'w:header="0" w:footer="0" w:gutter="0"/></w:sectPr>'
+        "</w:body></w:document>"
+    )
+    app = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+        f"<Application>SwipeHire</Application><Pages>{pages}</Pages><Words>{words}</Words></Properties>"
+    )
+    out = BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in (
+            ("[Content_Types].xml", _DOCX_CONTENT_TYPES),
+            ("_rels/.rels", _DOCX_RELS),
+            ("docProps/app.xml", app),
+            ("word/document.xml", document),
+        ):
+            # A fixed timestamp keeps the bytes, and so the cache key's output, stable
+            archive.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), data, zipfile.ZIP_DEFLATED)
+    return out.getvalue()
@@ -0,0 +1,181 @@
+"""
+Keyset (cursor) pagination.
+Pages are cut with a seek predicate on an ordered, unique key tuple such as
+(created_at, id) instead of OFFSET, so page 10,000 costs the same index
+range scan as page 1. Cursors are opaque to clients and page sizes are
+clamped to DEFAULT_PAGE_SIZE / MAX_PAGE_SIZE.
+"""
+
+import base64
+import enum
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return settings.DEFAULT_PAGE_SIZE
+    return max(1, min(limit, settings.MAX_PAGE_SIZE))
+
+
+# ===============================
+#       CURSOR ENCODING
+# ===============================
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _decode_value(value: Any):
+    if isinstance(value, dict) and len(value) == 1:
+        (tag, raw), = value.items()
+        if tag == "dt":
+            return datetime.fromisoformat(raw)
+        if tag == "d":
+            return date.fromisoformat(raw)
+        if tag == "dec":
+            return Decimal(raw)
+    if isinstance(value, (dict, list)):
+        raise ValueError(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, width: int) -> Tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != width:
+            raise ValueError(cursor)
+        return tuple(_decode_value(v) for v in values)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+# ===============================
+#       KEYSETS
+# ===============================
+class Keyset:
+    """
+    An ordered key over columns that together are unique, e.g.
+    Keyset(Job.created_at, Job.id). `descending` flips the whole order
+    (newest first), which keeps a single composite index usable.
+
+    Back the key with an index whose columns are, in order, any equality
+    filters the list applies (user_id, ...) followed by the key columns.
+    """
+
+    def __init__(self, *columns, descending: bool = False):
+        if not columns:
+            raise ValueError("A keyset needs at least one column")
+        self.columns = columns
+        self.descending = descending
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def order_by(self) -> list:
+        return [c.desc() if self.descending else c.asc() for c in self.columns]
+
+    def seek(self, values: Sequence[Any]):
+        """
+        Rows strictly after `values` in key order, expanded as
+        a >= x AND (a > x OR (a = x AND b > y)): the leading inequality
+        alone bounds the index range scan on every backend.
+        """
+
+        def after(column, value):
+            return column < value if self.descending else column > value
+
+        def at_or_after(column, value):
+            return column <= value if self.descending else column >= value
+
+        branches = []
+        for i, (column, value) in enumerate(zip(self.columns, values)):
+            equal = [c == v for c, v in zip(self.columns[:i], values[:i])]
+            branches.append(and_(*equal, after(column, value)))
+        return and_(at_or_after(self.columns[0], values[0]), or_(*branches))
+
+    def values_of(self, row) -> Tuple[Any, ...]:
+        # Works for ORM entities and for Row objects selected by column
+        return tuple(getattr(row, column.key) for column in self.columns)
+
+
+def created_at_keyset(model, descending: bool = True) -> Keyset:
+    """
+    (created_at, id) from app.models.base.BaseModel, newest first by default.
+    """
+    return Keyset(model.created_at, model.id, descending=descending)
+
+
+# ===============================
+#       PAGES
+# ===============================
+@dataclass
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def page_statement(stmt: Select, keyset: Keyset, limit: int, cursor: Optional[str]) -> Select:
+    """
+    Applies the seek predicate, key ordering and limit (+1 to detect a
+    following page) to a select(). Raises InvalidCursor for a bad cursor.
+    """
+    if cursor:
+        stmt = stmt.where(keyset.seek(decode_cursor(cursor, len(keyset))))
+    return stmt.order_by(*keyset.order_by()).limit(limit + 1)
+
+
+def _page(rows: list, keyset: Keyset, limit: int) -> Page:
+    if len(rows) <= limit:
+        return Page(items=rows)
+    rows = rows[:limit]
+    return Page(items=rows, next_cursor=encode_cursor(keyset.values_of(rows[-1])))
+
+
+def paginate(
+    db: Session, stmt: Select, keyset: Keyset, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> Page:
+    """
+    One page of `stmt` (a select() of an entity) after `cursor`.
+    `next_cursor` is None on the last page.
+    """
+    limit = clamp_page_size(limit)
+    rows = db.execute(page_statement(stmt, keyset, limit, cursor)).scalars().all()
+    return _page(list(rows), keyset, limit)
+
+
+async def paginate_async(
+    db: AsyncSession, stmt: Select, keyset: Keyset, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> Page:
+    limit = clamp_page_size(limit)
+    rows = (await db.execute(page_statement(stmt, keyset, limit, cursor))).scalars().all()
+    return _page(list(rows), keyset, limit)
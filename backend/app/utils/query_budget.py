@@ -0,0 +1,59 @@
+"""
+Query budget assertions.
+Counts the SQL statements an engine executes inside a block and fails loudly
+when the count differs from the budget, listing every statement that ran.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs a different number of queries than budgeted."""
+
+
+class QueryCounter:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def query_budget(
+    engine: Engine, exactly: Optional[int] = None, at_most: Optional[int] = None, label: str = ""
+) -> Iterator[QueryCounter]:
+    """
+    with query_budget(engine, exactly=4, label="GET /api/profiles/me/"):
+        client.get(...)
+
+    `exactly` catches regressions in both directions, so a budget that
+    becomes too generous after an optimisation gets tightened too.
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+    failed = (exactly is not None and counter.count != exactly) or (
+        at_most is not None and counter.count > at_most
+    )
+    if failed:
+        expected = f"exactly {exactly}" if exactly is not None else f"at most {at_most}"
+        listing = "\n".join(f"  {i + 1}. {s.strip()}" for i, s in enumerate(counter.statements))
+        raise QueryBudgetExceeded(
+            f"{label or 'block'}: expected {expected} queries, ran {counter.count}\n{listing}"
+        )
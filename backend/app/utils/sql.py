@@ -0,0 +1,95 @@
+"""
+Dialect-aware bulk SQL helpers.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+
+def upsert_statement(
+    dialect_name: str,
+    table: Table,
+    rows: Optional[List[Dict]],
+    conflict_columns: Sequence[str],
+    update_columns: Iterable[str],
+):
+    """
+    Builds a multi-row INSERT that updates `update_columns` when a row with
+    the same `conflict_columns` already exists. With `rows=None` the
+    statement takes its rows as executemany parameters instead.
+    MySQL uses ON DUPLICATE KEY UPDATE; SQLite and PostgreSQL use ON CONFLICT.
+    """
+    update_columns = list(update_columns)
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table) if rows is None else insert(table).values(rows)
+        if not update_columns:
+            return stmt.prefix_with("IGNORE")
+        return stmt.on_duplicate_key_update(
+            {col: stmt.inserted[col] for col in update_columns}
+        )
+
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported on {dialect_name}")
+
+    stmt = insert(table) if rows is None else insert(table).values(rows)
+    if not update_columns:
+        return stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+    return stmt.on_conflict_do_update(
+        index_elements=list(conflict_columns),
+        set_={col: stmt.excluded[col] for col in update_columns},
+    )
+
+
+def bulk_upsert(
+    db: Session,
+    table: Table,
+    rows: List[Dict],
+    conflict_columns: Sequence[str],
+    update_columns: Iterable[str],
+    chunk_size: int = 1000,
+) -> int:
+    """
+    Upserts `rows` in chunks of `chunk_size` using the session's connection.
+    Does not commit. Returns the number of rows sent.
+    """
+    if not rows:
+        return 0
+    dialect_name = db.get_bind().dialect.name
+    update_columns = list(update_columns)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        db.execute(
+            upsert_statement(
+                dialect_name, table, chunk, conflict_columns, update_columns
+            )
+        )
+    return len(rows)
+
+
+def upsert_many(
+    db: Session,
+    table: Table,
+    rows: List[Dict],
+    conflict_columns: Sequence[str],
+    update_columns: Iterable[str],
+) -> int:
+    """
+    Upserts `rows` as an executemany of one statement. Unlike bulk_upsert
+    the statement is compiled once (and cached) however many rows there
+    are, which dominates at thousands of rows; the driver still sends
+    multi-row VALUES on PostgreSQL and MySQL. Every row needs the same keys.
+    Does not commit. Returns the number of rows sent.
+    """
+    if not rows:
+        return 0
+    dialect_name = db.get_bind().dialect.name
+    db.execute(upsert_statement(dialect_name, table, None, conflict_columns, update_columns), rows)
+    return len(rows)
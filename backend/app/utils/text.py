@@ -0,0 +1,66 @@
+"""
+Text normalisation helpers shared by matching, search and skill lookup.
+"""
+
+import re
+import unicodedata
+from typing import List, Tuple
+
+from app.utils.stemming import stem
+
+_WHITESPACE = re.compile(r"\s+")
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+# Words plus the symbol-bearing tech tokens that matter in job ads:
+# c++, c#, node.js, asp.net, 3.5
+_TOKEN = re.compile(r"[a-z0-9]+(?:[+#]+|(?:\.[a-z0-9]+)+)?")
+STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have in is it its of on or our
+    that the their this to was we will with you your
+    """.split()
+)
+
+
+def normalize_skill_name(name: str) -> str:
+    """
+    Canonical form of a skill name used for lookups and matching:
+    trimmed, lower-cased and with runs of whitespace collapsed.
+    """
+    return _WHITESPACE.sub(" ", name.strip()).lower()
+
+
+def slugify(text: str) -> str:
+    """
+    URL slug of `text`: lower-cased ASCII words joined by hyphens,
+    e.g. "Acme, Inc." -> "acme-inc".
+    """
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _NON_SLUG.sub("-", ascii_text.lower()).strip("-")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased word tokens of `text`, punctuation dropped.
+    """
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def analyze_positions(text: str) -> List[Tuple[int, str]]:
+    """
+    (position, term) pairs of `text`: tokens with stopwords removed, then
+    stemmed. Positions count the removed stopwords too, so the phrase
+    "head of data" still needs its terms two apart.
+    """
+    return [
+        (position, stem(token))
+        for position, token in enumerate(tokenize(text))
+        if token not in STOPWORDS
+    ]
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Search terms of `text`. Index and query go through the same analysis,
+    so they agree on terms.
+    """
+    return [term for _, term in analyze_positions(text)]
@@ -0,0 +1 @@
+# SwipeHire performance benchmarks
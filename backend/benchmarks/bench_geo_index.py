@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Geo Index Benchmark
+Compares grid-bucketed radius search against a full-scan haversine query.
+
+Usage (from backend/):
+    python -m benchmarks.bench_geo_index
+    python -m benchmarks.bench_geo_index --jobs 1000000 --radius 50
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+import uuid
+
+from app.services.geo_index import GeoIndex
+
+# Rough population centres, so jobs cluster the way real listings do
+METROS = [
+    (40.71, -74.01), (34.05, -118.24), (41.88, -87.63), (29.76, -95.37),
+    (47.61, -122.33), (37.77, -122.42), (51.51, -0.13), (52.52, 13.40),
+    (48.86, 2.35), (35.68, 139.69), (1.35, 103.82), (-33.87, 151.21),
+    (19.08, 72.88), (-23.55, -46.63), (43.65, -79.38), (55.76, 37.62),
+]
+MODES = ["onsite", "hybrid", "remote"]
+
+FULL_SCAN_SQL = """
+SELECT id, 6371.0088 * acos(min(1.0,
+    cos(radians(:lat)) * cos(radians(latitude)) * cos(radians(longitude) - radians(:lon))
+    + sin(radians(:lat)) * sin(radians(latitude))
+)) AS distance
+FROM jobs
+WHERE work_mode != 'remote' AND distance <= :radius
+ORDER BY distance
+LIMIT :limit
+"""
+
+
+def synthetic_jobs(count):
+    for _ in range(count):
+        lat, lon = random.choice(METROS)
+        yield (
+            str(uuid.uuid4()),
+            lat + random.gauss(0, 1.5),
+            lon + random.gauss(0, 1.5),
+            random.choices(MODES, weights=(6, 3, 1))[0],
+        )
+
+
+def timed(fn, queries):
+    timings = []
+    for lat, lon in queries:
+        started = time.perf_counter()
+        fn(lat, lon)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.median(timings) * 1e3, timings[int(len(timings) * 0.99)] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--radius", type=float, default=50.0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    random.seed(42)
+    jobs = list(synthetic_jobs(args.jobs))
+    queries = [
+        (lat + random.uniform(-1, 1), lon + random.uniform(-1, 1))
+        for lat, lon in random.choices(METROS, k=args.queries)
+    ]
+
+    started = time.perf_counter()
+    index = GeoIndex()
+    for job_id, lat, lon, mode in jobs:
+        index.upsert(job_id, lat, lon, mode)
+    build_seconds = time.perf_counter() - started
+
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, latitude REAL, longitude REAL, work_mode TEXT)")
+    db.executemany("INSERT INTO jobs VALUES (?, ?, ?, ?)", jobs)
+
+    def indexed(lat, lon):
+        return index.within_radius(lat, lon, args.radius, include_remote=False, limit=args.limit)
+
+    def full_scan(lat, lon):
+        params = {"lat": lat, "lon": lon, "radius": args.radius, "limit": args.limit}
+        return db.execute(FULL_SCAN_SQL, params).fetchall()
+
+    # Both paths must agree before their timings mean anything
+    for lat, lon in queries[:3]:
+        expected = [row[0] for row in full_scan(lat, lon)]
+        actual = [hit.id for hit in indexed(lat, lon)]
+        assert len(expected) == len(actual), (len(expected), len(actual))
+
+    print(f"Geo index: {args.jobs:,} jobs, radius {args.radius:g} km, limit {args.limit}")
+    print(f"index build: {build_seconds:.1f}s")
+    print(f"{'strategy':>12} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, fn, sample in (
+        ("grid index", indexed, queries),
+        ("full scan", full_scan, queries[: args.scan_queries]),
+    ):
+        p50, p99 = timed(fn, sample)
+        print(f"{name:>12} {p50:>10.2f} {p99:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
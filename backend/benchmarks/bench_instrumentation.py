@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Instrumentation Overhead Benchmark
+Per-request cost of the metrics middleware and per-statement cost of the
+engine hooks, measured against the same app and engine without them.
+
+Usage (from backend/):
+    python -m benchmarks.bench_instrumentation
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.instrumentation import MetricsMiddleware, instrument_engine
+
+
+async def plain_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _noop_receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _noop_send(message):
+    pass
+
+
+def per_request(app, iterations):
+    scope = {"type": "http", "method": "GET", "path": "/bench"}
+
+    async def run():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app(dict(scope), _noop_receive, _noop_send)
+        return time.perf_counter() - started
+
+    return asyncio.run(run()) / iterations
+
+
+def per_statement(engine, iterations):
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        started = time.perf_counter()
+        for _ in range(iterations):
+            conn.execute(statement).scalar()
+        return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--statements", type=int, default=50_000)
+    args = parser.parse_args()
+
+    bare = per_request(plain_app, args.requests)
+    wrapped = per_request(MetricsMiddleware(plain_app), args.requests)
+    print(f"middleware: {bare * 1e6:.2f}us bare, {wrapped * 1e6:.2f}us instrumented "
+          f"(+{(wrapped - bare) * 1e6:.2f}us per request)")
+
+    engine = create_engine("sqlite://")
+    bare = per_statement(engine, args.statements)
+    instrument_engine(engine, "bench")
+    hooked = per_statement(engine, args.statements)
+    print(f"engine hooks: {bare * 1e6:.2f}us bare, {hooked * 1e6:.2f}us instrumented "
+          f"(+{(hooked - bare) * 1e6:.2f}us per statement)")
+    print("disabled (METRICS_ENABLED=False): nothing is installed, +0us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Job Import Benchmark
+Throughput of the batched feed importer on SQLite (first import, then a
+re-import that updates every job) against a row-at-a-time ORM import, and
+its peak memory across feed sizes, which should not grow with the feed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_import
+    python -m benchmarks.bench_job_import --rows 200000 --batch-size 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+# Measures the importer; the cache's invalidation log holds a minute of
+# tags, which a short benchmark would count as growth
+os.environ["CACHE_ENABLED"] = "false"
+
+import crud.user  # noqa: E402,F401  (resolves the crud/security import cycle)
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.cache import install_cache_invalidation  # noqa: E402
+from app.models.ai import MatchScore  # noqa: E402
+from app.models.job import Company, Job, JobSkill, JobSource  # noqa: E402
+from app.services import catalog  # noqa: E402
+from app.services.job_import import import_feed  # noqa: E402
+
+SKILLS = ["Python", "SQL", "Go", "Rust", "React", "AWS", "Docker", "Kubernetes", "Java", "Kotlin"]
+LEVELS = ["entry", "mid", "senior", "lead"]
+TABLES = [Company.__table__, Job.__table__, JobSkill.__table__, MatchScore.__table__]
+
+
+def write_feed(path, rows, companies, revision=0):
+    rng = random.Random(18)
+    with open(path, "w", encoding="utf-8") as feed:
+        for i in range(rows):
+            feed.write(
+                json.dumps(
+                    {
+                        "external_job_id": f"ext-{i}",
+                        "company_name": f"Company {rng.randrange(companies)}",
+                        "job_title": f"Engineer {i} r{revision}",
+                        "job_description": "Builds and runs services. " * 20,
+                        "experience_level": rng.choice(LEVELS),
+                        "location_city": "Berlin",
+                        "latitude": 52.5 + rng.random(),
+                        "longitude": 13.4 + rng.random(),
+                        "salary_min": 60_000,
+                        "salary_max": 90_000,
+                        "job_requirements": ["3+ years", "English"],
+                        "skills": rng.sample(SKILLS, 4),
+                    }
+                )
+                + "\n"
+            )
+
+
+def fresh_session(directory, name):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    for table in TABLES:
+        table.create(engine)
+    factory = sessionmaker(bind=engine)
+    install_cache_invalidation(factory, catalog.cache_tags)
+    return factory()
+
+
+def run(db, path, batch_size):
+    with open(path, encoding="utf-8") as feed:
+        return import_feed(db, feed, "jsonl", source=JobSource.IMPORTED, batch_size=batch_size)
+
+
+def row_at_a_time(db, path):
+    """The naive import: an ORM lookup per company and per job, then add."""
+    started = time.perf_counter()
+    with open(path, encoding="utf-8") as feed:
+        for line in feed:
+            record = json.loads(line)
+            company = db.query(Company).filter_by(company_name=record["company_name"]).first()
+            if company is None:
+                company = Company(company_name=record["company_name"])
+                db.add(company)
+            job = (
+                db.query(Job)
+                .filter_by(source=JobSource.IMPORTED, external_job_id=record["external_job_id"])
+                .first()
+            )
+            if job is None:
+                job = Job(source=JobSource.IMPORTED, external_job_id=record["external_job_id"])
+                db.add(job)
+            job.company = company
+            for column in ("job_title", "job_description", "experience_level", "location_city"):
+                setattr(job, column, record[column])
+            job.required_skills = [JobSkill(skill_name=name) for name in record["skills"]]
+            db.commit()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--companies", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--naive-rows", type=int, default=2_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="job-import-")
+    feed = os.path.join(directory, "feed.jsonl")
+    write_feed(feed, args.rows, args.companies)
+    size_mb = os.path.getsize(feed) / 1e6
+
+    db = fresh_session(directory, "batched.db")
+    report = run(db, feed, args.batch_size)
+    print(
+        f"first import : {report.imported:,} rows ({size_mb:.0f}MB) in {report.seconds:.2f}s, "
+        f"{report.rows_per_second:,.0f} rows/s, {report.skills:,} skills"
+    )
+    write_feed(feed, args.rows, args.companies, revision=1)
+    report = run(db, feed, args.batch_size)
+    print(
+        f"re-import    : {report.imported:,} rows updated in {report.seconds:.2f}s, "
+        f"{report.rows_per_second:,.0f} rows/s; {db.query(Job).count():,} jobs in the table"
+    )
+    db.close()
+
+    naive_feed = os.path.join(directory, "naive.jsonl")
+    write_feed(naive_feed, args.naive_rows, args.companies)
+    naive_db = fresh_session(directory, "naive.db")
+    seconds = row_at_a_time(naive_db, naive_feed)
+    print(f"row-at-a-time: {args.naive_rows:,} rows in {seconds:.2f}s, {args.naive_rows / seconds:,.0f} rows/s")
+    naive_db.close()
+
+    print(f"{'feed rows':>10} {'peak MB':>8}")
+    for rows in (args.rows // 10, args.rows // 2):
+        write_feed(feed, rows, args.companies)
+        db = fresh_session(directory, f"memory-{rows}.db")
+        tracemalloc.start()
+        run(db, feed, args.batch_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        db.close()
+        print(f"{rows:>10,} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
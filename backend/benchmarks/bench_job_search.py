@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Job Search Benchmark
+Query latency of the BM25 job search index at ~1M postings, against a
+LIKE '%term%' scan of the same text in SQLite, plus build, reopen (mmap)
+and incremental update costs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_search
+    python -m benchmarks.bench_job_search --postings 2000000 --repeats 50
+"""
+
+import argparse
+import itertools
+import random
+import sqlite3
+import statistics
+import string
+import tempfile
+import time
+
+from app.services.job_search import JobSearchIndex
+
+PHRASES = ["machine learning", "data pipelines", "distributed systems", "product design"]
+
+
+def vocabulary(size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10))))
+    return sorted(words)
+
+
+def make_jobs(target_postings, vocab_size):
+    """
+    Synthetic jobs with Zipf-distributed words until the index would hold
+    `target_postings` (term, job) pairs; a few fixed phrases are sprinkled in.
+    """
+    words = vocabulary(vocab_size)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+
+    def text(n):
+        return " ".join(random.choices(words, cum_weights=cum_weights, k=n))
+
+    jobs, postings = [], 0
+    while postings < target_postings:
+        description = text(150)
+        if random.random() < 0.3:
+            description += " " + random.choice(PHRASES) + " " + text(20)
+        fields = {
+            "title": text(5),
+            "skills": [text(1) for _ in range(6)],
+            "requirements": [text(8) for _ in range(4)],
+            "description": [description],
+        }
+        job_id = f"job-{len(jobs):07d}"
+        jobs.append((job_id, fields))
+        words_in_job = [fields["title"], *fields["skills"], *fields["requirements"], description]
+        postings += len(set(" ".join(words_in_job).split()))
+    return words, jobs
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.median(timings) * 1e3, timings[int(len(timings) * 0.95) - 1] * 1e3, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--postings", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=30_000)
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(17)
+    words, jobs = make_jobs(args.postings, args.vocabulary)
+    directory = tempfile.mkdtemp(prefix="job-search-")
+
+    started = time.perf_counter()
+    index = JobSearchIndex(directory, buffer_docs=5_000, max_segments=8)
+    for job_id, fields in jobs:
+        index.upsert(job_id, fields)
+    index.optimize()
+    build_s = time.perf_counter() - started
+    stats = index.stats()
+    print(f"{len(jobs):,} jobs, {stats['postings']:,} postings indexed in {build_s:.1f}s")
+
+    started = time.perf_counter()
+    reopened = JobSearchIndex.open(directory)
+    print(f"reopen from mmap'd segments: {(time.perf_counter() - started) * 1e3:.1f}ms")
+
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, job_title TEXT, job_description TEXT)")
+    db.executemany(
+        "INSERT INTO jobs VALUES (?, ?, ?)",
+        [(job_id, fields["title"], " ".join(fields["description"])) for job_id, fields in jobs],
+    )
+
+    common, mid, rare = words[0], words[len(words) // 10], words[-1]
+    queries = {
+        "common term": common,
+        "mid term": mid,
+        "rare term": rare,
+        "3 terms": f"{common} {mid} {rare}",
+        "phrase": f'"{PHRASES[0]}"',
+        "phrase + term": f'"{PHRASES[1]}" {mid}',
+    }
+    print(f"{'query':>14} {'p50 ms':>8} {'p95 ms':>8} {'hits':>5}")
+    for label, query in queries.items():
+        p50, p95, hits = timed(lambda: reopened.search(query, k=args.k), args.repeats)
+        print(f"{label:>14} {p50:>8.3f} {p95:>8.3f} {len(hits):>5}")
+
+    # A rare term makes LIKE scan the whole table, and it still can't rank
+    like = f"%{rare}%"
+    p50, p95, rows = timed(
+        lambda: db.execute(
+            "SELECT id FROM jobs WHERE job_title LIKE ? OR job_description LIKE ? LIMIT ?",
+            (like, like, args.k),
+        ).fetchall(),
+        max(args.repeats // 5, 3),
+    )
+    print(f"{'LIKE rare':>14} {p50:>8.3f} {p95:>8.3f} {len(rows):>5}  (unranked)")
+
+    # An edit lands in the write buffer; the next query folds it in
+    job_id, fields = jobs[0]
+    edits = []
+    for _ in range(args.repeats):
+        started = time.perf_counter()
+        reopened.upsert(job_id, {**fields, "title": f"{fields['title']} {rare}"})
+        reopened.search(rare, k=args.k)
+        edits.append(time.perf_counter() - started)
+    print(f"edit + next query: p50 {statistics.median(edits) * 1e3:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
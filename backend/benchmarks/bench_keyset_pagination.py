@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Keyset Pagination Benchmark
+Page latency at increasing depth for OFFSET versus the (created_at, id)
+seek predicate from app.utils.pagination, on an indexed SQLite table.
+
+Usage (from backend/):
+    python -m benchmarks.bench_keyset_pagination
+    python -m benchmarks.bench_keyset_pagination --rows 500000 --page-size 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Index, String, create_engine, insert, select
+from sqlalchemy.orm import Session, declarative_base
+
+from app.utils.pagination import Keyset, encode_cursor, paginate
+
+Base = declarative_base()
+
+
+class Listing(Base):
+    __tablename__ = "listings"
+    __table_args__ = (Index("ix_listings_created_at_id", "created_at", "id"),)
+
+    id = Column(String(36), primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    title = Column(String(100), nullable=False)
+
+
+KEYSET = Keyset(Listing.created_at, Listing.id, descending=True)
+
+
+def seed(engine, rows):
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            # Coarse timestamps, so plenty of created_at ties fall to the id
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "created_at": start + timedelta(seconds=i // 4),
+                "title": f"Listing {i}",
+            })
+            if len(batch) == 10_000:
+                conn.execute(insert(Listing), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Listing), batch)
+
+
+def offset_page(db, page, page_size):
+    stmt = select(Listing).order_by(*KEYSET.order_by()).offset((page - 1) * page_size).limit(page_size)
+    return db.execute(stmt).scalars().all()
+
+
+def cursor_before(db, page, page_size):
+    """Cursor a client would hold after reading `page - 1` pages."""
+    if page == 1:
+        return None
+    stmt = (
+        select(Listing.created_at, Listing.id)
+        .order_by(*KEYSET.order_by())
+        .offset((page - 1) * page_size - 1)
+        .limit(1)
+    )
+    return encode_cursor(tuple(db.execute(stmt).one()))
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e3, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=250_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(3)
+    engine = create_engine("sqlite://")
+    started = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"seeded {args.rows:,} rows in {time.perf_counter() - started:.1f}s, page size {args.page_size}")
+
+    deepest = args.rows // args.page_size
+    pages = [p for p in (1, 10, 100, 1_000, 10_000, deepest) if p <= deepest]
+    print(f"{'page':>8} {'OFFSET ms':>10} {'keyset ms':>10}")
+    with Session(engine) as db:
+        for page in sorted(set(pages)):
+            cursor = cursor_before(db, page, args.page_size)
+            offset_ms, by_offset = timed(lambda: offset_page(db, page, args.page_size), args.repeats)
+            keyset_ms, by_keyset = timed(
+                lambda: paginate(db, select(Listing), KEYSET, limit=args.page_size, cursor=cursor),
+                args.repeats,
+            )
+            # Same rows either way, or the comparison means nothing
+            assert [r.id for r in by_offset] == [r.id for r in by_keyset.items], page
+            print(f"{page:>8,} {offset_ms:>10.3f} {keyset_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
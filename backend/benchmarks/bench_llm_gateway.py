@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+LLM Gateway Benchmark
+Time to first byte and to the first words of a generated cover letter,
+streamed through the gateway as server-sent events versus a blocking
+endpoint that returns the finished completion, against a local fake
+streaming model server. Also reports how many sync threadpool threads each
+approach holds, and how the gateway's queue behaves past its limits.
+
+Usage (from backend/):
+    python -m benchmarks.bench_llm_gateway
+    python -m benchmarks.bench_llm_gateway --concurrency 64 --first-token-ms 800
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import anyio.to_thread
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+import crud.user  # noqa: F401  (resolves the crud/security import cycle)
+from app.services.ai_generation import KIND_COVER_LETTER, GenerationCache
+from app.services.llm import OpenAIModel
+from app.services.llm_gateway import LLMGateway, format_sse
+from benchmarks.fake_llm_server import FakeLLMServer
+
+JOB = {"title": "Backend Engineer", "company": "Bench", "skills": ["Python", "SQL"]}
+
+
+def build_app(gateway: LLMGateway) -> FastAPI:
+    app = FastAPI()
+    cache = gateway.cache
+
+    def request_for(n: int, user: str):
+        return cache.request(KIND_COVER_LETTER, {"name": f"Candidate {n}"}, JOB, tone="professional")
+
+    @app.post("/blocking/{n}")
+    def blocking(n: int):
+        return {"content": cache.generate(request_for(n, "u")).text}
+
+    @app.post("/stream/{user}/{n}")
+    async def stream(user: str, n: int):
+        async def body():
+            async for event in gateway.stream(user, request_for(n, user)):
+                yield format_sse(event)
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    return app
+
+
+async def call(app, path):
+    """(seconds to the first body byte, to the first text, to the end; body)."""
+    started = time.perf_counter()
+    first = text = None
+    chunks = []
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b""}
+        await asyncio.Event().wait()  # never disconnects
+
+    async def send(message):
+        nonlocal first, text
+        body = message.get("body")
+        if message["type"] == "http.response.body" and body:
+            elapsed = time.perf_counter() - started
+            if first is None:
+                first = elapsed
+            if text is None and (b"event: token" in body or b'"content"' in body):
+                text = elapsed
+            chunks.append(body)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 5000), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return first, text, time.perf_counter() - started, b"".join(chunks)
+
+
+async def run(app, paths):
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    peak = 0
+    done = False
+
+    async def sample():
+        nonlocal peak
+        while not done:
+            peak = max(peak, limiter.borrowed_tokens)
+            await asyncio.sleep(0.005)
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call(app, path) for path in paths))
+    wall = time.perf_counter() - started
+    done = True
+    await sampler
+    return results, wall, peak
+
+
+def _percentiles(values):
+    values = sorted(v * 1000 for v in values if v is not None)
+    if not values:
+        return "      -"
+    return f"{statistics.median(values):>6.0f}/{values[int(len(values) * 0.95) - 1]:<6.0f}"
+
+
+def report(label, results, wall, peak):
+    print(f"{label:>34} {_percentiles(r[0] for r in results)} {_percentiles(r[1] for r in results)} "
+          f"{wall:>7.2f} {peak:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=32, help="simultaneous requests")
+    parser.add_argument("--first-token-ms", type=float, default=600)
+    parser.add_argument("--token-ms", type=float, default=5)
+    parser.add_argument("--tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        first_token=args.first_token_ms / 1000, token_interval=args.token_ms / 1000, tokens=args.tokens
+    ).start_in_thread()
+    print(f"Fake model: first token {args.first_token_ms:.0f} ms, {args.tokens} tokens "
+          f"{args.token_ms:.0f} ms apart; {args.concurrency} concurrent requests, nothing cached")
+
+    async def scenario():
+        model = OpenAIModel("fake-stream-1", None, server.base_url)
+        n = args.concurrency
+        gateway = LLMGateway(GenerationCache(model), max_concurrency=n, per_user=n, queue_timeout=60)
+        app = build_app(gateway)
+        print(f"{'':>34} {'TTFB ms':>13} {'first text':>13} {'wall s':>7} {'threads':>9}")
+        print(f"{'':>34} {'p50/p95':>13} {'p50/p95':>13} {'':>7} {'(peak)':>9}")
+        report("blocking endpoint (complete)", *await run(app, [f"/blocking/{i}" for i in range(n)]))
+        results, wall, peak = await run(app, [f"/stream/u{i}/{n + i}" for i in range(n)])
+        report("gateway SSE stream", results, wall, peak)
+        assert all(b"event: done" in r[-1] for r in results)
+
+        # Past the limit: a quarter of the requests run at a time, the rest queue
+        gateway = LLMGateway(GenerationCache(model), max_concurrency=max(1, n // 4), per_user=2, queue_timeout=60)
+        report(f"SSE, global limit {gateway.max_concurrency}",
+               *await run(build_app(gateway), [f"/stream/u{i}/{2 * n + i}" for i in range(n)]))
+        # One user asking for everything: two at a time, at most four waiting
+        # (the two about to start included), the rest refused at once
+        timeout = (args.first_token_ms + args.tokens * args.token_ms) / 1000 * 1.5
+        gateway = LLMGateway(
+            GenerationCache(model), max_concurrency=n, per_user=2, queue_timeout=timeout, max_queue_per_user=4
+        )
+        results, wall, peak = await run(build_app(gateway), [f"/stream/solo/{3 * n + i}" for i in range(n)])
+        report("SSE, one user, per-user limit 2", results, wall, peak)
+        print(f"{'':>34} {gateway.total_generated} generated, {gateway.total_busy} refused, "
+              f"{gateway.total_timeouts} timed out after {timeout:.1f} s in the queue")
+        # Identical requests follow a single model stream
+        gateway = LLMGateway(GenerationCache(model), max_concurrency=n, per_user=n)
+        before = server.requests
+        report("SSE, identical requests", *await run(build_app(gateway), [f"/stream/u{i}/0" for i in range(n)]))
+        print(f"{'':>34} {server.requests - before} model call(s) for {n} requests")
+        await gateway.aclose()
+
+    asyncio.run(scenario())
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
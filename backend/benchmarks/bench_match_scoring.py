@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Match Scoring Benchmark
+Reports scored user x job pairs per second for the vectorised scorer.
+
+Usage (from backend/):
+    python -m benchmarks.bench_match_scoring
+    python -m benchmarks.bench_match_scoring --users 10000 --jobs 50000 --processes 4
+"""
+
+import argparse
+import os
+import random
+import time
+
+from app.services.match_scoring import (
+    MatchScorer,
+    Vocabulary,
+    build_job_features,
+    build_user_features,
+    top_matches_parallel,
+)
+
+SKILL_POOL = [f"skill-{i}" for i in range(5000)]
+INDUSTRIES = ["software", "finance", "healthcare", "retail", "education", "energy"]
+LEVELS = ["entry", "mid", "senior", "lead", "executive"]
+DEGREES = ["high_school", "associate", "bachelor", "master", "doctorate"]
+MODES = ["remote", "hybrid", "onsite"]
+EMPLOYMENT = ["full_time", "part_time", "contract", "internship"]
+IMPORTANCE = ["required", "preferred", "nice_to_have"]
+
+
+def synthetic_jobs(count):
+    return [
+        {
+            "id": f"job-{i}",
+            "experience_level": random.choice(LEVELS),
+            "education_level": random.choice(DEGREES + ["any"]),
+            "latitude": random.uniform(25, 49),
+            "longitude": random.uniform(-124, -67),
+            "work_mode": random.choice(MODES),
+            "employment_type": random.choice(EMPLOYMENT),
+            "salary_max": random.randrange(40_000, 250_000, 5_000),
+            "industry": random.choice(INDUSTRIES),
+            "company_rating": round(random.uniform(2.5, 5.0), 2),
+            "skills": [
+                (name, random.choice(IMPORTANCE), random.randint(1, 3))
+                for name in random.sample(SKILL_POOL, random.randint(4, 12))
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_users(count):
+    return [
+        {
+            "id": f"user-{i}",
+            "years": random.uniform(0, 20),
+            "latitude": random.uniform(25, 49),
+            "longitude": random.uniform(-124, -67),
+            "skills": random.sample(SKILL_POOL, random.randint(5, 25)),
+            "industries": random.sample(INDUSTRIES, random.randint(0, 2)),
+            "degrees": random.sample(DEGREES, random.randint(0, 2)),
+            "work_modes": random.sample(MODES, random.randint(1, 3)),
+            "job_types": random.sample(EMPLOYMENT, random.randint(1, 2)),
+            "min_salary": random.randrange(30_000, 200_000, 5_000),
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--jobs", type=int, default=50_000)
+    parser.add_argument("--top-k", type=int, default=500)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    random.seed(7)
+    vocab, industries = Vocabulary(), Vocabulary()
+    started = time.perf_counter()
+    jobs = build_job_features(synthetic_jobs(args.jobs), vocab, industries)
+    users = build_user_features(synthetic_users(args.users), vocab, industries)
+    print(f"Built features for {args.users:,} users x {args.jobs:,} jobs "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    scorer = MatchScorer(len(vocab), len(industries))
+    total_pairs = args.users * args.jobs
+
+    started = time.perf_counter()
+    pairs = scorer.top_matches(users, jobs, top_k=args.top_k)
+    elapsed = time.perf_counter() - started
+    print(f"single core : {elapsed:8.1f}s  {total_pairs / elapsed:>14,.0f} pairs/s  "
+          f"({len(pairs):,} kept)")
+
+    if args.processes > 1:
+        started = time.perf_counter()
+        pairs = top_matches_parallel(scorer, users, jobs, args.top_k, args.processes)
+        elapsed = time.perf_counter() - started
+        print(f"{args.processes:>2} processes: {elapsed:8.1f}s  {total_pairs / elapsed:>14,.0f} pairs/s  "
+              f"({len(pairs):,} kept)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Benchmark
+Login throughput, and p99 latency of an unrelated sync endpoint, during a
+login storm: hashing inline on request threads vs the hashing process pool.
+
+Usage (from backend/):
+    python -m benchmarks.bench_password_hashing
+    python -m benchmarks.bench_password_hashing --clients 400 --seconds 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.core.hashing import HashingPool, HashingPoolSaturated, pwd_context
+
+PASSWORD = "correct horse battery staple"
+
+
+def build_app(pool):
+    app = FastAPI()
+    hashed = pwd_context.hash(PASSWORD)
+
+    @app.post("/inline-login")
+    def inline_login():
+        # What the auth routes used to do: hash on a request thread
+        return {"ok": pwd_context.verify(PASSWORD, hashed)}
+
+    @app.post("/pool-login")
+    async def pool_login():
+        try:
+            return {"ok": await pool.verify(PASSWORD, hashed)}
+        except HashingPoolSaturated:
+            raise HTTPException(status_code=503)
+
+    @app.get("/ping")
+    def ping():
+        time.sleep(0.002)  # stands in for a small indexed query
+        return {"ok": True}
+
+    return app
+
+
+async def storm(app, login_path, clients, seconds):
+    transport = httpx.ASGITransport(app=app)
+    counts = {"ok": 0, "rejected": 0}
+    ping_latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm the pool processes so start-up cost is not measured
+        await client.post(login_path)
+
+        async def login_loop():
+            while time.perf_counter() < deadline:
+                response = await client.post(login_path)
+                if response.status_code == 503:
+                    counts["rejected"] += 1
+                    await asyncio.sleep(0.01)
+                else:
+                    counts["ok"] += 1
+
+        async def ping_loop():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(ping_loop(), *(login_loop() for _ in range(clients)))
+
+    ping_latencies.sort()
+    return {
+        "logins_per_second": counts["ok"] / seconds,
+        "rejected": counts["rejected"],
+        "ping_p50_ms": statistics.median(ping_latencies) * 1e3,
+        "ping_p99_ms": ping_latencies[int(len(ping_latencies) * 0.99)] * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+
+    pool = HashingPool(max_workers=args.workers, max_pending=args.max_pending)
+    app = build_app(pool)
+    print(
+        f"Login storm: {args.clients} clients for {args.seconds:g}s, "
+        f"{pool.max_workers} hashing workers, max {args.max_pending} pending"
+    )
+    print(f"{'strategy':>10} {'logins/s':>10} {'503s':>8} {'ping p50':>10} {'ping p99':>10}")
+    for name, path in (("inline", "/inline-login"), ("pool", "/pool-login")):
+        result = asyncio.run(storm(app, path, args.clients, args.seconds))
+        print(
+            f"{name:>10} {result['logins_per_second']:>10.1f} {result['rejected']:>8} "
+            f"{result['ping_p50_ms']:>8.1f}ms {result['ping_p99_ms']:>8.1f}ms"
+        )
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
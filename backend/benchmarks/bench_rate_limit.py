@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Rate Limit Overhead Benchmark
+Per-request cost of the sliding-window middleware and the daily swipe quota
+under 10k distinct keys, against the COUNT(*) over swipes it replaces.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit
+    python -m benchmarks.bench_rate_limit --keys 100000 --requests 500000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import crud.user  # noqa: F401  (resolves the crud/security import cycle)
+from app.core.rate_limit import (
+    DailyQuota,
+    RateLimitMiddleware,
+    bearer_key,
+    ShardedMemoryBackend,
+    SlidingWindowLimiter,
+)
+from app.models.application import Swipe
+from app.models.job import Company, Job
+from security import create_access_token, token_subject
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def scopes(keys, requests):
+    tokens = [f"Bearer {create_access_token({'sub': f'user-{i}'})}".encode() for i in range(keys)]
+    rng = random.Random(21)
+    return [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/jobs/",
+            "headers": [(b"authorization", rng.choice(tokens))],
+            "client": ("10.0.0.1", 5000),
+        }
+        for _ in range(requests)
+    ]
+
+
+def asgi_seconds(app, requests):
+    async def run():
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            pass
+
+        started = time.perf_counter()
+        for scope in requests:
+            await app(scope, receive, send)
+        return time.perf_counter() - started
+
+    return asyncio.run(run())
+
+
+def threaded_checks(limiter, keys, threads, per_thread):
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(per_thread):
+            limiter.check(keys[rng.randrange(len(keys))])
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def count_query_seconds(swipes, users, lookups):
+    """The naive daily-limit check: COUNT(*) of the user's swipes since midnight."""
+    directory = tempfile.mkdtemp(prefix="rate-limit-")
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'swipes.db')}")
+    for table in (Company.__table__, Job.__table__, Swipe.__table__):
+        table.create(engine)
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    job_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        conn.execute(insert(Company.__table__), [{"id": "c", "company_name": "Bench"}])
+        conn.execute(
+            insert(Job.__table__),
+            [{"id": job_id, "company_id": "c", "job_title": "E", "job_description": "E", "experience_level": "MID"}],
+        )
+        for start in range(0, swipes, 10_000):
+            conn.execute(
+                insert(Swipe.__table__),
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "user_id": rng.choice(user_ids),
+                        "job_id": job_id,
+                        "swipe_direction": "RIGHT",
+                        "swipe_timestamp": now - timedelta(hours=rng.randrange(24 * 30)),
+                    }
+                    for _ in range(min(10_000, swipes - start))
+                ],
+            )
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    db = sessionmaker(bind=engine)()
+    started = time.perf_counter()
+    for _ in range(lookups):
+        db.execute(
+            select(func.count())
+            .select_from(Swipe)
+            .where(Swipe.user_id == rng.choice(user_ids), Swipe.swipe_timestamp >= midnight)
+        ).scalar()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--swipes", type=int, default=500_000, help="rows for the COUNT(*) comparison")
+    args = parser.parse_args()
+
+    requests = scopes(args.keys, args.requests)
+    # A limit nobody reaches: every request takes the full allow path
+    limiter = SlidingWindowLimiter(ShardedMemoryBackend(), limit=10**9)
+    bare = asgi_seconds(_ok_app, requests)
+    middleware = RateLimitMiddleware(_ok_app, limiter_getter=lambda: limiter, key=bearer_key(token_subject))
+    limited = asgi_seconds(middleware, requests)
+    per_request = (limited - bare) / args.requests * 1e6
+    print(f"Rate limiting: {args.requests:,} requests over {args.keys:,} keys")
+    print(f"{'ASGI app alone':>28} {bare / args.requests * 1e6:>8.2f} µs/request")
+    print(f"{'with RateLimitMiddleware':>28} {limited / args.requests * 1e6:>8.2f} µs/request "
+          f"(+{per_request:.2f} µs)")
+    print(f"{'keys held':>28} {limiter.backend.size():>8,}")
+
+    keys = [f"user-{i}" for i in range(args.keys)]
+    per_thread = args.requests // args.threads
+    for shards in (1, 64):
+        limiter = SlidingWindowLimiter(ShardedMemoryBackend(shards), limit=10**9)
+        seconds = threaded_checks(limiter, keys, args.threads, per_thread)
+        print(f"{f'check(), {args.threads} threads, {shards} shard(s)':>28} "
+              f"{per_thread * args.threads / seconds:>8,.0f} checks/s")
+
+    quota = DailyQuota(ShardedMemoryBackend(), "daily_swipes")
+    rng = random.Random(3)
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        quota.consume(keys[rng.randrange(len(keys))], 10**9, timezone.utc)
+    quota_us = (time.perf_counter() - started) / args.requests * 1e6
+    print(f"{'daily quota consume()':>28} {quota_us:>8.2f} µs/swipe")
+
+    lookups = 2_000
+    seconds = count_query_seconds(args.swipes, args.keys, lookups)
+    print(f"{f'COUNT(*) over {args.swipes:,} swipes':>28} {seconds / lookups * 1e6:>8.2f} µs/swipe")
+
+
+if __name__ == "__main__":
+    main()
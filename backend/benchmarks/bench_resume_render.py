@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Resume Rendering Throughput Benchmark
+Resumes per second through render_many(), as auto-apply calls it: rendered
+in the calling thread, across process pools of growing size, and again from
+the output cache. Also shows what compiling the template per render costs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_resume_render
+    python -m benchmarks.bench_resume_render --resumes 2000 --format docx --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from jinja2 import Environment, FileSystemLoader
+
+from app.models.ai import FileFormat
+from app.services.resume_render import (
+    TEMPLATE_DIR,
+    RenderSpec,
+    ResumeRenderer,
+    normalize_formatting,
+    render_document,
+    resume_context,
+)
+from app.utils.disk_lru import DiskLRU
+
+_WORDS = (
+    "built shipped scaled led designed migrated reduced latency services pipelines "
+    "customers teams platform reliability revenue Python Kubernetes Postgres Kafka "
+    "observability onboarding mentored architecture costs throughput"
+).split()
+
+
+def synthetic_sections(rng: random.Random, n: int) -> dict:
+    def sentence(words):
+        return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+    return {
+        "name": f"Candidate {n}",
+        "headline": "Senior Software Engineer",
+        "email": f"candidate{n}@example.com",
+        "summary": " ".join(sentence(14) for _ in range(3)),
+        "experience": [
+            {
+                "title": rng.choice(("Staff Engineer", "Senior Engineer", "Engineer")),
+                "company": f"Company {rng.randrange(500)}",
+                "start": str(2010 + i * 3),
+                "end": str(2013 + i * 3) if i else None,
+                "bullets": [sentence(rng.randrange(10, 24)) for _ in range(rng.randrange(3, 7))],
+            }
+            for i in range(rng.randrange(2, 6))
+        ],
+        "education": [{"degree": "BSc Computer Science", "school": "State University", "end": "2010"}],
+        "skills": rng.sample(_WORDS, 10),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=600)
+    parser.add_argument("--format", default="pdf", choices=[f.value for f in FileFormat])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    rng = random.Random(24)
+    file_format = FileFormat(args.format)
+    formatting = normalize_formatting({})
+    specs = [RenderSpec(synthetic_sections(rng, n), formatting, file_format) for n in range(args.resumes)]
+    print(f"Rendering {args.resumes:,} distinct resumes to {file_format.value} ({os.cpu_count()} CPUs)")
+
+    def timed(label, run):
+        started = time.perf_counter()
+        results = run()
+        seconds = time.perf_counter() - started
+        assert not any(isinstance(result, Exception) for result in results)
+        print(f"{label:>34} {args.resumes / seconds:>9,.0f} resumes/s")
+        return results
+
+    # Compiling the template for every render, instead of once per process
+    environment = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=True, cache_size=0)
+    sample = specs[: max(1, args.resumes // 4)]
+    started = time.perf_counter()
+    for spec in sample:
+        environment.get_template("default.html.j2").render(
+            resume=resume_context(spec.sections), fmt=spec.formatting, title=""
+        )
+    uncached = (time.perf_counter() - started) / len(sample)
+    render_document(specs[0])  # compiles the template once
+    started = time.perf_counter()
+    for spec in sample:
+        render_document(spec)
+    compiled = (time.perf_counter() - started) / len(sample)
+    print(f"{'template compiled per render':>34} {uncached * 1e3:>9.2f} ms (HTML only)")
+    print(f"{'compiled once, full render':>34} {compiled * 1e3:>9.2f} ms (HTML + {file_format.value})")
+
+    results = timed("in-process (workers=0)", lambda: ResumeRenderer(workers=0).render_many(specs))
+    pages = sum(result.page_count for result in results) / len(results)
+    words = sum(result.word_count for result in results) / len(results)
+    size = sum(len(result.content) for result in results) / len(results)
+    for workers in args.workers:
+        renderer = ResumeRenderer(workers=workers)
+        renderer.render_many(specs[:workers])  # start the workers outside the timing
+        timed(f"process pool, {workers} worker(s)", lambda: renderer.render_many(specs))
+        renderer.shutdown()
+
+    directory = tempfile.mkdtemp(prefix="resume-render-")
+    try:
+        renderer = ResumeRenderer(workers=0, store=DiskLRU(directory, 1 << 30))
+        renderer.render_many(specs)
+        timed("output cache hits", lambda: renderer.render_many(specs))
+    finally:
+        shutil.rmtree(directory)
+    print(f"{'average resume':>34} {pages:>9.2f} pages, {words:,.0f} words, {size / 1024:,.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Skill Typeahead Benchmark
+Compares the in-memory prefix index against a LIKE 'prefix%' query ranked by
+popularity, over synthetic skills with Zipf-distributed popularity.
+
+Usage (from backend/):
+    python -m benchmarks.bench_skill_typeahead
+    python -m benchmarks.bench_skill_typeahead --skills 100000 --k 10
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import string
+import time
+
+from app.services.skill_typeahead import SkillSuggestion, SkillTypeahead
+
+SYLLABLES = ["py", "ja", "va", "re", "act", "go", "ru", "st", "type", "script", "data",
+             "ml", "ops", "cloud", "sql", "no", "de", "sign", "kube", "net", "ios", "an"]
+
+LIKE_SQL = """
+SELECT id, name, popularity FROM skills
+WHERE normalized_name LIKE :prefix || '%'
+ORDER BY popularity DESC, normalized_name
+LIMIT :k
+"""
+
+
+def synthetic_skills(count):
+    names = set()
+    while len(names) < count:
+        words = [
+            "".join(random.choices(SYLLABLES, k=random.randint(1, 3)))
+            for _ in range(random.choice((1, 1, 2)))
+        ]
+        if random.random() < 0.2:
+            words.append(random.choice(string.ascii_lowercase) + str(random.randint(1, 99)))
+        names.add(" ".join(words))
+    return [
+        SkillSuggestion(i + 1, name.title(), int(random.paretovariate(1.2)))
+        for i, name in enumerate(sorted(names))
+    ]
+
+
+def timed(fn, prefixes):
+    timings = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        fn(prefix)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(len(timings) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skills", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(7)
+    entries = synthetic_skills(args.skills)
+    # Mostly short prefixes: they match the most skills and are the common case
+    prefixes = [
+        entry.name.lower()[: random.choice((1, 1, 2, 2, 3, 4, 6))]
+        for entry in random.choices(entries, k=args.queries)
+    ]
+
+    started = time.perf_counter()
+    index = SkillTypeahead.from_entries(entries)
+    build_ms = (time.perf_counter() - started) * 1e3
+
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE skills (id INTEGER PRIMARY KEY, name TEXT, normalized_name TEXT, popularity INTEGER)")
+    db.execute("CREATE UNIQUE INDEX ix_norm ON skills (normalized_name)")
+    db.executemany(
+        "INSERT INTO skills VALUES (?, ?, ?, ?)",
+        ((e.id, e.name, e.name.lower(), e.popularity) for e in entries),
+    )
+    db.execute("PRAGMA case_sensitive_like = ON")  # lets LIKE 'x%' use the index
+
+    def sql(prefix):
+        return db.execute(LIKE_SQL, {"prefix": prefix, "k": args.k}).fetchall()
+
+    def memory(prefix):
+        return index.suggest(prefix, k=args.k)
+
+    # Both must agree on the ranking before timings mean anything
+    for prefix in prefixes[:200]:
+        expected = [row[0] for row in sql(prefix)]
+        assert [s.id for s in memory(prefix)] == expected, prefix
+
+    print(f"{args.skills:,} skills, {args.queries:,} prefixes, top {args.k}")
+    print(f"index build: {build_ms:.0f}ms")
+    for label, fn in (("SQL LIKE + ORDER BY", sql), ("prefix index", memory)):
+        p50, p99 = timed(fn, prefixes)
+        print(f"{label:>20}: p50 {p50:9.1f}us  p99 {p99:9.1f}us")
+
+    started = time.perf_counter()
+    for i in range(1000):
+        index.upsert(args.skills + i + 1, f"Zz New Skill {i}", i)
+    print(f"incremental add: {(time.perf_counter() - started) * 1e3:.1f}us per skill into the overlay")
+    started = time.perf_counter()
+    index.compact()
+    print(f"compaction: {(time.perf_counter() - started) * 1e3:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Swipe Deck Benchmark
+Shows that card-fetch latency does not depend on swipe history size.
+
+Usage (from backend/):
+    python -m benchmarks.bench_swipe_deck
+"""
+
+import random
+import statistics
+import time
+import uuid
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.swipe_deck import DeckEngine, _order
+
+TOTAL_JOBS = 200_000
+HISTORY_SIZES = [100, 50_000]
+PAGE_SIZE = 20
+PAGES = 2_000
+
+
+def build_catalog(size):
+    """Synthetic ranked job catalog, sorted in deck order."""
+    catalog = [(round(random.random() * 100, 4), str(uuid.uuid4())) for _ in range(size)]
+    catalog.sort(key=_order)
+    return catalog
+
+
+def make_source(catalog):
+    order_keys = [_order(key) for key in catalog]
+
+    def source(user_id, after, limit):
+        start = bisect_right(order_keys, _order(after)) if after else 0
+        return catalog[start : start + limit]
+
+    return source
+
+
+def run(history_size, catalog):
+    # Worst case: the user has already swiped the top-ranked jobs
+    history = {"user": [job_id for _, job_id in catalog[:history_size]]}
+    executor = ThreadPoolExecutor(max_workers=1)
+    engine = DeckEngine(
+        source=make_source(catalog),
+        seen_loader=lambda user_id: history[user_id],
+        executor=executor,
+    )
+    engine.next_cards("user", PAGE_SIZE)  # cold start, not measured
+
+    timings = []
+    cursor = None
+    for _ in range(PAGES):
+        started = time.perf_counter()
+        cards = engine.next_cards("user", PAGE_SIZE, after=cursor)
+        timings.append(time.perf_counter() - started)
+        for card in cards:
+            engine.record_swipe("user", card.job_id)
+        if cards:
+            cursor = cards[-1].cursor
+        else:
+            time.sleep(0.001)  # let the background refill catch up
+    executor.shutdown(wait=True)
+
+    timings.sort()
+    return {
+        "p50": statistics.median(timings) * 1e6,
+        "p99": timings[int(len(timings) * 0.99)] * 1e6,
+        "mean": statistics.fmean(timings) * 1e6,
+    }
+
+
+def main():
+    random.seed(42)
+    catalog = build_catalog(TOTAL_JOBS)
+    print(f"Swipe deck: {TOTAL_JOBS:,} jobs, {PAGES:,} pages of {PAGE_SIZE} cards")
+    print(f"{'history':>10} {'p50 (us)':>10} {'p99 (us)':>10} {'mean (us)':>10}")
+    for history_size in HISTORY_SIZES:
+        result = run(history_size, catalog)
+        print(
+            f"{history_size:>10,} {result['p50']:>10.1f} "
+            f"{result['p99']:>10.1f} {result['mean']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Swipe Ingestion Load Test
+Sustained swipes per second: per-request commit vs the write-behind buffer,
+and the buffer again with auto-apply on, which must not slow acks down.
+
+Usage (from backend/):
+    python -m benchmarks.bench_swipe_ingest
+    python -m benchmarks.bench_swipe_ingest --swipes 50000 --clients 32
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.ai import CoverLetter, Resume
+from app.models.application import Application, Swipe
+from app.models.auth import UserPreferences
+from app.models.job import Company, Job
+from app.services.auto_apply import AutoApplyPipeline, requests_from_swipes
+from app.services.swipe_ingest import SpillLog, SwipeBuffer, SwipeEvent
+
+DIRECTIONS = ["left", "right", "super"]
+
+
+def setup(url, job_count):
+    engine = create_engine(url)
+    tables = [
+        Company.__table__, Job.__table__, Swipe.__table__, Application.__table__,
+        UserPreferences.__table__, Resume.__table__, CoverLetter.__table__,
+    ]
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
+    company_id = str(uuid.uuid4())
+    job_ids = [str(uuid.uuid4()) for _ in range(job_count)]
+    with engine.begin() as conn:
+        conn.execute(insert(Company.__table__), [{"id": company_id, "company_name": "Bench"}])
+        conn.execute(
+            insert(Job.__table__),
+            [
+                {
+                    "id": job_id,
+                    "company_id": company_id,
+                    "job_title": "Engineer",
+                    "job_description": "Bench job",
+                    "experience_level": "MID",
+                    "swipe_right_count": 0,
+                    "swipe_left_count": 0,
+                }
+                for job_id in job_ids
+            ],
+        )
+    return engine, job_ids
+
+
+def synthetic_swipes(job_ids, count):
+    # Skewed towards a handful of popular jobs, which is what hurts in MySQL
+    weights = [1.0 / (rank + 1) for rank in range(len(job_ids))]
+    jobs = random.choices(job_ids, weights=weights, k=count)
+    return [
+        SwipeEvent(user_id=str(uuid.uuid4()), job_id=job_id, swipe_direction=random.choice(DIRECTIONS))
+        for job_id in jobs
+    ]
+
+
+def per_request_commit(session_factory, events, clients):
+    jobs = Job.__table__
+
+    def handle(event):
+        db = session_factory()
+        try:
+            db.execute(insert(Swipe.__table__), [event.to_row()])
+            column = "swipe_left_count" if event.swipe_direction == "left" else "swipe_right_count"
+            db.execute(
+                update(jobs).where(jobs.c.id == event.job_id).values({column: jobs.c[column] + 1})
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(handle, events))
+    return time.perf_counter() - started
+
+
+def write_behind(session_factory, events, clients, spill_dir, durability, on_flushed=None):
+    spill = None
+    if durability != "memory":
+        spill = SpillLog(spill_dir, fsync=durability == "fsync")
+    buffer = SwipeBuffer(session_factory, spill=spill, on_flushed=on_flushed)
+    buffer.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(buffer.submit, events))
+    acked = time.perf_counter() - started
+    buffer.stop()  # drains the buffer, so the total includes the last flush
+    return acked, time.perf_counter() - started
+
+
+def with_auto_apply(engine, events, clients, spill_dir):
+    """The memory buffer again, with every swiping user opted into auto-apply."""
+    with engine.begin() as conn:
+        conn.execute(
+            insert(UserPreferences.__table__),
+            [
+                {"id": str(uuid.uuid4()), "user_id": user_id, "auto_apply": True}
+                for user_id in {event.user_id for event in events}
+            ],
+        )
+    session_factory = sessionmaker(bind=engine)
+    pipeline = AutoApplyPipeline(session_factory)
+    pipeline.start()
+    acked, _ = write_behind(
+        session_factory, events, clients, spill_dir, "memory",
+        on_flushed=lambda flushed: pipeline.enqueue(requests_from_swipes(flushed)),
+    )
+    pipeline.stop()  # drains the intake queue
+    with engine.connect() as conn:
+        applied = conn.execute(select(func.count()).select_from(Application.__table__)).scalar()
+    return acked, applied
+
+
+def check_counters(engine, events):
+    expected_right = sum(1 for event in events if event.swipe_direction != "left")
+    with engine.connect() as conn:
+        right = conn.execute(Job.__table__.select().with_only_columns(Job.swipe_right_count)).scalars()
+        assert sum(right) == expected_right, "counter deltas were lost"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--swipes", type=int, default=20_000)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=16)
+    args = parser.parse_args()
+
+    random.seed(42)
+    workdir = tempfile.mkdtemp(prefix="swipe-bench-")
+    url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    print(f"Swipe ingestion: {args.swipes:,} swipes, {args.jobs} jobs, {args.clients} clients")
+    print(f"{'strategy':>22} {'ack/s':>10} {'durable/s':>10}")
+
+    engine, job_ids = setup(url, args.jobs)
+    events = synthetic_swipes(job_ids, args.swipes)
+    elapsed = per_request_commit(sessionmaker(bind=engine), events, args.clients)
+    check_counters(engine, events)
+    rate = args.swipes / elapsed
+    print(f"{'per-request commit':>22} {rate:>10,.0f} {rate:>10,.0f}")
+
+    for durability in ("memory", "spill", "fsync"):
+        engine, job_ids = setup(url, args.jobs)
+        events = synthetic_swipes(job_ids, args.swipes)
+        acked, total = write_behind(
+            sessionmaker(bind=engine), events, args.clients,
+            os.path.join(workdir, f"spill-{durability}"), durability,
+        )
+        check_counters(engine, events)
+        print(
+            f"{'write-behind/' + durability:>22} {args.swipes / acked:>10,.0f} "
+            f"{args.swipes / total:>10,.0f}"
+        )
+
+    engine, job_ids = setup(url, args.jobs)
+    events = synthetic_swipes(job_ids, args.swipes)
+    acked, applied = with_auto_apply(engine, events, args.clients, os.path.join(workdir, "spill-auto"))
+    print(f"{'write-behind/auto-apply':>22} {args.swipes / acked:>10,.0f} {'':>10} ({applied:,} applications)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Resume Upload Benchmark
+Peak Python memory and throughput of a large upload streamed into the
+upload store, in chunks as the server receives it, versus a handler that
+reads the whole body with `await request.body()` before writing it out.
+Also shows that a duplicate upload adds nothing on disk and that an
+oversized upload is cut off at the limit instead of read to the end.
+
+Usage (from backend/):
+    python -m benchmarks.bench_upload
+    python -m benchmarks.bench_upload --size-mb 200 --chunk-kb 256
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from fastapi import FastAPI, HTTPException, Request
+
+from app.services.upload_store import UploadRejected, UploadStore
+
+
+def build_app(store: UploadStore, naive_dir: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/stream")
+    async def stream(request: Request):
+        try:
+            stored = await store.save(request.stream())
+        except UploadRejected as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+        return {"key": stored.key, "deduplicated": stored.deduplicated}
+
+    @app.post("/naive")
+    async def naive(request: Request):
+        body = await request.body()
+        if len(body) > store.max_bytes:
+            raise HTTPException(status_code=413, detail="Too large")
+        with open(os.path.join(naive_dir, "upload"), "wb") as f:
+            f.write(body)
+        return {"size": len(body)}
+
+    return app
+
+
+async def upload(app, path: str, size: int, chunk: bytes):
+    """(status, bytes the app read from the client, seconds)."""
+    sent = 0
+    status = None
+
+    async def receive():
+        nonlocal sent
+        if sent >= size:
+            await asyncio.Event().wait()
+        piece = chunk[: size - sent]
+        sent += len(piece)
+        return {"type": "http.request", "body": piece, "more_body": sent < size}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 5000), "server": ("test", 80),
+        "headers": [(b"content-type", b"application/pdf"), (b"transfer-encoding", b"chunked")],
+    }
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return status, sent, time.perf_counter() - started
+
+
+def disk_usage(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    size = args.size_mb << 20
+    chunk = b"%PDF-1.4\n" + os.urandom((args.chunk_kb << 10) - 9)
+    directory = tempfile.mkdtemp(prefix="upload-bench-")
+    try:
+        store = UploadStore(os.path.join(directory, "store"), size + 1, ["pdf"])
+        app = build_app(store, directory)
+        print(f"{args.size_mb} MiB upload in {args.chunk_kb} KiB chunks")
+        print(f"{'':>30} {'status':>6} {'MiB/s':>8} {'peak MiB':>9}")
+
+        def measure(label, path, upload_size):
+            tracemalloc.start()
+            status, read, seconds = asyncio.run(upload(app, path, upload_size, chunk))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:>30} {status:>6} {read / seconds / (1 << 20):>8,.0f} {peak / (1 << 20):>9,.2f}")
+            return status, read
+
+        measure("await request.body()", "/naive", size)
+        measure("streamed into the store", "/stream", size)
+        on_disk = disk_usage(store.root)
+        measure("same file again (dedup)", "/stream", size)
+        print(f"{'':>30} disk grew by {disk_usage(store.root) - on_disk:,} bytes")
+
+        status, read = measure("over the limit by 4x", "/stream", size * 4)
+        print(f"{'':>30} cut off after reading {read / (1 << 20):,.1f} of {args.size_mb * 4} MiB")
+        store.shutdown()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
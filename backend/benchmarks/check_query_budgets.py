@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Query Budget Check
+Runs the profile, skill and auth endpoints against a seeded SQLite database
+and asserts the exact number of SQL statements each one issues.
+Exits non-zero on any mismatch, listing the statements that ran.
+
+Usage (from backend/):
+    python -m benchmarks.check_query_budgets
+"""
+
+import os
+import sys
+import tempfile
+
+# The legacy database module reads DATABASE_URL at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'budget.db')}"
+# Budgets describe the database work of a read, not whether it was cached
+os.environ["CACHE_ENABLED"] = "false"
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import crud.user  # noqa: E402,F401  (resolves the crud/security import cycle)
+import crud.profile as profile_crud  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+import security  # noqa: E402
+from app.utils.query_budget import QueryBudgetExceeded, query_budget  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from routers import auth, profiles, skills  # noqa: E402
+
+# (label, method, path, payload, exact query count)
+ENDPOINT_BUDGETS = [
+    # Principal comes from the cache; version probe, then profile + one
+    # selectin per collection
+    ("GET /api/profiles/me/", "GET", "/api/profiles/me/", None, 5),
+    # Version probe + page
+    ("GET /api/skills/", "GET", "/api/skills/", None, 2),
+    # INSERT + profile version bump + refresh SELECT
+    ("POST /api/profiles/me/education/", "POST", "/api/profiles/me/education/",
+     {"school": "MIT", "degree": "BSc"}, 3),
+    # Skill lookup, INSERT of the missing ones, their ids, one link INSERT,
+    # the version bump, then the profile reload (4); independent of the
+    # number of skills
+    ("POST /api/profiles/me/skills/bulk/", "POST", "/api/profiles/me/skills/bulk/",
+     {"skills": [{"name": "python"}, {"name": " sql "}]
+      + [{"name": f"Skill {i}"} for i in range(40)]}, 9),
+]
+# A revalidation that still matches costs the version probe alone
+REVALIDATE_BUDGET = 1
+LIST_PROFILES = 50
+LIST_BUDGET = 4  # independent of LIST_PROFILES
+
+
+def seed(client):
+    client.post("/api/auth/register/", json={"email": "budget@example.com", "password": "budget-pw"})
+    token = client.post(
+        "/api/auth/token", data={"username": "budget@example.com", "password": "budget-pw"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/api/profiles/", json={"first_name": "Budget", "last_name": "Check"}, headers=headers)
+    for name in ("Python", "SQL", "Docker"):
+        client.post("/api/profiles/me/skills/", json={"name": name}, headers=headers)
+    client.post("/api/profiles/me/experience/", json={"title": "Dev", "company": "Acme"}, headers=headers)
+
+    db = SessionLocal()
+    try:
+        for i in range(LIST_PROFILES):
+            user = models.User(email=f"user{i}@example.com", hashed_password="x")
+            user.profile = models.Profile(first_name="User", last_name=str(i))
+            db.add(user)
+        db.commit()
+    finally:
+        db.close()
+    return headers
+
+
+def main():
+    Base.metadata.create_all(engine)
+    security.install_principal_invalidation(SessionLocal)
+    profile_crud.install_profile_versioning(SessionLocal)
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/auth")
+    app.include_router(profiles.router, prefix="/api/profiles")
+    app.include_router(skills.router, prefix="/api/skills")
+    client = TestClient(app)
+    headers = seed(client)
+    client.get("/api/profiles/me/", headers=headers)  # warm the principal cache
+
+    failures = 0
+    for label, method, path, payload, budget in ENDPOINT_BUDGETS:
+        try:
+            with query_budget(engine, exactly=budget, label=label):
+                response = client.request(method, path, json=payload, headers=headers)
+            response.raise_for_status()
+            print(f"ok    {label}: {budget} queries")
+        except QueryBudgetExceeded as exc:
+            failures += 1
+            print(f"FAIL  {exc}")
+
+    label = "GET /api/profiles/me/ (If-None-Match)"
+    etag = client.get("/api/profiles/me/", headers=headers).headers["ETag"]
+    try:
+        with query_budget(engine, exactly=REVALIDATE_BUDGET, label=label):
+            response = client.get("/api/profiles/me/", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304, response.status_code
+        print(f"ok    {label}: {REVALIDATE_BUDGET} queries")
+    except QueryBudgetExceeded as exc:
+        failures += 1
+        print(f"FAIL  {exc}")
+
+    label = f"crud.profile.get_profiles({LIST_PROFILES + 1} profiles)"
+    try:
+        with query_budget(engine, exactly=LIST_BUDGET, label=label):
+            db = SessionLocal()
+            try:
+                for profile in profile_crud.get_profiles(db, limit=LIST_PROFILES + 1):
+                    schemas.Profile.model_validate(profile).model_dump()
+            finally:
+                db.close()
+        print(f"ok    {label}: {LIST_BUDGET} queries")
+    except QueryBudgetExceeded as exc:
+        failures += 1
+        print(f"FAIL  {exc}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Fake Streaming Model Server
+A local OpenAI-compatible /chat/completions endpoint with realistic timing:
+the first token after --first-token-ms, then one token every --token-ms.
+Answers `"stream": true` with server-sent event chunks and otherwise with
+one JSON body once the whole completion is "written".
+
+Usage (from backend/):
+    python -m benchmarks.fake_llm_server --port 8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 AI_MODEL_BACKEND=openai uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+MODEL = "fake-stream-1"
+
+
+class FakeLLMServer:
+    def __init__(self, host="127.0.0.1", port=0, first_token=0.6, token_interval=0.02, tokens=400):
+        self.host = host
+        self.port = port
+        self.first_token = first_token
+        self.token_interval = token_interval
+        self.tokens = tokens
+        self.requests = 0
+        self._server = None
+        self._loop = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = json.loads(await reader.readexactly(int(headers.get("content-length", 0))) or b"{}")
+                self.requests += 1
+                count = min(self.tokens, body.get("max_tokens") or self.tokens)
+                if body.get("stream"):
+                    await self._stream(writer, count)
+                else:
+                    await self._complete(writer, count)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _token(self, i: int) -> str:
+        return ("Dear" if i == 0 else f" word{i}") + ("." if i % 12 == 11 else "")
+
+    async def _complete(self, writer, count):
+        await asyncio.sleep(self.first_token + self.token_interval * (count - 1))
+        payload = json.dumps(
+            {
+                "model": MODEL,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(map(self._token, range(count)))}}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": count},
+            }
+        ).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+            + f"content-length: {len(payload)}\r\n\r\n".encode()
+            + payload
+        )
+        await writer.drain()
+
+    async def _stream(self, writer, count):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\ntransfer-encoding: chunked\r\n\r\n"
+        )
+        await asyncio.sleep(self.first_token)
+        for i in range(count):
+            if i:
+                await asyncio.sleep(self.token_interval)
+            chunk = {"model": MODEL, "choices": [{"index": 0, "delta": {"content": self._token(i)}}]}
+            self._chunk(writer, f"data: {json.dumps(chunk)}\n\n".encode())
+            await writer.drain()
+        self._chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _chunk(writer, data: bytes):
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start_in_thread(self) -> "FakeLLMServer":
+        """Serves from a background thread with its own event loop."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name="fake-llm", daemon=True).start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-ms", type=float, default=600)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--tokens", type=int, default=400)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, args.first_token_ms / 1000, args.token_ms / 1000, args.tokens)
+
+    async def run():
+        await server.serve()
+        print(f"Fake model serving {server.base_url} ({MODEL}), started {time.strftime('%H:%M:%S')}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Loader options per response model.
+
+Walks a Pydantic response schema alongside the ORM mapper and returns the
+eager-loading options that fetch exactly the relationships the schema will
+serialise: joinedload for scalar (many-to-one / one-to-one) relationships,
+selectinload for collections. Without them every nested field is a lazy
+load, and a list of N users with profiles costs N x 4 queries.
+"""
+
+import typing
+from functools import lru_cache
+from typing import Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def _nested_schema(annotation):
+    """Returns the BaseModel inside Optional[...] / List[...], if any."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        nested = _nested_schema(arg)
+        if nested is not None:
+            return nested
+    return None
+
+
+def _walk(orm_class, schema, parent=None):
+    relationships = inspect(orm_class).relationships
+    for name, field in schema.model_fields.items():
+        relationship = relationships.get(name)
+        nested = _nested_schema(field.annotation)
+        if relationship is None or nested is None:
+            continue
+        attribute = getattr(orm_class, name)
+        strategy = selectinload if relationship.uselist else joinedload
+        option = strategy(attribute) if parent is None else getattr(
+            parent, strategy.__name__
+        )(attribute)
+        yield option
+        yield from _walk(relationship.mapper.class_, nested, option)
+
+
+@lru_cache()
+def loader_options(orm_class, schema) -> Tuple:
+    """
+    Eager-loading options for serialising `orm_class` rows as `schema`.
+    Cached, so building them costs nothing after the first request.
+    """
+    return tuple(_walk(orm_class, schema))
@@ -1,10 +1,122 @@
+from typing import List, Optional
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import models
 import schemas
+from app.core.cache import cached, invalidate_on_commit
+from app.core.conditional import make_etag
+from app.utils.sql import upsert_statement
+from crud.loaders import loader_options
+from app.utils.text import normalize_skill_name
+from crud.skill import resolve_skill_ids, resolve_skill_ids_async
+
+
+def _profile_options():
+    # Everything schemas.Profile serialises, fetched up front
+    return loader_options(models.Profile, schemas.Profile)
 
 
 def get_profile_by_user_id(db: Session, user_id: int):
-    return db.query(models.Profile).filter(models.Profile.user_id == user_id).first()
+    return (
+        db.query(models.Profile)
+        .options(*_profile_options())
+        .filter(models.Profile.user_id == user_id)
+        .first()
+    )
+
+
+def get_profile(db: Session, profile_id: int):
+    return db.get(models.Profile, profile_id, options=_profile_options())
+
+
+def profile_tag(profile_id: int) -> str:
+    return f"profile:{profile_id}"
+
+
+def cache_tags(obj):
+    """
+    Cache tags to invalidate when `obj` changes (see install_cache_invalidation).
+    """
+    if isinstance(obj, models.Profile):
+        return [profile_tag(obj.id)]
+    if isinstance(obj, (models.Education, models.Experience)):
+        return [profile_tag(obj.profile_id)]
+    return []
+
+
+# ===============================
+#       ROW VERSION
+# ===============================
+def _bump_version(profile_ids):
+    profiles = models.Profile.__table__
+    return (
+        update(profiles)
+        .where(profiles.c.id.in_(sorted(profile_ids)))
+        .values(version=profiles.c.version + 1)
+    )
+
+
+def install_profile_versioning(session_factory) -> None:
+    """
+    Bumps profiles.version in the same flush as any change to a profile or
+    its education / experience rows, so GET /me/ can revalidate with a
+    primary-key lookup. Core writes (the bulk skill path) bump it themselves.
+    """
+
+    def bump(session, flush_context, instances):
+        profile_ids, bumped = set(), set()
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, models.Profile):
+                # Skill links count: is_modified() includes collections
+                if obj in session.dirty and session.is_modified(obj):
+                    obj.version = models.Profile.version + 1
+                    bumped.add(obj.id)
+            elif isinstance(obj, (models.Education, models.Experience)):
+                if obj.profile_id is not None:
+                    profile_ids.add(obj.profile_id)
+        profile_ids -= bumped
+        if profile_ids:
+            session.execute(_bump_version(profile_ids))
+
+    event.listen(session_factory, "before_flush", bump)
+
+
+def profile_etag(profile_id: int, version: int) -> str:
+    return make_etag("profile", profile_id, version)
+
+
+def get_profile_version(db: Session, profile_id: int) -> Optional[int]:
+    return db.scalar(select(models.Profile.version).where(models.Profile.id == profile_id))
+
+
+@cached(
+    key=lambda db, profile_id, version: f"profile:{profile_id}:{version}",
+    tags=lambda value, db, profile_id, version: [profile_tag(profile_id)],
+    schema=schemas.Profile,
+)
+def get_profile_view(db: Session, profile_id: int, version: int):
+    """
+    The full profile as a schemas.Profile dict, served from the cache.
+    Cached per profile version, so the body always matches the ETag built
+    from that version.
+    """
+    return get_profile(db, profile_id)
+
+
+def get_profiles(db: Session, skip: int = 0, limit: int = 100):
+    """
+    Lists profiles with their nested details in a constant number of queries.
+    """
+    return (
+        db.query(models.Profile)
+        .options(*_profile_options())
+        .order_by(models.Profile.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
 
 
 def create_user_profile(db: Session, profile: schemas.ProfileCreate, user_id: int):
@@ -50,5 +162,165 @@ def add_skill_to_profile(db: Session, profile: models.Profile, skill: models.Ski
     """
     profile.skills.append(skill)
     db.commit()
-    db.refresh(profile)
-    return profile
+    return get_profile(db, profile.id)
+
+
+def _skill_link_statement(db, profile_id: int, skill_ids):
+    rows = [{"profile_id": profile_id, "skill_id": skill_id} for skill_id in sorted(set(skill_ids))]
+    return upsert_statement(
+        db.get_bind().dialect.name,
+        models.profile_skills_association,
+        rows,
+        ["profile_id", "skill_id"],
+        [],
+    )
+
+
+def add_skills_to_profile(db: Session, profile_id: int, skills: List[schemas.SkillCreate]):
+    """
+    Links a batch of skills to a profile, creating any that don't exist yet.
+    Skills already on the profile are left as they are. Runs as a single
+    transaction: lookup, insert of missing skills, one multi-row link insert.
+    """
+    skill_ids = resolve_skill_ids(db, (skill.name for skill in skills))
+    if skill_ids:
+        db.execute(_skill_link_statement(db, profile_id, skill_ids.values()))
+        db.execute(_bump_version([profile_id]))
+        invalidate_on_commit(db, profile_tag(profile_id))
+    db.commit()
+    return get_profile(db, profile_id)
+
+
+def backfill_skill_names(db: Session):
+    """
+    Sets every skill's normalized_name with normalize_skill_name and merges
+    skills whose names normalise to the same key into the oldest one,
+    moving their profile links over. Commits; returns (updated, merged).
+    """
+    skills = models.Skill.__table__
+    links = models.profile_skills_association
+    groups = {}
+    for skill_id, name, normalized_name in db.execute(
+        select(skills.c.id, skills.c.name, skills.c.normalized_name).order_by(skills.c.id)
+    ):
+        groups.setdefault(normalize_skill_name(name), []).append((skill_id, normalized_name))
+
+    updated = merged = 0
+    touched_profiles = set()
+    for key, rows in groups.items():
+        (keeper, normalized_name), duplicates = rows[0], [skill_id for skill_id, _ in rows[1:]]
+        if duplicates:
+            profile_ids = set(
+                db.execute(select(links.c.profile_id).where(links.c.skill_id.in_(duplicates))).scalars()
+            )
+            if profile_ids:
+                db.execute(
+                    upsert_statement(
+                        db.get_bind().dialect.name,
+                        links,
+                        [{"profile_id": profile_id, "skill_id": keeper} for profile_id in sorted(profile_ids)],
+                        ["profile_id", "skill_id"],
+                        [],
+                    )
+                )
+                touched_profiles |= profile_ids
+            db.execute(delete(links).where(links.c.skill_id.in_(duplicates)))
+            db.execute(delete(skills).where(skills.c.id.in_(duplicates)))
+            merged += len(duplicates)
+        if normalized_name != key:
+            db.execute(update(skills).where(skills.c.id == keeper).values(normalized_name=key))
+            updated += 1
+    if touched_profiles:
+        db.execute(_bump_version(touched_profiles))
+        invalidate_on_commit(db, *(profile_tag(profile_id) for profile_id in touched_profiles))
+    db.commit()
+    return updated, merged
+
+
+# --- Async versions (DATABASE_ASYNC) ---
+# Eager loading is mandatory here: async sessions cannot lazy load.
+
+
+async def get_profile_by_user_id_async(db: AsyncSession, user_id: int):
+    result = await db.execute(
+        select(models.Profile)
+        .where(models.Profile.user_id == user_id)
+        .options(*_profile_options())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def get_profile_async(db: AsyncSession, profile_id: int):
+    return await db.get(models.Profile, profile_id, options=_profile_options())
+
+
+@cached(
+    key=lambda db, profile_id, version: f"profile:{profile_id}:{version}",
+    tags=lambda value, db, profile_id, version: [profile_tag(profile_id)],
+    schema=schemas.Profile,
+)
+async def get_profile_view_async(db: AsyncSession, profile_id: int, version: int):
+    return await get_profile_async(db, profile_id)
+
+
+async def get_profile_version_async(db: AsyncSession, profile_id: int) -> Optional[int]:
+    return await db.scalar(select(models.Profile.version).where(models.Profile.id == profile_id))
+
+
+async def create_user_profile_async(
+    db: AsyncSession, profile: schemas.ProfileCreate, user_id: int
+):
+    db_profile = models.Profile(
+        **profile.model_dump(), user_id=user_id, educations=[], experiences=[], skills=[]
+    )
+    db.add(db_profile)
+    await db.commit()
+    return db_profile
+
+
+async def add_education_to_profile_async(
+    db: AsyncSession, education: schemas.EducationCreate, profile_id: int
+):
+    db_education = models.Education(**education.model_dump(), profile_id=profile_id)
+    db.add(db_education)
+    await db.commit()
+    await db.refresh(db_education)
+    return db_education
+
+
+async def add_experience_to_profile_async(
+    db: AsyncSession, experience: schemas.ExperienceCreate, profile_id: int
+):
+    db_experience = models.Experience(**experience.model_dump(), profile_id=profile_id)
+    db.add(db_experience)
+    await db.commit()
+    await db.refresh(db_experience)
+    return db_experience
+
+
+async def add_skill_to_profile_async(
+    db: AsyncSession, profile: models.Profile, skill: models.Skill
+):
+    """
+    `profile` must have been loaded with get_profile_async().
+    """
+    profile.skills.append(skill)
+    await db.commit()
+    return await get_profile_async(db, profile.id)
+
+
+async def add_skills_to_profile_async(
+    db: AsyncSession, profile_id: int, skills: List[schemas.SkillCreate]
+):
+    skill_ids = await resolve_skill_ids_async(db, (skill.name for skill in skills))
+    if skill_ids:
+        await db.execute(_skill_link_statement(db, profile_id, skill_ids.values()))
+        await db.execute(_bump_version([profile_id]))
+        invalidate_on_commit(db, profile_tag(profile_id))
+    await db.commit()
+    # populate_existing: the link rows were written with Core, so a profile
+    # already in the identity map would otherwise keep its stale collection
+    return await db.get(
+        models.Profile, profile_id, options=_profile_options(), populate_existing=True
+    )
@@ -1,27 +1,70 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import models
 import schemas
+from app.core.conditional import make_etag
+from app.utils.pagination import Keyset, Page, paginate, paginate_async
+from app.utils.sql import upsert_statement
+from app.utils.text import normalize_skill_name
+
+
+def _display_name(normalized_name: str) -> str:
+    # Derived from the normalised key so `name` and `normalized_name`
+    # can never conflict independently of each other
+    return normalized_name.title()  # Standardize to Title Case
+
+
+def _normalized_names(names: Iterable[str]) -> List[str]:
+    # Sorted so concurrent bulk inserts take index locks in the same order
+    return sorted({normalize_skill_name(name) for name in names if name and name.strip()})
 
 
 def get_skill_by_name(db: Session, name: str):
     """
-    Fetches a single skill by its name (case-insensitive).
+    Fetches a single skill by its name (case- and whitespace-insensitive).
     """
-    return db.query(models.Skill).filter(models.Skill.name.ilike(name)).first()
+    return (
+        db.query(models.Skill)
+        .filter(models.Skill.normalized_name == normalize_skill_name(name))
+        .first()
+    )
+
 
+SKILL_KEYSET = Keyset(models.Skill.id)
 
-def get_skills(db: Session, skip: int = 0, limit: int = 100):
+
+def get_skills(db: Session, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
     """
-    Fetches a list of all skills.
+    Fetches one page of skills in id order, continuing after `cursor`.
     """
-    return db.query(models.Skill).offset(skip).limit(limit).all()
+    return paginate(db, select(models.Skill), SKILL_KEYSET, limit=limit, cursor=cursor)
+
+
+def _skills_version():
+    # Skills are only ever added or removed, never edited in place
+    return select(func.max(models.Skill.id), func.count(models.Skill.id))
+
+
+def skills_page_etag(version, limit: Optional[int], cursor: Optional[str]) -> str:
+    return make_etag("skills", *version, limit, cursor)
+
+
+def get_skills_version(db: Session):
+    """
+    (max id, count) of the skills table: the ETag input for skill pages.
+    """
+    return tuple(db.execute(_skills_version()).one())
 
 
 def create_skill(db: Session, skill: schemas.SkillCreate):
     """
     Creates a new skill in the database.
     """
-    db_skill = models.Skill(name=skill.name.title())  # Standardize to Title Case
+    normalized_name = normalize_skill_name(skill.name)
+    db_skill = models.Skill(name=_display_name(normalized_name), normalized_name=normalized_name)
     db.add(db_skill)
     db.commit()
     db.refresh(db_skill)
@@ -36,3 +79,96 @@ def get_or_create_skill(db: Session, skill: schemas.SkillCreate):
     if db_skill:
         return db_skill
     return create_skill(db=db, skill=skill)
+
+
+def _skill_ids_query(normalized_names: List[str]):
+    return select(models.Skill.normalized_name, models.Skill.id).where(
+        models.Skill.normalized_name.in_(normalized_names)
+    )
+
+
+def _missing_skill_rows(normalized_names: List[str], found: Dict[str, int]) -> List[Dict]:
+    return [
+        {"name": _display_name(normalized_name), "normalized_name": normalized_name}
+        for normalized_name in normalized_names
+        if normalized_name not in found
+    ]
+
+
+def resolve_skill_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Maps each distinct normalised name to a skill id, creating missing skills.
+    One IN query for the lookup, then one conflict-ignoring multi-row INSERT
+    and one IN query for the new ids only if something was missing, so
+    concurrent callers creating the same skill both succeed.
+    Does not commit.
+    """
+    normalized_names = _normalized_names(names)
+    if not normalized_names:
+        return {}
+    found = dict(db.execute(_skill_ids_query(normalized_names)).all())
+    missing = _missing_skill_rows(normalized_names, found)
+    if missing:
+        db.execute(
+            upsert_statement(
+                db.get_bind().dialect.name, models.Skill.__table__, missing, ["normalized_name"], []
+            )
+        )
+        created = [row["normalized_name"] for row in missing]
+        found.update(db.execute(_skill_ids_query(created)).all())
+    return found
+
+
+# --- Async versions (DATABASE_ASYNC) ---
+
+
+async def get_skill_by_name_async(db: AsyncSession, name: str):
+    result = await db.execute(
+        select(models.Skill)
+        .where(models.Skill.normalized_name == normalize_skill_name(name))
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def get_skills_async(
+    db: AsyncSession, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> Page:
+    return await paginate_async(db, select(models.Skill), SKILL_KEYSET, limit=limit, cursor=cursor)
+
+
+async def get_skills_version_async(db: AsyncSession):
+    return tuple((await db.execute(_skills_version())).one())
+
+
+async def create_skill_async(db: AsyncSession, skill: schemas.SkillCreate):
+    normalized_name = normalize_skill_name(skill.name)
+    db_skill = models.Skill(name=_display_name(normalized_name), normalized_name=normalized_name)
+    db.add(db_skill)
+    await db.commit()
+    await db.refresh(db_skill)
+    return db_skill
+
+
+async def get_or_create_skill_async(db: AsyncSession, skill: schemas.SkillCreate):
+    db_skill = await get_skill_by_name_async(db, name=skill.name)
+    if db_skill:
+        return db_skill
+    return await create_skill_async(db=db, skill=skill)
+
+
+async def resolve_skill_ids_async(db: AsyncSession, names: Iterable[str]) -> Dict[str, int]:
+    normalized_names = _normalized_names(names)
+    if not normalized_names:
+        return {}
+    found = dict((await db.execute(_skill_ids_query(normalized_names))).all())
+    missing = _missing_skill_rows(normalized_names, found)
+    if missing:
+        await db.execute(
+            upsert_statement(
+                db.get_bind().dialect.name, models.Skill.__table__, missing, ["normalized_name"], []
+            )
+        )
+        created = [row["normalized_name"] for row in missing]
+        found.update((await db.execute(_skill_ids_query(created))).all())
+    return found
@@ -1,7 +1,11 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models import User
+from models import Profile, User
 from schemas import UserCreate
-from security import get_password_hash
+from security import get_password_hash, get_password_hash_async
 
 
 def get_user_by_email(db: Session, email: str):
@@ -11,14 +15,58 @@ def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 
-def create_user(db: Session, user: UserCreate):
+def get_principal_by_email(db: Session, email: str):
+
+    # Fetches what authentication needs (user and profile id) in one query.
+
+    return (
+        db.query(User.id, User.email, User.is_active, Profile.id.label("profile_id"))
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .filter(User.email == email)
+        .first()
+    )
+
+
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None):
 
     # Creates a new user in the database.
-    # This function handles hashing the password.
+    # This function hashes the password unless the caller already did.
 
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(email=user.email, hashed_password=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
+
+
+# --- Async versions (DATABASE_ASYNC) ---
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email).limit(1))
+    return result.scalars().first()
+
+
+async def get_principal_by_email_async(db: AsyncSession, email: str):
+    result = await db.execute(
+        select(User.id, User.email, User.is_active, Profile.id.label("profile_id"))
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .where(User.email == email)
+        .limit(1)
+    )
+    return result.first()
+
+
+async def create_user_async(
+    db: AsyncSession, user: UserCreate, hashed_password: Optional[str] = None
+):
+    if hashed_password is None:
+        hashed_password = await get_password_hash_async(user.password)
+    db_user = User(email=user.email, hashed_password=hashed_password)
+    db.add(db_user)
+    await db.commit()
+    # Load the (empty) profile now; lazy loading is not available in async
+    await db.refresh(db_user, attribute_names=["id", "email", "is_active", "profile"])
+    return db_user
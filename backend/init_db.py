@@ -20,6 +20,30 @@ def main():
             print("❌ Cancelled")
             return
     
+    if len(sys.argv) > 1 and sys.argv[1] == "--dedupe-match-scores":
+        # Run before adding uq_match_scores_user_job to an existing table
+        from app.core.database import SessionLocal
+        from app.services.match_scoring import dedupe_match_scores
+        db = SessionLocal()
+        try:
+            print(f"🧹 Deleted {dedupe_match_scores(db)} duplicate match scores")
+        finally:
+            db.close()
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "--backfill-skill-names":
+        # Run after adding skills.normalized_name, before its unique index
+        import crud.user  # noqa: F401  (resolves the crud/security import cycle)
+        from crud.profile import backfill_skill_names
+        from database import SessionLocal as LegacySessionLocal
+        db = LegacySessionLocal()
+        try:
+            updated, merged = backfill_skill_names(db)
+            print(f"🧹 Normalised {updated} skill names, merged {merged} duplicate skills")
+        finally:
+            db.close()
+        return
+    
     print("🔄 Initializing database...")
     init_db()
     print("✅ Database initialized successfully!")
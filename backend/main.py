@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import the centralized settings object
@@ -8,7 +8,47 @@ from app.core.config import settings
 from database import engine, Base
 from models import *  # This will find and register all your models (User, Profile, etc.)
 from routers import auth, profiles  # Import both of our feature routers
-from routers import auth, profiles, skills
+from routers import auth, profiles, skills, feed, matching, jobs, swipes, companies, ai, resumes
+from app.core.database import SessionLocal, engine as app_engine
+from app.core.instrumentation import install_instrumentation, register_component
+from app.core.metrics import registry
+from app.core.rate_limit import RateLimitMiddleware, bearer_key, get_rate_limiter
+from database import AsyncBackingSession, SessionLocal as LegacySessionLocal
+from security import install_principal_invalidation, principal_cache, token_subject
+from app.core.cache import get_cache, install_cache_invalidation
+from app.core.hashing import get_hashing_pool
+import crud.profile as profile_crud
+from app.services import catalog
+from app.services.ai_generation import get_generation_cache
+from app.services.auto_apply import get_auto_apply_pipeline
+from app.services.llm_gateway import get_llm_gateway
+from app.services.resume_render import get_resume_renderer
+from app.services.upload_store import get_upload_store
+from app.services.match_invalidation import (
+    get_stale_score_worker,
+    install_change_capture,
+)
+from app.services.geo_index import get_job_geo_index, install_geo_sync
+from app.services.job_expiry import get_expiry_scheduler, install_expiry_sync
+from app.services.job_search import (
+    get_job_search_index,
+    install_search_sync,
+    save_job_search_index,
+    warm_job_search_index,
+)
+from app.services.swipe_deck import install_deck_sync
+from app.services.swipe_ingest import get_swipe_buffer
+from app.services.swipe_quota import get_swipe_quota, install_quota_sync
+from app.services.skill_typeahead import get_skill_typeahead, install_typeahead_sync
+from app.services.skill_index import (
+    get_skill_index,
+    install_index_sync,
+    save_skill_index,
+)
+
+if settings.DATABASE_ASYNC:
+    # AsyncSession-backed handlers for the auth, profile and skill routes
+    from routers import auth_async as auth, profiles_async as profiles, skills_async as skills
 
 # This crucial line tells SQLAlchemy to create all the tables
 # defined in models.py when the app starts.
@@ -21,6 +61,15 @@ app = FastAPI(
     description="AI-powered job application platform with Tinder-like swiping interface",
 )
 
+# Sliding-window limit per client; added before CORS so that 429s still
+# carry the CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        exempt_paths=settings.RATE_LIMIT_EXEMPT_PATHS,
+        key=bearer_key(token_subject),
+    )
+
 # Configure CORS using settings from your config file
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +79,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and SQL metrics, exposed at /metrics
+if settings.METRICS_ENABLED:
+    install_instrumentation(app, {"database": engine, "app.core.database": app_engine})
+    register_component("principal_cache", principal_cache.stats)
+    register_component("swipe_buffer", lambda: get_swipe_buffer().stats())
+    register_component("password_hashing", lambda: get_hashing_pool().stats())
+    register_component("cache", lambda: get_cache().stats())
+    register_component("job_search", lambda: get_job_search_index().stats())
+    register_component("job_expiry", lambda: get_expiry_scheduler().stats())
+    register_component("auto_apply", lambda: get_auto_apply_pipeline().stats())
+    register_component("rate_limit", lambda: get_rate_limiter().stats())
+    register_component("swipe_quota", lambda: get_swipe_quota().stats())
+    register_component("generation_cache", lambda: get_generation_cache().stats())
+    register_component("llm_gateway", lambda: get_llm_gateway().stats())
+    register_component("resume_render", lambda: get_resume_renderer().stats())
+    register_component("upload_store", lambda: get_upload_store().stats())
+
 
 # --- Lifespan Events (for startup and shutdown) ---
 @app.on_event("startup")
@@ -37,12 +103,67 @@ def startup_event():
     """Prints a nice message when the application starts."""
     print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     print(f"📝 API Documentation available at: /docs")
+    # Drop cached principals when a user or their profile changes
+    install_principal_invalidation(LegacySessionLocal)
+    install_principal_invalidation(AsyncBackingSession)
+    # Drop cached profile, job and company pages when their rows change
+    install_cache_invalidation(LegacySessionLocal, profile_crud.cache_tags)
+    install_cache_invalidation(AsyncBackingSession, profile_crud.cache_tags)
+    install_cache_invalidation(SessionLocal, catalog.cache_tags)
+    # Row version behind the GET /me/ ETag
+    profile_crud.install_profile_versioning(LegacySessionLocal)
+    profile_crud.install_profile_versioning(AsyncBackingSession)
+    # Flag affected match scores whenever profile or job data changes
+    install_change_capture(SessionLocal)
+    get_stale_score_worker().start()
+    # Keep the in-memory skill and geo indexes in step with job edits
+    install_index_sync(SessionLocal, get_skill_index)
+    install_geo_sync(SessionLocal, get_job_geo_index)
+    # Swipe decks look for newly published jobs on their next first page
+    install_deck_sync(SessionLocal)
+    # Publishing, editing and closing jobs re-index them for search; the
+    # index reopens its memory-mapped segments instead of rebuilding, off
+    # the startup path
+    install_search_sync(SessionLocal, get_job_search_index)
+    warm_job_search_index()
+    # New skills show up in the typeahead as soon as they are committed
+    install_typeahead_sync(LegacySessionLocal, get_skill_typeahead)
+    install_typeahead_sync(AsyncBackingSession, get_skill_typeahead)
+    get_skill_typeahead()
+    # Expires jobs at their application deadline (and any that passed while
+    # down), so job queries only need to filter on status
+    install_expiry_sync(SessionLocal, get_expiry_scheduler)
+    get_expiry_scheduler().start()
+    # A changed daily swipe limit or timezone applies from the next swipe
+    install_quota_sync(SessionLocal, get_swipe_quota)
+    # Replays any spilled swipes, then starts the write-behind flusher
+    get_swipe_buffer().start()
+    if settings.ENABLE_AUTO_APPLY:
+        # Applies on right swipes after they are flushed; its first sweep
+        # picks up swipes left unapplied when the process last stopped
+        get_auto_apply_pipeline().start()
 
 
 @app.on_event("shutdown")
 def shutdown_event():
     """Prints a nice message when the application shuts down."""
     print(f"👋 Shutting down {settings.APP_NAME}")
+    get_swipe_buffer().stop()
+    if settings.ENABLE_AUTO_APPLY:
+        get_auto_apply_pipeline().stop()
+    get_hashing_pool().shutdown()
+    get_resume_renderer().shutdown()
+    get_upload_store().shutdown()
+    get_stale_score_worker().stop()
+    get_expiry_scheduler().stop()
+    save_skill_index()
+    save_job_search_index()
+
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    """Cancels unfinished generations and closes the model's connections."""
+    await get_llm_gateway().aclose()
 
 
 # --- Include Routers ---
@@ -50,6 +171,13 @@ def shutdown_event():
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(profiles.router, prefix="/api/profiles", tags=["Profiles"])
 app.include_router(skills.router, prefix="/api/skills", tags=["Skills"])
+app.include_router(feed.router, prefix="/api/feed", tags=["Feed"])
+app.include_router(matching.router, prefix="/api/match-scores", tags=["Matching"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(companies.router, prefix="/api/companies", tags=["Companies"])
+app.include_router(swipes.router, prefix="/api/swipes", tags=["Swipes"])
+app.include_router(ai.router, prefix="/api/ai", tags=["AI Generation"])
+app.include_router(resumes.router, prefix="/api/resumes", tags=["Resumes"])
 
 
 # --- Root and Health Check Endpoints ---
@@ -63,3 +191,11 @@ def root():
 def health_check():
     """A health check endpoint that can be used by monitoring services."""
     return {"status": "healthy"}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint."""
+        return Response(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, Table, Date
 from sqlalchemy.orm import relationship
 from database import Base
+from app.utils.text import normalize_skill_name
 
 # --- NEW: Association Table for Profile <-> Skill (Many-to-Many) ---
 profile_skills_association = Table(
@@ -35,6 +36,9 @@ class Profile(Base):
     headline = Column(String(100))
     bio = Column(Text)
     resume_url = Column(String(255), nullable=True)  # <-- NEW: For the resume path
+    # Bumped whenever the profile or its education/experience/skills change;
+    # the ETag of GET /me/ (see crud.profile.install_profile_versioning)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True
     )
@@ -85,6 +89,15 @@ class Skill(Base):
     __tablename__ = "skills"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, index=True, nullable=False)
+    # Lookup key (see normalize_skill_name); an equality/IN match on this
+    # uses the unique index, unlike ILIKE on `name`
+    normalized_name = Column(
+        String(50),
+        unique=True,
+        index=True,
+        nullable=False,
+        default=lambda ctx: normalize_skill_name(ctx.get_current_parameters()["name"]),
+    )
 
     profiles = relationship(
         "Profile", secondary=profile_skills_association, back_populates="skills"
@@ -0,0 +1,108 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+import crud.profile
+import schemas
+import security
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job
+from app.services.ai_generation import (
+    KIND_COVER_LETTER,
+    KIND_RESUME,
+    GenerationRequest,
+    job_snapshot,
+    profile_snapshot,
+    save_document,
+)
+from app.services.llm_gateway import format_sse, get_llm_gateway
+from database import SessionLocal as LegacySessionLocal
+
+router = APIRouter()
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _load_snapshots(user_id: int, job_id: Optional[str]):
+    """The prompt snapshots of the user's profile and the job (None when missing)."""
+    with LegacySessionLocal() as db:
+        profile = crud.profile.get_profile_by_user_id(db, user_id)
+        profile = profile_snapshot(profile) if profile is not None else None
+    job = None
+    if job_id is not None:
+        with SessionLocal() as db:
+            job = db.scalar(
+                select(Job)
+                .where(Job.id == job_id, Job.deleted_at.is_(None))
+                .options(selectinload(Job.company), selectinload(Job.required_skills))
+            )
+            job = job_snapshot(job) if job is not None else None
+    return profile, job
+
+
+def _persister(user_id: str, request: GenerationRequest, job_id: Optional[str]):
+    def persist(generation):
+        with SessionLocal() as db:
+            document = save_document(db, user_id, request, generation, job_id=job_id)
+            db.commit()
+            return {"document_id": document.id, "word_count": document.word_count}
+
+    return persist
+
+
+async def _stream_document(current_user, kind, job_id, tone=None, template_id=None) -> StreamingResponse:
+    gateway = get_llm_gateway()
+    profile, job = await gateway.run_sync(_load_snapshots, current_user.id, job_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Create a profile first")
+    if job_id is not None and job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    try:
+        request = gateway.cache.request(kind, profile, job, tone=tone, template_id=template_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    user_id = str(current_user.id)
+    events = gateway.stream(user_id, request, on_complete=_persister(user_id, request, job_id))
+
+    async def body():
+        async for event in events:
+            yield format_sse(event)
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/cover-letters/stream")
+async def stream_cover_letter(
+    body: schemas.CoverLetterGenerate,
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Writes a cover letter for a job and streams it as server-sent events:
+    `token` events carry text as the model writes it, then `done` carries
+    the id of the saved CoverLetter (or `error`, with `retryable` when the
+    generation queue was full).
+    """
+    if not settings.ENABLE_AI_COVER_LETTER_GENERATION:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AI cover letters are disabled")
+    return await _stream_document(
+        current_user, KIND_COVER_LETTER, body.job_id, tone=body.tone.value, template_id=body.template_id
+    )
+
+
+@router.post("/resumes/stream")
+async def stream_resume(
+    body: schemas.ResumeGenerate,
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Rewrites the user's profile as a resume, optionally tailored to a job,
+    streamed like /cover-letters/stream and saved as a Resume.
+    """
+    if not settings.ENABLE_AI_RESUME_GENERATION:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="AI resumes are disabled")
+    return await _stream_document(current_user, KIND_RESUME, body.job_id, template_id=body.template_id)
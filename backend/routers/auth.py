@@ -1,38 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 import crud.user as crud
 import schemas
 import security
+from app.core.hashing import HashingPoolSaturated
 from database import get_db
 
 router = APIRouter()
 
+# Login and registration are async so that waiting on the hashing pool does
+# not hold a request thread; the DB calls still run in the threadpool.
+hashing_unavailable = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many concurrent sign-ins, retry shortly",
+    headers={"Retry-After": "1"},
+)
+
 
 @router.post("/register/", response_model=schemas.User)
-def create_new_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_new_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """
     Create a new user in the system.
     """
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    return crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await security.get_password_hash_async(user.password)
+    except HashingPoolSaturated:
+        raise hashing_unavailable
+    return await run_in_threadpool(
+        crud.create_user, db=db, user=user, hashed_password=hashed_password
+    )
 
 
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     Authenticate user and return a JWT access token.
     """
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(
-        form_data.password, user.hashed_password
-    ):
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=form_data.username)
+    try:
+        verified = user is not None and await security.verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except HashingPoolSaturated:
+        raise hashing_unavailable
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
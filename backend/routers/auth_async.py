@@ -0,0 +1,57 @@
+# Async twin of routers/auth.py, mounted instead of it when DATABASE_ASYNC is on.
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud.user as crud
+import schemas
+import security
+from app.core.hashing import HashingPoolSaturated
+from database import get_async_db
+from routers.auth import hashing_unavailable
+
+router = APIRouter()
+
+
+@router.post("/register/", response_model=schemas.User)
+async def create_new_user(
+    user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create a new user in the system.
+    """
+    db_user = await crud.get_user_by_email_async(db, email=user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    try:
+        hashed_password = await security.get_password_hash_async(user.password)
+    except HashingPoolSaturated:
+        raise hashing_unavailable
+    return await crud.create_user_async(db=db, user=user, hashed_password=hashed_password)
+
+
+@router.post("/token", response_model=schemas.Token)
+async def login_for_access_token(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+):
+    """
+    Authenticate user and return a JWT access token.
+    """
+    user = await crud.get_user_by_email_async(db, email=form_data.username)
+    try:
+        verified = user is not None and await security.verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except HashingPoolSaturated:
+        raise hashing_unavailable
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = security.create_access_token(data={"sub": user.email})
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,38 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+import schemas
+import security
+from app.core.conditional import respond
+from app.core.database import get_db
+from app.services.catalog import get_company_page, get_company_validators
+
+router = APIRouter()
+
+
+@router.get("/{company_slug}", response_model=schemas.CompanyPage)
+def read_company(
+    company_slug: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Company profile with its most recent open jobs (cached).
+    Answers 304 when If-None-Match / If-Modified-Since still match.
+    """
+    started = time.perf_counter()
+    validators = get_company_validators(db, company_slug)
+    if validators is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+    etag, last_modified = validators
+    return respond(
+        request,
+        etag,
+        last_modified,
+        lambda: get_company_page(db, company_slug, etag),
+        started,
+        not_found="Company not found",
+    )
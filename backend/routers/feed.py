@@ -0,0 +1,62 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+import schemas
+import security
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.job import Job
+from app.services.swipe_deck import InvalidCursor, get_deck_engine
+from app.utils.pagination import clamp_page_size
+
+router = APIRouter()
+
+
+@router.get("/", response_model=schemas.FeedPage)
+def read_feed(
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Returns the next cards from the current user's swipe deck.
+    Pass the returned `next_cursor` back to continue where the page ended.
+    """
+    limit = clamp_page_size(limit)
+    try:
+        cards = get_deck_engine().next_cards(
+            str(current_user.id), limit=limit, after=cursor
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid feed cursor")
+
+    if not cards:
+        return schemas.FeedPage(cards=[], next_cursor=cursor)
+
+    # One IN query for the whole page, re-ordered to match the deck
+    jobs = db.query(Job).filter(Job.id.in_([card.job_id for card in cards])).all()
+    jobs_by_id = {job.id: job for job in jobs}
+
+    page = []
+    for card in cards:
+        job = jobs_by_id.get(card.job_id)
+        if job is None:
+            continue
+        page.append(
+            schemas.JobCard(
+                id=job.id,
+                job_title=job.job_title,
+                company_id=job.company_id,
+                work_mode=job.work_mode,
+                experience_level=job.experience_level,
+                location_city=job.location_city,
+                location_country=job.location_country,
+                salary_min=job.salary_min,
+                salary_max=job.salary_max,
+                score=card.score,
+            )
+        )
+    return schemas.FeedPage(cards=page, next_cursor=cards[-1].cursor)
@@ -0,0 +1,157 @@
+import hmac
+import io
+import time
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, UploadFile
+from sqlalchemy.orm import Session
+
+import schemas
+import security
+from app.core.conditional import respond
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.job import JobSource, WorkMode
+from app.services.catalog import get_job_detail, get_job_validators
+from app.services.geo_index import get_job_geo_index, jobs_near_user
+from app.services.job_import import FEED_FORMATS, detect_format, import_feed
+from app.services.job_search import get_job_search_index
+from app.services.skill_index import get_skill_index
+from app.utils.pagination import clamp_page_size
+
+router = APIRouter()
+
+
+@router.get("/match-skills", response_model=List[schemas.SkillMatch])
+def match_jobs_by_skills(
+    skills: List[str] = Query(..., description="Skill names to match"),
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    require_all: bool = False,
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Active jobs ranked by weighted overlap with the given skills.
+    With `require_all`, only jobs listing every skill are returned.
+    """
+    limit = clamp_page_size(limit)
+    return get_skill_index().top_jobs(skills, k=limit, require_all=require_all)
+
+
+@router.get("/search", response_model=List[schemas.JobSearchHit])
+def search_jobs(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Full-text job search ranked by BM25, titles weighted above skills,
+    requirements and descriptions. Quote words to require them as a phrase:
+    `"machine learning" python`.
+    """
+    limit = clamp_page_size(limit)
+    return get_job_search_index().search(q, k=limit)
+
+
+@router.get("/nearby", response_model=List[schemas.GeoHit])
+def read_nearby_jobs(
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_km: Optional[float] = None,
+    work_mode: Optional[List[WorkMode]] = Query(None),
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    db: Session = Depends(get_db),
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Active jobs within `radius_km`, nearest first, followed by remote jobs.
+    Without `lat`/`lon` the search centres on the current user's profile
+    location and search radius preferences.
+    """
+    limit = clamp_page_size(limit)
+    if lat is None or lon is None:
+        return jobs_near_user(
+            db, str(current_user.id), radius_km=radius_km, work_modes=work_mode, limit=limit
+        )
+    return get_job_geo_index().within_radius(
+        lat,
+        lon,
+        radius_km or settings.GEO_DEFAULT_RADIUS_KM,
+        work_modes=work_mode,
+        limit=limit,
+    )
+
+
+@router.get("/in-box", response_model=List[schemas.GeoHit])
+def read_jobs_in_box(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    work_mode: Optional[List[WorkMode]] = Query(None),
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Active jobs inside a map viewport, nearest to its centre first.
+    """
+    limit = clamp_page_size(limit)
+    return get_job_geo_index().within_box(
+        min_lat, min_lon, max_lat, max_lon, work_modes=work_mode, limit=limit
+    )
+
+
+@router.post("/import", response_model=schemas.JobImportReport)
+def import_jobs(
+    file: UploadFile = File(...),
+    source: JobSource = JobSource.IMPORTED,
+    format: Optional[str] = Query(None, pattern="^(jsonl|csv)$"),
+    x_import_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk-imports a JSONL or CSV job feed for partner integrations,
+    authenticated with the `X-Import-Key` header. Jobs are upserted by
+    (`source`, `external_job_id`); invalid rows are skipped and reported.
+    The upload is read in batches, never whole.
+    """
+    expected = settings.JOB_IMPORT_API_KEY
+    if not expected or not x_import_key or not hmac.compare_digest(x_import_key, expected):
+        raise HTTPException(status_code=403, detail="Invalid import key")
+    if source is JobSource.INTERNAL:
+        raise HTTPException(status_code=400, detail="Internal jobs cannot be imported")
+    fmt = format or detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown feed format; pass format as one of {FEED_FORMATS}"
+        )
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return import_feed(
+            db, stream, fmt, source=source, batch_size=settings.JOB_IMPORT_BATCH_SIZE
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Feed is not valid UTF-8")
+    finally:
+        stream.detach()
+
+
+# Declared last so the fixed paths above are never captured as a job id
+@router.get("/{job_id}", response_model=schemas.JobDetail)
+def read_job(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Full job posting with its company and required skills (cached).
+    Answers 304 when If-None-Match / If-Modified-Since still match.
+    """
+    started = time.perf_counter()
+    validators = get_job_validators(db, job_id)
+    if validators is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    etag, last_modified = validators
+    return respond(
+        request, etag, last_modified, lambda: get_job_detail(db, job_id, etag), started, not_found="Job not found"
+    )
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+import schemas
+import security
+from app.services.match_invalidation import get_stale_score_worker
+
+router = APIRouter()
+
+
+@router.get("/pipeline", response_model=schemas.MatchPipelineStats)
+def read_match_pipeline_stats(
+    current_user: security.Principal = Depends(security.get_current_admin),
+):
+    """
+    Reports the stale match score backlog and how fast it is draining.
+    """
+    return get_stale_score_worker().stats()
@@ -1,15 +1,17 @@
 # /backend/routers/profiles.py
 
-from fastapi import APIRouter, Depends, HTTPException
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
-import models
 import schemas
 import security
 
 import crud.profile as profile_crud
 import crud.skill as skill_crud
 
+from app.core.conditional import respond
 from database import get_db
 
 router = APIRouter()
@@ -21,9 +23,9 @@ router = APIRouter()
 def create_profile_for_current_user(
     profile: schemas.ProfileCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(security.get_current_user),
+    current_user: security.Principal = Depends(security.get_current_user),
 ):
-    if current_user.profile:
+    if profile_crud.get_profile_by_user_id(db, user_id=current_user.id):
         raise HTTPException(status_code=400, detail="User already has a profile")
     return profile_crud.create_user_profile(
         db=db, profile=profile, user_id=current_user.id
@@ -32,13 +34,27 @@ def create_profile_for_current_user(
 
 @router.get("/me/", response_model=schemas.Profile)
 def read_current_user_profile(
-    current_user: models.User = Depends(security.get_current_user),
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: security.Principal = Depends(security.get_current_user),
 ):
-    if not current_user.profile:
+    started = time.perf_counter()
+    profile_id = current_user.profile_id
+    version = None
+    if profile_id is not None:
+        version = profile_crud.get_profile_version(db, profile_id)
+    if version is None:
         raise HTTPException(
             status_code=404, detail="Profile not found for current user"
         )
-    return current_user.profile
+    return respond(
+        request,
+        profile_crud.profile_etag(profile_id, version),
+        None,
+        lambda: profile_crud.get_profile_view(db, profile_id=profile_id, version=version),
+        started,
+        not_found="Profile not found for current user",
+    )
 
 
 # --- NEW Endpoints for Profile Details ---
@@ -48,14 +64,14 @@ def read_current_user_profile(
 def add_education_to_my_profile(
     education: schemas.EducationCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(security.get_current_user),
+    current_user: security.Principal = Depends(security.get_current_user),
 ):
-    if not current_user.profile:
+    if current_user.profile_id is None:
         raise HTTPException(
             status_code=404, detail="Profile not found, create one first."
         )
     return profile_crud.add_education_to_profile(
-        db=db, education=education, profile_id=current_user.profile.id
+        db=db, education=education, profile_id=current_user.profile_id
     )
 
 
@@ -63,14 +79,14 @@ def add_education_to_my_profile(
 def add_experience_to_my_profile(
     experience: schemas.ExperienceCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(security.get_current_user),
+    current_user: security.Principal = Depends(security.get_current_user),
 ):
-    if not current_user.profile:
+    if current_user.profile_id is None:
         raise HTTPException(
             status_code=404, detail="Profile not found, create one first."
         )
     return profile_crud.add_experience_to_profile(
-        db=db, experience=experience, profile_id=current_user.profile.id
+        db=db, experience=experience, profile_id=current_user.profile_id
     )
 
 
@@ -78,9 +94,12 @@ def add_experience_to_my_profile(
 def add_skill_to_my_profile(
     skill: schemas.SkillCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(security.get_current_user),
+    current_user: security.Principal = Depends(security.get_current_user),
 ):
-    if not current_user.profile:
+    profile = None
+    if current_user.profile_id is not None:
+        profile = profile_crud.get_profile(db, profile_id=current_user.profile_id)
+    if not profile:
         raise HTTPException(
             status_code=404, detail="Profile not found, create one first."
         )
@@ -89,10 +108,28 @@ def add_skill_to_my_profile(
     db_skill = skill_crud.get_or_create_skill(db, skill=skill)
 
     # Check if skill is already linked to profile
-    if db_skill in current_user.profile.skills:
+    if db_skill in profile.skills:
         raise HTTPException(status_code=400, detail="Skill already added to profile.")
 
     # Link the skill to the profile
     return profile_crud.add_skill_to_profile(
-        db=db, profile=current_user.profile, skill=db_skill
+        db=db, profile=profile, skill=db_skill
+    )
+
+
+@router.post("/me/skills/bulk/", response_model=schemas.Profile)
+def add_skills_to_my_profile(
+    payload: schemas.SkillBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Attaches many skills at once; ones already on the profile are skipped.
+    """
+    if current_user.profile_id is None:
+        raise HTTPException(
+            status_code=404, detail="Profile not found, create one first."
+        )
+    return profile_crud.add_skills_to_profile(
+        db=db, profile_id=current_user.profile_id, skills=payload.skills
     )
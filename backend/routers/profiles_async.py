@@ -0,0 +1,131 @@
+# Async twin of routers/profiles.py, mounted instead of it when DATABASE_ASYNC is on.
+
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import schemas
+import security
+
+import crud.profile as profile_crud
+import crud.skill as skill_crud
+
+from app.core.conditional import respond_async
+from database import get_async_db
+
+router = APIRouter()
+
+
+async def _my_profile(db: AsyncSession, current_user: security.Principal, detail: str):
+    profile = None
+    if current_user.profile_id is not None:
+        profile = await profile_crud.get_profile_async(db, profile_id=current_user.profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail=detail)
+    return profile
+
+
+@router.post("/", response_model=schemas.Profile)
+async def create_profile_for_current_user(
+    profile: schemas.ProfileCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: security.Principal = Depends(security.get_current_user_async),
+):
+    if await profile_crud.get_profile_by_user_id_async(db, user_id=current_user.id):
+        raise HTTPException(status_code=400, detail="User already has a profile")
+    return await profile_crud.create_user_profile_async(
+        db=db, profile=profile, user_id=current_user.id
+    )
+
+
+@router.get("/me/", response_model=schemas.Profile)
+async def read_current_user_profile(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: security.Principal = Depends(security.get_current_user_async),
+):
+    started = time.perf_counter()
+    profile_id = current_user.profile_id
+    version = None
+    if profile_id is not None:
+        version = await profile_crud.get_profile_version_async(db, profile_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Profile not found for current user")
+    return await respond_async(
+        request,
+        profile_crud.profile_etag(profile_id, version),
+        None,
+        lambda: profile_crud.get_profile_view_async(db, profile_id=profile_id, version=version),
+        started,
+        not_found="Profile not found for current user",
+    )
+
+
+@router.post("/me/education/", response_model=schemas.Education)
+async def add_education_to_my_profile(
+    education: schemas.EducationCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: security.Principal = Depends(security.get_current_user_async),
+):
+    if current_user.profile_id is None:
+        raise HTTPException(
+            status_code=404, detail="Profile not found, create one first."
+        )
+    return await profile_crud.add_education_to_profile_async(
+        db=db, education=education, profile_id=current_user.profile_id
+    )
+
+
+@router.post("/me/experience/", response_model=schemas.Experience)
+async def add_experience_to_my_profile(
+    experience: schemas.ExperienceCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: security.Principal = Depends(security.get_current_user_async),
+):
+    if current_user.profile_id is None:
+        raise HTTPException(
+            status_code=404, detail="Profile not found, create one first."
+        )
+    return await profile_crud.add_experience_to_profile_async(
+        db=db, experience=experience, profile_id=current_user.profile_id
+    )
+
+
+@router.post("/me/skills/", response_model=schemas.Profile)
+async def add_skill_to_my_profile(
+    skill: schemas.SkillCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: security.Principal = Depends(security.get_current_user_async),
+):
+    profile = await _my_profile(db, current_user, "Profile not found, create one first.")
+
+    # Check if skill exists, or create it if it doesn't
+    db_skill = await skill_crud.get_or_create_skill_async(db, skill=skill)
+
+    # Check if skill is already linked to profile
+    if db_skill in profile.skills:
+        raise HTTPException(status_code=400, detail="Skill already added to profile.")
+
+    # Link the skill to the profile
+    return await profile_crud.add_skill_to_profile_async(
+        db=db, profile=profile, skill=db_skill
+    )
+
+
+@router.post("/me/skills/bulk/", response_model=schemas.Profile)
+async def add_skills_to_my_profile(
+    payload: schemas.SkillBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: security.Principal = Depends(security.get_current_user_async),
+):
+    """
+    Attaches many skills at once; ones already on the profile are skipped.
+    """
+    if current_user.profile_id is None:
+        raise HTTPException(
+            status_code=404, detail="Profile not found, create one first."
+        )
+    return await profile_crud.add_skills_to_profile_async(
+        db=db, profile_id=current_user.profile_id, skills=payload.skills
+    )
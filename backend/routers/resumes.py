@@ -0,0 +1,171 @@
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import schemas
+import security
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.models.ai import FileFormat, Resume
+from app.services.resume_render import (
+    RenderSpec,
+    UnknownTemplate,
+    apply_render_stats,
+    available_templates,
+    get_resume_renderer,
+    safe_filename,
+)
+from app.services.upload_store import MEDIA_TYPES as UPLOAD_MEDIA_TYPES
+from app.services.upload_store import MultipartFile, StoredFile, UploadRejected, get_upload_store
+
+router = APIRouter()
+
+# Boundaries and part headers a multipart body adds around the file
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+@router.get("/templates", response_model=List[str])
+def list_templates():
+    """Template ids a resume's template_id may name."""
+    return available_templates()
+
+
+def _record_upload(user_id: str, stored: StoredFile, filename: Optional[str]):
+    """(id, name, created) of the user's Resume for the stored file, created unless they already uploaded it."""
+    with SessionLocal() as db:
+        resume = db.scalar(
+            select(Resume).where(
+                Resume.user_id == user_id, Resume.file_url == stored.key, Resume.deleted_at.is_(None)
+            )
+        )
+        if resume is not None:
+            return resume.id, resume.resume_name, False
+        name = os.path.splitext(os.path.basename(filename or ""))[0].strip() or "Uploaded resume"
+        resume = Resume(
+            user_id=user_id,
+            resume_name=name[:255],
+            file_url=stored.key,
+            file_format=FileFormat(stored.extension) if stored.extension in FileFormat._value2member_map_ else None,
+            file_size_bytes=stored.size,
+            content_sections={},
+        )
+        db.add(resume)
+        db.commit()
+        return resume.id, resume.resume_name, True
+
+
+@router.post("/upload", response_model=schemas.ResumeUpload, status_code=status.HTTP_201_CREATED)
+async def upload_resume(
+    request: Request,
+    response: Response,
+    filename: Optional[str] = None,
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Uploads a resume file (PDF, DOCX, DOC or plain text), sent either as the
+    raw request body (name it with `filename`) or as the first file field of
+    a multipart form. The body is streamed to disk, never held in memory,
+    and cut off at MAX_UPLOAD_SIZE. The type is read from the file itself.
+    Uploading a file you already uploaded returns its Resume with 200.
+    """
+    store = get_upload_store()
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > store.max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"File is larger than {store.max_bytes} bytes",
+        )
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            form = MultipartFile(request.stream(), content_type)
+            stored = await store.save(form.chunks())
+            filename = form.filename or filename
+        else:
+            stored = await store.save(request.stream())
+    except UploadRejected as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+
+    resume_id, resume_name, created = await run_in_threadpool(_record_upload, str(current_user.id), stored, filename)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return schemas.ResumeUpload(
+        id=resume_id,
+        resume_name=resume_name,
+        file_format=stored.extension,
+        file_size_bytes=stored.size,
+        sha256=stored.sha256,
+        deduplicated=stored.deduplicated,
+    )
+
+
+def _uploaded_file_response(resume: Resume):
+    store = get_upload_store()
+    key = resume.file_url
+    extension = key.rsplit(".", 1)[1]
+    # resume_name comes from the client; it must not reach the header raw
+    filename = safe_filename(resume.resume_name or "resume", extension)
+    media_type = UPLOAD_MEDIA_TYPES[extension]
+    if settings.UPLOAD_ACCEL_REDIRECT_PREFIX:
+        # nginx sends the file itself (sendfile); the app only authorises it
+        response = Response(media_type=media_type)
+        response.headers["X-Accel-Redirect"] = settings.UPLOAD_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + key
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+    # Streamed from disk in chunks, or zero-copy where the server supports pathsend
+    return FileResponse(store.path(key), media_type=media_type, filename=filename)
+
+
+@router.get("/{resume_id}/file")
+def download_resume(
+    resume_id: str,
+    format: Optional[FileFormat] = None,
+    db: Session = Depends(get_db),
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    The resume as a file. Uploaded resumes are sent as uploaded; others are
+    rendered in their own file_format unless `format` asks for another
+    (unchanged resumes come from the render cache), recording the word and
+    page counts the render measured.
+    """
+    resume = db.scalar(
+        select(Resume).where(
+            Resume.id == resume_id,
+            Resume.user_id == str(current_user.id),
+            Resume.deleted_at.is_(None),
+        )
+    )
+    if resume is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resume not found")
+    if get_upload_store().owns(resume.file_url) and not resume.content_sections:
+        if format is not None and format != resume.file_format:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded resumes are only available in the format they were uploaded in",
+            )
+        resume.download_count = (resume.download_count or 0) + 1
+        db.commit()
+        return _uploaded_file_response(resume)
+    try:
+        rendered = get_resume_renderer().render(RenderSpec.for_resume(resume, format))
+    except UnknownTemplate as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    apply_render_stats(resume, rendered)
+    resume.download_count = (resume.download_count or 0) + 1
+    db.commit()
+    return Response(
+        content=rendered.content,
+        media_type=rendered.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{rendered.filename(resume.resume_name or "resume")}"',
+            "X-Page-Count": str(rendered.page_count),
+            "X-Word-Count": str(rendered.word_count),
+        },
+    )
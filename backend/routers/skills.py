@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 import schemas
 import crud.skill as crud
+from app.core.conditional import respond
+from app.core.config import settings
+from app.utils.pagination import InvalidCursor
+from app.services.skill_typeahead import get_skill_typeahead, refresh_if_stale
 from database import get_db
 
 router = APIRouter()
@@ -17,10 +23,38 @@ def create_new_skill(skill: schemas.SkillCreate, db: Session = Depends(get_db)):
     return crud.create_skill(db=db, skill=skill)
 
 
-@router.get("/", response_model=List[schemas.Skill])
-def read_all_skills(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=schemas.SkillPage)
+def read_all_skills(
+    request: Request,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieve a page of skills. Pass the returned `next_cursor` back to get
+    the following page; it is null on the last one. Answers 304 while
+    the skills table is unchanged and If-None-Match still matches.
+    """
+    started = time.perf_counter()
+    etag = crud.skills_page_etag(crud.get_skills_version(db), limit, cursor)
+
+    def load():
+        page = crud.get_skills(db, limit=limit, cursor=cursor)
+        return schemas.SkillPage.model_validate(page)
+
+    try:
+        return respond(request, etag, None, load, started)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid skills cursor")
+
+
+@router.get("/typeahead", response_model=List[schemas.SkillSuggestion])
+def suggest_skills(
+    q: str = Query("", max_length=50), limit: int = Query(10, ge=1, le=50)
+):
     """
-    Retrieve a list of all skills.
+    Most popular skills whose name starts with `q`, served from memory.
     """
-    skills = crud.get_skills(db, skip=skip, limit=limit)
-    return skills
+    index = get_skill_typeahead()
+    refresh_if_stale(index)
+    return index.suggest(q, k=limit)
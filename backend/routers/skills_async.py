@@ -0,0 +1,64 @@
+# Async twin of routers/skills.py, mounted instead of it when DATABASE_ASYNC is on.
+
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+import schemas
+import crud.skill as crud
+from app.core.conditional import respond_async
+from app.core.config import settings
+from app.utils.pagination import InvalidCursor
+from app.services.skill_typeahead import get_skill_typeahead, refresh_if_stale
+from database import get_async_db
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Skill)
+async def create_new_skill(
+    skill: schemas.SkillCreate, db: AsyncSession = Depends(get_async_db)
+):
+
+    # Create a new skill in the system.
+
+    return await crud.create_skill_async(db=db, skill=skill)
+
+
+@router.get("/", response_model=schemas.SkillPage)
+async def read_all_skills(
+    request: Request,
+    limit: int = settings.DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Retrieve a page of skills. Pass the returned `next_cursor` back to get
+    the following page; it is null on the last one. Answers 304 while
+    the skills table is unchanged and If-None-Match still matches.
+    """
+    started = time.perf_counter()
+    etag = crud.skills_page_etag(await crud.get_skills_version_async(db), limit, cursor)
+
+    async def load():
+        page = await crud.get_skills_async(db, limit=limit, cursor=cursor)
+        return schemas.SkillPage.model_validate(page)
+
+    try:
+        return await respond_async(request, etag, None, load, started)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid skills cursor")
+
+
+@router.get("/typeahead", response_model=List[schemas.SkillSuggestion])
+async def suggest_skills(
+    q: str = Query("", max_length=50), limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Most popular skills whose name starts with `q`, served from memory.
+    """
+    index = get_skill_typeahead()
+    refresh_if_stale(index)
+    return index.suggest(q, k=limit)
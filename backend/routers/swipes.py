@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+import schemas
+import security
+from app.services.auto_apply import get_auto_apply_pipeline
+from app.services.swipe_ingest import BufferFull, SwipeEvent, get_swipe_buffer
+from app.services.swipe_quota import get_swipe_quota
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.SwipeAck, status_code=status.HTTP_202_ACCEPTED)
+def create_swipe(
+    swipe: schemas.SwipeCreate,
+    response: Response,
+    current_user: security.Principal = Depends(security.get_current_user),
+):
+    """
+    Records a swipe. The swipe is acknowledged once it is buffered and
+    written to the spill log; it reaches the database on the next flush.
+    Counts against the user's daily swipe limit, which resets at midnight
+    in their timezone.
+    """
+    user_id = str(current_user.id)
+    quota = get_swipe_quota()
+    decision = quota.consume(user_id)
+    if decision is not None:
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Daily swipe limit reached",
+                headers={"Retry-After": str(decision.reset_seconds)},
+            )
+        response.headers["X-Swipe-Quota-Limit"] = str(decision.limit)
+        response.headers["X-Swipe-Quota-Remaining"] = str(decision.remaining)
+
+    try:
+        event = SwipeEvent(
+            user_id=user_id,
+            job_id=swipe.job_id,
+            swipe_direction=swipe.swipe_direction.value,
+            time_spent_viewing=swipe.time_spent_viewing,
+            device_type=swipe.device_type.value if swipe.device_type else None,
+            session_id=swipe.session_id,
+            swipe_context=swipe.swipe_context,
+            match_score=swipe.match_score,
+        )
+        get_swipe_buffer().submit(event)
+    except Exception as exc:
+        # A swipe that was not recorded must not use up the quota
+        if decision is not None:
+            quota.release(user_id)
+        if isinstance(exc, BufferFull):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Swipe ingestion is overloaded, retry shortly",
+            )
+        raise
+    return schemas.SwipeAck(
+        id=event.id, job_id=event.job_id, swipe_direction=swipe.swipe_direction
+    )
+
+
+@router.get("/ingest", response_model=schemas.SwipeIngestStats)
+def read_swipe_ingest_stats(
+    current_user: security.Principal = Depends(security.get_current_admin),
+):
+    """
+    Reports the write-behind buffer depth and flush counters.
+    """
+    return get_swipe_buffer().stats()
+
+
+@router.get("/auto-apply", response_model=schemas.AutoApplyStats)
+def read_auto_apply_stats(
+    current_user: security.Principal = Depends(security.get_current_admin),
+):
+    """
+    Reports the auto-apply queue depths per stage and batch counters.
+    """
+    return get_auto_apply_pipeline().stats()
@@ -1,6 +1,10 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional, List
-from datetime import date
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, field_validator
+from typing import Any, Dict, Optional, List
+from datetime import date, datetime
+
+from app.models.ai import CoverLetterTone
+from app.models.application import DeviceType, SwipeDirection
+from app.models.job import ApplyType, EmploymentType, ExperienceLevel, JobStatus, WorkMode
 
 
 # ===============================
@@ -19,6 +23,23 @@ class Skill(SkillBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SkillPage(BaseModel):
+    items: List[Skill] = []
+    next_cursor: Optional[str] = None  # absent on the last page
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SkillSuggestion(BaseModel):
+    id: int
+    name: str
+    popularity: int  # profiles + active job postings listing the skill
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SkillBulkCreate(BaseModel):
+    skills: List[SkillCreate] = Field(..., min_length=1, max_length=200)
+
+
 # ===============================
 #       EDUCATION SCHEMAS (NEW)
 # ===============================
@@ -113,3 +134,252 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[EmailStr] = None
+
+
+# ===============================
+#       FEED SCHEMAS
+# ===============================
+class JobCard(BaseModel):
+    id: str
+    job_title: str
+    company_id: str
+    work_mode: Optional[str] = None
+    experience_level: Optional[str] = None
+    location_city: Optional[str] = None
+    location_country: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    score: float
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FeedPage(BaseModel):
+    cards: List[JobCard] = []
+    next_cursor: Optional[str] = None
+
+
+# ===============================
+#       JOB & COMPANY SCHEMAS
+# ===============================
+class CompanySummary(BaseModel):
+    id: str
+    company_name: str
+    company_slug: Optional[str] = None
+    logo_url: Optional[str] = None
+    industry: Optional[str] = None
+    headquarters_city: Optional[str] = None
+    headquarters_country: Optional[str] = None
+    is_verified: bool = False
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobSkillOut(BaseModel):
+    skill_name: str
+    importance: Optional[str] = None
+    weight: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobSummary(BaseModel):
+    id: str
+    job_title: str
+    work_mode: Optional[str] = None
+    experience_level: Optional[str] = None
+    location_city: Optional[str] = None
+    location_country: Optional[str] = None
+    published_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobDetail(JobSummary):
+    company: CompanySummary
+    job_description: str
+    job_responsibilities: Optional[List[Any]] = None
+    job_requirements: Optional[List[Any]] = None
+    nice_to_have: Optional[List[Any]] = None
+    employment_type: Optional[str] = None
+    location_state: Optional[str] = None
+    is_location_flexible: Optional[bool] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_currency: Optional[str] = None
+    salary_period: Optional[str] = None
+    benefits: Optional[List[Any]] = None
+    visa_sponsorship: Optional[bool] = None
+    application_deadline: Optional[datetime] = None
+    job_status: Optional[str] = None
+    apply_type: Optional[str] = None
+    external_url: Optional[str] = None
+    required_skills: List[JobSkillOut] = []
+
+
+class CompanyPage(CompanySummary):
+    website_url: Optional[str] = None
+    description: Optional[str] = None
+    company_size: Optional[str] = None
+    founded_year: Optional[int] = None
+    tech_stack: Optional[List[Any]] = None
+    benefits: Optional[List[Any]] = None
+    is_hiring: Optional[bool] = None
+    open_jobs: List[JobSummary] = []
+
+
+# ===============================
+#       JOB IMPORT SCHEMAS
+# ===============================
+class JobImportRow(BaseModel):
+    """
+    One job of a partner or scraped feed. CSV feeds flatten list fields
+    with "|" (`skills: "python|sql"`).
+    """
+    external_job_id: str = Field(..., min_length=1, max_length=255)
+    company_name: str = Field(..., min_length=1, max_length=255)
+    company_slug: Optional[str] = Field(None, max_length=255)
+    job_title: str = Field(..., min_length=1, max_length=255)
+    job_description: str = Field(..., min_length=1)
+    experience_level: ExperienceLevel
+    employment_type: EmploymentType = EmploymentType.FULL_TIME
+    work_mode: WorkMode = WorkMode.REMOTE
+    job_status: JobStatus = JobStatus.ACTIVE
+    job_responsibilities: List[str] = []
+    job_requirements: List[str] = []
+    nice_to_have: List[str] = []
+    skills: List[str] = []
+    location_city: Optional[str] = Field(None, max_length=100)
+    location_state: Optional[str] = Field(None, max_length=100)
+    location_country: Optional[str] = Field(None, max_length=100)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    salary_min: Optional[int] = Field(None, ge=0)
+    salary_max: Optional[int] = Field(None, ge=0)
+    salary_currency: str = Field("USD", min_length=3, max_length=3)
+    salary_period: str = Field("yearly", max_length=20)
+    external_url: Optional[str] = None
+    apply_type: ApplyType = ApplyType.EXTERNAL
+    application_deadline: Optional[datetime] = None
+    published_at: Optional[datetime] = None
+
+    @field_validator(
+        "job_responsibilities", "job_requirements", "nice_to_have", "skills", mode="before"
+    )
+    @classmethod
+    def _split_lists(cls, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [item.strip() for item in value.split("|") if item.strip()]
+        return value
+
+
+class JobImportError(BaseModel):
+    line: int
+    error: str
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobImportReport(BaseModel):
+    rows_read: int
+    imported: int
+    invalid: int
+    companies: int
+    skills: int
+    batches: int
+    seconds: float
+    rows_per_second: float
+    errors: List[JobImportError] = []  # the first few only
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ===============================
+#       MATCHING SCHEMAS
+# ===============================
+class MatchPipelineStats(BaseModel):
+    stale_backlog: int
+    drain_rate_per_second: float
+    total_drained: int
+    total_errors: int
+    running: bool
+
+
+class SkillMatch(BaseModel):
+    job_id: str
+    score: float
+    coverage: float
+    matched_skills: List[str] = []
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobSearchHit(BaseModel):
+    job_id: str
+    score: float
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GeoHit(BaseModel):
+    id: str
+    distance_km: Optional[float] = None
+    work_mode: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ===============================
+#       SWIPE SCHEMAS
+# ===============================
+class SwipeCreate(BaseModel):
+    job_id: str = Field(..., min_length=1, max_length=36)
+    swipe_direction: SwipeDirection
+    time_spent_viewing: Optional[int] = Field(None, ge=0)
+    device_type: Optional[DeviceType] = None
+    session_id: Optional[str] = Field(None, max_length=36)
+    swipe_context: Dict[str, Any] = {}
+    match_score: Optional[float] = Field(None, ge=0, le=100)  # DECIMAL(5,2)
+
+
+class SwipeAck(BaseModel):
+    id: str
+    job_id: str
+    swipe_direction: SwipeDirection
+    queued: bool = True
+
+
+class SwipeIngestStats(BaseModel):
+    pending: int
+    total_flushed: int
+    total_batches: int
+    total_errors: int
+    total_dead_lettered: int
+    running: bool
+
+
+class AutoApplyLaneStats(BaseModel):
+    waiting: int
+    running: int
+    concurrency: int
+
+
+class AutoApplyStats(BaseModel):
+    pending: int
+    lanes: Dict[str, AutoApplyLaneStats]
+    total_batches: int
+    total_errors: int
+    running: bool
+
+
+class CoverLetterGenerate(BaseModel):
+    job_id: str
+    tone: CoverLetterTone = CoverLetterTone.PROFESSIONAL
+    template_id: Optional[str] = None
+
+
+class ResumeGenerate(BaseModel):
+    job_id: Optional[str] = None  # tailor the resume to this job
+    template_id: Optional[str] = None
+
+
+class ResumeUpload(BaseModel):
+    id: str
+    resume_name: str
+    file_format: str  # detected from the content, not the filename
+    file_size_bytes: int
+    sha256: str
+    deduplicated: bool  # the same file was already stored
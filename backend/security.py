@@ -1,15 +1,24 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from itertools import chain
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
 # It's better practice to import modules, not just functions
 import crud.user as user_crud
-from database import get_db
+import models
+from app.core.config import settings
+from app.core.hashing import get_hashing_pool, pwd_context
+from app.core.principal_cache import Principal, PrincipalCache, token_key
+from database import get_async_db, get_db
 
 # --- Configuration ---
 SECRET_KEY = "a_very_secret_key_that_you_should_change"
@@ -19,9 +28,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
 # --- Password Hashing ---
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
-
-
+# The sync helpers hash on the calling thread; request handlers should use
+# the async variants, which run on the dedicated hashing process pool.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -30,6 +38,14 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await get_hashing_pool().verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await get_hashing_pool().hash(password)
+
+
 # --- JWT Token Creation ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -44,24 +60,149 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+# --- Principal Cache ---
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    max_ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+_PENDING_KEY = "principal_invalidation"
+
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    Forgets every cached token of a user, e.g. after deactivating them.
+    """
+    principal_cache.invalidate_user(user_id)
+
+
+def _collect_principal_changes(session: Session, flush_context) -> None:
+    user_ids = session.info.setdefault(_PENDING_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, models.User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, models.Profile):
+            user_ids.add(obj.user_id)
+
+
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_principal(user_id)
+
+
+def _discard_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def install_principal_invalidation(session_factory) -> None:
+    """
+    Drops cached principals whenever a user or their profile changes.
+    """
+    if not event.contains(session_factory, "after_flush", _collect_principal_changes):
+        event.listen(session_factory, "after_flush", _collect_principal_changes)
+        event.listen(session_factory, "after_commit", _invalidate_committed)
+        event.listen(session_factory, "after_soft_rollback", _discard_pending)
+
+
 # --- "Gatekeeper" Dependency ---
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
         raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+
+# token hash -> (subject, exp) of validly signed tokens; like the principal
+# cache, raw tokens are never kept, and tokens that fail the check take no slot
+_subjects: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_subjects_lock = threading.Lock()
+
+
+def token_subject(token: str) -> Optional[str]:
+    """
+    The subject of a validly signed, unexpired token, else None. Used to key
+    rate limits: the signature check is memoised per token until it
+    expires, and the user is not looked up.
+    """
+    key = token_key(token)
+    now = time.time()
+    with _subjects_lock:
+        claims = _subjects.get(key)
+        if claims is not None:
+            if claims[1] > now:
+                _subjects.move_to_end(key)
+                return claims[0]
+            del _subjects[key]
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    subject, exp = payload.get("sub"), payload.get("exp")
+    if subject is None or exp is None or exp <= now:
+        return None
+    with _subjects_lock:
+        _subjects[key] = (subject, float(exp))
+        while len(_subjects) > settings.PRINCIPAL_CACHE_MAX_ENTRIES:
+            _subjects.popitem(last=False)
+    return subject
+
 
-    user = user_crud.get_user_by_email(db, email=email)
-    if user is None:
+def _remember(token: str, payload: dict, row) -> Principal:
+    if row is None or row.is_active is False:
         raise credentials_exception
-    return user
+    principal = Principal(
+        id=row.id, email=row.email, is_active=True, profile_id=row.profile_id
+    )
+    principal_cache.put(token, principal, payload["exp"])
+    return principal
+
+
+def get_current_user(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Resolves the bearer token to a Principal. Repeat requests with the same
+    token are answered from the principal cache without touching the DB.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    payload = _decode_token(token)
+    row = user_crud.get_principal_by_email(db, email=payload["sub"])
+    return _remember(token, payload, row)
+
+
+def get_current_admin(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
+    """get_current_user, restricted to the accounts listed in ADMIN_EMAILS."""
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return current_user
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    get_current_user for async routes: a cache miss awaits an AsyncSession
+    query instead of borrowing a threadpool thread.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    payload = _decode_token(token)
+    row = await user_crud.get_principal_by_email_async(db, email=payload["sub"])
+    return _remember(token, payload, row)